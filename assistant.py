@@ -16,12 +16,13 @@ import importlib
 import re
 
 from modules.actions import detect_action
-from modules.tts_manager import speak, is_speaking, stop_speech
+from modules.tts_manager import speak, is_speaking, stop_speech, on_idle as on_speech_idle
 from modules import window_tools, vision_tools
 from modules.automation_learning import record_macro, play_macro
-from modules import command_macros
+from modules import command_macros, command_scheduler, macro_suggestions
 from modules.desktop_shortcuts import build_shortcut_map, open_shortcut
 from modules.chitchat import is_chitchat, talk_to_llm
+from modules import phrase_matcher
 import planning_agent
 import remote_agent
 from state_manager import (
@@ -31,7 +32,6 @@ from state_manager import (
     state as state_dict,
     save_state,
     add_resume_phrase,
-    get_resume_phrases,
 )
 
 from error_logger import log_error
@@ -41,14 +41,16 @@ import llm_interface
 from llm_interface import generate_response
 from phrase_manager import add_wake_phrase, add_sleep_phrase, add_cancel_phrase
 from module_manager import ModuleRegistry
-from config_loader import ConfigLoader
+from config_service import get_config_service
 from config_validator import validate_config
 import scan_registry
 from crash_handler import setup_crash_handler
 
-config_loader = ConfigLoader()
+config_loader = get_config_service()
 config = config_loader.config
 BUSY_TIMEOUT = config.get("busy_timeout", 60)
+# Longest the command queue waits for a reply to finish playing
+HANDOFF_TIMEOUT = 120.0
 
 # Ensure long term memory DB is ready
 try:
@@ -73,9 +75,11 @@ scan_registry.initialize()
 
 # Central state of the assistant: "idle" or "processing"
 assistant_state = "idle"
-pending_commands: list[tuple[str, any]] = []
 listening_before_processing = True
 
+# Commands from the GUI, voice listener, web API and remote server run here
+scheduler = command_scheduler.get_scheduler()
+
 # Event used to signal a cancellation request
 cancel_event = threading.Event()
 
@@ -115,42 +119,114 @@ def get_state() -> str:
 setup_crash_handler(speak, lambda: set_state("idle"))
 
 
-def queue_command(text: str, widget) -> None:
-    """Store a command to be processed once the assistant is idle."""
-    pending_commands.append((text, widget))
+class _ConsoleOutput:
+    """Output widget stand-in for commands submitted without a GUI."""
+
+    def insert(self, _index, text):
+        print(text, end="")
+
+    def see(self, _index):
+        pass
+
+
+def submit_command(
+    text: str,
+    widget=None,
+    priority: int = command_scheduler.PRIORITY_NORMAL,
+    source: str = "gui",
+) -> command_scheduler.Ticket:
+    """Queue ``text`` for :func:`process_input` and return its ticket.
+
+    Commands run one at a time, each bounded by ``busy_timeout``.
+    """
+    widget = widget if widget is not None else _ConsoleOutput()
+    if scheduler.running() or scheduler.depth():
+        widget.insert("end", f"[Queued] {text}\n")
+        widget.see("end")
+    return scheduler.submit(
+        _run_command,
+        text,
+        widget,
+        priority=priority,
+        timeout=BUSY_TIMEOUT,
+        label=text,
+        source=source,
+        on_timeout=_command_timed_out,
+    )
+
+
+def queue_command(text: str, widget) -> command_scheduler.Ticket:
+    """Queue a follow-up command behind anything the user asked for directly."""
+    return submit_command(text, widget, command_scheduler.PRIORITY_LOW, "queue")
+
+
+def _run_command(text: str, widget):
+    result = process_input(text, widget)
+    if not _command_token().is_set():
+        _run_next_in_queue()
+    return result
+
+
+def _command_timed_out(ticket: command_scheduler.Ticket) -> None:
+    text, widget = ticket.args
+    speak(
+        "Sorry, I got a bit lost trying to answer that. Can you ask again?",
+    )
+    widget.insert(
+        "end", "Assistant: ⚠️ Timed out or overload! Command was: " + text + "\n"
+    )
+    widget.see("end")
+    log_error("Assistant timed out or overloaded.", context=text)
+    set_state("idle")
+    set_listening(False)
+    _run_next_in_queue()
+
+
+def _command_token() -> threading.Event:
+    """Return the running command's cancel token, or ``cancel_event``."""
+    ticket = command_scheduler.current()
+    return ticket.token if ticket is not None else cancel_event
+
+
+def _cancelled() -> bool:
+    return cancel_event.is_set() or _command_token().is_set()
 
 
 def cancel_processing() -> None:
     """Abort current work and clear the queue."""
     cancel_event.set()
-    pending_commands.clear()
+    scheduler.cancel_all()
     set_state("idle")
 
 
 def _run_next_in_queue():
-    """Process the next queued command or announce readiness only when TTS is idle."""
+    """Start the next queued command once queued speech has played."""
+    start = time.time()
+    waiting = is_speaking()
+    hold_id = scheduler.hold(HANDOFF_TIMEOUT)
 
-    def _do_next():
-        if pending_commands:
-            text, widget = pending_commands.pop(0)
-            process_input(text, widget)
-        else:
-            print("*>")
-
-    if is_speaking():
-
-        def _wait_then_run():
-            start = time.time()
-            while is_speaking():
-                time.sleep(0.05)
+    def _handoff():
+        if waiting:
             print(
                 f"[assistant] Waited {time.time() - start:.2f}s for TTS to finish before idle prompt."
             )
-            _do_next()
+        if not scheduler.depth():
+            print("*>")
+        scheduler.release(hold_id)
 
-        threading.Thread(target=_wait_then_run, daemon=True).start()
-    else:
-        _do_next()
+    on_speech_idle(_handoff)
+
+
+def queue_status() -> str:
+    """Describe the command queue depth and latencies."""
+    st = scheduler.stats()
+    return (
+        f"{st['depth']} queued, {st['running']} running; "
+        f"wait {st['wait_ms_mean']:.0f} ms avg / {st['wait_ms_p95']:.0f} ms p95, "
+        f"run {st['run_ms_mean']:.0f} ms avg / {st['run_ms_p95']:.0f} ms p95; "
+        f"{st['done']} done, {st['failed']} failed, {st['timed_out']} timed out, "
+        f"{st['cancelled']} cancelled"
+    )
 
 
 def list_capabilities():
@@ -167,6 +243,8 @@ def list_capabilities():
     lines.append("\nExamples:")
     lines.append("- record <name> : record a new macro")
     lines.append("- play macro <name> : run a saved macro")
+    lines.append("- suggest macros : offer command routines you repeat as macros")
+    lines.append("- queue status : show queued commands and their latency")
     lines.append("- capture region x y w h : OCR part of the screen")
     lines.append("- recall <keyword> : search memory")
     return "\n".join(lines)
@@ -281,14 +359,13 @@ def process_input(user_input, output_widget):
     # --- Multi-task handling without explicit "plan" ---
     plan = planning_agent.create_plan(text)
     if len(plan) > 1 and not text.lower().startswith("plan "):
-        pending_commands.clear()
+        scheduler.clear()
         for sub in plan:
             queue_command(sub, output_widget)
         msg = "Queued tasks: " + ", ".join(plan)
         output_widget.insert("end", f"Assistant: {msg}\n")
         output_widget.see("end")
         speak(msg)
-        _run_next_in_queue()
         return
     set_state("processing")
     global listening_before_processing
@@ -296,7 +373,9 @@ def process_input(user_input, output_widget):
     was_listening = listening_before_processing
 
     listening_before_processing = is_listening()
-    pending_commands.clear()
+    if command_scheduler.current() is None:
+        # A command run directly rather than from the queue supersedes it
+        scheduler.clear()
     set_listening(False)
     speak("Give me a moment...", speed=1.0)
 
@@ -306,7 +385,7 @@ def process_input(user_input, output_widget):
     def task():
         global remote_srv
         try:
-            if cancel_event.is_set():
+            if _cancelled():
                 return
             # === Sleep/Wake logic ===
             if not was_listening:
@@ -786,9 +865,40 @@ def process_input(user_input, output_widget):
                 last_ai_response = msg
                 return
 
+            if text.lower() in {"queue status", "command queue status"}:
+                msg = queue_status()
+                output_widget.insert("end", f"Assistant: {msg}\n")
+                output_widget.see("end")
+                speak(msg)
+                last_ai_response = msg
+                return
+
+            if text.lower() in {"suggest macros", "suggest a macro"}:
+                routines = macro_suggestions.suggest_routines()
+                if routines:
+                    msg = "; ".join(
+                        f"{i}: {' then '.join(cmds)}" for i, cmds in enumerate(routines, 1)
+                    ) + ". Say 'save suggestion <number> as <name>' to keep one."
+                else:
+                    msg = "No repeated routines found yet"
+                output_widget.insert("end", f"Assistant: {msg}\n")
+                output_widget.see("end")
+                speak(msg)
+                last_ai_response = msg
+                return
+
+            m = re.match(r"save suggestion (\d+) as (\w+)", text, re.IGNORECASE)
+            if m:
+                msg = macro_suggestions.save_routine(int(m.group(1)), m.group(2))
+                output_widget.insert("end", f"Assistant: {msg}\n")
+                output_widget.see("end")
+                speak(msg)
+                last_ai_response = msg
+                return
+
             m = re.match(r"run macro (\w+)", text, re.IGNORECASE)
             if m:
-                msg = command_macros.run_macro(m.group(1), parse_and_execute)
+                msg = command_macros.run_macro(m.group(1), parse_and_execute, cancel=_command_token())
                 output_widget.insert("end", f"Assistant: {msg}\n")
                 output_widget.see("end")
                 speak(msg)
@@ -906,7 +1016,7 @@ def process_input(user_input, output_widget):
 
 
             # === Synonym action logic ===
-            if cancel_event.is_set():
+            if _cancelled():
                 return
             action = detect_action(text)
             if action == "ENTER":
@@ -944,7 +1054,7 @@ def process_input(user_input, output_widget):
                 return
 
             # === Window Awareness & Button Actions ===
-            if cancel_event.is_set():
+            if _cancelled():
                 return
 
             def get_button_image(app, action):
@@ -960,12 +1070,16 @@ def process_input(user_input, output_widget):
                         "pause": "button_images/youtube_pause.png",
                     },
                 }
-                if app in button_map and action in button_map[app]:
-                    return button_map[app][action]
-                generic_path = f"button_images/{action}.png"
-                if os.path.exists(generic_path):
-                    return generic_path
-                return None
+                # Every existing candidate is matched against one capture
+                candidates = [
+                    button_map.get(app, {}).get(action),
+                    f"button_images/{app}_{action}.png",
+                    f"button_images/{action}.png",
+                ]
+                return [
+                    path for path in dict.fromkeys(candidates)
+                    if path and os.path.exists(path)
+                ]
 
             if (
                 "hit play" in text.lower() or "press play" in text.lower()
@@ -977,9 +1091,9 @@ def process_input(user_input, output_widget):
                 if not found:
                     result[0] = msg
                     return
-                image_path = get_button_image(app, action)
-                if image_path and os.path.exists(image_path):
-                    found, msg = window_tools.click_ui_element(image_path)
+                image_paths = get_button_image(app, action)
+                if image_paths:
+                    found, msg = window_tools.click_ui_element(image_paths)
                     if not found:
                         speak(
                             f"I couldn't find the {action} button in {app}. Would you like to teach me?"
@@ -1029,9 +1143,9 @@ def process_input(user_input, output_widget):
                 if not found:
                     result[0] = msg
                     return
-                image_path = get_button_image(app, action)
-                if image_path and os.path.exists(image_path):
-                    found, msg = window_tools.click_ui_element(image_path)
+                image_paths = get_button_image(app, action)
+                if image_paths:
+                    found, msg = window_tools.click_ui_element(image_paths)
                     if not found:
                         speak(
                             f"I couldn't find the {action} button in {app}. Would you like to teach me?"
@@ -1068,7 +1182,7 @@ def process_input(user_input, output_widget):
                 return
 
             # === Vision commands ===
-            if cancel_event.is_set():
+            if _cancelled():
                 return
             try:
                 if text.lower().startswith("capture region"):
@@ -1101,7 +1215,7 @@ def process_input(user_input, output_widget):
                 return
 
             # === Fallback to orchestrator or LLM ===
-            if cancel_event.is_set():
+            if _cancelled():
                 return
             try:
                 if user_wants_code(text):
@@ -1118,21 +1232,13 @@ def process_input(user_input, output_widget):
         except Exception as e:
             exception_caught[0] = e
 
-    t = threading.Thread(target=task)
-    t.start()
-    t.join(BUSY_TIMEOUT)
+    task()
+    ticket = command_scheduler.current()
+    if ticket is not None and ticket.token.is_set():
+        # Timed out or cancelled; the scheduler has already moved on
+        return
 
-    if t.is_alive():
-        cancel_event.set()
-        speak(
-            "Sorry, I got a bit lost trying to answer that. Can you ask again?",
-        )
-        output_widget.insert(
-            "end", "Assistant: ⚠️ Timed out or overload! Command was: " + text + "\n"
-        )
-        output_widget.see("end")
-        log_error("Assistant timed out or overloaded.", context=text)
-    elif exception_caught[0]:
+    if exception_caught[0]:
         speak("Sorry, I encountered an error. Please try again.")
         output_widget.insert("end", f"Assistant: [ERROR]: {exception_caught[0]}\n")
         output_widget.see("end")
@@ -1151,10 +1257,13 @@ def process_input(user_input, output_widget):
                 last_ai_response = msg
             print("*>")
 
-    update_state(last_command=last_user_command, last_response=last_ai_response)
+    update_state(
+        last_command=last_user_command,
+        last_response=last_ai_response,
+        last_command_time=time.time(),
+    )
     set_state("idle")
     set_listening(False)
-    _run_next_in_queue()
 
     # If quit requested, let GUI handle quitting
     if result[0] == "QUIT":
@@ -1166,34 +1275,18 @@ def process_input(user_input, output_widget):
 
 _listening = False
 
-def _wake_phrases() -> list:
-    return config_loader.config.get("wake_phrases", ["hey assistant"])
-
-
-def _sleep_phrases() -> list:
-    return config_loader.config.get("sleep_phrases", ["ok that's all"])
-
-
-def _resume_phrases() -> list:
-    return config_loader.config.get("resume_phrases", ["next question", "next answer"])
-
-
 def check_wake(text):
     """Return True if a wake or resume phrase is detected and assistant was asleep."""
     global _listening
     if _listening:
         return False
 
-    text_l = text.lower()
-    user_phrases = get_resume_phrases()
-    all_phrases = _wake_phrases() + _resume_phrases() + user_phrases
-    for phrase in all_phrases:
-        if phrase in text_l:
-            _listening = True
-            if phrase not in _wake_phrases() + _resume_phrases():
-                add_resume_phrase(phrase)
-            return True
+    hits = phrase_matcher.match(text)
+    if "wake" in hits or "resume" in hits:
+        _listening = True
+        return True
 
+    text_l = text.lower()
     if text_l.startswith("next "):
         add_resume_phrase(text_l.strip())
         _listening = True
@@ -1205,7 +1298,7 @@ def check_wake(text):
 def check_sleep(text):
     """Return True if a sleep phrase is detected and assistant was awake; also puts assistant to sleep."""
     global _listening
-    if _listening and any(sleep in text.lower() for sleep in _sleep_phrases()):
+    if _listening and "sleep" in phrase_matcher.match(text):
         _listening = False
         return True
     return False
@@ -9,7 +9,7 @@ from assistant import (
 )
 from orchestrator import parse_and_execute
 from modules.actions import detect_action
-from modules import command_macros
+from modules import command_macros, command_scheduler
 import re
 import planning_agent
 import keyboard
@@ -18,19 +18,19 @@ import time
 import os
 
 
-# Queue of pending CLI commands processed sequentially
-pending_commands: list[str] = []
+def queue_command(text: str):
+    """Queue a command on the shared command scheduler."""
+    return command_scheduler.submit(
+        _run_queued, text, priority=command_scheduler.PRIORITY_LOW, label=text, source="cli"
+    )
 
-def queue_command(text: str) -> None:
-    """Add a command to the pending queue."""
-    pending_commands.append(text)
+def _run_queued(text: str) -> None:
+    result = parse_and_execute(text)
+    print("Assistant:", result)
 
-def _run_next_in_queue() -> None:
-    """Process queued commands in FIFO order."""
-    while pending_commands:
-        cmd = pending_commands.pop(0)
-        result = parse_and_execute(cmd)
-        print("Assistant:", result)
+def _wait_for_queue() -> None:
+    """Block until queued commands have run, so replies precede the prompt."""
+    command_scheduler.get_scheduler().wait_idle()
 
 
 def process_command(user_input: str):
@@ -156,7 +156,7 @@ def handle_cli_input(user_input: str) -> str | None:
         for t in tasks:
             queue_command(t)
         queued = ", ".join(tasks)
-        _run_next_in_queue()
+        _wait_for_queue()
         return f"Queued plan: {queued}"
 
     plan = planning_agent.create_plan(user_input)
@@ -164,7 +164,7 @@ def handle_cli_input(user_input: str) -> str | None:
         for t in plan:
             queue_command(t)
         queued = ", ".join(plan)
-        _run_next_in_queue()
+        _wait_for_queue()
         return f"Queued tasks: {queued}"
 
     # Generic actions
@@ -232,6 +232,9 @@ def handle_cli_input(user_input: str) -> str | None:
     return parse_and_execute(user_input)
 
 def cli_loop():
+    from modules import tts_manager
+
+    tts_manager.start_preload()
     print(
         "Local AI Assistant with Memory\nType 'exit' to quit, 'recall <keyword>' to search memory."
     )
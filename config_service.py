@@ -0,0 +1,410 @@
+"""Process-wide configuration service shared by every module.
+
+``config.json`` is parsed once per process.  All modules read the same
+dictionary, a single watcher picks up external edits and subscribers are
+notified when individual keys change.  Writes are coalesced by a debounced,
+atomic writer so rapid updates (e.g. dragging the volume slider) result in a
+single rewrite of the file.  A failed write is kept by the writer so callers
+can report it and retried on the next flush, and an external edit made
+while a write is pending or failed is merged with the unsaved keys instead
+of overwriting them.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import tempfile
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from config_loader import ConfigLoader
+from error_logger import log_error
+
+MODULE_NAME = "config_service"
+DEFAULT_PATH = "config.json"
+WRITE_DEBOUNCE = 0.5
+POLL_INTERVAL = 1.0
+
+__all__ = [
+    "ConfigService",
+    "ConfigWriter",
+    "atomic_write_json",
+    "get_config_service",
+    "update_config",
+    "flush_writes",
+]
+
+
+def atomic_write_json(path: str, data: dict) -> None:
+    """Write ``data`` to ``path`` via a temp file and ``os.replace``."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(prefix=".config-", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except Exception:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+class ConfigWriter:
+    """Debounced writer that coalesces repeated saves of the same file."""
+
+    def __init__(self, delay: float = WRITE_DEBOUNCE):
+        self.delay = delay
+        self._lock = threading.Lock()
+        self._pending: Dict[str, Callable[[], dict]] = {}
+        self._timers: Dict[str, threading.Timer] = {}
+        self._callbacks: Dict[str, List[Callable[[], None]]] = {}
+        self._errors: Dict[str, Exception] = {}
+
+    def schedule(
+        self,
+        path: str,
+        snapshot: Callable[[], dict],
+        on_written: Optional[Callable[[], None]] = None,
+    ) -> None:
+        """Write ``snapshot()`` to ``path`` once no new request arrives for ``delay`` seconds."""
+        path = os.path.abspath(path)
+        with self._lock:
+            self._pending[path] = snapshot
+            if on_written and on_written not in self._callbacks.setdefault(path, []):
+                self._callbacks[path].append(on_written)
+            timer = self._timers.pop(path, None)
+            if timer:
+                timer.cancel()
+            if self.delay <= 0:
+                timer = None
+            else:
+                timer = threading.Timer(self.delay, self.flush, args=(path,))
+                timer.daemon = True
+                self._timers[path] = timer
+        if timer is None:
+            self.flush(path)
+        else:
+            timer.start()
+
+    def pending(self, path: str) -> bool:
+        """Return ``True`` if a write for ``path`` has not been flushed yet."""
+        with self._lock:
+            return os.path.abspath(path) in self._pending
+
+    def error(self, path: str) -> Exception | None:
+        """Return why the last write of ``path`` failed, or ``None`` if it succeeded."""
+        with self._lock:
+            return self._errors.get(os.path.abspath(path))
+
+    def flush(self, path: Optional[str] = None) -> bool:
+        """Write pending data for ``path`` (or every path) immediately."""
+        with self._lock:
+            paths = [os.path.abspath(path)] if path else list(self._pending)
+            jobs = []
+            for p in paths:
+                timer = self._timers.pop(p, None)
+                if timer:
+                    timer.cancel()
+                snapshot = self._pending.pop(p, None)
+                if snapshot is not None:
+                    jobs.append((p, snapshot, self._callbacks.pop(p, [])))
+        ok = True
+        for p, snapshot, callbacks in jobs:
+            try:
+                atomic_write_json(p, snapshot())
+            except Exception as e:
+                log_error(f"[{MODULE_NAME}] Could not write {p}: {e}")
+                with self._lock:
+                    self._errors[p] = e
+                    # Keep the data pending so the next flush retries it
+                    self._pending.setdefault(p, snapshot)
+                    waiting = self._callbacks.setdefault(p, [])
+                    waiting.extend(cb for cb in callbacks if cb not in waiting)
+                ok = False
+                continue
+            with self._lock:
+                self._errors.pop(p, None)
+            for cb in callbacks:
+                try:
+                    cb()
+                except Exception as e:  # pragma: no cover - callback error
+                    log_error(f"[{MODULE_NAME}] write callback error: {e}")
+        return ok
+
+
+_writer = ConfigWriter()
+_MISSING = object()
+
+
+def _diff(old: dict, new: dict) -> dict:
+    """Return ``{key: new_value}`` for every key whose value differs."""
+    return {k: new.get(k) for k in set(old) | set(new) if old.get(k) != new.get(k)}
+
+
+class ConfigService(ConfigLoader):
+    """Shared configuration with typed accessors, subscriptions and a watcher.
+
+    The service keeps the :class:`ConfigLoader` interface so existing callers
+    continue to work.  ``self.config`` is updated in place on reload, meaning
+    module level aliases such as ``config = service.config`` stay current.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH, writer: ConfigWriter | None = None):
+        self._lock = threading.RLock()
+        self._subscribers: Dict[str, List[Callable[[Any], None]]] = {}
+        self._reload_listeners: List[Callable[[dict], None]] = []
+        self._writer = writer or _writer
+        self._observer = None
+        self._poll_thread: threading.Thread | None = None
+        self._stop_polling = threading.Event()
+        # Keys changed in memory and not yet written to the file
+        self._dirty: set = set()
+        self._saving: dict = {}
+        self.config: dict = {}
+        self.path = path
+        self.last_modified = None
+        self.load_config()
+
+    # ----- loading -----
+    def _read(self) -> dict | None:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            log_error(f"[{MODULE_NAME}] Could not load {self.path}: {e}")
+            return None
+        return data if isinstance(data, dict) else {}
+
+    def _mtime(self):
+        try:
+            return os.path.getmtime(self.path)
+        except OSError:
+            return None
+
+    def load_config(self) -> dict:
+        """Read the file, replace ``self.config`` in place and notify subscribers.
+
+        Keys changed here but not written yet keep their in-memory value;
+        the pending write then saves them together with the file's keys.
+        """
+        data = self._read()
+        if data is None:
+            return self.config
+        with self._lock:
+            if self._writer.pending(self.path):
+                for key in self._dirty:
+                    if key in self.config:
+                        data[key] = self.config[key]
+                    else:
+                        data.pop(key, None)
+            old = dict(self.config)
+            self.config.clear()
+            self.config.update(data)
+            self.last_modified = self._mtime()
+        changes = _diff(old, self.config)
+        if not changes:
+            return self.config
+        self._notify(changes)
+        for listener in list(self._reload_listeners):
+            try:
+                listener(changes)
+            except Exception as e:
+                log_error(f"[{MODULE_NAME}] reload listener error: {e}")
+        return self.config
+
+    def reload_if_changed(self):
+        if self._mtime() != self.last_modified:
+            print("[ConfigService] Detected config change, reloading...")
+            return self.load_config()
+        return self.config
+
+    # ----- typed accessors -----
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.config.get(key, default)
+
+    def get_bool(self, key: str, default: bool = False) -> bool:
+        val = self.config.get(key, default)
+        if isinstance(val, str):
+            return val.strip().lower() in {"1", "true", "yes", "on"}
+        return bool(val)
+
+    def get_int(self, key: str, default: int = 0) -> int:
+        try:
+            return int(self.config.get(key, default))
+        except (TypeError, ValueError):
+            return default
+
+    def get_float(self, key: str, default: float = 0.0) -> float:
+        try:
+            return float(self.config.get(key, default))
+        except (TypeError, ValueError):
+            return default
+
+    def get_str(self, key: str, default: str = "") -> str:
+        val = self.config.get(key, default)
+        return default if val is None else str(val)
+
+    def get_list(self, key: str, default: list | None = None) -> list:
+        val = self.config.get(key)
+        if isinstance(val, list):
+            return val
+        return list(default or [])
+
+    # ----- subscriptions -----
+    def subscribe(self, key: str, callback: Callable[[Any], None]) -> Callable[[], None]:
+        """Call ``callback(new_value)`` whenever ``key`` changes.
+
+        Returns a function that removes the subscription.
+        """
+        with self._lock:
+            self._subscribers.setdefault(key, []).append(callback)
+
+        def _unsubscribe() -> None:
+            with self._lock:
+                subs = self._subscribers.get(key, [])
+                if callback in subs:
+                    subs.remove(callback)
+
+        return _unsubscribe
+
+    def add_reload_listener(self, callback: Callable[[dict], None]) -> None:
+        """Call ``callback(changes)`` when re-reading the file changed any key."""
+        self._reload_listeners.append(callback)
+
+    def _notify(self, changes: dict) -> None:
+        for key, value in changes.items():
+            with self._lock:
+                subs = list(self._subscribers.get(key, []))
+            for cb in subs:
+                try:
+                    cb(value)
+                except Exception as e:
+                    log_error(f"[{MODULE_NAME}] subscriber for '{key}' failed: {e}")
+
+    # ----- writes -----
+    def update(self, values: dict | None = None, **kwargs) -> None:
+        """Merge ``values`` into the config, notify subscribers and save."""
+        values = {**(values or {}), **kwargs}
+        with self._lock:
+            changes = {k: v for k, v in values.items() if self.config.get(k) != v or k not in self.config}
+            self.config.update(values)
+            self._dirty.update(values)
+        self._notify(changes)
+        self.save()
+
+    def set(self, key: str, value: Any) -> None:
+        self.update({key: value})
+
+    def remove(self, key: str) -> None:
+        """Delete ``key`` from the config if present and save."""
+        with self._lock:
+            if key not in self.config:
+                return
+            del self.config[key]
+            self._dirty.add(key)
+        self._notify({key: None})
+        self.save()
+
+    def replace(self, values: dict) -> None:
+        """Replace the whole config with ``values`` (keys not present are removed)."""
+        with self._lock:
+            old = dict(self.config)
+            self.config.clear()
+            self.config.update(values)
+            self._dirty.update(old, values)
+        self._notify(_diff(old, self.config))
+        self.save()
+
+    def _snapshot(self) -> dict:
+        with self._lock:
+            self._saving = json.loads(json.dumps(self.config))
+            return self._saving
+
+    def _mark_written(self) -> None:
+        with self._lock:
+            # Keys changed again after the snapshot still need writing
+            self._dirty = {
+                k for k in self._dirty if self.config.get(k, _MISSING) != self._saving.get(k, _MISSING)
+            }
+            self.last_modified = self._mtime()
+
+    def save(self) -> None:
+        """Schedule a debounced atomic write of the whole config."""
+        self._writer.schedule(self.path, self._snapshot, self._mark_written)
+
+    def flush(self) -> bool:
+        """Write any pending changes immediately."""
+        return self._writer.flush(self.path)
+
+    def write_error(self) -> Exception | None:
+        """Return why the last write of the file failed, or ``None``."""
+        return self._writer.error(self.path)
+
+    # ----- watching -----
+    def start_watching(self, poll_interval: float = POLL_INTERVAL) -> None:
+        """Start the single file watcher (watchdog if available, else polling)."""
+        if self._observer is not None or self._poll_thread is not None:
+            return
+        try:
+            from config_watcher import start_watcher
+
+            self._observer = start_watcher(self.path, self.reload_if_changed)
+            print("[ConfigService] Watching for config changes...")
+            return
+        except Exception as e:
+            log_error(f"[{MODULE_NAME}] watchdog unavailable, polling instead: {e}", level="INFO")
+
+        def _poll() -> None:
+            while not self._stop_polling.wait(poll_interval):
+                try:
+                    self.reload_if_changed()
+                except Exception as e:  # pragma: no cover - unexpected I/O error
+                    log_error(f"[{MODULE_NAME}] poll error: {e}")
+
+        self._stop_polling.clear()
+        self._poll_thread = threading.Thread(target=_poll, daemon=True)
+        self._poll_thread.start()
+
+    def stop_watching(self) -> None:
+        if self._observer is not None:
+            from config_watcher import stop_watcher
+
+            stop_watcher(self._observer)
+            self._observer = None
+        if self._poll_thread is not None:
+            self._stop_polling.set()
+            self._poll_thread = None
+
+
+_services: Dict[str, ConfigService] = {}
+_services_lock = threading.Lock()
+
+
+def get_config_service(path: str = DEFAULT_PATH) -> ConfigService:
+    """Return the process-wide :class:`ConfigService` for ``path``."""
+    key = os.path.abspath(path)
+    with _services_lock:
+        svc = _services.get(key)
+        if svc is None:
+            svc = ConfigService(path)
+            _services[key] = svc
+        return svc
+
+
+def update_config(values: dict, path: str = DEFAULT_PATH) -> None:
+    """Merge ``values`` into the config at ``path`` through the shared writer."""
+    get_config_service(path).update(values)
+
+
+def flush_writes() -> bool:
+    """Write every pending config change to disk immediately."""
+    return _writer.flush()
+
+
+atexit.register(flush_writes)
@@ -13,6 +13,13 @@ CONFIG_SCHEMA = {
         "tts_voice": {"type": ["string", "null"]},
         "tts_volume": {"type": "number", "minimum": 0.0, "maximum": 1.0},
         "tts_speed": {"type": "number", "minimum": 0.5, "maximum": 2.0},
+        "tts_streaming": {"type": "boolean"},
+        "tts_preload": {"type": "boolean"},
+        "tts_fallback_backend": {"type": "string", "enum": ["none", "gtts"]},
+        "tts_cache": {"type": "boolean"},
+        "tts_cache_dir": {"type": "string"},
+        "tts_cache_size": {"type": "integer", "minimum": 1},
+        "tts_cache_phrases": {"type": "array", "items": {"type": "string"}},
         "use_voice": {"type": "boolean"},
         "prefer_local_llm": {
             "oneOf": [
@@ -31,8 +38,31 @@ CONFIG_SCHEMA = {
         "sleep_phrases": {"type": "array", "items": {"type": "string"}},
         "cancel_phrases": {"type": "array", "items": {"type": "string"}},
         "resume_phrases": {"type": "array", "items": {"type": "string"}},
+        "phrase_fuzzy_distance": {"type": "integer", "minimum": 0},
         "mic_overlay": {"type": "boolean"},
         "hide_cmd_window": {"type": "boolean"},
+        "screen_capture_backend": {"type": "string", "enum": ["auto", "mss", "pyautogui"]},
+        "screen_cache_ttl": {"type": "number", "minimum": 0.0},
+        "screen_tile_size": {"type": "integer", "minimum": 8},
+        "ocr_tile_size": {"type": "integer", "minimum": 32},
+        "ocr_tile_margin": {"type": "integer", "minimum": 0},
+        "ocr_workers": {"type": "integer", "minimum": 0},
+        "window_cache_ttl": {"type": "number", "minimum": 0},
+        "window_poll_interval": {"type": "number", "minimum": 0},
+        "window_wait_timeout": {"type": "number", "minimum": 0},
+        "step_workers": {"type": "integer", "minimum": 1},
+        "command_workers": {"type": "integer", "minimum": 1},
+        "task_workers": {"type": "integer", "minimum": 1},
+        "task_queue_size": {"type": "integer", "minimum": 1},
+        "macro_replay_speed": {"type": "number"},
+        "macro_simplify_epsilon": {"type": "number", "minimum": 0},
+        "exe_index_path": {"type": "string"},
+        "exe_index_workers": {"type": "integer", "minimum": 1},
+        "exe_index_refresh": {"type": "number", "minimum": 0},
+        "ocr_journal_path": {"type": "string"},
+        "ocr_journal_retention_days": {"type": "number", "minimum": 0},
+        "ocr_journal_max_entries": {"type": "integer", "minimum": 1},
+        "template_scales": {"type": "array", "items": {"type": "number", "exclusiveMinimum": 0}},
         "mic_overlay_colors": {
             "type": "object",
             "properties": {
@@ -46,12 +76,22 @@ CONFIG_SCHEMA = {
         "tips": {"type": "array", "items": {"type": "string"}},
         "hotword": {"type": "string"},
         "enable_hotword": {"type": "boolean"},
-        "pause_threshold": {"type": "number"},
+        "hotword_grammar": {"type": "boolean"},
         "max_speech_length": {"type": "number"},
+        "stt_preroll": {"type": "number", "minimum": 0.0},
+        "mic_device": {"type": ["integer", "string", "null"]},
+        "vad_backend": {"type": "string", "enum": ["energy", "webrtc", "silero"]},
+        "vad_hangover": {"type": "number", "minimum": 0.0},
+        "vad_margin_db": {"type": "number", "minimum": 0.0},
         "auto_sleep_timeout": {"type": "number"},
         "voice_beep": {"type": "boolean"},
         "hf_tts_model": {"type": "string"},
         "hf_stt_model": {"type": "string"},
+        "hf_stt_chunk_length": {"type": "number", "minimum": 0.0},
+        "hf_stt_stride": {"type": "number", "minimum": 0.0},
+        "hf_stt_batch_size": {"type": "integer", "minimum": 1},
+        "hf_stt_quantize": {"type": "boolean"},
+        "hf_stt_idle_unload": {"type": "number", "minimum": 0.0},
         "log_level": {"type": "string"},
         "enable_advanced_logging": {"type": "boolean"},
         "busy_timeout": {"type": "number"},
@@ -16,6 +16,15 @@ class ConfigFileChangeHandler(FileSystemEventHandler):
             print("[ConfigWatcher] config.json modified, reloading...")
             self.reload_callback()
 
+    def on_created(self, event):
+        self.on_modified(event)
+
+    def on_moved(self, event):
+        # Atomic saves (temp file + rename) show up as a move onto the config
+        if getattr(event, "dest_path", "").endswith(self.config_path):
+            print("[ConfigWatcher] config.json replaced, reloading...")
+            self.reload_callback()
+
 def start_watcher(config_path, reload_callback):
     """Start watching a config file for changes."""
     handler = ConfigFileChangeHandler(reload_callback, os.path.basename(config_path))
@@ -59,35 +59,29 @@ try:
     import trimesh
 except Exception:  # pragma: no cover - optional dependency
     trimesh = None  # type: ignore
-try:
-    from watchdog.observers import Observer
-    from config_watcher import ConfigFileChangeHandler
-    WATCHDOG_AVAILABLE = True
-except Exception:
-    Observer = None  # type: ignore
-    ConfigFileChangeHandler = None  # type: ignore
-    WATCHDOG_AVAILABLE = False
-from config_loader import ConfigLoader
+from config_service import get_config_service
 from config_validator import validate_config
 from config_gui import open_memory_window
 from assistant import set_screen_viewer_callback
 from assistant import (
-    process_input,
+    submit_command,
     check_wake,
     check_sleep,
     is_listening,
     speak,
     set_listening,
     get_state,
+    cancel_event,
 )
 # voice_input module lives inside the modules package
 from modules.voice_input import start_voice_listener
-from modules.tts_integration import is_speaking
+from modules.tts_manager import is_speaking
 import modules.tts_integration as tts_module
 from modules import speech_learning
 # utils is located within the modules package
 from modules.utils import resource_path, project_path, hide_cmd_window, show_cmd_window
 from modules import wake_sleep_hotkey
+from modules import tts_manager
 from modules import api_keys
 from modules import debug_panel
 from modules import image_generator
@@ -117,7 +111,7 @@ tray_icon = None  # type: ignore
 
 # ========== RESOURCE PATH & CONFIG ==========
 VOSK_MODEL_PATH = resource_path("vosk-model-small-en-us-0.15")
-config_loader = ConfigLoader()
+config_loader = get_config_service()
 config = config_loader.config
 api_keys.apply_keys_from_config()
 
@@ -188,6 +182,7 @@ config_text.pack(fill="both", expand=True, padx=10, pady=10)
 def load_config_text() -> None:
     """Load ``config.json`` into the editor widget."""
     try:
+        config_loader.flush()
         with open("config.json", "r", encoding="utf-8") as f:
             data = f.read()
     except Exception as exc:  # pragma: no cover - unexpected I/O issues
@@ -207,11 +202,9 @@ def save_config_text() -> None:
     if errors:
         output.insert(tk.END, "[CONFIG VALIDATION ERROR]\n" + "\n".join(errors) + "\n")
         return
-    with open("config.json", "w", encoding="utf-8") as f:
-        json.dump(cfg, f, indent=2)
-    config_loader.config = cfg
+    config_loader.replace(cfg)
     output.insert(tk.END, "[SYSTEM] Config saved.\n")
-    reload_config()
+    _apply_config()
 
 btn_frame = ttk.Frame(config_tab)
 btn_frame.pack(pady=(0, 10))
@@ -344,6 +337,7 @@ class ScreenViewer(tk.Toplevel):
         self.fps = max(1, fps)
         self._after_id = None
         self.recording = False
+        self.playing = False
         self.recorded_events: list = []
         self.label = tk.Label(self)
         self.label.pack()
@@ -356,16 +350,14 @@ class ScreenViewer(tk.Toplevel):
 
     def _grab_screen(self):
         try:
-            from PIL import ImageGrab, ImageTk  # type: ignore
-            img = ImageGrab.grab()
-            return ImageTk.PhotoImage(img)
+            from PIL import ImageTk  # type: ignore
+            from modules import screen_capture
+
+            # Reuse a frame another consumer grabbed during this tick
+            frame = screen_capture.grab(max_age=1 / self.fps)
+            return ImageTk.PhotoImage(frame.to_pil())
         except Exception:
-            try:
-                import pyautogui
-                img = pyautogui.screenshot()
-                return ImageTk.PhotoImage(img)
-            except Exception:
-                return None
+            return None
 
     def _update_frame(self):
         if self.recording:
@@ -406,13 +398,23 @@ class ScreenViewer(tk.Toplevel):
             pass
 
     def play_macro(self):
-        if self.recording or not self.recorded_events:
+        if self.recording or not self.recorded_events or self.playing:
             return
-        try:
-            from modules.automation_learning import play_events
-            play_events(self.recorded_events)
-        except Exception:
-            pass
+        from modules.automation_learning import play_events
+
+        def _play():
+            try:
+                play_events(self.recorded_events, cancel=cancel_event)
+            except Exception:
+                pass
+            finally:
+                self.playing = False
+
+        # Replay keeps the recorded timing, so run it off the Tk thread; a
+        # stale cancel from an earlier command must not stop it immediately
+        cancel_event.clear()
+        self.playing = True
+        threading.Thread(target=_play, daemon=True).start()
 
     def destroy(self):
         if self._after_id:
@@ -437,10 +439,10 @@ set_screen_viewer_callback(open_screen_viewer)
 def send():
     user_input = entry.get()
     entry.delete(0, tk.END)
-    # Use imported process_input, pass the UI output widget for responses
+    # Queue the command; responses are written to the UI output widget
     if user_input.strip():
         debug_panel.add_command(user_input)
-    threading.Thread(target=process_input, args=(user_input, output), daemon=True).start()
+    submit_command(user_input, output)
 
 # ===== Task Entry Handlers =====
 task_history = []
@@ -456,7 +458,7 @@ def send_task(event=None):
     task_history.append(user_input)
     history_index = len(task_history)
     debug_panel.add_command(user_input)
-    threading.Thread(target=process_input, args=(user_input, output), daemon=True).start()
+    submit_command(user_input, output)
 
 def show_prev_task(event):
     global history_index
@@ -474,10 +476,8 @@ def show_next_task(event):
     else:
         task_entry.delete(0, tk.END)
     # ========== “Reload Config” Button and Handler=================
-def reload_config():
-    global config
-    config = config_loader.reload()
-    api_keys.apply_keys_from_config()
+def _apply_config(_changes=None):
+    """Validate the shared config and mirror it in the UI controls."""
     errors = validate_config(config)
     if errors:
         output.insert(tk.END, "[CONFIG VALIDATION ERROR]\n" + "\n".join(errors) + "\n")
@@ -490,10 +490,14 @@ def reload_config():
     # Mirror updated values in the UI controls
     volume_scale.set(config.get("tts_volume", 0.8))
     speed_scale.set(config.get("tts_speed", 1.0))
-    tts_module.config.update(config)
     current_voice = config.get("tts_voice") or voice_var.get()
     voice_var.set(current_voice)
 
+
+def reload_config():
+    """Re-read ``config.json``; reload listeners refresh the UI on changes."""
+    config_loader.reload()
+
 # ========== BUTTON HANDLER (UI ONLY) ==========
 buttons_frame = ttk.Frame(entry_frame)
 buttons_frame.pack(side=tk.LEFT)
@@ -1578,12 +1582,8 @@ def browse_llm_model() -> None:
         if path not in saved_llm_models:
             saved_llm_models.append(path)
         llm_model_manager.save_models(saved_llm_models, path)
-        cfg = config_loader.config
-        cfg["llm_model"] = path
-        with open("config.json", "w", encoding="utf-8") as f:
-            json.dump(cfg, f, indent=2)
-        config_loader.config = cfg
-        reload_config()
+        config_loader.set("llm_model", path)
+        _apply_config()
         output.insert(tk.END, f"[SYSTEM] LLM model set to {path}\n")
 
 
@@ -1592,26 +1592,21 @@ ttk.Button(llm_frame, text="Browse", command=browse_llm_model).pack(side=tk.LEFT
 # Settings tab holds remote LLM settings and model selection
 
 def save_settings() -> None:
-    cfg = config_loader.config
     if use_remote_var.get():
-        cfg["llm_url"] = url_var.get().strip()
+        config_loader.set("llm_url", url_var.get().strip())
     else:
-        cfg.pop("llm_url", None)
-    cfg["hide_cmd_window"] = hide_cmd_var.get()
+        config_loader.remove("llm_url")
     path = llm_model_var.get().strip()
     if path and path not in saved_llm_models:
         saved_llm_models.append(path)
     llm_model_manager.save_models(saved_llm_models, path)
-    cfg["llm_model"] = path
-    with open("config.json", "w", encoding="utf-8") as f:
-        json.dump(cfg, f, indent=2)
-    config_loader.config = cfg
+    config_loader.update({"hide_cmd_window": hide_cmd_var.get(), "llm_model": path})
     output.insert(tk.END, "[SYSTEM] Settings saved.\n")
     if hide_cmd_var.get():
         hide_cmd_window()
     else:
         show_cmd_window()
-    reload_config()
+    _apply_config()
 
 ttk.Button(settings_tab, text="Save Settings", command=save_settings).pack(pady=10)
 _toggle_remote()
@@ -1635,15 +1630,9 @@ def browse_hf_tts_model() -> None:
 
 
 def save_hf_tts_model() -> None:
-    from modules import hf_tts
-    cfg = config_loader.config
-    cfg["hf_tts_model"] = hf_tts_var.get().strip()
-    with open("config.json", "w", encoding="utf-8") as f:
-        json.dump(cfg, f, indent=2)
-    config_loader.config = cfg
-    hf_tts._CFG = cfg  # type: ignore
-    hf_tts._tts = None  # reset to load new model on next speak
-    reload_config()
+    from modules import hf_tts  # noqa: F401 - subscribes to hf_tts_model changes
+    config_loader.set("hf_tts_model", hf_tts_var.get().strip())
+    _apply_config()
     output.insert(tk.END, f"[SYSTEM] HF TTS model set to {hf_tts_var.get()}\n")
 
 
@@ -1663,15 +1652,9 @@ def browse_hf_stt_model() -> None:
 
 
 def save_hf_stt_model() -> None:
-    from modules import hf_stt
-    cfg = config_loader.config
-    cfg["hf_stt_model"] = hf_stt_var.get().strip()
-    with open("config.json", "w", encoding="utf-8") as f:
-        json.dump(cfg, f, indent=2)
-    config_loader.config = cfg
-    hf_stt._CFG = cfg  # type: ignore
-    hf_stt._model = None  # reset to load new model on next recognition
-    reload_config()
+    from modules import hf_stt  # noqa: F401 - subscribes to hf_stt_model changes
+    config_loader.set("hf_stt_model", hf_stt_var.get().strip())
+    _apply_config()
     output.insert(tk.END, f"[SYSTEM] HF STT model set to {hf_stt_var.get()}\n")
 
 
@@ -1692,7 +1675,6 @@ def _update_pro_widgets() -> None:
 def toggle_pro_mode() -> None:
     """Switch STT and TTS backends when Pro Mode changes."""
     from modules import tts_manager, voice_input
-    cfg = config_loader.config
     if pro_var.get():
         if not has_internet():
             pro_var.set(False)
@@ -1700,18 +1682,13 @@ def toggle_pro_mode() -> None:
             return
         tts_manager.BACKEND = "huggingface"
         voice_input.STT_BACKEND = "huggingface"
-        cfg["tts_backend"] = "huggingface"
-        cfg["stt_backend"] = "huggingface"
+        backends = {"tts_backend": "huggingface", "stt_backend": "huggingface"}
     else:
         tts_manager.BACKEND = "coqui"
         voice_input.STT_BACKEND = "vosk"
-        cfg["tts_backend"] = "coqui"
-        cfg["stt_backend"] = "vosk"
-    cfg["pro_mode"] = pro_var.get()
-    with open("config.json", "w", encoding="utf-8") as f:
-        json.dump(cfg, f, indent=2)
-    config_loader.config = cfg
-    reload_config()
+        backends = {"tts_backend": "coqui", "stt_backend": "vosk"}
+    config_loader.update({**backends, "pro_mode": pro_var.get()})
+    _apply_config()
     _update_pro_widgets()
     output.insert(tk.END, f"[SYSTEM] Pro Mode {'enabled' if pro_var.get() else 'disabled'}.\n")
 
@@ -1803,6 +1780,7 @@ paragraph_result.pack(fill="x")
 
 # ========== START VOICE LISTENERS & SCHEDULE THREADS ==========
 wake_sleep_hotkey.start_hotkeys()
+tts_manager.start_preload()
 threading.Thread(
     target=start_voice_listener,
     args=(output, VOSK_MODEL_PATH, lambda: mic_hard_muted),  # UI output, model path, mic state
@@ -1877,24 +1855,11 @@ if not os.environ.get("PYTEST_CURRENT_TEST"):
 output.insert(tk.END, "Assistant: Welcome to your local AI assistant! Speak or type your prompt.\n")
 output.insert(tk.END, "Assistant: Try: capture region 100 200 300 300  | click image red_button.png\n\n")
 
-# ========= Watcher Thread ========
-def start_config_watcher():
-    if not WATCHDOG_AVAILABLE:
-        print("[ConfigWatcher] watchdog not available; config auto-reload disabled")
-        return
-    config_path = "config.json"
-    handler = ConfigFileChangeHandler(reload_callback=reload_config, config_path=config_path)
-    observer = Observer()
-    observer.schedule(handler, path=".", recursive=False)
-    observer.start()
-    print("[ConfigWatcher] Watching for config changes...")
-    # Keep observer running (background)
-    while True:
-        time.sleep(1)
-
-# Start watcher thread if watchdog is available
-if WATCHDOG_AVAILABLE:
-    threading.Thread(target=start_config_watcher, daemon=True).start()
+# ========= Config Watcher ========
+# The shared config service owns the single file watcher; external edits
+# reach the UI through its reload listeners.
+config_loader.add_reload_listener(_apply_config)
+config_loader.start_watching()
 
 # ========== MAINLOOP ==========
 root.mainloop()
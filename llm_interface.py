@@ -1,12 +1,12 @@
 import json
 from urllib import request
-from config_loader import ConfigLoader
+from config_service import get_config_service
 from memory_manager import search_memory
 from error_logger import log_error
 from module_manager import get_module_overview
 
 # Load config once at import
-_config_loader = ConfigLoader()
+_config_loader = get_config_service()
 config = _config_loader.config
 
 SYSTEM_PROMPT = (
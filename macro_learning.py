@@ -7,6 +7,7 @@ from pathlib import Path
 from typing import Callable, List, Iterable
 
 from error_logger import log_error
+from modules import step_graph
 
 MACRO_DIR = "macros"
 
@@ -62,8 +63,16 @@ def learn_macro(
     return path
 
 
-def run_macro(name: str, executor: Callable[[str], None]) -> str:
-    """Run macro ``name`` executing each command via ``executor``."""
+def run_macro(
+    name: str,
+    executor: Callable[[str], None],
+    on_progress: Callable | None = None,
+    cancel=None,
+) -> str:
+    """Run macro ``name`` executing each command via ``executor``.
+
+    Independent commands run concurrently (see :mod:`modules.step_graph`).
+    """
     path = Path(MACRO_DIR) / f"{name}.json"
     if not path.exists():
         return f"Macro '{name}' not found"
@@ -73,6 +82,7 @@ def run_macro(name: str, executor: Callable[[str], None]) -> str:
     except Exception as exc:  # pragma: no cover - json errors
         log_error(f"[macro_learning] failed to load {name}: {exc}")
         return f"Error running macro {name}"
-    for cmd in commands:
-        executor(cmd)
+    result = step_graph.run_commands(commands, executor, on_progress=on_progress, cancel=cancel)
+    if result.cancelled:
+        return f"Stopped macro {name}"
     return f"Ran macro {name}"
@@ -29,7 +29,7 @@ except ImportError:  # pragma: no cover - fallback for minimal environments
             return sorted(range(len(seq)), key=lambda i: seq[i])
 
     np = _SimpleNumpy()
-from config_loader import ConfigLoader
+from config_service import get_config_service
 
 # Ensure the 'modules' package can be imported even if the working directory
 # isn't the project root. This commonly happens on Windows when launching the
@@ -74,10 +74,10 @@ def get_model():
 memory = {"texts": [], "vectors": []}
 
 # Load configuration for memory limits
-_config_loader = ConfigLoader()
-MEMORY_MAX = _config_loader.config.get("memory_max", 500)
+_config_loader = get_config_service()
+MEMORY_MAX = _config_loader.get_int("memory_max", 500)
 # Optional auto expansion when memory reaches the limit
-AUTO_MEMORY_INCREASE = _config_loader.config.get("auto_memory_increase", True)
+AUTO_MEMORY_INCREASE = _config_loader.get_bool("auto_memory_increase", True)
 
 def save_memory(mem=memory):
     # Convert all np.ndarray vectors to lists before saving as JSON
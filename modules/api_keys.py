@@ -2,11 +2,10 @@ from __future__ import annotations
 
 """Utility functions for managing API keys for external providers."""
 
-import json
 import os
 from typing import Dict
 
-from config_loader import ConfigLoader
+from config_service import get_config_service
 
 # Supported provider identifiers
 PROVIDERS = ["openai", "anthropic", "google"]
@@ -21,8 +20,8 @@ __all__ = [
     "get_description",
 ]
 
-# Initialize configuration loader
-_config_loader = ConfigLoader()
+# Shared configuration service
+_config_loader = get_config_service()
 _config = _config_loader.config
 
 
@@ -37,12 +36,11 @@ def apply_keys_from_config() -> None:
 
 def save_api_keys(keys: Dict[str, str]) -> None:
     """Persist ``keys`` into ``config.json`` and update the environment."""
-    api_cfg = _config.setdefault("api_keys", {})
+    api_cfg = dict(_config.get("api_keys", {}))
     for prov in PROVIDERS:
         if prov in keys:
             api_cfg[prov] = keys[prov]
-    with open(_config_loader.path, "w", encoding="utf-8") as f:
-        json.dump(_config, f, indent=2)
+    _config_loader.update({"api_keys": api_cfg})
     apply_keys_from_config()
 
 
@@ -72,3 +70,4 @@ def get_description() -> str:
 
 # Apply keys at import so other modules can rely on environment variables
 apply_keys_from_config()
+_config_loader.subscribe("api_keys", lambda _keys: apply_keys_from_config())
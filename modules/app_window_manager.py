@@ -8,7 +8,8 @@ close windows and keeps a JSON file mapping applications to custom workflows.
 
 These utilities are designed for the assistant to trigger window operations or
 learn new app-specific actions. On Windows, process names are returned for open
-windows when ``pywin32`` and ``psutil`` are available.
+windows when ``pywin32`` and ``psutil`` are available; window lookups are
+served from the cached :mod:`window_inventory` snapshot.
 """
 from __future__ import annotations
 
@@ -36,16 +37,6 @@ except Exception as e:  # pragma: no cover - optional dependency
 else:  # pragma: no cover - optional dependency
     _PYAUTOGUI_ERROR = None
 
-try:  # for retrieving process names on Windows
-    import psutil
-    import win32process
-except Exception as e:  # pragma: no cover - optional dependency
-    psutil = None
-    win32process = None
-    _WIN32_ERROR = e
-else:
-    _WIN32_ERROR = None
-
 try:  # optional for UI element access
     from pywinauto import Application
 except Exception as e:  # pragma: no cover - optional dependency
@@ -54,6 +45,11 @@ except Exception as e:  # pragma: no cover - optional dependency
 else:
     _PYWINAUTO_ERROR = None
 
+from error_logger import log_error
+
+from . import step_graph, window_inventory
+from .wait_utils import focus_timeout, wait_until
+
 # Key combinations for common window actions
 if platform.system() == "Darwin":
     _ALT_TAB_KEYS = ("command", "tab")
@@ -118,20 +114,11 @@ def get_open_windows() -> list[dict[str, str | None]]:
     if gw is None or _GW_ERROR:
         return []
 
-    windows: list[dict[str, str | None]] = []
-    for win in gw.getAllWindows():
-        title = getattr(win, "title", "").strip()
-        if not title:
-            continue
-        proc = None
-        if os.name == "nt" and win32process is not None and hasattr(win, "_hWnd"):
-            try:
-                _, pid = win32process.GetWindowThreadProcessId(int(win._hWnd))
-                proc = psutil.Process(pid).name() if psutil else None
-            except Exception:  # pragma: no cover - OS specific
-                proc = None
-        windows.append({"title": title, "process": proc})
-    return windows
+    # Process names are cached per pid by the inventory
+    return [
+        {"title": w.title, "process": w.process}
+        for w in window_inventory.get_inventory(gw).windows()
+    ]
 
 
 def open_application(command: str) -> tuple[bool, str]:
@@ -154,16 +141,16 @@ def close_window(partial_title: str) -> tuple[bool, str]:
     if gw is None or _GW_ERROR:
         return False, f"pygetwindow not available: {_GW_ERROR}" if _GW_ERROR else "pygetwindow not available"
 
-    matches = [w for w in gw.getAllTitles() if partial_title.lower() in w.lower()]
+    matches = _matching_titles(partial_title)
     if not matches:
         return False, f"No window found containing '{partial_title}'"
     win = gw.getWindowsWithTitle(matches[0])[0]
+    window_inventory.get_inventory(gw).invalidate()
 
     try:
         win.activate()
         win.close()
-        time.sleep(0.5)
-        if win not in gw.getAllWindows():
+        if wait_until(lambda: window_inventory.is_gone(gw, win)):
             return True, f"Closed window: {matches[0]}"
     except Exception:
         pass
@@ -179,6 +166,21 @@ def close_window(partial_title: str) -> tuple[bool, str]:
     return False, f"Failed to close '{matches[0]}'"
 
 
+def _matching_titles(partial_title: str, fuzzy: bool = False) -> list[str]:
+    """Return titles containing ``partial_title``.
+
+    With ``fuzzy`` and no such title, return the closest fuzzy match
+    instead.  Only focusing uses it: closing or minimizing a window the
+    user did not name is worse than reporting no match.
+    """
+    inventory = window_inventory.get_inventory(gw)
+    matches = [w.title for w in inventory.find(partial_title)]
+    if not matches and fuzzy:
+        near = inventory.closest(partial_title)
+        matches = [near.title] if near is not None else []
+    return matches
+
+
 # Window manipulation implementations ---------------------------------------
 
 def focus_window(partial_title: str) -> tuple[bool, str]:
@@ -186,15 +188,16 @@ def focus_window(partial_title: str) -> tuple[bool, str]:
     if gw is None or _GW_ERROR:
         return False, f"pygetwindow not available: {_GW_ERROR}"
     try:
-        matches = [w for w in gw.getAllTitles() if partial_title.lower() in w.lower()]
+        matches = _matching_titles(partial_title, fuzzy=True)
     except Exception:
         matches = []
     if matches:
         win = gw.getWindowsWithTitle(matches[0])[0]
         try:
             win.activate()
-            time.sleep(0.5)
-            return True, f"Activated window: {matches[0]}"
+            if wait_until(lambda: window_inventory.is_active(gw, win), timeout=focus_timeout()):
+                return True, f"Activated window: {matches[0]}"
+            log_error(f"[{MODULE_NAME}] '{matches[0]}' did not come to the front; trying Alt+Tab")
         except Exception:
             pass
 
@@ -204,14 +207,9 @@ def focus_window(partial_title: str) -> tuple[bool, str]:
     for _ in range(10):
         try:
             pyautogui.hotkey(*_ALT_TAB_KEYS)
-            time.sleep(0.2)
-            active = None
-            try:
-                active = gw.getActiveWindow()
-            except Exception:
-                pass
-            if active and partial_title.lower() in active.title.lower():
-                return True, f"Activated window via Alt+Tab: {active.title}"
+            # Each Alt+Tab gets up to 0.2 s to bring the wanted window forward
+            if wait_until(lambda: partial_title.lower() in gw.getActiveWindow().title.lower(), timeout=0.2):
+                return True, f"Activated window via Alt+Tab: {gw.getActiveWindow().title}"
         except Exception:
             break
 
@@ -222,7 +220,7 @@ def minimize_window(partial_title: str) -> tuple[bool, str]:
     """Minimize the first window containing ``partial_title``."""
     if gw is None or _GW_ERROR:
         return False, f"pygetwindow not available: {_GW_ERROR}"
-    matches = [w for w in gw.getAllTitles() if partial_title.lower() in w.lower()]
+    matches = _matching_titles(partial_title)
     if not matches:
         return False, f"No window found containing '{partial_title}'"
     win = gw.getWindowsWithTitle(matches[0])[0]
@@ -246,6 +244,8 @@ def maximize_window(partial_title: str) -> tuple[bool, str]:
     try:
         if hasattr(win, "maximize"):
             win.maximize()
+            if not wait_until(lambda: getattr(win, "isMaximized", True)):
+                log_error(f"[{MODULE_NAME}] '{win.title}' did not report being maximized")
             return True, f"Maximized window: {win.title}"
     except Exception:
         pass
@@ -254,6 +254,7 @@ def maximize_window(partial_title: str) -> tuple[bool, str]:
     try:
         if _MAXIMIZE_HOTKEY == ("alt", "space", "x"):
             pyautogui.hotkey("alt", "space")
+            # The window menu is not observable, so it keeps a short fixed delay
             time.sleep(0.1)
             pyautogui.press("x")
         elif _MAXIMIZE_HOTKEY == ("command", "ctrl", "f"):
@@ -298,24 +299,55 @@ _FUNCTION_MAP = {
 }
 
 
-def handle_app_logic(app_name: str) -> str:
-    """Execute stored workflow actions for ``app_name`` if present."""
+# Actions that activate a window need keyboard focus; the others act on
+# their window through the window manager only
+_FOCUS_ACTIONS = {"focus_window", "maximize_window", "close_window", "open_application"}
+
+
+def _workflow_resources(step: dict):
+    if "resources" in step:
+        return frozenset(step["resources"])
+    action, args = step.get("action"), step.get("args", [])
+    if action not in _FUNCTION_MAP:
+        return None
+    window = {f"window:{str(args[0]).lower()}"} if args and action != "open_application" else set()
+    if action == "open_application":
+        return frozenset({"focus", "files"})
+    focus = "focus" if action in _FOCUS_ACTIONS else step_graph.SHARED + "focus"
+    return frozenset(window | {focus})
+
+
+def handle_app_logic(app_name: str, on_progress=None, cancel=None) -> str:
+    """Execute stored workflow actions for ``app_name`` if present.
+
+    Steps touching different windows without taking focus run
+    concurrently.  A step may list its own ``"resources"`` (see
+    :mod:`step_graph`).
+    """
     workflow = APP_WORKFLOWS.get(app_name.lower())
     if not workflow:
         return f"No workflow for {app_name}"
 
+    steps = [
+        step_graph.Step(
+            _FUNCTION_MAP[step.get("action")],
+            tuple(step.get("args", [])),
+            label=step.get("action"),
+            resources=_workflow_resources(step),
+        )
+        for step in workflow
+        if step.get("action") in _FUNCTION_MAP
+    ]
+    outcome = step_graph.run(steps, on_progress=on_progress, cancel=cancel)
     messages = []
-    for step in workflow:
-        action = step.get("action")
-        args = step.get("args", [])
-        func = _FUNCTION_MAP.get(action)
-        if func:
-            result = func(*args)
-            if isinstance(result, tuple):
-                ok, msg = result
-                messages.append(msg if ok else msg)
-            else:
-                messages.append(str(result))
+    for result, error in zip(outcome.results, (outcome.errors.get(i) for i in range(len(steps)))):
+        if error is not None:
+            messages.append(f"Error: {error}")
+        elif isinstance(result, tuple):
+            ok, msg = result
+            messages.append(msg)
+        elif result is not None:
+            messages.append(str(result))
     return "; ".join(messages)
 
 
@@ -0,0 +1,306 @@
+"""audio_output.py
+Single playback scheduler shared by every TTS backend.
+
+Utterances are queued by priority and played one at a time by a worker
+thread that owns a persistent ``sounddevice.OutputStream``.  Audio is
+written in short blocks, so :meth:`AudioOutput.stop` takes effect within a
+block (about 25 ms at 22 kHz) instead of when the clip ends.  Backends that
+can only hand over an encoded file (gTTS) submit a ``play`` callable, which
+is serialized with everything else but cannot be cut off mid-clip.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import threading
+from typing import Callable, Iterable
+
+from error_logger import log_error
+
+MODULE_NAME = "audio_output"
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+# Frames per ``OutputStream.write``; bounds how long a stop request can lag
+BLOCK_FRAMES = 512
+# Close the output device after this many idle seconds
+IDLE_CLOSE_SECONDS = 5.0
+
+__all__ = [
+    "AudioOutput",
+    "Utterance",
+    "get_output",
+    "is_speaking",
+    "stop",
+    "wait_idle",
+    "on_idle",
+    "PRIORITY_HIGH",
+    "PRIORITY_NORMAL",
+    "PRIORITY_LOW",
+]
+
+
+class Utterance:
+    """Handle for one queued piece of audio."""
+
+    def __init__(
+        self,
+        source: Iterable | None,
+        rate: int | None,
+        priority: int,
+        on_complete: Callable[[], None] | None,
+        play: Callable[[], None] | None,
+        cancelled: threading.Event | None = None,
+    ):
+        self.source = source
+        self.rate = rate
+        self.priority = priority
+        self.on_complete = on_complete
+        self.play = play
+        self.cancelled = cancelled or threading.Event()
+        self.done = threading.Event()
+
+    def cancel(self) -> None:
+        self.cancelled.set()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Block until playback finished or was cancelled."""
+        return self.done.wait(timeout)
+
+
+class AudioOutput:
+    """Priority queue of utterances played on one output stream."""
+
+    def __init__(
+        self,
+        block_frames: int = BLOCK_FRAMES,
+        idle_close: float = IDLE_CLOSE_SECONDS,
+    ):
+        self.block_frames = block_frames
+        self.idle_close = idle_close
+        self._queue: list[tuple[int, int, Utterance]] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._current: Utterance | None = None
+        self._worker: threading.Thread | None = None
+        self._stream = None
+        self._stream_rate: int | None = None
+        self._speaking = threading.Event()
+        self._idle = threading.Event()
+        self._idle.set()
+        self._idle_callbacks: list[Callable[[], None]] = []
+
+    # ----- public API -----
+    def submit(
+        self,
+        source: Iterable | None = None,
+        rate: int | None = None,
+        priority: int = PRIORITY_NORMAL,
+        interrupt: bool = False,
+        on_complete: Callable[[], None] | None = None,
+        play: Callable[[], None] | None = None,
+        cancelled: threading.Event | None = None,
+    ) -> Utterance:
+        """Queue audio for playback and return its :class:`Utterance`.
+
+        ``source`` yields float32 mono buffers at ``rate`` Hz and may be a
+        generator that synthesizes lazily.  With ``interrupt`` the current
+        utterance and every queued one of equal or lower priority are
+        cancelled first (barge-in).  A ``cancelled`` event shared with the
+        source is set on cancellation, so a source blocked waiting for
+        audio can give up.
+        """
+        utt = Utterance(source, rate, priority, on_complete, play, cancelled)
+        with self._cond:
+            dropped = self._cancel_locked(priority) if interrupt else []
+            heapq.heappush(self._queue, (priority, next(self._seq), utt))
+            self._idle.clear()
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, daemon=True)
+                self._worker.start()
+            self._cond.notify()
+        for old in dropped:
+            self._finish(old)
+        return utt
+
+    def stop(self) -> None:
+        """Cancel the current utterance and drop everything queued."""
+        with self._cond:
+            dropped = self._cancel_locked(None)
+        for old in dropped:
+            self._finish(old)
+
+    def is_speaking(self) -> bool:
+        """Return ``True`` while audio is being written to the device."""
+        return self._speaking.is_set()
+
+    def is_busy(self) -> bool:
+        """Return ``True`` while anything is playing or queued."""
+        return not self._idle.is_set()
+
+    def wait_idle(self, timeout: float | None = None) -> bool:
+        """Block until the queue is drained; ``False`` on timeout."""
+        return self._idle.wait(timeout)
+
+    def on_idle(self, callback: Callable[[], None]) -> None:
+        """Call ``callback`` once the queue is drained (now if it already is).
+
+        The callback runs on the playback thread, so it must not block.
+        """
+        with self._cond:
+            if not self._idle.is_set():
+                self._idle_callbacks.append(callback)
+                return
+        self._notify_idle([callback])
+
+    # ----- internals -----
+    def _notify_idle(self, callbacks: list[Callable[[], None]]) -> None:
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                log_error(f"[{MODULE_NAME}] idle callback error: {e}")
+
+    def _cancel_locked(self, priority: int | None) -> list[Utterance]:
+        """Cancel work at or below ``priority`` (everything when ``None``)."""
+        current = self._current
+        if current is not None and (priority is None or current.priority >= priority):
+            current.cancel()
+        keep, dropped = [], []
+        for item in self._queue:
+            if priority is None or item[0] >= priority:
+                item[2].cancel()
+                dropped.append(item[2])
+            else:
+                keep.append(item)
+        heapq.heapify(keep)
+        self._queue = keep
+        return dropped
+
+    def _finish(self, utt: Utterance) -> None:
+        if utt.on_complete:
+            try:
+                utt.on_complete()
+            except Exception as e:
+                log_error(f"[{MODULE_NAME}] on_complete error: {e}")
+        utt.done.set()
+
+    def _run(self) -> None:
+        while True:
+            callbacks: list[Callable[[], None]] = []
+            with self._cond:
+                while not self._queue:
+                    callbacks = self._set_idle_locked()
+                    if callbacks:
+                        break
+                    if not self._cond.wait(self.idle_close) and not self._queue:
+                        self._close_stream()
+                else:
+                    _, _, utt = heapq.heappop(self._queue)
+                    self._current = utt
+            if callbacks:
+                self._notify_idle(callbacks)
+                continue
+            if not utt.cancelled.is_set():
+                try:
+                    self._play(utt)
+                except Exception as e:
+                    log_error(f"[{MODULE_NAME}] playback error: {e}")
+                    self._close_stream(abort=True)
+            self._speaking.clear()
+            self._finish(utt)
+
+    def _set_idle_locked(self) -> list[Callable[[], None]]:
+        """Mark the queue idle and return the callbacks waiting for it."""
+        self._current = None
+        self._idle.set()
+        callbacks, self._idle_callbacks = self._idle_callbacks, []
+        return callbacks
+
+    def _play(self, utt: Utterance) -> None:
+        if utt.play is not None:
+            self._speaking.set()
+            utt.play()
+            return
+        stream = None
+        try:
+            for buf in utt.source or ():
+                if utt.cancelled.is_set():
+                    break
+                if stream is None:
+                    stream = self._open(utt.rate)
+                    self._speaking.set()
+                for offset in range(0, len(buf), self.block_frames):
+                    if utt.cancelled.is_set():
+                        break
+                    stream.write(buf[offset : offset + self.block_frames])
+        finally:
+            close = getattr(utt.source, "close", None)
+            if close is not None:
+                close()
+        if utt.cancelled.is_set():
+            # Discard whatever the device still has buffered
+            self._close_stream(abort=True)
+
+    def _open(self, rate: int):
+        rate = int(rate)
+        if self._stream is not None and self._stream_rate == rate:
+            return self._stream
+        self._close_stream()
+        import sounddevice as sd
+
+        stream = sd.OutputStream(
+            samplerate=rate, channels=1, dtype="float32", latency="low"
+        )
+        stream.start()
+        self._stream, self._stream_rate = stream, rate
+        return stream
+
+    def _close_stream(self, abort: bool = False) -> None:
+        stream, self._stream = self._stream, None
+        self._stream_rate = None
+        if stream is None:
+            return
+        try:
+            if abort:
+                stream.abort()
+            else:
+                stream.stop()
+            stream.close()
+        except Exception as e:
+            log_error(f"[{MODULE_NAME}] could not close stream: {e}")
+
+
+_output: AudioOutput | None = None
+_output_lock = threading.Lock()
+
+
+def get_output() -> AudioOutput:
+    """Return the process-wide playback scheduler."""
+    global _output
+    with _output_lock:
+        if _output is None:
+            _output = AudioOutput()
+        return _output
+
+
+def is_speaking() -> bool:
+    return get_output().is_speaking()
+
+
+def stop() -> None:
+    get_output().stop()
+
+
+def wait_idle(timeout: float | None = None) -> bool:
+    return get_output().wait_idle(timeout)
+
+
+def on_idle(callback: Callable[[], None]) -> None:
+    get_output().on_idle(callback)
+
+
+def get_description() -> str:
+    """Return a short summary of this module."""
+    return "Queues and plays TTS audio on one output stream with priority barge-in."
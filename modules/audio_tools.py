@@ -18,6 +18,7 @@ except Exception:
     _sd = None
 
 from error_logger import log_error
+from . import mic_capture
 
 __all__ = ["transcribe_speaker", "detect_sound"]
 
@@ -98,8 +99,24 @@ def _record_speaker(duration=5, samplerate=16000):
     return None, None
 
 
-def detect_sound(threshold=500, duration=2):
-    """Return True if speaker audio exceeds threshold during duration."""
+def _record_mic(duration=2):
+    """Return ``duration`` seconds from the shared microphone stream."""
+    capture = mic_capture.get_capture()
+    with capture.subscribe("detect_sound") as sub:
+        if not capture.running:
+            return None
+        return sub.read_for(duration)
+
+
+def detect_sound(threshold=500, duration=2, source="speaker"):
+    """Return True if audio exceeds threshold during duration.
+
+    ``source`` is ``"speaker"`` for system output (loopback) or ``"mic"``
+    to listen on the microphone stream shared with the voice listener.
+    """
+    if source == "mic":
+        data = _record_mic(duration)
+        return bool(data) and mic_capture.rms(data) > threshold
     data, rate = _record_speaker(duration, samplerate=16000)
     if data is None:
         return False
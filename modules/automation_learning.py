@@ -3,7 +3,9 @@
 This module provides utilities to record and play back desktop automation
 macros. Recording uses ``pyautogui`` if available. If the installed
 ``pyautogui`` library does not provide ``record``/``play`` helpers, it falls
-back to a lightweight implementation powered by ``pynput``.
+back to a lightweight implementation powered by ``pynput``.  Macros are
+saved in the packed :mod:`macro_format` when the events allow it and as
+JSON otherwise.
 """
 
 import os
@@ -21,6 +23,8 @@ from state_manager import register_action
 
 from error_logger import log_error
 
+from . import macro_format, macro_player
+
 MACRO_DIR = "macros"
 MODULE_NAME = "automation_learning"
 
@@ -84,34 +88,18 @@ def record_events() -> list:
     return events
 
 
-def play_events(events: list) -> None:
-    """Replay recorded events using pyautogui."""
+def play_events(events: list, speed: float | None = None, cancel=None):
+    """Replay recorded events using pyautogui at their recorded pace.
+
+    ``speed`` defaults to ``macro_replay_speed`` and ``cancel`` to the
+    assistant's cancel event; see :func:`macro_player.replay`.
+    """
     if pyautogui is None:
         raise RuntimeError(f"pyautogui not available: {_IMPORT_ERROR}")
     if hasattr(pyautogui, "play"):
         pyautogui.play(events)
-        return
-    for ev in events:
-        et = ev.get("type")
-        if et == "move":
-            pyautogui.moveTo(ev["x"], ev["y"])
-        elif et == "click":
-            button = ev.get("button", "left").replace("Button.", "")
-            if ev.get("pressed", ev.get("down", True)):
-                pyautogui.mouseDown(x=ev["x"], y=ev["y"], button=button)
-            else:
-                pyautogui.mouseUp(x=ev["x"], y=ev["y"], button=button)
-        elif et == "scroll":
-            pyautogui.scroll(ev.get("dy", 0), x=ev.get("x"), y=ev.get("y"))
-        elif et == "write":
-            pyautogui.write(ev.get("text", ""))
-        elif et == "press" or et == "key":
-            key = ev.get("key")
-            if ev.get("pressed", ev.get("down", True)):
-                pyautogui.keyDown(key)
-            else:
-                pyautogui.keyUp(key)
-
+        return None
+    return macro_player.replay(events, pyautogui, speed=speed, cancel=cancel)
 
 
 def record_macro(name: str) -> str:
@@ -121,9 +109,7 @@ def record_macro(name: str) -> str:
     os.makedirs(MACRO_DIR, exist_ok=True)
     try:
         events = record_events()
-        path = os.path.join(MACRO_DIR, f"{name}.json")
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(events, f)
+        path = macro_format.save(os.path.join(MACRO_DIR, name), events)
         register_action(name, path)
         return path
     except Exception as e:
@@ -160,12 +146,11 @@ def play_macro(name: str) -> str:
     """Play back a previously recorded macro."""
     if _IMPORT_ERROR:
         return f"pyautogui not available: {_IMPORT_ERROR}"
-    path = os.path.join(MACRO_DIR, f"{name}.json")
+    path = macro_format.macro_path(name, MACRO_DIR)
     if not os.path.exists(path):
         return f"Macro '{name}' not found"
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            events = json.load(f)
+        events = macro_format.load(path)
         play_events(events)
         return f"Played macro {name}"
     except Exception as e:
@@ -175,9 +160,7 @@ def play_macro(name: str) -> str:
 
 def list_macros() -> list[str]:
     """Return the names of saved macros."""
-    if not os.path.isdir(MACRO_DIR):
-        return []
-    return [f[:-5] for f in os.listdir(MACRO_DIR) if f.endswith(".json")]
+    return macro_format.list_names(MACRO_DIR)
 
 
 def get_info():
@@ -1,7 +1,5 @@
 """Helper functions for small talk and LLM interaction."""
 
-import re
-
 from modules.long_term_storage import save_entry
 
 # Config will be resolved lazily from the assistant module
@@ -18,9 +16,6 @@ CHITCHAT_PHRASES = [
     "what's up",
 ]
 
-# Precompiled regex patterns for chit-chat detection
-_CHITCHAT_PATTERNS = [re.compile(rf"\b{re.escape(p)}\b", re.IGNORECASE) for p in CHITCHAT_PHRASES]
-
 # Persistent memory for last prompt/response (lazy loaded)
 assistant_memory = None
 conversation_history = None
@@ -28,7 +23,9 @@ conversation_history = None
 
 def is_chitchat(text: str) -> bool:
     """Return True if ``text`` looks like casual conversation."""
-    return any(p.search(text) for p in _CHITCHAT_PATTERNS)
+    from modules import phrase_matcher
+
+    return "chitchat" in phrase_matcher.match(text)
 
 
 def talk_to_llm(prompt: str) -> str:
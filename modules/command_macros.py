@@ -9,8 +9,11 @@ from __future__ import annotations
 
 import json
 import os
+import threading
 from typing import Callable, Dict, List, Optional
 
+from . import step_graph
+
 FILE_PATH = "command_macros.json"
 
 _current_name: Optional[str] = None
@@ -24,6 +27,7 @@ __all__ = [
     "list_macros",
     "run_macro",
     "edit_macro",
+    "add_macro",
     "get_description",
 ]
 
@@ -79,14 +83,26 @@ def list_macros() -> List[str]:
     return list(_load().keys())
 
 
-def run_macro(name: str, executor: Callable[[str], str | None]) -> str:
-    """Execute each command in macro ``name`` using ``executor``."""
+def run_macro(
+    name: str,
+    executor: Callable[[str], str | None],
+    on_progress: Callable | None = None,
+    cancel: threading.Event | None = None,
+) -> str:
+    """Execute each command in macro ``name`` using ``executor``.
+
+    Commands that cannot interfere with each other run concurrently; see
+    :mod:`step_graph` for ``on_progress`` and ``cancel``.
+    """
     data = _load()
     cmds = data.get(name)
     if not cmds:
         return f"Macro '{name}' not found"
-    for cmd in cmds:
-        executor(cmd)
+    result = step_graph.run_commands(cmds, executor, on_progress=on_progress, cancel=cancel)
+    if result.cancelled:
+        return f"Stopped macro '{name}'"
+    if result.errors:
+        return f"Ran macro '{name}' ({len(result.errors)} of {len(cmds)} commands failed)"
     return f"Ran macro '{name}'"
 
 
@@ -100,5 +116,15 @@ def edit_macro(name: str, commands: List[str]) -> str:
     return f"Updated macro '{name}'"
 
 
+def add_macro(name: str, commands: List[str]) -> str:
+    """Save ``commands`` as a new macro ``name``."""
+    data = _load()
+    if name in data:
+        return f"Macro '{name}' already exists"
+    data[name] = [c.strip() for c in commands]
+    _save(data)
+    return f"Saved macro '{name}'"
+
+
 def get_description() -> str:
     return "Record and run text command macros."
@@ -0,0 +1,485 @@
+"""command_scheduler.py
+Queue assistant commands and run them on a fixed pool of worker threads.
+
+Before this module, each GUI, voice or web command ran on a fresh thread.
+Queued commands sat in a plain list drained with ``pop(0)``, and a helper
+thread polled the TTS engine until speech ended before starting the next.
+
+:class:`CommandScheduler` keeps one deque per priority and hands the most
+urgent command to a pool of ``command_workers`` threads.  At most
+``max_active`` commands run at once; the assistant uses one, because its
+state and speech are shared.  Each submission returns a :class:`Ticket`
+holding a :class:`CancelToken` and the command's deadlines:
+
+* a command still queued after ``ttl`` seconds is dropped (``expired``);
+* a command running longer than ``timeout`` seconds has its token set,
+  its waiters are released and it stops counting as active
+  (``timed_out``).  A replacement worker is started, so the next command
+  runs while the stuck one finishes in the background; that thread then
+  exits.  Commands must check their token to stop early, because Python
+  threads cannot be killed.
+
+A single watchdog thread sleeps until the nearest deadline, so nothing
+polls.  :meth:`CommandScheduler.hold` and :meth:`CommandScheduler.release`
+pause dispatch.  The assistant holds the queue after a command and
+releases it from the TTS idle callback, so the next command starts when
+the reply has been spoken.
+
+:meth:`CommandScheduler.stats` reports queue depth, outcome counts and
+queue-wait and run latencies.
+
+Run ``python -m modules.command_scheduler [commands]`` for the benchmark.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import sys
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List
+
+from config_service import get_config_service
+from error_logger import log_error
+from modules.utils import LatencyWindow
+
+MODULE_NAME = "command_scheduler"
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+WORKERS = 2
+
+# Ticket states
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+CANCELLED, EXPIRED, TIMED_OUT = "cancelled", "expired", "timed_out"
+
+__all__ = [
+    "CancelToken",
+    "Ticket",
+    "CommandScheduler",
+    "get_scheduler",
+    "submit",
+    "current",
+    "benchmark",
+    "PRIORITY_HIGH",
+    "PRIORITY_NORMAL",
+    "PRIORITY_LOW",
+]
+
+_local = threading.local()
+
+
+class CancelToken(threading.Event):
+    """Event set when a command is cancelled or runs past its deadline.
+
+    It can be passed anywhere a ``cancel`` event is accepted, such as
+    :func:`modules.step_graph.run`.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.reason = ""
+
+    def cancel(self, reason: str = CANCELLED) -> None:
+        if not self.is_set():
+            self.reason = reason
+            self.set()
+
+
+class Ticket:
+    """Handle for one submitted command."""
+
+    def __init__(self, scheduler, fn, args, kwargs, priority, timeout, ttl, label, source, on_timeout):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.priority = priority
+        self.timeout = timeout
+        self.label = label
+        self.source = source
+        self.on_timeout = on_timeout
+        self.token = CancelToken()
+        self.state = QUEUED
+        self.result: Any = None
+        self.error: BaseException | None = None
+        self.submitted = time.monotonic()
+        self.started: float | None = None
+        self.finished: float | None = None
+        self.expires = self.submitted + ttl if ttl else None
+        self.deadline: float | None = None
+        self.abandoned = False
+        # Set when the command returned while ``on_timeout`` was still running
+        self.returned = False
+        self._scheduler = scheduler
+        self._done = threading.Event()
+
+    def __repr__(self) -> str:
+        return f"<Ticket {self.label or getattr(self.fn, '__name__', 'job')!r} {self.state}>"
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Block until the command finished, failed, expired or timed out."""
+        return self._done.wait(timeout)
+
+    def cancel(self) -> bool:
+        """Cancel the command; ``False`` if it had already ended."""
+        return self._scheduler.cancel(self)
+
+
+def current() -> Ticket | None:
+    """Return the ticket of the command running on this thread, if any."""
+    return getattr(_local, "ticket", None)
+
+
+class CommandScheduler:
+    """Priority queue of commands served by a fixed pool of threads."""
+
+    def __init__(self, workers: int = WORKERS, max_active: int = 1, timeout: float | None = None):
+        self.workers = max(1, workers)
+        self.max_active = max(1, max_active)
+        self.timeout = timeout
+        self._cond = threading.Condition()
+        self._queues = (deque(), deque(), deque())
+        self._queued = 0
+        self._active: set = set()
+        # (deadline, seq, ticket) for queued ttls and running timeouts, and
+        # (deadline, id, id) for hold timeouts
+        self._deadlines: list = []
+        self._seq = itertools.count()
+        self._holds: set = set()
+        self._threads: List[threading.Thread] = []
+        self._closed = False
+        # Commands still running after a timeout or cancel
+        self._abandoned = 0
+        self._counts = dict.fromkeys(
+            ("submitted", DONE, FAILED, CANCELLED, EXPIRED, TIMED_OUT), 0
+        )
+        self._max_depth = 0
+        self._waits = LatencyWindow()
+        self._runs = LatencyWindow()
+
+    # ----- public API -----
+    def submit(
+        self,
+        fn: Callable[..., Any],
+        *args,
+        priority: int = PRIORITY_NORMAL,
+        timeout: float | None = None,
+        ttl: float | None = None,
+        label: str = "",
+        source: str = "",
+        on_timeout: Callable[[Ticket], None] | None = None,
+        **kwargs,
+    ) -> Ticket:
+        """Queue ``fn(*args, **kwargs)`` and return its :class:`Ticket`.
+
+        ``timeout`` bounds the run time (the scheduler default when
+        ``None``; ``0`` for no limit) and ``ttl`` the time spent queued.
+        ``on_timeout(ticket)`` is called from the watchdog thread when the
+        command overruns.
+        """
+        priority = min(max(priority, PRIORITY_HIGH), PRIORITY_LOW)
+        timeout = self.timeout if timeout is None else timeout
+        ticket = Ticket(self, fn, args, kwargs, priority, timeout, ttl, label, source, on_timeout)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError(f"[{MODULE_NAME}] scheduler is closed")
+            self._start_locked()
+            self._queues[priority].append(ticket)
+            self._queued += 1
+            self._counts["submitted"] += 1
+            self._max_depth = max(self._max_depth, self._queued)
+            if ticket.expires is not None:
+                heapq.heappush(self._deadlines, (ticket.expires, next(self._seq), ticket))
+            self._cond.notify_all()
+        return ticket
+
+    def hold(self, timeout: float | None = None) -> int:
+        """Stop starting queued commands until :meth:`release` is called.
+
+        Returns a hold id for :meth:`release`.  With ``timeout`` the hold
+        lifts itself after that many seconds, in case nothing releases it.
+        """
+        with self._cond:
+            hold_id = next(self._seq)
+            self._holds.add(hold_id)
+            if timeout is not None:
+                self._start_locked()
+                heapq.heappush(self._deadlines, (time.monotonic() + timeout, hold_id, hold_id))
+                self._cond.notify_all()
+            return hold_id
+
+    def release(self, hold_id: int | None = None) -> None:
+        """Lift the hold ``hold_id`` (the oldest one when ``None``).
+
+        Releasing a hold that already ended does nothing.
+        """
+        with self._cond:
+            if hold_id is None and self._holds:
+                hold_id = min(self._holds)
+            self._holds.discard(hold_id)
+            self._cond.notify_all()
+
+    @property
+    def held(self) -> bool:
+        return bool(self._holds)
+
+    def depth(self) -> int:
+        """Return the number of queued commands."""
+        return self._queued
+
+    def running(self) -> int:
+        """Return the number of active commands."""
+        return len(self._active)
+
+    def cancel(self, ticket: Ticket) -> bool:
+        with self._cond:
+            return self._cancel_locked(ticket)
+
+    def clear(self) -> int:
+        """Drop every queued command and return how many were dropped."""
+        with self._cond:
+            return sum(self._cancel_locked(t) for q in self._queues for t in list(q))
+
+    def cancel_all(self) -> int:
+        """Cancel the running commands and drop the queued ones."""
+        with self._cond:
+            dropped = sum(self._cancel_locked(t) for q in self._queues for t in list(q))
+            return dropped + sum(self._cancel_locked(t) for t in list(self._active))
+
+    def wait_idle(self, timeout: float | None = None) -> bool:
+        """Block until nothing is queued or active; ``False`` on timeout."""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._queued and not self._active, timeout)
+
+    def close(self) -> None:
+        """Cancel all commands and let the threads exit."""
+        with self._cond:
+            self._closed = True
+        self.cancel_all()
+        with self._cond:
+            self._cond.notify_all()
+
+    def stats(self) -> Dict[str, float]:
+        """Return queue depth, outcome counts and latencies in milliseconds."""
+        with self._cond:
+            data: Dict[str, float] = {
+                "depth": self._queued,
+                "max_depth": self._max_depth,
+                "running": len(self._active),
+                "workers": self.workers,
+                **self._counts,
+            }
+        return {**data, **self._waits.summary("wait"), **self._runs.summary("run")}
+
+    # ----- internals -----
+    def _start_locked(self) -> None:
+        if self._threads:
+            return
+        for _ in range(self.workers):
+            self._spawn_locked()
+        watchdog = threading.Thread(target=self._watch, name=f"{MODULE_NAME}-watchdog", daemon=True)
+        watchdog.start()
+        self._threads.append(watchdog)
+
+    def _spawn_locked(self) -> None:
+        t = threading.Thread(target=self._work, name=f"{MODULE_NAME}-{next(self._seq)}", daemon=True)
+        t.start()
+        self._threads.append(t)
+
+    def _abandon_locked(self, ticket: Ticket) -> None:
+        """Free the slot of a command that is still running, and replace its worker."""
+        self._active.discard(ticket)
+        ticket.abandoned = True
+        self._abandoned += 1
+        if self._abandoned > self.workers:
+            log_error(f"[{MODULE_NAME}] {self._abandoned} commands are still stuck after their deadline")
+        self._spawn_locked()
+
+    def _end_locked(self, ticket: Ticket, state: str) -> None:
+        ticket.state = state
+        ticket.finished = time.monotonic()
+        self._counts[state] += 1
+        ticket._done.set()
+        self._cond.notify_all()
+
+    def _cancel_locked(self, ticket: Ticket) -> bool:
+        if ticket.state == QUEUED:
+            self._queues[ticket.priority].remove(ticket)
+            self._queued -= 1
+        elif ticket.state == RUNNING:
+            self._abandon_locked(ticket)
+        else:
+            return False
+        ticket.token.cancel(CANCELLED)
+        self._end_locked(ticket, CANCELLED)
+        return True
+
+    def _next_locked(self) -> Ticket | None:
+        if self._holds or len(self._active) >= self.max_active or not self._queued:
+            return None
+        now = time.monotonic()
+        for queue in self._queues:
+            while queue:
+                ticket = queue.popleft()
+                self._queued -= 1
+                if ticket.expires is not None and now >= ticket.expires:
+                    ticket.token.cancel(EXPIRED)
+                    self._end_locked(ticket, EXPIRED)
+                    continue
+                ticket.state = RUNNING
+                ticket.started = now
+                self._waits.add(now - ticket.submitted)
+                self._active.add(ticket)
+                if ticket.timeout:
+                    ticket.deadline = now + ticket.timeout
+                    heapq.heappush(self._deadlines, (ticket.deadline, next(self._seq), ticket))
+                    self._cond.notify_all()
+                return ticket
+        return None
+
+    def _work(self) -> None:
+        while True:
+            with self._cond:
+                ticket = self._next_locked()
+                while ticket is None:
+                    if self._closed:
+                        return
+                    self._cond.wait()
+                    ticket = self._next_locked()
+            _local.ticket = ticket
+            result, error = None, None
+            try:
+                result = ticket.fn(*ticket.args, **ticket.kwargs)
+            except Exception as e:
+                error = e
+                log_error(f"[{MODULE_NAME}] {ticket.label or 'command'} failed: {e}")
+            finally:
+                _local.ticket = None
+            with self._cond:
+                self._runs.add(time.monotonic() - ticket.started)
+                if ticket.state == RUNNING:
+                    self._active.discard(ticket)
+                    ticket.result, ticket.error = result, error
+                    self._end_locked(ticket, FAILED if error else DONE)
+                elif ticket.abandoned:
+                    # A replacement worker took over this thread's place
+                    self._abandoned -= 1
+                    self._threads.remove(threading.current_thread())
+                    return
+                elif ticket.state == TIMED_OUT:
+                    # Timed out but not yet abandoned: the watchdog is still in
+                    # ``on_timeout`` and must not replace this worker
+                    ticket.returned = True
+
+    def _watch(self) -> None:
+        while True:
+            overdue = []
+            with self._cond:
+                if self._closed:
+                    return
+                now = time.monotonic()
+                while self._deadlines and self._deadlines[0][0] <= now:
+                    _, _, ticket = heapq.heappop(self._deadlines)
+                    if isinstance(ticket, int):
+                        if ticket in self._holds:
+                            log_error(f"[{MODULE_NAME}] hold {ticket} timed out; resuming the queue")
+                            self._holds.discard(ticket)
+                            self._cond.notify_all()
+                    elif ticket.state == RUNNING and ticket.deadline is not None:
+                        # Stays active until ``on_timeout`` has run
+                        ticket.state = TIMED_OUT
+                        ticket.token.cancel(TIMED_OUT)
+                        overdue.append(ticket)
+                    elif ticket.state == QUEUED:
+                        self._queues[ticket.priority].remove(ticket)
+                        self._queued -= 1
+                        ticket.token.cancel(EXPIRED)
+                        self._end_locked(ticket, EXPIRED)
+                if not overdue:
+                    wait = self._deadlines[0][0] - now if self._deadlines else None
+                    self._cond.wait(wait)
+            for ticket in overdue:
+                log_error(f"[{MODULE_NAME}] {ticket.label or 'command'} timed out after {ticket.timeout}s")
+                if ticket.on_timeout is not None:
+                    try:
+                        ticket.on_timeout(ticket)
+                    except Exception as e:
+                        log_error(f"[{MODULE_NAME}] timeout callback failed: {e}")
+                with self._cond:
+                    if ticket.returned:
+                        self._active.discard(ticket)
+                    else:
+                        self._abandon_locked(ticket)
+                    self._end_locked(ticket, TIMED_OUT)
+
+
+_scheduler: CommandScheduler | None = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> CommandScheduler:
+    """Return the process-wide command scheduler."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            cfg = get_config_service()
+            _scheduler = CommandScheduler(
+                workers=cfg.get_int("command_workers", WORKERS),
+                timeout=cfg.get_float("busy_timeout", 60.0),
+            )
+        return _scheduler
+
+
+def submit(fn: Callable[..., Any], *args, **kwargs) -> Ticket:
+    """Shortcut for ``get_scheduler().submit(...)``."""
+    return get_scheduler().submit(fn, *args, **kwargs)
+
+
+# ----- benchmark -----
+def benchmark(commands: int = 2000) -> Dict[str, float]:
+    """Measure handoff latency against the old thread-per-command pattern."""
+    done = threading.Event()
+
+    def noop() -> None:
+        pass
+
+    start = time.perf_counter()
+    for _ in range(commands):
+        t = threading.Thread(target=noop)
+        t.start()
+        t.join(60)
+    threads = time.perf_counter() - start
+
+    scheduler = CommandScheduler(workers=WORKERS)
+    start = time.perf_counter()
+    for _ in range(commands):
+        scheduler.submit(noop)
+    scheduler.submit(done.set)
+    done.wait()
+    pooled = time.perf_counter() - start
+    stats = scheduler.stats()
+    scheduler.close()
+    return {
+        "commands": float(commands),
+        "thread_per_command_us": threads / commands * 1e6,
+        "scheduler_us": pooled / commands * 1e6,
+        "wait_ms_p95": stats["wait_ms_p95"],
+        "max_depth": float(stats["max_depth"]),
+    }
+
+
+def get_description() -> str:
+    """Return a short summary of this module."""
+    return "Queues assistant commands by priority and runs them on a worker pool with deadlines."
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    for name, value in benchmark(count).items():
+        print(f"[{MODULE_NAME}] {name}: {value:,.3f}")
@@ -1,15 +1,70 @@
 """concurrent_tasks.py
-Utility functions for running tasks concurrently using threads.
+Run tasks concurrently on long-lived, bounded worker pools.
+
+``run_tasks`` used to create and tear down a ``ThreadPoolExecutor`` on
+every call.  It waited for results in submission order with no timeout,
+and returned nothing at all if one task raised.
+
+:class:`TaskService` keeps one executor alive for the whole process.
+``mode="process"`` runs tasks on a process pool, for CPU-bound tools such
+as OCR or image post-processing.  Tasks then have to be picklable
+module-level functions.  At most ``task_queue_size`` tasks may be
+submitted and unfinished at once.  Past that, :meth:`TaskService.submit`
+blocks or raises ``queue.Full``, so a fast producer cannot pile up
+unbounded work.
+
+:meth:`TaskService.as_completed` yields one :class:`TaskResult` per task
+as soon as it finishes.  Tasks running past their timeout are abandoned,
+and a set ``cancel`` event cancels whatever is left.  Abandoning a task
+that is already running retires its pool, so the stuck worker cannot
+starve later tasks; work still queued there moves to a fresh pool.  A failing task
+yields its error rather than hiding the other results.  Each service
+records queue-wait and run latencies in :meth:`TaskService.stats`.
+
+Run ``python -m modules.concurrent_tasks [calls]`` for the benchmark.
 """
 
-from concurrent.futures import ThreadPoolExecutor
-from typing import Callable, Iterable, Tuple, Any
+from __future__ import annotations
 
+import os
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, Tuple
+
+from config_service import get_config_service
 from error_logger import log_error
+from modules.utils import LatencyWindow
 
+MODULE_NAME = "concurrent_tasks"
 DEFAULT_WORKERS = 4
+QUEUE_SIZE = 64
+# How often ``as_completed`` checks its cancel event while tasks run
+CANCEL_POLL = 0.05
+
+# Task outcomes
+DONE, FAILED, TIMEOUT, CANCELLED = "done", "failed", "timeout", "cancelled"
+
+__all__ = ["TaskResult", "TaskService", "get_service", "as_completed", "run_tasks", "benchmark"]
 
-__all__ = ["run_tasks"]
+
+@dataclass
+class TaskResult:
+    """Outcome of one task, as yielded by :meth:`TaskService.as_completed`."""
+
+    index: int
+    value: Any = None
+    error: BaseException | None = None
+    state: str = DONE
+    wait: float = 0.0
+    run: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.state == DONE
 
 
 def _parse_task(task: Any) -> Tuple[Callable, Tuple, dict]:
@@ -26,7 +81,291 @@ def _parse_task(task: Any) -> Tuple[Callable, Tuple, dict]:
     raise TypeError("Task must be a callable or (callable, args, kwargs) tuple")
 
 
-def run_tasks(tasks: Iterable[Any], max_workers: int | None = DEFAULT_WORKERS) -> list:
+def _timed(func: Callable, args: tuple, kwargs: dict) -> Tuple[Any, float]:
+    # Module level so process pools can pickle it
+    start = time.perf_counter()
+    value = func(*args, **kwargs)
+    return value, time.perf_counter() - start
+
+
+def default_workers() -> int:
+    """Return ``task_workers`` from the config."""
+    return max(1, get_config_service().get_int("task_workers", DEFAULT_WORKERS))
+
+
+def default_queue_size() -> int:
+    """Return ``task_queue_size`` from the config."""
+    return max(1, get_config_service().get_int("task_queue_size", QUEUE_SIZE))
+
+
+class TaskService:
+    """Long-lived thread or process pool with a bounded submission queue."""
+
+    def __init__(self, max_workers: int | None = None, mode: str = "thread", max_queue: int | None = None):
+        if mode not in ("thread", "process"):
+            raise ValueError(f"[{MODULE_NAME}] unknown mode {mode!r}")
+        if max_workers is None:
+            max_workers = (os.cpu_count() or 1) if mode == "process" else default_workers()
+        self.mode = mode
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max_queue or default_queue_size()
+        self._slots = threading.BoundedSemaphore(self.max_queue)
+        self._lock = threading.Lock()
+        self._pool = None
+        self._counts = dict.fromkeys(("submitted", DONE, FAILED, TIMEOUT, CANCELLED), 0)
+        self._in_flight = 0
+        self._waits = LatencyWindow()
+        self._runs = LatencyWindow()
+
+    def _executor(self):
+        with self._lock:
+            if self._pool is None:
+                if self.mode == "process":
+                    try:
+                        self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+                    except Exception as e:  # pragma: no cover - platform specific
+                        log_error(f"[{MODULE_NAME}] Process pool unavailable, using threads: {e}")
+                        self.mode = "thread"
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=MODULE_NAME)
+            return self._pool
+
+    def submit(
+        self,
+        func: Callable,
+        args: tuple = (),
+        kwargs: dict | None = None,
+        *,
+        block: bool = True,
+        wait: float | None = None,
+    ) -> Future:
+        """Start ``func(*args, **kwargs)`` and return a future for its value.
+
+        The task's arguments are passed as a tuple and a dict, so keywords
+        such as ``block`` or ``wait`` reach ``func`` untouched.  When ``max_queue`` tasks are already unfinished this blocks until
+        one ends.  It raises ``queue.Full`` instead when ``block`` is
+        false or ``wait`` seconds pass.  Cancelling the future before the
+        task starts stops it from running.
+        """
+        if not self._slots.acquire(block, wait if block else None):
+            raise queue.Full(f"[{MODULE_NAME}] {self.max_queue} tasks already queued")
+        submitted = time.monotonic()
+        outer: Future = Future()
+        outer.latency = (0.0, 0.0)
+        with self._lock:
+            self._in_flight += 1
+        try:
+            self._dispatch(outer, (func, tuple(args), dict(kwargs or {})), submitted)
+        except Exception:
+            with self._lock:
+                self._in_flight -= 1
+            self._slots.release()
+            raise
+        with self._lock:
+            self._counts["submitted"] += 1
+        outer.add_done_callback(lambda f: f.cancelled() and f.inner.cancel())
+        return outer
+
+    def _dispatch(self, outer: Future, call: tuple, submitted: float) -> None:
+        pool = self._executor()
+        inner = pool.submit(_timed, *call)
+        outer.inner, outer.pool = inner, pool
+        inner.add_done_callback(lambda f: self._settle(f, outer, call, submitted))
+
+    def _retire(self, pool) -> None:
+        """Stop handing work to ``pool``; its queued tasks move to a new one."""
+        with self._lock:
+            if self._pool is not pool:
+                return
+            self._pool = None
+        pool.retired = True
+        log_error(f"[{MODULE_NAME}] Abandoned a running task; replacing the {self.mode} pool")
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def _abandon(self, outer: Future) -> None:
+        outer.cancel()
+        if not outer.inner.done():
+            # Still running: its worker stays busy until the call returns
+            self._retire(outer.pool)
+
+    def _settle(self, inner: Future, outer: Future, call: tuple, submitted: float) -> None:
+        if inner.cancelled() and getattr(outer.pool, "retired", False) and not outer.done():
+            try:
+                self._dispatch(outer, call, submitted)
+                return
+            except Exception as e:
+                log_error(f"[{MODULE_NAME}] Could not move task to the new pool: {e}")
+        self._slots.release()
+        total = time.monotonic() - submitted
+        with self._lock:
+            self._in_flight -= 1
+        if inner.cancelled():
+            outer.cancel()
+            return
+        if outer.done():
+            # Cancelled or timed out already; that outcome was counted then
+            return
+        error = inner.exception()
+        if error is None:
+            value, run = inner.result()
+            self._waits.add(max(total - run, 0.0))
+            self._runs.add(run)
+        else:
+            run = total
+        with self._lock:
+            self._counts[DONE if error is None else FAILED] += 1
+        outer.latency = (max(total - run, 0.0), run)
+        try:
+            if error is None:
+                outer.set_result(value)
+            else:
+                outer.set_exception(error)
+        except Exception:
+            # Cancelled while we were recording the outcome
+            pass
+
+    def as_completed(
+        self,
+        tasks: Iterable[Any],
+        timeout: float | None = None,
+        cancel: threading.Event | None = None,
+    ) -> Iterator[TaskResult]:
+        """Run ``tasks`` and yield a :class:`TaskResult` for each as it ends.
+
+        ``timeout`` is per task, counted from when it starts running (seen
+        within ``CANCEL_POLL``), so time spent queued behind other tasks
+        does not count.  Tasks are submitted as queue slots free up.  Once ``cancel`` is set, the
+        tasks still running or waiting are yielded as cancelled.
+        """
+        items = iter(enumerate(tasks))
+        pending: Dict[Future, int] = {}
+        started: Dict[Future, float] = {}
+        nxt = next(items, None)
+        while nxt is not None or pending:
+            if cancel is not None and cancel.is_set():
+                for fut, index in pending.items():
+                    self._abandon(fut)
+                    yield self._ended(TaskResult(index, state=CANCELLED))
+                while nxt is not None:
+                    yield self._ended(TaskResult(nxt[0], state=CANCELLED))
+                    nxt = next(items, None)
+                return
+            # Submit while slots are free; block only if nothing else can finish
+            while nxt is not None:
+                index, task = nxt
+                try:
+                    func, args, kwargs = _parse_task(task)
+                    fut = self.submit(func, args, kwargs, block=not pending)
+                except queue.Full:
+                    break
+                except Exception as e:
+                    yield self._ended(TaskResult(index, error=e, state=FAILED))
+                else:
+                    pending[fut] = index
+                nxt = next(items, None)
+            if not pending:
+                continue
+            limit = None
+            if timeout:
+                self._note_started(pending, started)
+                now = time.monotonic()
+                if started:
+                    limit = max(min(started.values()) + timeout - now, 0.0)
+                if len(started) < len(pending):
+                    limit = CANCEL_POLL if limit is None else min(limit, CANCEL_POLL)
+            if cancel is not None:
+                limit = CANCEL_POLL if limit is None else min(limit, CANCEL_POLL)
+            done, _ = wait(list(pending), timeout=limit, return_when=FIRST_COMPLETED)
+            for fut in done:
+                index = pending.pop(fut)
+                started.pop(fut, None)
+                res = _result(index, fut)
+                yield self._ended(res) if res.state == CANCELLED else res
+            if not timeout:
+                continue
+            self._note_started(pending, started)
+            now = time.monotonic()
+            for fut, begun in list(started.items()):
+                if now >= begun + timeout and not fut.done():
+                    index = pending.pop(fut)
+                    del started[fut]
+                    self._abandon(fut)
+                    error = TimeoutError(f"task {index} exceeded {timeout}s")
+                    yield self._ended(TaskResult(index, error=error, state=TIMEOUT, run=timeout))
+
+    @staticmethod
+    def _note_started(pending: Dict[Future, int], started: Dict[Future, float]) -> None:
+        now = time.monotonic()
+        for fut in pending:
+            if fut not in started and (fut.inner.running() or fut.inner.done()):
+                started[fut] = now
+
+    def _ended(self, result: TaskResult) -> TaskResult:
+        with self._lock:
+            self._counts[result.state] += 1
+        return result
+
+    def stats(self) -> Dict[str, float]:
+        """Return outcome counts and latencies in milliseconds."""
+        with self._lock:
+            data: Dict[str, float] = {
+                "workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "in_flight": self._in_flight,
+                **self._counts,
+            }
+        return {**data, **self._waits.summary("wait"), **self._runs.summary("run")}
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=True)
+
+
+def _result(index: int, fut: Future) -> TaskResult:
+    wait_time, run = getattr(fut, "latency", (0.0, 0.0))
+    if fut.cancelled():
+        return TaskResult(index, state=CANCELLED, wait=wait_time)
+    error = fut.exception()
+    if error is not None:
+        return TaskResult(index, error=error, state=FAILED, wait=wait_time, run=run)
+    return TaskResult(index, fut.result(), wait=wait_time, run=run)
+
+
+_services: Dict[Tuple[str, int | None], TaskService] = {}
+_services_lock = threading.Lock()
+
+
+def get_service(max_workers: int | None = None, mode: str = "thread") -> TaskService:
+    """Return the shared service for ``mode`` and worker count."""
+    key = (mode, max_workers)
+    with _services_lock:
+        service = _services.get(key)
+        if service is None:
+            service = _services[key] = TaskService(max_workers, mode)
+        return service
+
+
+def as_completed(
+    tasks: Iterable[Any],
+    timeout: float | None = None,
+    cancel: threading.Event | None = None,
+    max_workers: int | None = None,
+    mode: str = "thread",
+) -> Iterator[TaskResult]:
+    """Shortcut for ``get_service(max_workers, mode).as_completed(...)``."""
+    return get_service(max_workers, mode).as_completed(tasks, timeout, cancel)
+
+
+def run_tasks(
+    tasks: Iterable[Any],
+    max_workers: int | None = None,
+    timeout: float | None = None,
+    mode: str = "thread",
+    return_exceptions: bool = False,
+    cancel: threading.Event | None = None,
+) -> list:
     """Run multiple tasks concurrently and return their results.
 
     Parameters
@@ -34,35 +373,86 @@ def run_tasks(tasks: Iterable[Any], max_workers: int | None = DEFAULT_WORKERS) -
     tasks : Iterable
         Each item is either a callable or a tuple ``(callable, args, kwargs)``.
     max_workers : int, optional
-        Number of worker threads to use.
+        Size of the shared pool to use; ``task_workers`` by default.
+    timeout : float, optional
+        Seconds each task may take before it is abandoned.
+    mode : str, optional
+        ``"thread"`` or ``"process"`` for CPU-bound, picklable tasks.
+    return_exceptions : bool, optional
+        Put the error of a failed task in its slot instead of ``None``.
+    cancel : threading.Event, optional
+        Stop waiting and cancel unfinished tasks once set.
 
     Returns
     -------
     list
         Results in the same order as ``tasks``.
     """
-    results = []
-    try:
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = []
-            for task in tasks:
-                func, args, kwargs = _parse_task(task)
-                futures.append(executor.submit(func, *args, **kwargs))
-            for fut in futures:
-                results.append(fut.result())
-    except Exception as e:  # pragma: no cover - error path
-        log_error(f"[concurrent_tasks] Error running tasks: {e}")
+    tasks = list(tasks)
+    results: list = [None] * len(tasks)
+    for res in as_completed(tasks, timeout, cancel, max_workers, mode):
+        if res.ok:
+            results[res.index] = res.value
+            continue
+        if res.state != CANCELLED:
+            log_error(f"[{MODULE_NAME}] Task {res.index} {res.state}: {res.error}")
+        if return_exceptions:
+            results[res.index] = res.error
     return results
 
 
+# ----- benchmark -----
+def benchmark(calls: int = 300) -> Dict[str, float]:
+    """Compare a pool per call with the shared service, and ordered with streamed results."""
+    batch = [(sum, (range(200),), {})] * DEFAULT_WORKERS
+
+    def per_call_pool() -> None:
+        with ThreadPoolExecutor(max_workers=DEFAULT_WORKERS) as executor:
+            futures = [executor.submit(func, *args, **kwargs) for func, args, kwargs in batch]
+            for fut in futures:
+                fut.result()
+
+    start = time.perf_counter()
+    for _ in range(calls):
+        per_call_pool()
+    fresh = time.perf_counter() - start
+    service = TaskService(DEFAULT_WORKERS)
+    start = time.perf_counter()
+    for _ in range(calls):
+        list(service.as_completed(batch))
+    shared = time.perf_counter() - start
+
+    delays = [0.4, 0.05, 0.1, 0.2]
+    start = time.perf_counter()
+    first = next(service.as_completed([(time.sleep, (d,), {}) for d in delays]))
+    streamed = time.perf_counter() - start
+    stats = service.stats()
+    service.shutdown()
+    return {
+        "calls": float(calls),
+        "pool_per_call_ms": fresh / calls * 1000,
+        "shared_pool_ms": shared / calls * 1000,
+        "first_result_ordered_ms": delays[0] * 1000,
+        "first_result_streamed_ms": streamed * 1000,
+        "first_result_index": float(first.index),
+        "run_ms_p95": stats["run_ms_p95"],
+    }
+
+
 def get_info():
     return {
         "name": "concurrent_tasks",
-        "description": "Run multiple callables concurrently using threads.",
-        "functions": ["run_tasks"],
+        "description": "Run multiple callables concurrently on shared thread or process pools.",
+        "functions": ["run_tasks", "as_completed", "get_service"],
     }
 
 
 def get_description() -> str:
     """Return a short description of this module."""
-    return "Utilities for running a list of functions concurrently with threads."
+    return "Runs functions concurrently on long-lived, bounded pools with streaming results and timeouts."
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    for name, value in benchmark(count).items():
+        print(f"[{MODULE_NAME}] {name}: {value:,.3f}")
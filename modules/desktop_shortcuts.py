@@ -2,10 +2,11 @@
 
 import os
 import sys
-import difflib
 import subprocess
 from typing import Iterable, Dict
 
+from . import exe_index, fuzzy_index
+
 __all__ = ["build_shortcut_map", "open_shortcut", "build_exe_map"]
 
 def get_desktop_path():
@@ -19,28 +20,17 @@ def get_desktop_path():
 def build_exe_map(search_dirs: Iterable[str] | None = None) -> Dict[str, str]:
     """Return mapping of executable names to absolute paths.
 
-    If ``search_dirs`` is ``None``, standard Windows directories like
-    ``ProgramFiles`` and ``SystemRoot`` are scanned. The function walks each
-    directory recursively and collects paths to ``.exe`` files keyed by their
-    lowercase filename without the extension.
+    If ``search_dirs`` is ``None``, the persistent :mod:`exe_index` is used:
+    ``ProgramFiles`` and ``SystemRoot`` on Windows, XDG ``.desktop`` entries
+    and ``$PATH`` elsewhere, refreshed incrementally.  Explicit
+    ``search_dirs`` are scanned recursively for ``.exe`` files (keyed by
+    their lowercase filename without the extension) without touching the
+    saved index.
     """
     if search_dirs is None:
-        search_dirs = [
-            os.environ.get("ProgramFiles"),
-            os.environ.get("ProgramFiles(x86)"),
-            os.environ.get("SystemRoot"),
-        ]
-
-    exe_map: Dict[str, str] = {}
-    for base in search_dirs:
-        if not base or not os.path.exists(base):
-            continue
-        for root_dir, _dirs, files in os.walk(base):
-            for file in files:
-                if file.lower().endswith(".exe"):
-                    key = os.path.splitext(file)[0].lower()
-                    exe_map.setdefault(key, os.path.join(root_dir, file))
-    return exe_map
+        return exe_index.get_index().exe_map()
+    roots = [("exe", base) for base in search_dirs if base and os.path.exists(base)]
+    return exe_index.ExeIndex(path=None).exe_map(roots)
 
 def build_shortcut_map(desktop_path=None, include_system=False):
     """Return mapping of shortcut names to executable or shortcut paths.
@@ -68,22 +58,35 @@ def build_shortcut_map(desktop_path=None, include_system=False):
         shortcut_map.update(build_exe_map())
     return shortcut_map
 
+_shortcut_cache: Dict[str, tuple] = {}
+
+
+def _cached_shortcut_map() -> Dict[str, str]:
+    """Return :func:`build_shortcut_map`, rebuilt only when the desktop changes."""
+    desktop_path = get_desktop_path()
+    try:
+        mtime = os.stat(desktop_path).st_mtime_ns
+    except OSError:
+        mtime = None
+    cached = _shortcut_cache.get(desktop_path)
+    if cached is None or cached[0] != mtime:
+        cached = _shortcut_cache[desktop_path] = (mtime, build_shortcut_map(desktop_path))
+    return cached[1]
+
+
 def open_shortcut(command, shortcut_map=None, fuzzy=True):
     """
     Tries to open a desktop shortcut or known app matching the user's command.
     Returns a status message.
     """
     if shortcut_map is None:
-        shortcut_map = build_shortcut_map()
+        shortcut_map = _cached_shortcut_map()
     command = command.lower().replace("open ", "").replace("launch ", "").strip()
 
-    # Find best match using fuzzy search
-    possible_keys = list(shortcut_map.keys())
+    # Find best match using the trigram index, built once per map
     match = None
     if fuzzy:
-        matches = difflib.get_close_matches(command, possible_keys, n=1, cutoff=0.7)
-        if matches:
-            match = matches[0]
+        match = fuzzy_index.closest(command, shortcut_map)
     if not match and command in shortcut_map:
         match = command
 
@@ -96,6 +99,10 @@ def open_shortcut(command, shortcut_map=None, fuzzy=True):
                 else:
                     if sys.platform == "darwin":
                         subprocess.Popen(["open", target])
+                    elif target.endswith(".desktop"):
+                        subprocess.Popen(["gtk-launch", os.path.basename(target)[: -len(".desktop")]])
+                    elif os.path.isfile(target) and os.access(target, os.X_OK):
+                        subprocess.Popen([target])
                     else:
                         subprocess.Popen(["xdg-open", target])
                 return f"Opening {match.title()}."
@@ -0,0 +1,402 @@
+"""exe_index.py
+Persistent index of launchable programs with incremental refresh.
+
+Each indexed root is walked with ``os.scandir``.  Directories are scanned
+on a thread pool, so several roots (and the subtrees inside them) are
+scanned in parallel.  Every directory's modification time is stored with
+its matching files and subdirectories.  A refresh stats each known
+directory and only lists the ones whose mtime changed, since adding,
+removing or renaming an entry updates the mtime of its parent directory.
+The index is saved to ``exe_index_path`` so a restart starts warm.
+
+Three kinds of roots are indexed:
+
+``"exe"``
+    ``*.exe`` files anywhere below the root (Program Files, SystemRoot).
+``"desktop"``
+    XDG ``*.desktop`` entries below ``applications`` data directories,
+    keyed by their ``Name=``.
+``"path"``
+    Executable files directly inside ``$PATH`` directories.
+
+Run ``python -m modules.exe_index --bench [files]`` to time a cold scan, a
+warm start and an incremental refresh on a synthetic tree.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Iterable, List, Tuple
+
+from config_service import get_config_service
+from error_logger import log_error
+
+MODULE_NAME = "exe_index"
+INDEX_FILE = "exe_index.json"
+INDEX_VERSION = 1
+WORKERS = 8
+# Directories one worker visits before handing leftovers back to the pool
+WALK_BUDGET = 64
+# Seconds before a lookup re-checks directory mtimes
+REFRESH_INTERVAL = 600.0
+
+Root = Tuple[str, str]  # (kind, path)
+
+__all__ = ["ExeIndex", "default_roots", "get_index", "benchmark"]
+
+
+def default_roots() -> List[Root]:
+    """Return the roots indexed for this platform."""
+    if platform.system() == "Windows":
+        dirs = [
+            os.environ.get("ProgramFiles"),
+            os.environ.get("ProgramFiles(x86)"),
+            os.environ.get("SystemRoot"),
+        ]
+        return [("exe", d) for d in dirs if d]
+    data_home = os.environ.get("XDG_DATA_HOME") or os.path.expanduser("~/.local/share")
+    data_dirs = os.environ.get("XDG_DATA_DIRS") or "/usr/local/share:/usr/share"
+    roots = [
+        ("desktop", os.path.join(d, "applications"))
+        for d in [data_home] + data_dirs.split(os.pathsep)
+        if d
+    ]
+    roots += [("path", d) for d in os.environ.get("PATH", "").split(os.pathsep) if d]
+    return roots
+
+
+def _desktop_name(path: str) -> str | None:
+    """Return the ``Name=`` of an application ``.desktop`` file, if launchable."""
+    name = None
+    in_entry = False
+    try:
+        with open(path, "r", encoding="utf-8", errors="ignore") as fh:
+            for line in fh:
+                line = line.strip()
+                if line.startswith("["):
+                    if in_entry:
+                        break
+                    in_entry = line == "[Desktop Entry]"
+                elif in_entry and "=" in line:
+                    key, value = line.split("=", 1)
+                    if key == "Name" and name is None:
+                        name = value.strip()
+                    elif key == "NoDisplay" and value.strip().lower() == "true":
+                        return None
+                    elif key == "Type" and value.strip() != "Application":
+                        return None
+    except OSError:
+        return None
+    return name or os.path.basename(path)[: -len(".desktop")]
+
+
+def _match(kind: str, entry: os.DirEntry) -> str | None:
+    """Return the lookup key for ``entry`` or ``None`` if it is not indexed."""
+    name = entry.name
+    lower = name.lower()
+    if kind == "exe":
+        if lower.endswith(".exe"):
+            return os.path.splitext(lower)[0]
+    elif kind == "desktop":
+        if lower.endswith(".desktop"):
+            found = _desktop_name(entry.path)
+            return found.lower() if found else None
+    elif kind == "path":
+        if entry.is_file() and os.access(entry.path, os.X_OK):
+            return lower
+    return None
+
+
+def _visit(path: str, kind: str, cached: list | None):
+    """Return ``(path, record, scanned)`` for one directory.
+
+    ``record`` is ``[mtime_ns, [[key, filename], ...], [subdir, ...]]``;
+    ``cached`` is reused untouched when the mtime is unchanged.
+    """
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return path, None, False
+    if cached is not None and cached[0] == mtime:
+        return path, cached, False
+    files, subdirs = [], []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if kind != "path":
+                            subdirs.append(entry.name)
+                        continue
+                    key = _match(kind, entry)
+                except OSError:
+                    continue
+                if key:
+                    files.append([key, entry.name])
+    except OSError:
+        return path, None, True
+    files.sort()
+    subdirs.sort()
+    return path, [mtime, files, subdirs], True
+
+
+def _walk(stack: List[str], kind: str, old: Dict[str, list], budget: int):
+    """Visit up to ``budget`` directories depth-first; return results and leftovers.
+
+    Handing whole subtrees to one worker avoids a future per directory;
+    leftovers are split between idle workers by the caller.
+    """
+    results = []
+    while stack and len(results) < budget:
+        path = stack.pop()
+        path, record, scanned = _visit(path, kind, old.get(path))
+        results.append((path, record, scanned))
+        if record is not None:
+            stack.extend(os.path.join(path, sub) for sub in reversed(record[2]))
+    return results, stack
+
+
+class ExeIndex:
+    """Name -> path index over a set of roots, optionally persisted to disk."""
+
+    def __init__(
+        self,
+        path: str | None = INDEX_FILE,
+        workers: int = WORKERS,
+        refresh_interval: float = REFRESH_INTERVAL,
+    ):
+        self.path = path
+        self.workers = workers
+        self.refresh_interval = refresh_interval
+        self._lock = threading.RLock()
+        # Orders writers of the index file; lookups never wait on it
+        self._save_lock = threading.Lock()
+        # "kind:root" -> {dirpath: record}
+        self._trees: Dict[str, Dict[str, list]] = {}
+        self._refreshed: Dict[str, float] = {}
+        self._maps: Dict[tuple, Dict[str, str]] = {}
+        self.last_stats: Dict[str, float] = {}
+        self._saver: threading.Thread | None = None
+        self._load()
+
+    # ----- persistence -----
+    def _load(self) -> None:
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as fh:
+                data = json.load(fh)
+            if data.get("version") == INDEX_VERSION:
+                self._trees = data.get("trees", {})
+                self._refreshed = data.get("refreshed", {})
+        except Exception as e:
+            log_error(f"[{MODULE_NAME}] could not load {self.path}: {e}")
+
+    def save(self) -> None:
+        """Write the index, serializing a snapshot outside the lookup lock."""
+        if not self.path:
+            return
+        with self._save_lock:
+            with self._lock:
+                # refresh() replaces whole trees, so a shallow copy is stable
+                data = {"version": INDEX_VERSION, "trees": dict(self._trees), "refreshed": dict(self._refreshed)}
+            tmp = f"{self.path}.tmp"
+            try:
+                with open(tmp, "w", encoding="utf-8") as fh:
+                    json.dump(data, fh, separators=(",", ":"))
+                os.replace(tmp, self.path)
+            except Exception as e:
+                log_error(f"[{MODULE_NAME}] could not save {self.path}: {e}")
+
+    def _save_later(self) -> None:
+        """Write the index on a background thread so lookups don't wait on disk."""
+        if not self.path:
+            return
+        self.flush()
+        self._saver = threading.Thread(target=self.save, daemon=True)
+        self._saver.start()
+
+    def flush(self) -> None:
+        """Wait for a pending background save."""
+        saver = self._saver
+        if saver is not None:
+            saver.join()
+
+    # ----- scanning -----
+    def refresh(self, roots: Iterable[Root]) -> Dict[str, float]:
+        """Bring ``roots`` up to date, listing only directories that changed."""
+        roots = [(kind, os.path.abspath(path)) for kind, path in roots]
+        start = time.perf_counter()
+        visited = scanned = 0
+        with self._lock:
+            fresh: Dict[str, Dict[str, list]] = {f"{k}:{p}": {} for k, p in roots}
+            workers = max(1, self.workers)
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                pending = {}
+                for kind, path in roots:
+                    tree = f"{kind}:{path}"
+                    old = self._trees.get(tree, {})
+                    future = pool.submit(_walk, [path], kind, old, WALK_BUDGET)
+                    pending[future] = (tree, kind, old)
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        tree, kind, old = pending.pop(future)
+                        results, leftover = future.result()
+                        for dirpath, record, did_scan in results:
+                            visited += 1
+                            scanned += did_scan
+                            if record is not None:
+                                fresh[tree][dirpath] = record
+                        # Share the unvisited directories among idle workers
+                        parts = max(1, min(len(leftover), workers - len(pending)))
+                        for i in range(parts if leftover else 0):
+                            chunk = leftover[i::parts]
+                            future = pool.submit(_walk, chunk, kind, old, WALK_BUDGET)
+                            pending[future] = (tree, kind, old)
+            changed = scanned > 0 or any(fresh[t].keys() != self._trees.get(t, {}).keys() for t in fresh)
+            now = time.time()
+            for tree, dirs in fresh.items():
+                self._trees[tree] = dirs
+                self._refreshed[tree] = now
+            if changed:
+                self._maps.clear()
+        self.last_stats = {
+            "dirs": visited,
+            "scanned": scanned,
+            "seconds": time.perf_counter() - start,
+        }
+        if changed:
+            self._save_later()
+        return self.last_stats
+
+    def exe_map(self, roots: Iterable[Root] | None = None, max_age: float | None = None) -> Dict[str, str]:
+        """Return ``{name: path}`` for ``roots`` (default :func:`default_roots`).
+
+        Roots not checked within ``max_age`` seconds (default
+        ``refresh_interval``) are refreshed first.  Earlier roots win when a
+        name appears more than once.
+        """
+        roots = [(k, os.path.abspath(p)) for k, p in (default_roots() if roots is None else roots)]
+        max_age = self.refresh_interval if max_age is None else max_age
+        now = time.time()
+        stale = [r for r in roots if now - self._refreshed.get(f"{r[0]}:{r[1]}", 0) > max_age]
+        if stale:
+            self.refresh(stale)
+        key = tuple(roots)
+        with self._lock:
+            cached = self._maps.get(key)
+            if cached is not None:
+                return dict(cached)
+            result: Dict[str, str] = {}
+            for kind, path in roots:
+                dirs = self._trees.get(f"{kind}:{path}", {})
+                for dirpath in sorted(dirs):
+                    for name, filename in dirs[dirpath][1]:
+                        result.setdefault(name, os.path.join(dirpath, filename))
+            self._maps[key] = result
+            return dict(result)
+
+
+_index: ExeIndex | None = None
+_index_lock = threading.Lock()
+
+
+def get_index() -> ExeIndex:
+    """Return the process-wide persistent index."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            cfg = get_config_service()
+            _index = ExeIndex(
+                path=cfg.get_str("exe_index_path", INDEX_FILE),
+                workers=cfg.get_int("exe_index_workers", WORKERS),
+                refresh_interval=cfg.get_float("exe_index_refresh", REFRESH_INTERVAL),
+            )
+        return _index
+
+
+# ----- benchmark -----
+def _make_tree(base: str, files: int, per_dir: int = 50, fanout: int = 10) -> List[str]:
+    """Create ``files`` empty ``.exe``/``.dll`` files under ``base``; return the dirs."""
+    dirs = []
+    queue = [base]
+    created = 0
+    while created < files:
+        parent = queue.pop(0)
+        for i in range(fanout):
+            d = os.path.join(parent, f"d{i}")
+            os.makedirs(d, exist_ok=True)
+            queue.append(d)
+            dirs.append(d)
+            for j in range(min(per_dir, files - created)):
+                ext = ".exe" if j % 5 == 0 else ".dll"
+                open(os.path.join(d, f"app{created}{ext}"), "w").close()
+                created += 1
+            if created >= files:
+                break
+    return dirs
+
+
+def benchmark(files: int = 200_000, workers: int = WORKERS) -> Dict[str, float]:
+    """Time a cold scan, warm start and incremental refresh on a synthetic tree."""
+    base = tempfile.mkdtemp(prefix="exe_index_bench_")
+    try:
+        tree = os.path.join(base, "tree")
+        dirs = _make_tree(tree, files)
+        db = os.path.join(base, "index.json")
+        roots = [("exe", tree)]
+        report: Dict[str, float] = {"files": files, "dirs": len(dirs)}
+
+        start = time.perf_counter()
+        legacy = {}
+        for root_dir, _d, names in os.walk(tree):
+            for name in names:
+                if name.lower().endswith(".exe"):
+                    legacy.setdefault(os.path.splitext(name)[0].lower(), os.path.join(root_dir, name))
+        report["os_walk"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        index = ExeIndex(db, workers=workers)
+        found = index.exe_map(roots)
+        report["cold"] = time.perf_counter() - start
+        assert len(found) == len(legacy)
+        index.flush()
+
+        start = time.perf_counter()
+        ExeIndex(db, workers=workers).exe_map(roots)
+        report["warm"] = time.perf_counter() - start
+
+        for d in dirs[:: max(1, len(dirs) // 10)][:10]:
+            open(os.path.join(d, "new_tool.exe"), "w").close()
+        start = time.perf_counter()
+        index.exe_map(roots, max_age=0)
+        report["incremental"] = time.perf_counter() - start
+        report["rescanned_dirs"] = index.last_stats["scanned"]
+        index.flush()
+        return report
+    finally:
+        shutil.rmtree(base, ignore_errors=True)
+
+
+def get_description() -> str:
+    """Return a short summary of this module."""
+    return "Persistent, incrementally refreshed index of installed programs and shortcuts."
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--bench":
+        count = int(sys.argv[2]) if len(sys.argv) > 2 else 200_000
+        for key, value in benchmark(count).items():
+            print(f"[exe_index] {key}: {value:.3f}" if isinstance(value, float) else f"[exe_index] {key}: {value}")
+    else:
+        for name, target in sorted(get_index().exe_map().items()):
+            print(f"{name}\t{target}")
@@ -10,32 +10,104 @@ except Exception as e:  # pragma: no cover - optional dependency
 else:
     _IMPORT_ERROR = None
 
+import io
 import os
 import tempfile
+from config_service import get_config_service
 from error_logger import log_error
+from . import audio_output, tts_cache
 
 MODULE_NAME = "gtts_tts"
 
-__all__ = ["speak"]
+__all__ = ["speak", "precache", "is_speaking", "stop_speech"]
 
-def speak(text: str, lang: str = 'en') -> str:
-    """Speak ``text`` using Google TTS online service."""
-    if gTTS is None:
-        return f"gTTS not available: {_IMPORT_ERROR}"
+
+def _use_cache(text: str) -> bool:
+    return get_config_service().get_bool("tts_cache", True) and tts_cache.is_cacheable(text)
+
+
+def precache(text: str, lang: str = 'en') -> bool:
+    """Download ``text`` into the phrase cache without playing it."""
+    if gTTS is None or not tts_cache.is_cacheable(text):
+        return False
+    cache = tts_cache.get_cache()
+    if cache.get_file("gtts", lang, None, text, "mp3"):
+        return True
+    buf = io.BytesIO()
+    gTTS(text, lang=lang).write_to_fp(buf)
+    return cache.put_file("gtts", lang, None, text, buf.getvalue(), "mp3") is not None
+
+
+def _play_file(text: str, lang: str) -> None:
+    """Play ``text`` from the phrase cache or a freshly downloaded temp file."""
+    if _use_cache(text):
+        try:
+            if precache(text, lang):
+                cached = tts_cache.get_cache().get_file("gtts", lang, None, text, "mp3")
+                if cached:
+                    playsound.playsound(cached)
+                    return
+        except Exception as e:
+            log_error(f"[gtts_tts] cache error: {e}")
     tmp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".mp3")
     tmp = tmp_file.name
     tmp_file.close()
     try:
         gTTS(text, lang=lang).save(tmp)
         playsound.playsound(tmp)
-    except Exception as e:
-        log_error(f"[gtts_tts] TTS error: {e}")
-        return f"TTS error: {e}"
     finally:
         if os.path.exists(tmp):
             os.remove(tmp)
+
+
+def speak(
+    text: str,
+    lang: str = 'en',
+    async_play: bool = False,
+    on_complete=None,
+    priority: int = audio_output.PRIORITY_NORMAL,
+    interrupt: bool = False,
+    **_unused,
+) -> str:
+    """Speak ``text`` using Google TTS online service.
+
+    The MP3 is played through :mod:`modules.audio_output` so it never
+    overlaps other speech; it cannot be cut off once started.
+    """
+    if gTTS is None:
+        return f"gTTS not available: {_IMPORT_ERROR}"
+    errors = []
+
+    def play():
+        try:
+            _play_file(text, lang)
+        except Exception as e:
+            log_error(f"[gtts_tts] TTS error: {e}")
+            errors.append(e)
+
+    utterance = audio_output.get_output().submit(
+        play=play, priority=priority, interrupt=interrupt, on_complete=on_complete
+    )
+    if async_play:
+        return "spoke"
+    utterance.wait()
+    if errors:
+        return f"TTS error: {errors[0]}"
     return "spoke"
 
 
+def is_ready() -> bool:
+    """gTTS has no local model, so it is ready whenever it is installed."""
+    return gTTS is not None
+
+
+def is_speaking() -> bool:
+    return audio_output.is_speaking()
+
+
+def stop_speech() -> None:
+    audio_output.stop()
+
+
 def get_description() -> str:
     return "Online gTTS speech synthesis for fallback when offline TTS is missing."
@@ -14,6 +14,8 @@ except Exception as e:  # pragma: no cover - optional deps
 else:
     _IMPORT_ERROR = None
 
+from . import macro_format
+
 MACRO_DIR = "macros"
 MODULE_NAME = "gui_recorder"
 
@@ -21,35 +23,31 @@ __all__ = ["record_gui", "play_gui", "open_recorder_window"]
 
 
 def record_gui(name: str) -> str:
-    """Record actions until ESC is pressed and save to a JSON file."""
+    """Record actions until ESC is pressed and save them as a macro file."""
     if _IMPORT_ERROR:
         return f"pyautogui not available: {_IMPORT_ERROR}"
     if record_events is None:
         return "Recording functions unavailable"
     events = record_events()
-    import json
     import os
     os.makedirs(MACRO_DIR, exist_ok=True)
-    path = os.path.join(MACRO_DIR, f"{name}.json")
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(events, f)
-    return path
+    return macro_format.save(os.path.join(MACRO_DIR, name), events)
 
 
-def play_gui(name: str) -> str:
-    """Play back a recorded macro by name."""
+def play_gui(name: str, speed: float | None = None) -> str:
+    """Play back a recorded macro by name at ``speed`` times its recorded pace."""
     if _IMPORT_ERROR:
         return f"pyautogui not available: {_IMPORT_ERROR}"
     if play_events is None:
         return "Playback functions unavailable"
-    import json
     import os
-    path = os.path.join(MACRO_DIR, f"{name}.json")
+    path = macro_format.macro_path(name, MACRO_DIR)
     if not os.path.isfile(path):
         return f"Macro '{name}' not found"
-    with open(path, "r", encoding="utf-8") as f:
-        events = json.load(f)
-    play_events(events)
+    events = macro_format.load(path)
+    stats = play_events(events, speed=speed)
+    if stats is not None and stats.cancelled:
+        return f"Stopped {name}"
     return f"Played {name}"
 
 
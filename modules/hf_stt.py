@@ -1,43 +1,240 @@
-"""Speech recognition using Hugging Face models."""
+"""Speech recognition using Hugging Face models.
+
+Clips longer than ``hf_stt_chunk_length`` seconds are split by the
+``automatic-speech-recognition`` pipeline into overlapping windows
+(``hf_stt_stride`` seconds on each side) that are decoded
+``hf_stt_batch_size`` at a time and stitched back together on the overlap.
+
+On CPU the model's linear layers can be quantized to int8
+(``hf_stt_quantize``), which roughly halves memory and speeds up Whisper
+decoding at a small accuracy cost.  The pipeline is unloaded after
+``hf_stt_idle_unload`` seconds without a request (``0`` keeps it resident);
+:func:`preload` loads it ahead of the first utterance.
+"""
 
 from __future__ import annotations
 
+import gc
 import io
-import json
-from transformers import pipeline
-import soundfile as sf
-from error_logger import log_error
+import sys
+import threading
+import time
+
+try:
+    from transformers import pipeline
+    import soundfile as sf
+except ImportError as e:
+    pipeline = None
+    sf = None
+    _IMPORT_ERROR = str(e)
+else:
+    _IMPORT_ERROR = None
+
+from error_logger import log_error, log_info
+from config_service import get_config_service
 from . import gpu
 
+MODULE_NAME = "hf_stt"
 CONFIG_PATH = "config.json"
 DEFAULT_MODEL = "openai/whisper-small"
+# Whisper's native window; longer clips are chunked
+CHUNK_LENGTH = 30.0
+STRIDE = 5.0
+BATCH_SIZE = 4
+IDLE_UNLOAD = 300.0
 
-try:
-    with open(CONFIG_PATH, "r") as f:
-        _CFG = json.load(f)
-except Exception:
-    _CFG = {}
+__all__ = [
+    "recognize_from_audio",
+    "transcribe",
+    "preload",
+    "unload",
+    "is_loaded",
+    "benchmark",
+]
+
+_CFG = get_config_service(CONFIG_PATH).config
 
 _model = None
+_lock = threading.RLock()
+_last_used = 0.0
+_unload_timer: threading.Timer | None = None
+
+
+def _reset_model(_value) -> None:
+    """Drop the cached pipeline so the new ``hf_stt_model`` loads on next use."""
+    unload()
+
+
+get_config_service(CONFIG_PATH).subscribe("hf_stt_model", _reset_model)
+get_config_service(CONFIG_PATH).subscribe("hf_stt_quantize", _reset_model)
+
+
+def _quantize(asr):
+    """Replace ``asr.model`` with an int8 dynamically quantized copy."""
+    try:
+        import torch
+
+        asr.model = torch.quantization.quantize_dynamic(
+            asr.model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+        log_info(f"[{MODULE_NAME}] Using int8 dynamic quantization")
+    except Exception as e:
+        log_error(f"[{MODULE_NAME}] Quantization failed, using float model: {e}")
+    return asr
 
 
 def _get_asr():
     """Lazy-load and return the HF ASR pipeline."""
     global _model
-    if _model is None:
-        model_name = _CFG.get("hf_stt_model", DEFAULT_MODEL)
-        device = 0 if gpu.is_available() else -1
-        _model = pipeline("automatic-speech-recognition", model=model_name, device=device)
-    return _model
+    with _lock:
+        if _model is None:
+            if _IMPORT_ERROR:
+                raise RuntimeError(f"Missing dependency: {_IMPORT_ERROR}")
+            model_name = _CFG.get("hf_stt_model", DEFAULT_MODEL)
+            device = 0 if gpu.is_available() else -1
+            start = time.perf_counter()
+            asr = pipeline("automatic-speech-recognition", model=model_name, device=device)
+            if device == -1 and _CFG.get("hf_stt_quantize", False):
+                asr = _quantize(asr)
+            _model = asr
+            log_info(
+                f"[{MODULE_NAME}] Loaded {model_name} in {time.perf_counter() - start:.2f}s"
+            )
+        return _model
+
+
+def is_loaded() -> bool:
+    """Return ``True`` while the pipeline is resident in memory."""
+    return _model is not None
+
+
+def unload() -> None:
+    """Release the pipeline and the memory it holds."""
+    global _model, _unload_timer
+    with _lock:
+        if _unload_timer is not None:
+            _unload_timer.cancel()
+            _unload_timer = None
+        if _model is None:
+            return
+        _model = None
+    gc.collect()
+    torch = sys.modules.get("torch")
+    if torch is not None and torch.cuda.is_available():
+        torch.cuda.empty_cache()
+    log_info(f"[{MODULE_NAME}] Model unloaded")
+
+
+def _unload_if_idle(idle: float) -> None:
+    if time.monotonic() - _last_used >= idle:
+        unload()
+
+
+def _touch() -> None:
+    """Record a request and re-arm the idle-unload timer."""
+    global _last_used, _unload_timer
+    idle = float(_CFG.get("hf_stt_idle_unload", IDLE_UNLOAD) or 0)
+    with _lock:
+        _last_used = time.monotonic()
+        if _unload_timer is not None:
+            _unload_timer.cancel()
+            _unload_timer = None
+        if idle > 0:
+            _unload_timer = threading.Timer(idle, _unload_if_idle, args=(idle,))
+            _unload_timer.daemon = True
+            _unload_timer.start()
+
+
+def preload() -> threading.Thread:
+    """Load the pipeline on a background thread."""
+
+    def worker():
+        try:
+            _get_asr()
+            _touch()
+        except Exception as e:
+            log_error(f"[{MODULE_NAME}] Preload failed: {e}")
+
+    thread = threading.Thread(target=worker, daemon=True)
+    thread.start()
+    return thread
+
+
+def transcribe(wav, rate: int) -> str:
+    """Return text for mono or multi-channel float samples ``wav``."""
+    if getattr(wav, "ndim", 1) > 1:
+        wav = wav.mean(axis=1)
+    asr = _get_asr()
+    kwargs = {}
+    chunk = float(_CFG.get("hf_stt_chunk_length", CHUNK_LENGTH))
+    if chunk and len(wav) / rate > chunk:
+        kwargs = {
+            "chunk_length_s": chunk,
+            "stride_length_s": float(_CFG.get("hf_stt_stride", STRIDE)),
+            "batch_size": int(_CFG.get("hf_stt_batch_size", BATCH_SIZE)),
+        }
+    try:
+        result = asr({"raw": wav, "sampling_rate": rate}, **kwargs)
+    finally:
+        _touch()
+    return result.get("text", "").strip()
 
 
 def recognize_from_audio(data: bytes) -> str:
     """Return transcribed text from ``data`` containing WAV bytes."""
     try:
-        wav, rate = sf.read(io.BytesIO(data))
-        asr = _get_asr()
-        result = asr(wav, sampling_rate=rate)
-        return result.get("text", "").strip()
+        wav, rate = sf.read(io.BytesIO(data), dtype="float32")
+        return transcribe(wav, rate)
     except Exception as e:
-        log_error(f"[hf_stt] Recognition error: {e}")
+        log_error(f"[{MODULE_NAME}] Recognition error: {e}")
         return ""
+
+
+def benchmark(clips, runs: int = 1) -> dict:
+    """Measure the real-time factor of :func:`transcribe`.
+
+    ``clips`` are WAV paths or ``(samples, rate)`` pairs.  Model loading is
+    timed separately; ``rtf`` is decoding time divided by audio duration
+    (below 1.0 is faster than real time).
+    """
+    start = time.perf_counter()
+    _get_asr()
+    load_seconds = time.perf_counter() - start
+    results = []
+    for clip in clips:
+        if isinstance(clip, (str, bytes)) or hasattr(clip, "__fspath__"):
+            wav, rate = sf.read(clip, dtype="float32")
+            name = str(clip)
+        else:
+            wav, rate = clip
+            name = f"clip{len(results)}"
+        duration = len(wav) / rate
+        start = time.perf_counter()
+        for _ in range(runs):
+            text = transcribe(wav, rate)
+        elapsed = (time.perf_counter() - start) / runs
+        results.append(
+            {"clip": name, "audio": duration, "seconds": elapsed, "rtf": elapsed / duration, "text": text}
+        )
+    audio = sum(r["audio"] for r in results)
+    seconds = sum(r["seconds"] for r in results)
+    return {
+        "load_seconds": load_seconds,
+        "audio_seconds": audio,
+        "seconds": seconds,
+        "rtf": seconds / audio if audio else 0.0,
+        "clips": results,
+    }
+
+
+def get_description() -> str:
+    """Return a short summary of this module."""
+    return "Transcribes speech with Hugging Face ASR models, chunking long audio."
+
+
+if __name__ == "__main__":
+    report = benchmark(sys.argv[1:])
+    print(f"[hf_stt] model load {report['load_seconds']:.2f}s")
+    for row in report["clips"]:
+        print(f"[hf_stt] {row['clip']}: {row['audio']:.1f}s audio, RTF {row['rtf']:.3f}")
+    print(f"[hf_stt] overall RTF {report['rtf']:.3f}")
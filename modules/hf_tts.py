@@ -2,55 +2,134 @@
 
 from __future__ import annotations
 
-import json
 import threading
+
+import numpy as np
 from transformers import pipeline
-import sounddevice as sd
 from error_logger import log_error
-from . import gpu
+from config_service import get_config_service
+from . import audio_output, gpu, tts_cache
 
 CONFIG_PATH = "config.json"
 DEFAULT_MODEL = "facebook/fastspeech2-en-ljspeech"
 
-try:
-    with open(CONFIG_PATH, "r") as f:
-        _CFG = json.load(f)
-except Exception:
-    _CFG = {}
+_CFG = get_config_service(CONFIG_PATH).config
 
 _tts = None
+_lock = threading.RLock()
+_ready = False
+WARMUP_TEXT = "Hello."
+
+
+def _reset_model(_value) -> None:
+    """Drop the cached pipeline so the new ``hf_tts_model`` loads on next use."""
+    global _tts, _ready
+    _tts = None
+    _ready = False
+
+
+get_config_service(CONFIG_PATH).subscribe("hf_tts_model", _reset_model)
 
 
 def _get_tts():
     """Lazy-load and return the HF TTS pipeline."""
     global _tts
-    if _tts is None:
-        model_name = _CFG.get("hf_tts_model", DEFAULT_MODEL)
-        device = 0 if gpu.is_available() else -1
-        _tts = pipeline("text-to-speech", model=model_name, device=device)
-    return _tts
+    with _lock:
+        if _tts is None:
+            model_name = _CFG.get("hf_tts_model", DEFAULT_MODEL)
+            device = 0 if gpu.is_available() else -1
+            _tts = pipeline("text-to-speech", model=model_name, device=device)
+        return _tts
+
+
+def warm_up(text: str = WARMUP_TEXT) -> bool:
+    """Load the pipeline and run one throwaway synthesis."""
+    global _ready
+    with _lock:
+        _get_tts()(text)
+        _ready = True
+    return True
+
+
+def is_ready() -> bool:
+    """Return ``True`` once the pipeline has completed a synthesis."""
+    return _ready
+
+
+def is_cached(text: str) -> bool:
+    """Return ``True`` if ``text`` can be played from the phrase cache."""
+    return _use_cache(text) and tts_cache.get_cache().get_pcm(
+        "huggingface", _model_name(), None, text
+    ) is not None
+
 
+def _model_name() -> str:
+    return _CFG.get("hf_tts_model", DEFAULT_MODEL)
 
-def speak(text: str, async_play: bool = True):
-    """Speak ``text`` using a Hugging Face model."""
+
+def _use_cache(text: str) -> bool:
+    return _CFG.get("tts_cache", True) and tts_cache.is_cacheable(text)
+
+
+def _synthesize(text: str, cache: bool):
+    """Return ``(audio, rate)`` for ``text``, consulting the phrase cache."""
+    if cache:
+        hit = tts_cache.get_cache().get_pcm("huggingface", _model_name(), None, text)
+        if hit is not None:
+            return tts_cache.pcm16_to_float(hit[0]), hit[1]
+    global _ready
+    with _lock:
+        out = _get_tts()(text)
+    _ready = True
+    audio = out["audio"]
+    rate = out["sampling_rate"]
+    if cache:
+        tts_cache.get_cache().put_pcm("huggingface", _model_name(), None, text, audio, rate)
+    return audio, rate
+
+
+def precache(text: str) -> bool:
+    """Synthesize ``text`` into the phrase cache without playing it."""
+    if not tts_cache.is_cacheable(text):
+        return False
+    _synthesize(text, cache=True)
+    return True
+
+
+def speak(
+    text: str,
+    async_play: bool = True,
+    on_complete=None,
+    priority: int = audio_output.PRIORITY_NORMAL,
+    interrupt: bool = False,
+    **_unused,
+):
+    """Speak ``text`` using a Hugging Face model.
+
+    Playback goes through :mod:`modules.audio_output`; options meant for
+    other backends such as ``voice`` or ``speed`` are ignored.
+    """
     try:
-        tts = _get_tts()
-        out = tts(text)
-        audio = out["audio"]
-        rate = out["sampling_rate"]
-
-        def _play():
-            try:
-                sd.play(audio, rate)
-                sd.wait()
-            except Exception as e:
-                log_error(f"[hf_tts] Playback error: {e}")
-
-        if async_play:
-            threading.Thread(target=_play, daemon=True).start()
-        else:
-            _play()
+        audio, rate = _synthesize(text, _use_cache(text))
+        audio = np.asarray(audio, dtype=np.float32).reshape(-1)
+        utterance = audio_output.get_output().submit(
+            [audio],
+            rate,
+            priority=priority,
+            interrupt=interrupt,
+            on_complete=on_complete,
+        )
+        if not async_play:
+            utterance.wait()
         return "spoke"
     except Exception as e:
         log_error(f"[hf_tts] Error: {e}")
         return f"[hf_tts error] {e}"
+
+
+def is_speaking() -> bool:
+    return audio_output.is_speaking()
+
+
+def stop_speech() -> None:
+    audio_output.stop()
@@ -19,6 +19,8 @@ else:
 
 import webbrowser
 
+from . import fuzzy_index
+
 MODULE_NAME = "launcher_installer"
 LAUNCHERS_FILE = "learned_launchers.json"
 EPIC_URL = (
@@ -83,6 +85,9 @@ def _install_file(path: Path) -> str:
 def install_launcher(name: str, dest_dir: str = ".") -> str:
     """Download and run the launcher identified by ``name``."""
     data = _load_launchers()
+    if name not in data:
+        # Tolerate misspelled or misheard launcher names
+        name = fuzzy_index.closest(name, data) or name
     url = data.get(name)
     if not url:
         return f"no launcher named {name}"
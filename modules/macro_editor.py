@@ -10,6 +10,8 @@ except Exception as e:  # pragma: no cover - optional dependency
 else:
     _IMPORT_ERROR = None
 
+from . import macro_format
+
 MACRO_DIR = "macros"
 
 __all__ = ["open_editor"]
@@ -18,22 +20,27 @@ __all__ = ["open_editor"]
 def open_editor(name: str):
     if tk is None:
         return "Tkinter not available"
-    path = os.path.join(MACRO_DIR, f"{name}.json")
+    path = macro_format.macro_path(name, MACRO_DIR)
     if not os.path.isfile(path):
         return f"Macro {name} not found"
-    with open(path, "r", encoding="utf-8") as f:
-        events = json.load(f)
+    events = macro_format.load(path)
     win = tk.Tk()
     win.title(f"Edit macro {name}")
     text = tk.Text(win, width=60, height=20)
     text.pack()
     text.insert("1.0", json.dumps(events, indent=2))
     def save():
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(json.loads(text.get("1.0", tk.END)), f, indent=2)
+        edited = json.loads(text.get("1.0", tk.END))
+        try:
+            macro_format.dump(edited, path)
+        except ValueError:
+            # Edits outside the packed schema are kept as JSON
+            macro_format.dump(edited, os.path.join(MACRO_DIR, f"{name}.json"))
+            if path.endswith(macro_format.EXTENSION):
+                os.remove(path)
     tk.Button(win, text="Save", command=save).pack()
     win.mainloop()
 
 
 def get_description() -> str:
-    return "Allows basic editing of saved macro JSON files via Tkinter."
+    return "Allows basic editing of saved macros as JSON via Tkinter."
@@ -0,0 +1,428 @@
+"""macro_format.py
+Compact columnar storage for recorded macros.
+
+Recorded macros used to be saved as a JSON list with one dict per event.
+A few minutes of mouse movement is tens of megabytes of JSON, and replay
+calls ``moveTo`` once per recorded position.
+
+A ``.macro`` file stores the same events as packed columns: kind, time
+delta in microseconds, x and y deltas, and two integer arguments.  The
+arguments hold the button or key id plus the pressed flag, or the scroll
+amounts.  Buttons, keys and typed text are stored once in a string table.
+The whole body is zlib-compressed.  Decoding returns the original event
+dicts, with timestamps exact to the microsecond.
+
+:func:`simplify` optionally thins each run of mouse moves with the
+Ramer-Douglas-Peucker algorithm.  Dropped moves take their timestamps with
+them, so replay jumps between the kept points instead of following the
+recorded pace.  :func:`save` therefore only simplifies when
+``macro_simplify_epsilon`` is above 0; by default every event is kept.
+Event lists that do not fit the schema (for
+example output of ``pyautogui.record``) are stored as JSON instead.
+
+``python -m modules.macro_format convert [dir]`` converts existing JSON
+macros and ``python -m modules.macro_format --bench [seconds]`` reports
+file sizes and replay CPU for a synthetic recording.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import random
+import struct
+import sys
+import time
+import types
+import zlib
+from array import array
+from itertools import accumulate
+from typing import Dict, Iterable, List
+
+from config_service import get_config_service
+from error_logger import log_error
+
+MODULE_NAME = "macro_format"
+EXTENSION = ".macro"
+MAGIC = b"AMAC"
+VERSION = 1
+_HEADER = struct.Struct("<4sBdI")
+
+# kind -> (fields besides "type" and "t", argument fields a, b)
+_SCHEMA = {
+    "move": (("x", "y"), (None, None)),
+    "click": (("x", "y", "button", "pressed"), ("button", "pressed")),
+    "scroll": (("x", "y", "dx", "dy"), ("dx", "dy")),
+    "key": (("key", "down"), ("key", "down")),
+    "write": (("text",), ("text", None)),
+}
+_KINDS = list(_SCHEMA)
+_STRINGS = {"button", "key", "text"}
+_FLAGS = {"pressed", "down"}
+_INT32 = (-(2**31), 2**31 - 1)
+
+__all__ = [
+    "encode",
+    "decode",
+    "dump",
+    "load",
+    "save",
+    "simplify",
+    "macro_path",
+    "list_names",
+    "convert",
+    "benchmark",
+]
+
+
+# ----- encoding -----
+def _encodable(ev) -> bool:
+    if not isinstance(ev, dict) or ev.get("type") not in _SCHEMA:
+        return False
+    fields, _ = _SCHEMA[ev["type"]]
+    if set(ev) != {"type", "t", *fields} or not isinstance(ev["t"], (int, float)):
+        return False
+    for name in fields:
+        value = ev[name]
+        if name in _STRINGS:
+            ok = isinstance(value, str)
+        elif name in _FLAGS:
+            ok = isinstance(value, bool)
+        else:
+            ok = isinstance(value, int) and not isinstance(value, bool) and _INT32[0] <= value <= _INT32[1]
+        if not ok:
+            return False
+    return True
+
+
+def _column(typecode: str, values) -> bytes:
+    col = array(typecode, values)
+    if sys.byteorder == "big":
+        col.byteswap()
+    return col.tobytes()
+
+
+def _read_column(typecode: str, data: memoryview, offset: int, count: int):
+    col = array(typecode)
+    size = col.itemsize * count
+    col.frombytes(data[offset : offset + size])
+    if sys.byteorder == "big":
+        col.byteswap()
+    return col, offset + size
+
+
+def encode(events: List[dict]) -> bytes:
+    """Return ``events`` packed as a ``.macro`` blob.
+
+    Raises ``ValueError`` when an event does not fit the columnar schema.
+    """
+    for ev in events:
+        if not _encodable(ev):
+            raise ValueError(f"event not representable: {ev!r}")
+    strings: Dict[str, int] = {}
+    kinds, dts, xs, ys, args_a, args_b = [], [], [], [], [], []
+    t0 = events[0]["t"] if events else 0.0
+    prev_us = 0
+    px = py = 0
+    for ev in events:
+        kind = ev["type"]
+        us = round((ev["t"] - t0) * 1e6)
+        kinds.append(_KINDS.index(kind))
+        dts.append(us - prev_us)
+        prev_us = us
+        x, y = ev.get("x", px), ev.get("y", py)
+        xs.append(x - px)
+        ys.append(y - py)
+        px, py = x, y
+        row = []
+        for name in _SCHEMA[kind][1]:
+            value = ev.get(name) if name else 0
+            if name in _STRINGS:
+                value = strings.setdefault(value, len(strings))
+            row.append(int(value))
+        args_a.append(row[0])
+        args_b.append(row[1])
+    table = json.dumps(list(strings), ensure_ascii=False).encode("utf-8")
+    if any(not _INT32[0] <= d <= _INT32[1] for d in dts + xs + ys):
+        raise ValueError("time or coordinate delta out of range")
+    body = b"".join(
+        [
+            struct.pack("<I", len(table)),
+            table,
+            _column("B", kinds),
+            _column("i", dts),
+            _column("i", xs),
+            _column("i", ys),
+            _column("i", args_a),
+            _column("i", args_b),
+        ]
+    )
+    return _HEADER.pack(MAGIC, VERSION, float(t0), len(events)) + zlib.compress(body, 6)
+
+
+def decode(blob: bytes) -> List[dict]:
+    """Return the event dicts stored in a ``.macro`` blob."""
+    magic, version, t0, count = _HEADER.unpack_from(blob)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("not a macro file")
+    body = memoryview(zlib.decompress(blob[_HEADER.size :]))
+    (table_len,) = struct.unpack_from("<I", body)
+    strings = json.loads(bytes(body[4 : 4 + table_len]).decode("utf-8"))
+    offset = 4 + table_len
+    kinds, offset = _read_column("B", body, offset, count)
+    dts, offset = _read_column("i", body, offset, count)
+    xs, offset = _read_column("i", body, offset, count)
+    ys, offset = _read_column("i", body, offset, count)
+    args_a, offset = _read_column("i", body, offset, count)
+    args_b, offset = _read_column("i", body, offset, count)
+
+    events = []
+    rows = zip(kinds, accumulate(dts), accumulate(xs), accumulate(ys), args_a, args_b)
+    for code, us, x, y, a, b in rows:
+        kind = _KINDS[code]
+        t = round(t0 + us / 1e6, 6)
+        if kind == "move":
+            events.append({"type": kind, "x": x, "y": y, "t": t})
+            continue
+        fields, args = _SCHEMA[kind]
+        ev = {"type": kind}
+        if "x" in fields:
+            ev["x"], ev["y"] = x, y
+        for name, value in zip(args, (a, b)):
+            if name in _STRINGS:
+                ev[name] = strings[value]
+            elif name in _FLAGS:
+                ev[name] = bool(value)
+            elif name:
+                ev[name] = value
+        ev["t"] = t
+        events.append(ev)
+    return events
+
+
+# ----- path simplification -----
+def _rdp(points: List[dict], epsilon: float) -> List[dict]:
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        ax, ay = points[first]["x"], points[first]["y"]
+        bx, by = points[last]["x"], points[last]["y"]
+        dx, dy = bx - ax, by - ay
+        length_sq = dx * dx + dy * dy
+        worst, index = -1.0, first
+        for i in range(first + 1, last):
+            px, py = points[i]["x"] - ax, points[i]["y"] - ay
+            dot = px * dx + py * dy
+            if length_sq == 0 or dot <= 0:
+                dist = math.hypot(px, py)
+            elif dot >= length_sq:
+                dist = math.hypot(px - dx, py - dy)
+            else:
+                # Integer cross product keeps exactly collinear points at 0
+                dist = abs(px * dy - py * dx) / math.sqrt(length_sq)
+            if dist > worst:
+                worst, index = dist, i
+        if worst > epsilon:
+            keep[index] = True
+            stack.append((first, index))
+            stack.append((index, last))
+    return [p for p, k in zip(points, keep) if k]
+
+
+def simplify(events: Iterable[dict], epsilon: float = 0.0) -> List[dict]:
+    """Thin each run of consecutive mouse moves to within ``epsilon`` pixels."""
+    result: List[dict] = []
+    run: List[dict] = []
+    for ev in list(events) + [None]:
+        if ev is not None and isinstance(ev, dict) and ev.get("type") == "move" and "x" in ev and "y" in ev:
+            run.append(ev)
+            continue
+        if run:
+            result.extend(_rdp(run, epsilon) if len(run) > 2 else run)
+            run = []
+        if ev is not None:
+            result.append(ev)
+    return result
+
+
+# ----- files -----
+def dump(events: List[dict], path: str) -> str:
+    """Write ``events`` to ``path``; ``.macro`` paths are packed, others JSON."""
+    tmp = f"{path}.tmp"
+    if path.endswith(EXTENSION):
+        blob = encode(events)
+        with open(tmp, "wb") as f:
+            f.write(blob)
+    else:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(events, f)
+    os.replace(tmp, path)
+    return path
+
+
+def load(path: str) -> List[dict]:
+    """Return the events stored at ``path`` in either format."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:4] == MAGIC:
+        return decode(data)
+    return json.loads(data.decode("utf-8"))
+
+
+def default_epsilon() -> float:
+    """Return ``macro_simplify_epsilon`` from the config."""
+    return get_config_service().get_float("macro_simplify_epsilon", 0.0)
+
+
+def _thin(events: List[dict], epsilon: float | None) -> List[dict]:
+    epsilon = default_epsilon() if epsilon is None else epsilon
+    return simplify(events, epsilon) if epsilon > 0 else events
+
+
+def save(base: str, events: List[dict], epsilon: float | None = None) -> str:
+    """Save ``events`` as ``base.macro``, or ``base.json`` if they do not fit.
+
+    Moves are simplified only when ``epsilon`` is above 0.  Returns the
+    written path.
+    """
+    try:
+        return dump(_thin(events, epsilon), base + EXTENSION)
+    except ValueError:
+        path = dump(events, base + ".json")
+        # An older packed copy would shadow the new JSON in macro_path
+        if os.path.exists(base + EXTENSION):
+            os.remove(base + EXTENSION)
+        return path
+
+
+def macro_path(name: str, macro_dir: str) -> str:
+    """Return the saved file for macro ``name``, preferring ``.macro`` over JSON.
+
+    When neither exists, the JSON path is returned.
+    """
+    packed = os.path.join(macro_dir, name + EXTENSION)
+    if os.path.isfile(packed):
+        return packed
+    return os.path.join(macro_dir, f"{name}.json")
+
+
+def list_names(macro_dir: str) -> List[str]:
+    """Return the names of the macros saved in ``macro_dir`` in either format."""
+    if not os.path.isdir(macro_dir):
+        return []
+    names = {
+        os.path.splitext(f)[0]
+        for f in os.listdir(macro_dir)
+        if f.endswith(EXTENSION) or f.endswith(".json")
+    }
+    return sorted(names)
+
+
+def convert(path: str, epsilon: float | None = None) -> str | None:
+    """Write a ``.macro`` copy of the JSON macro at ``path``.
+
+    Returns the new path, or ``None`` when the macro cannot be packed.  The
+    JSON file is kept, but :func:`macro_path` prefers the packed copy.
+    """
+    events = load(path)
+    try:
+        return dump(_thin(events, epsilon), os.path.splitext(path)[0] + EXTENSION)
+    except ValueError as e:
+        log_error(f"[{MODULE_NAME}] cannot convert {path}: {e}")
+        return None
+
+
+# ----- benchmark -----
+def _synthetic_recording(seconds: float, rate: int = 125, seed: int = 5) -> List[dict]:
+    """Return a recording of smooth mouse strokes with clicks and key presses."""
+    rng = random.Random(seed)
+    events: List[dict] = []
+    t = 1_700_000_000.0
+    x, y = 500, 400
+    end = t + seconds
+    while t < end:
+        tx, ty = rng.randint(0, 1919), rng.randint(0, 1079)
+        steps = rng.randint(20, 150)
+        straight = rng.random() < 0.5
+        for i in range(1, steps + 1):
+            f = i / steps
+            bend = 0 if straight else math.sin(f * math.pi) * 60
+            nx = round(x + (tx - x) * f + bend)
+            ny = round(y + (ty - y) * f)
+            # Input events arrive with a few milliseconds of jitter
+            t += 1 / rate + rng.uniform(0, 0.004)
+            events.append({"type": "move", "x": nx, "y": ny, "t": t})
+        x, y = tx, ty
+        for pressed in (True, False):
+            t += 0.08
+            events.append({"type": "click", "x": x, "y": y, "button": "Button.left", "pressed": pressed, "t": t})
+        for ch in rng.sample("abcdefgh", 3):
+            for down in (True, False):
+                t += 0.05
+                events.append({"type": "key", "key": f"'{ch}'", "down": down, "t": t})
+        t += rng.uniform(0.2, 1.0)
+    return events
+
+
+def _replay_cpu(path: str) -> tuple:
+    from modules import automation_learning
+
+    calls = [0]
+
+    def count(*args, **kwargs):
+        calls[0] += 1
+
+    stub = types.SimpleNamespace(
+        moveTo=count, mouseDown=count, mouseUp=count, scroll=count, write=count, keyDown=count, keyUp=count
+    )
+    saved = automation_learning.pyautogui
+    automation_learning.pyautogui = stub
+    try:
+        start = time.process_time()
+        automation_learning.play_events(load(path), speed=0)
+        return time.process_time() - start, calls[0]
+    finally:
+        automation_learning.pyautogui = saved
+
+
+def benchmark(seconds: float = 300, directory: str | None = None) -> Dict[str, float]:
+    """Compare JSON and packed files for a synthetic recording of ``seconds``."""
+    import tempfile
+
+    events = _synthetic_recording(seconds)
+    results: Dict[str, float] = {"events": float(len(events))}
+    with tempfile.TemporaryDirectory(dir=directory) as tmp:
+        variants = {
+            "json": (os.path.join(tmp, "m.json"), events),
+            "packed": (os.path.join(tmp, "a.macro"), events),
+            "packed_lossless_rdp": (os.path.join(tmp, "b.macro"), simplify(events, 0.0)),
+            "packed_rdp_1px": (os.path.join(tmp, "c.macro"), simplify(events, 1.0)),
+        }
+        for name, (path, evs) in variants.items():
+            dump(evs, path)
+            results[f"{name}_bytes"] = float(os.path.getsize(path))
+            cpu, calls = _replay_cpu(path)
+            results[f"{name}_replay_cpu"] = cpu
+            results[f"{name}_replay_calls"] = float(calls)
+    return results
+
+
+def get_description() -> str:
+    """Return a short summary of this module."""
+    return "Packed columnar macro files with optional mouse path simplification."
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "convert":
+        folder = sys.argv[2] if len(sys.argv) > 2 else "macros"
+        for fname in sorted(os.listdir(folder)):
+            if fname.endswith(".json"):
+                out = convert(os.path.join(folder, fname))
+                print(f"[{MODULE_NAME}] {fname}: {out or 'kept as JSON'}")
+    else:
+        length = float(sys.argv[2]) if len(sys.argv) > 2 else 300
+        for name, value in benchmark(length).items():
+            print(f"[{MODULE_NAME}] {name}: {value:,.3f}")
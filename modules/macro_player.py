@@ -0,0 +1,253 @@
+"""macro_player.py
+Replay recorded input events on their original schedule.
+
+``play_events`` used to send every event back to back.  Each pyautogui call
+also added its default ``PAUSE`` of 0.1 s, so long mouse strokes replayed
+many times slower than recorded and key timing was lost.
+
+:func:`replay` runs each event at its recorded offset divided by ``speed``,
+measured from one ``time.monotonic`` start time.  The deadlines are
+absolute, so a late event does not push back the ones after it.  Waiting
+uses ``Event.wait`` on the cancel event, with a short spin at the end for
+precision.  Mouse moves that fall due in the same ``MOVE_FRAME`` are
+coalesced into a single move to the latest position.  pyautogui's
+per-call pause is disabled.  Setting the cancel event (by default
+``assistant.cancel_event``) stops the replay between events and releases
+any keys or buttons the macro still holds down.
+
+Run ``python -m modules.macro_player [seconds] [speed]`` to measure
+schedule accuracy and CPU use against a stub input backend.
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+import time
+import types
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List
+
+from config_service import get_config_service
+from error_logger import log_error
+
+MODULE_NAME = "macro_player"
+SPEED = 1.0
+# Moves due within this window are sent as one move
+MOVE_FRAME = 1 / 120
+# The final stretch of each wait is spun because OS sleeps overshoot
+SPIN = 0.002
+
+__all__ = ["ReplayStats", "replay", "default_speed", "benchmark"]
+
+_KEY_ALIASES = {"cmd": "command" if sys.platform == "darwin" else "win", "alt_gr": "altright"}
+
+
+@dataclass
+class ReplayStats:
+    """Summary of one replay."""
+
+    events: int = 0
+    sent: int = 0
+    coalesced: int = 0
+    duration: float = 0.0
+    mean_lag: float = 0.0
+    max_lag: float = 0.0
+    cancelled: bool = False
+
+
+def default_speed() -> float:
+    """Return ``macro_replay_speed`` from the config."""
+    return get_config_service().get_float("macro_replay_speed", SPEED)
+
+
+def _default_cancel() -> threading.Event | None:
+    # Use the assistant's cancel flag when it is running, without importing it
+    return getattr(sys.modules.get("assistant"), "cancel_event", None)
+
+
+def _key_name(key) -> str:
+    """Translate a pynput key string (``'a'``, ``Key.ctrl_l``) for pyautogui."""
+    key = str(key)
+    if len(key) >= 3 and key[0] == key[-1] == "'":
+        return key[1:-1]
+    if key.startswith("Key."):
+        key = key[4:]
+        if key in _KEY_ALIASES:
+            return _KEY_ALIASES[key]
+        for suffix, side in (("_l", "left"), ("_r", "right")):
+            if key.endswith(suffix):
+                key = key[: -len(suffix)] + side
+        return key.replace("_", "")
+    return key
+
+
+def _button_name(button) -> str:
+    return str(button or "left").replace("Button.", "")
+
+
+class _Output:
+    """Sends events through ``pyautogui`` without its per-call pause."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.held_keys: List[str] = []
+        self.held_buttons: List[str] = []
+        # Stand-ins without ``PAUSE`` do not take pyautogui's ``_pause`` keyword
+        self._extra = {"_pause": False} if hasattr(backend, "PAUSE") else {}
+
+    def _call(self, name: str, *args, **kwargs):
+        return getattr(self.backend, name)(*args, **kwargs, **self._extra)
+
+    def send(self, ev: dict) -> None:
+        et = ev.get("type")
+        if et == "move":
+            self._call("moveTo", ev["x"], ev["y"])
+        elif et == "click":
+            button = _button_name(ev.get("button"))
+            if ev.get("pressed", ev.get("down", True)):
+                self._call("mouseDown", x=ev["x"], y=ev["y"], button=button)
+                self.held_buttons.append(button)
+            else:
+                self._call("mouseUp", x=ev["x"], y=ev["y"], button=button)
+                if button in self.held_buttons:
+                    self.held_buttons.remove(button)
+        elif et == "scroll":
+            self._call("scroll", ev.get("dy", 0), x=ev.get("x"), y=ev.get("y"))
+        elif et == "write":
+            self._call("write", ev.get("text", ""))
+        elif et in ("press", "key"):
+            key = _key_name(ev.get("key"))
+            if ev.get("pressed", ev.get("down", True)):
+                self._call("keyDown", key)
+                self.held_keys.append(key)
+            else:
+                self._call("keyUp", key)
+                if key in self.held_keys:
+                    self.held_keys.remove(key)
+
+    def release_all(self) -> None:
+        for key in reversed(self.held_keys):
+            self._call("keyUp", key)
+        for button in reversed(self.held_buttons):
+            self._call("mouseUp", button=button)
+        self.held_keys, self.held_buttons = [], []
+
+
+def _wait_until(deadline: float, cancel: threading.Event | None, clock: Callable[[], float]) -> bool:
+    """Wait for ``deadline``; return ``False`` if ``cancel`` was set first."""
+    while True:
+        remaining = deadline - clock()
+        if remaining <= 0:
+            return not (cancel is not None and cancel.is_set())
+        if remaining > SPIN:
+            if cancel is not None:
+                if cancel.wait(remaining - SPIN):
+                    return False
+            else:
+                time.sleep(remaining - SPIN)
+        else:
+            time.sleep(0)
+
+
+def replay(
+    events: Iterable[dict],
+    backend=None,
+    speed: float | None = None,
+    cancel: threading.Event | None = None,
+    clock: Callable[[], float] = time.monotonic,
+) -> ReplayStats:
+    """Send ``events`` through ``backend`` (default ``pyautogui``) on schedule.
+
+    ``speed`` multiplies the recorded pace; 0 or less sends every event
+    without waiting or coalescing.
+    Events without a ``"t"`` timestamp run right after the previous one.
+    """
+    if backend is None:
+        import pyautogui as backend  # noqa: N813 - optional dependency
+    events = list(events)
+    speed = default_speed() if speed is None else speed
+    cancel = _default_cancel() if cancel is None else cancel
+    out = _Output(backend)
+    stats = ReplayStats(events=len(events))
+
+    start = clock()
+    base = next((ev["t"] for ev in events if isinstance(ev.get("t"), (int, float))), None)
+    offset = 0.0
+    total_lag = 0.0
+    i = 0
+    try:
+        while i < len(events):
+            ev = events[i]
+            if base is not None and speed > 0 and isinstance(ev.get("t"), (int, float)):
+                offset = (ev["t"] - base) / speed
+            if not _wait_until(start + offset, cancel, clock):
+                stats.cancelled = True
+                break
+            if ev.get("type") == "move" and speed > 0 and base is not None:
+                # Skip ahead to the last move that is already due this frame
+                horizon = clock() - start + MOVE_FRAME
+                while i + 1 < len(events) and events[i + 1].get("type") == "move":
+                    nxt = events[i + 1].get("t")
+                    if not isinstance(nxt, (int, float)) or (nxt - base) / speed > horizon:
+                        break
+                    i += 1
+                    stats.coalesced += 1
+                ev = events[i]
+            lag = clock() - start - offset
+            total_lag += max(lag, 0.0)
+            stats.max_lag = max(stats.max_lag, lag)
+            try:
+                out.send(ev)
+            except Exception as e:
+                log_error(f"[{MODULE_NAME}] event {ev.get('type')} failed: {e}")
+            stats.sent += 1
+            i += 1
+    finally:
+        if stats.cancelled or i < len(events):
+            try:
+                out.release_all()
+            except Exception as e:  # pragma: no cover - backend specific
+                log_error(f"[{MODULE_NAME}] release failed: {e}")
+    stats.duration = clock() - start
+    stats.mean_lag = total_lag / stats.sent if stats.sent else 0.0
+    return stats
+
+
+# ----- benchmark -----
+def benchmark(seconds: float = 10.0, speed: float = 1.0) -> Dict[str, float]:
+    """Replay a synthetic recording against a stub backend and time it."""
+    from modules.macro_format import _synthetic_recording
+
+    events = _synthetic_recording(seconds)
+    recorded = (events[-1]["t"] - events[0]["t"]) / speed
+    noop = lambda *a, **k: None  # noqa: E731
+    stub = types.SimpleNamespace(
+        moveTo=noop, mouseDown=noop, mouseUp=noop, scroll=noop, write=noop, keyDown=noop, keyUp=noop
+    )
+    cpu = time.process_time()
+    stats = replay(events, stub, speed=speed, cancel=threading.Event())
+    cpu = time.process_time() - cpu
+    return {
+        "events": float(stats.events),
+        "sent": float(stats.sent),
+        "scheduled_seconds": recorded,
+        "wall_seconds": stats.duration,
+        "cpu_seconds": cpu,
+        "mean_lag_ms": stats.mean_lag * 1000,
+        "max_lag_ms": stats.max_lag * 1000,
+        # The old loop: one call per event plus pyautogui's default 0.1 s PAUSE
+        "old_loop_seconds": stats.events * 0.1,
+    }
+
+
+def get_description() -> str:
+    """Return a short summary of this module."""
+    return "Replays recorded macros on a monotonic schedule with speed control and cancellation."
+
+
+if __name__ == "__main__":
+    length = float(sys.argv[1]) if len(sys.argv) > 1 else 10.0
+    pace = float(sys.argv[2]) if len(sys.argv) > 2 else 1.0
+    for name, value in benchmark(length, pace).items():
+        print(f"[{MODULE_NAME}] {name}: {value:,.3f}")
@@ -1,14 +1,23 @@
-"""Track repeated actions and suggest creating macros."""
+"""Track repeated actions and suggest creating macros.
+
+Single actions repeated in the current session are counted here.
+Multi-step routines repeated across the whole saved command history come
+from :mod:`sequence_miner` and can be saved as ``command_macros``.
+"""
 
 from collections import Counter, deque
 
+from . import command_macros, sequence_miner
+
 MODULE_NAME = "macro_suggestions"
 
 _HISTORY_LEN = 20
 _actions = deque(maxlen=_HISTORY_LEN)
 _suggested = set()
+# Routines offered by the last ``suggest_routines`` call, for ``save_routine``
+_last_routines: list = []
 
-__all__ = ["record_action", "suggest_macros"]
+__all__ = ["record_action", "suggest_macros", "suggest_routines", "save_routine"]
 
 
 def record_action(action: str) -> None:
@@ -24,5 +33,23 @@ def suggest_macros(threshold: int = 3) -> list[str]:
     return suggestions
 
 
+def suggest_routines(threshold: int = 3, limit: int = 5) -> list[list[str]]:
+    """Return command sequences repeated ``threshold`` times or more.
+
+    Sequences already saved as command macros are not suggested again.
+    """
+    existing = command_macros._load().values()
+    routines = sequence_miner.suggest(threshold, limit, exclude=existing)
+    _last_routines[:] = [r.commands for r in routines]
+    return list(_last_routines)
+
+
+def save_routine(index: int, name: str) -> str:
+    """Save suggestion number ``index`` (1-based) as command macro ``name``."""
+    if not 1 <= index <= len(_last_routines):
+        return f"No suggestion {index}"
+    return command_macros.add_macro(name, _last_routines[index - 1])
+
+
 def get_description() -> str:
-    return "Detects repeated actions to recommend new macros."
+    return "Detects repeated actions and command routines to recommend new macros."
@@ -0,0 +1,385 @@
+"""mic_capture.py
+One shared microphone stream with fan-out to every audio consumer.
+
+The capture callback appends 16 kHz mono int16 PCM to a fixed-size ring
+buffer.  Consumers (hotword detection, speech recognition, sound detection)
+hold a :class:`Subscription`, which is just a read cursor into that ring.
+The callback therefore never blocks on slow consumers, and a consumer that
+starts late can rewind to audio captured before it subscribed.  This lets
+speech recognition include the words spoken while the wake word was being
+handled.
+
+``sounddevice`` is used when installed, otherwise ``pyaudio``.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+import time
+from array import array
+from collections import deque
+
+from config_service import get_config_service
+from error_logger import log_error, log_info
+
+MODULE_NAME = "mic_capture"
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2  # int16
+BLOCK_FRAMES = 1600  # 100 ms per callback
+BUFFER_SECONDS = 10.0
+# Minimum RMS treated as speech by :func:`record_phrase`
+ENERGY_FLOOR = 300.0
+
+__all__ = [
+    "RingBuffer",
+    "MicCapture",
+    "Subscription",
+    "get_capture",
+    "rms",
+    "record_phrase",
+]
+
+
+def rms(data: bytes) -> float:
+    """Return the root-mean-square level of int16 ``data``."""
+    samples = array("h")
+    samples.frombytes(data[: len(data) - len(data) % SAMPLE_WIDTH])
+    if not samples:
+        return 0.0
+    return math.sqrt(sum(s * s for s in samples) / len(samples))
+
+
+class RingBuffer:
+    """Single-writer byte ring addressed by absolute stream position.
+
+    ``total`` only ever grows and is published after the bytes are written,
+    so readers can copy without taking a lock.
+    """
+
+    def __init__(self, capacity: int):
+        capacity -= capacity % SAMPLE_WIDTH
+        self.capacity = capacity
+        self._buf = bytearray(capacity)
+        self.total = 0
+
+    def write(self, data: bytes) -> None:
+        n = len(data)
+        skip = max(0, n - self.capacity)  # only the newest bytes fit
+        data = data[skip:]
+        start = (self.total + skip) % self.capacity
+        first = min(len(data), self.capacity - start)
+        self._buf[start : start + first] = data[:first]
+        if first < len(data):
+            self._buf[: len(data) - first] = data[first:]
+        self.total += n
+
+    def oldest(self) -> int:
+        """Return the oldest position still held in the buffer."""
+        return max(0, self.total - self.capacity)
+
+    def read(self, pos: int, end: int | None = None) -> tuple[bytes, int]:
+        """Return ``(bytes, new_pos)`` for ``[pos, end)`` clamped to the buffer."""
+        end = self.total if end is None else min(end, self.total)
+        pos = min(max(pos, self.oldest()), end)
+        if pos == end:
+            return b"", pos
+        start = pos % self.capacity
+        stop = start + (end - pos)
+        if stop <= self.capacity:
+            return bytes(self._buf[start:stop]), end
+        return bytes(self._buf[start:]) + bytes(self._buf[: stop - self.capacity]), end
+
+
+class Subscription:
+    """Read cursor into a :class:`MicCapture` ring buffer."""
+
+    def __init__(self, capture: "MicCapture", name: str = ""):
+        self._capture = capture
+        self.name = name
+        self.position = capture.ring.total
+        self.closed = False
+
+    def read(self, timeout: float | None = None) -> bytes | None:
+        """Return every byte captured since the last read.
+
+        Blocks until new audio arrives; returns ``None`` on timeout or once
+        the subscription is closed.  A reader that falls more than the
+        buffer length behind skips ahead to the oldest retained audio.
+        """
+        if not self._capture.wait_for(self.position, timeout) or self.closed:
+            return None
+        data, self.position = self._capture.ring.read(self.position)
+        return data
+
+    def read_for(self, seconds: float) -> bytes:
+        """Return the audio captured over the next ``seconds``."""
+        end = time.monotonic() + seconds
+        chunks = []
+        while not self.closed:
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                break
+            data = self.read(timeout=remaining)
+            if data:
+                chunks.append(data)
+        return b"".join(chunks)
+
+    def rewind(self, seconds: float) -> None:
+        """Move the cursor back so the next read includes older audio."""
+        back = int(seconds * self._capture.samplerate) * SAMPLE_WIDTH
+        self.position = max(self._capture.ring.oldest(), self.position - back)
+
+    def skip(self) -> None:
+        """Discard anything not yet read."""
+        self.position = self._capture.ring.total
+
+    def close(self) -> None:
+        if not self.closed:
+            self.closed = True
+            self._capture._unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+class MicCapture:
+    """Owns the input stream and the ring buffer shared by subscribers."""
+
+    def __init__(
+        self,
+        samplerate: int = SAMPLE_RATE,
+        block_frames: int = BLOCK_FRAMES,
+        buffer_seconds: float = BUFFER_SECONDS,
+        device=None,
+    ):
+        self.samplerate = samplerate
+        self.block_frames = block_frames
+        self.device = device
+        self.ring = RingBuffer(int(samplerate * buffer_seconds) * SAMPLE_WIDTH)
+        self._cond = threading.Condition()
+        self._subscribers: list[Subscription] = []
+        self._stream = None
+        self._close = None
+
+    # ----- capture side -----
+    def feed(self, data: bytes) -> None:
+        """Append PCM to the ring and wake readers.
+
+        Called from the audio callback; other sources (tests, files) may
+        push audio the same way.
+        """
+        self.ring.write(data)
+        with self._cond:
+            self._cond.notify_all()
+
+    def start(self) -> bool:
+        """Open the input stream if it is not running yet."""
+        if self._stream is not None:
+            return True
+        try:
+            self._stream, self._close = self._open_sounddevice()
+        except Exception as sd_error:
+            try:
+                self._stream, self._close = self._open_pyaudio()
+            except Exception as pa_error:
+                log_error(
+                    f"[{MODULE_NAME}] Could not open microphone: {sd_error}; {pa_error}"
+                )
+                return False
+        log_info(f"[{MODULE_NAME}] Microphone open at {self.samplerate} Hz")
+        return True
+
+    def stop(self) -> None:
+        """Close the input stream and release blocked readers."""
+        close, self._close = self._close, None
+        self._stream = None
+        if close is not None:
+            try:
+                close()
+            except Exception as e:
+                log_error(f"[{MODULE_NAME}] Could not close microphone: {e}")
+        with self._cond:
+            self._cond.notify_all()
+
+    @property
+    def running(self) -> bool:
+        return self._stream is not None
+
+    def _open_sounddevice(self):
+        import sounddevice as sd
+
+        def callback(indata, frames, time_info, status):
+            self.feed(bytes(indata))
+
+        stream = sd.RawInputStream(
+            samplerate=self.samplerate,
+            blocksize=self.block_frames,
+            dtype="int16",
+            channels=1,
+            device=self.device,
+            callback=callback,
+        )
+        stream.start()
+
+        def close():
+            stream.stop()
+            stream.close()
+
+        return stream, close
+
+    def _open_pyaudio(self):
+        import pyaudio
+
+        pa = pyaudio.PyAudio()
+
+        def callback(in_data, frame_count, time_info, status):
+            self.feed(in_data)
+            return None, pyaudio.paContinue
+
+        stream = pa.open(
+            format=pyaudio.paInt16,
+            channels=1,
+            rate=self.samplerate,
+            input=True,
+            input_device_index=self.device,
+            frames_per_buffer=self.block_frames,
+            stream_callback=callback,
+        )
+        stream.start_stream()
+
+        def close():
+            stream.stop_stream()
+            stream.close()
+            pa.terminate()
+
+        return stream, close
+
+    # ----- consumer side -----
+    def subscribe(self, name: str = "", start: bool = True) -> Subscription:
+        """Return a new cursor positioned at the live edge of the stream."""
+        sub = Subscription(self, name)
+        with self._cond:
+            self._subscribers.append(sub)
+        if start:
+            self.start()
+        return sub
+
+    def _unsubscribe(self, sub: Subscription) -> None:
+        with self._cond:
+            if sub in self._subscribers:
+                self._subscribers.remove(sub)
+            last = not self._subscribers
+            self._cond.notify_all()
+        if last:
+            self.stop()
+
+    def wait_for(self, position: int, timeout: float | None = None) -> bool:
+        """Block until audio past ``position`` exists; ``False`` on timeout."""
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: self.ring.total > position, timeout=timeout
+            )
+
+    def recent(self, seconds: float) -> bytes:
+        """Return up to ``seconds`` of the most recent audio."""
+        back = int(seconds * self.samplerate) * SAMPLE_WIDTH
+        return self.ring.read(self.ring.total - back)[0]
+
+    @property
+    def subscribers(self) -> list[str]:
+        return [s.name for s in self._subscribers]
+
+
+_capture: MicCapture | None = None
+_capture_lock = threading.Lock()
+
+
+def get_capture() -> MicCapture:
+    """Return the process-wide microphone capture."""
+    global _capture
+    with _capture_lock:
+        if _capture is None:
+            cfg = get_config_service()
+            _capture = MicCapture(device=cfg.get("mic_device"))
+        return _capture
+
+
+def record_phrase(
+    sub: Subscription,
+    timeout: float = 1.0,
+    pause_threshold: float = 2.0,
+    phrase_time_limit: float = 30.0,
+    preroll: float = 0.5,
+    threshold: float | None = None,
+    stop_event: threading.Event | None = None,
+    vad=None,
+) -> bytes | None:
+    """Collect one utterance from ``sub``.
+
+    With a :class:`modules.vad.VAD` the utterance ends when its hangover
+    expires; otherwise a simple energy gate and ``pause_threshold`` are
+    used.  ``preroll`` seconds of audio captured before speech started are
+    kept so onsets are not clipped.  Returns ``None`` if nobody speaks
+    within ``timeout`` seconds.
+    """
+    if vad is not None:
+        vad.reset()
+    elif threshold is None:
+        ambient = rms(sub._capture.recent(1.0))
+        threshold = max(ENERGY_FLOOR, ambient * 1.5)
+    sub.rewind(preroll)
+    preroll_bytes = int(preroll * sub._capture.samplerate) * SAMPLE_WIDTH
+    before: deque[bytes] = deque()
+    before_len = 0
+    frames: list[bytes] = []
+    started = None
+    silent_since = None
+    deadline = time.monotonic() + timeout
+    while not (stop_event and stop_event.is_set()):
+        data = sub.read(timeout=0.5)
+        now = time.monotonic()
+        if data is None:
+            if sub.closed or (started is None and now > deadline):
+                return None
+            if started is not None and now - started >= phrase_time_limit:
+                break
+            continue
+        loud = vad.process(data) if vad is not None else rms(data) > threshold
+        if started is None:
+            if loud:
+                started = now
+                frames.extend(before)
+                frames.append(data)
+                if vad is not None and not vad.active:
+                    break
+                continue
+            if now > deadline:
+                return None
+            before.append(data)
+            before_len += len(data)
+            while before and before_len - len(before[0]) >= preroll_bytes:
+                before_len -= len(before.popleft())
+            continue
+        frames.append(data)
+        if vad is not None:
+            if not vad.active:
+                break
+        elif loud:
+            silent_since = None
+        elif silent_since is None:
+            silent_since = now
+        if silent_since is not None and now - silent_since >= pause_threshold:
+            break
+        if now - started >= phrase_time_limit:
+            break
+    return b"".join(frames) if frames else None
+
+
+def get_description() -> str:
+    """Return a short summary of this module."""
+    return "Shares one microphone stream between hotword, speech recognition and sound detection."
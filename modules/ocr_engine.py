@@ -0,0 +1,347 @@
+"""ocr_engine.py
+Incremental screen OCR with per-tile result caching.
+
+The frame is cut into ``ocr_tile_size`` tiles.  Each tile is OCRed together
+with an ``ocr_tile_margin`` border of context, and only words whose centre
+lies inside the tile itself are kept, so nothing is reported twice.  A word
+touching an inner edge of its padded crop was cut off there; it is dropped
+and the area around it is read again, widening the crop until the word no
+longer reaches its edge, so long words and URLs crossing a tile edge come
+back whole.  Results are cached by a hash of the padded tile pixels, so unchanged parts of the screen are never sent to
+Tesseract again and only dirty tiles are OCRed, in parallel on a thread
+pool.  ``pytesseract`` runs Tesseract as a subprocess, so threads overlap as
+well as processes would, without re-importing ``__main__`` (the GUI script)
+in every worker on Windows.
+
+Results carry word bounding boxes from ``pytesseract.image_to_data`` in
+absolute screen coordinates, so "click the word X" needs no second OCR
+pass.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, List, Tuple
+
+from config_service import get_config_service
+from error_logger import log_error
+from . import screen_capture
+
+MODULE_NAME = "ocr_engine"
+TILE_SIZE = 256
+TILE_MARGIN = 32
+CACHE_TILES = 2048
+# Tesseract confidence below this is treated as noise
+MIN_CONFIDENCE = 30.0
+
+__all__ = ["Word", "OCRResult", "IncrementalOCR", "get_engine", "ocr_frame"]
+
+
+@dataclass
+class Word:
+    """One recognized word in absolute screen coordinates."""
+
+    text: str
+    x: int
+    y: int
+    width: int
+    height: int
+    confidence: float = -1.0
+
+    @property
+    def center(self) -> Tuple[int, int]:
+        return (self.x + self.width // 2, self.y + self.height // 2)
+
+
+class OCRResult:
+    """Words found on one frame plus tile statistics."""
+
+    def __init__(self, region, words: List[Word], tiles: int = 0, ocred: int = 0):
+        self.region = region
+        self.words = words
+        self.tiles = tiles
+        self.ocred = ocred
+
+    @property
+    def text(self) -> str:
+        """Words joined into lines, top to bottom and left to right."""
+        lines: List[List[Word]] = []
+        for word in sorted(self.words, key=lambda w: (w.center[1], w.x)):
+            if lines:
+                last = lines[-1][0]
+                if abs(word.center[1] - last.center[1]) <= max(last.height, word.height) / 2:
+                    lines[-1].append(word)
+                    continue
+            lines.append([word])
+        return "\n".join(" ".join(w.text for w in sorted(line, key=lambda w: w.x)) for line in lines)
+
+    def find(self, phrase: str) -> List[Word]:
+        """Return words matching ``phrase`` (case-insensitive).
+
+        Multi-word phrases match consecutive words on one line and are
+        returned as a single merged box.
+        """
+        target = phrase.lower().split()
+        if not target:
+            return []
+        ordered = sorted(self.words, key=lambda w: (w.center[1], w.x))
+        found = []
+        for i in range(len(ordered) - len(target) + 1):
+            run = ordered[i : i + len(target)]
+            if [w.text.lower().strip(".,:;!?") for w in run] != target:
+                continue
+            x = min(w.x for w in run)
+            y = min(w.y for w in run)
+            right = max(w.x + w.width for w in run)
+            bottom = max(w.y + w.height for w in run)
+            found.append(
+                Word(phrase, x, y, right - x, bottom - y, min(w.confidence for w in run))
+            )
+        return found
+
+
+def tesseract_words(image) -> List[Tuple[str, int, int, int, int, float]]:
+    """Run ``image_to_data`` on ``image`` and return ``(text, x, y, w, h, conf)``."""
+    import pytesseract
+
+    data = pytesseract.image_to_data(image, output_type=pytesseract.Output.DICT)
+    words = []
+    for i, text in enumerate(data["text"]):
+        text = text.strip()
+        conf = float(data["conf"][i])
+        if text and conf >= MIN_CONFIDENCE:
+            words.append(
+                (text, data["left"][i], data["top"][i], data["width"][i], data["height"][i], conf)
+            )
+    return words
+
+
+def _box(word: Word) -> tuple:
+    return (word.x, word.y, word.width, word.height)
+
+
+def _overlaps(a: tuple, b: tuple) -> bool:
+    return a[0] < b[0] + b[2] and b[0] < a[0] + a[2] and a[1] < b[1] + b[3] and b[1] < a[1] + a[3]
+
+
+def _union(a: tuple, b: tuple) -> tuple:
+    left, top = min(a[0], b[0]), min(a[1], b[1])
+    right = max(a[0] + a[2], b[0] + b[2])
+    bottom = max(a[1] + a[3], b[1] + b[3])
+    return (left, top, right - left, bottom - top)
+
+
+def _grow(region: tuple, box: tuple, pad: int) -> tuple:
+    """Return ``box`` padded by ``pad`` on every side, clamped to ``region``."""
+    fx, fy, fw, fh = region
+    left, top = max(fx, box[0] - pad), max(fy, box[1] - pad)
+    right = min(fx + fw, box[0] + box[2] + pad)
+    bottom = min(fy + fh, box[1] + box[3] + pad)
+    return (left, top, right - left, bottom - top)
+
+
+class IncrementalOCR:
+    """Tiled OCR that only re-reads tiles whose pixels changed."""
+
+    def __init__(
+        self,
+        tile_size: int = TILE_SIZE,
+        margin: int = TILE_MARGIN,
+        workers: int = 0,
+        ocr_func: Callable = tesseract_words,
+        cache_tiles: int = CACHE_TILES,
+    ):
+        self.tile_size = tile_size
+        self.margin = margin
+        self.workers = workers
+        self.ocr_func = ocr_func
+        self.cache_tiles = cache_tiles
+        self._cache: "OrderedDict[bytes, list]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._pool: ThreadPoolExecutor | None = None
+        self.last_result: OCRResult | None = None
+
+    # ----- tiling -----
+    def _tiles(self, frame) -> List[Tuple[tuple, tuple]]:
+        """Return ``(core, padded)`` absolute boxes covering ``frame``."""
+        fx, fy, fw, fh = frame.region
+        t, m = self.tile_size, self.margin
+        boxes = []
+        for y in range(fy, fy + fh, t):
+            for x in range(fx, fx + fw, t):
+                core = (x, y, min(t, fx + fw - x), min(t, fy + fh - y))
+                boxes.append((core, _grow(frame.region, core, m)))
+        return boxes
+
+    def _digest(self, frame, padded) -> bytes:
+        x, y, w, h = padded
+        rel = (x - frame.region[0], y - frame.region[1], w, h)
+        return hashlib.blake2b(
+            frame.tile_bytes(rel) + repr((w, h)).encode(), digest_size=16
+        ).digest()
+
+    # ----- OCR -----
+    def _executor(self):
+        if self.workers <= 0:
+            return None
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=MODULE_NAME)
+        return self._pool
+
+    def _run(self, images: list) -> list:
+        pool = self._executor()
+        if pool is None or len(images) < 2:
+            return [self.ocr_func(img) for img in images]
+        try:
+            return list(pool.map(self.ocr_func, images))
+        except Exception as e:
+            log_error(f"[{MODULE_NAME}] OCR pool failed, OCR runs inline: {e}")
+            self.shutdown()
+            self.workers = 0
+            return [self.ocr_func(img) for img in images]
+
+    def _read(self, frame, boxes: list) -> Tuple[list, int]:
+        """OCR the absolute ``boxes`` of ``frame`` through the tile cache.
+
+        Returns the ``(text, x, y, w, h, conf)`` lists relative to each box
+        and how many boxes actually had to be OCRed.
+        """
+        digests = [self._digest(frame, box) for box in boxes]
+        with self._lock:
+            cached = {d: self._cache[d] for d in digests if d in self._cache}
+            for d in cached:
+                self._cache.move_to_end(d)
+        dirty = []
+        queued = set()
+        for box, digest in zip(boxes, digests):
+            # Identical tiles (e.g. blank areas) are OCRed once
+            if digest not in cached and digest not in queued:
+                queued.add(digest)
+                dirty.append((digest, box))
+        if dirty:
+            images = [frame.crop(box).to_pil() for _, box in dirty]
+            for (digest, _), words in zip(dirty, self._run(images)):
+                cached[digest] = words
+            with self._lock:
+                for digest, _ in dirty:
+                    self._cache[digest] = cached[digest]
+                while len(self._cache) > self.cache_tiles:
+                    self._cache.popitem(last=False)
+        return [cached[d] for d in digests], len(dirty)
+
+    @staticmethod
+    def _clipped(frame, box, word: Word) -> bool:
+        """Return True if ``word`` touches an edge of ``box`` inside the frame."""
+        fx, fy, fw, fh = frame.region
+        x, y, w, h = box
+        return (
+            (word.x <= x and x > fx)
+            or (word.y <= y and y > fy)
+            or (word.x + word.width >= x + w and x + w < fx + fw)
+            or (word.y + word.height >= y + h and y + h < fy + fh)
+        )
+
+    def _rejoin(self, frame, clipped: List[Word], kept: List[Word]) -> Tuple[List[Word], int]:
+        """Read words that were cut off by a tile edge again, whole."""
+        groups: List[tuple] = []
+        for word in clipped:
+            box = _box(word)
+            if any(_overlaps(box, _box(k)) for k in kept):
+                # The neighbouring tile already read it whole
+                continue
+            while True:
+                touching = [g for g in groups if _overlaps(g, box)]
+                if not touching:
+                    break
+                for other in touching:
+                    groups.remove(other)
+                    box = _union(box, other)
+            groups.append(box)
+
+        words: List[Word] = []
+        ocred = 0
+        for box in groups:
+            pad = max(1, self.margin)
+            while True:
+                crop = _grow(frame.region, box, pad)
+                (hits,), count = self._read(frame, [crop])
+                ocred += count
+                hits = [Word(t, crop[0] + x, crop[1] + y, w, h, c) for t, x, y, w, h, c in hits]
+                hits = [w for w in hits if _overlaps(_box(w), box)]
+                cut = [w for w in hits if self._clipped(frame, crop, w)]
+                if not cut:
+                    break
+                # Still cut off: widen the crop until the word ends inside it
+                for w in cut:
+                    box = _union(box, _box(w))
+                pad *= 2
+            for word in hits:
+                if not any(_overlaps(_box(word), _box(k)) for k in kept + words):
+                    words.append(word)
+        return words, ocred
+
+    def ocr(self, frame) -> OCRResult:
+        """OCR ``frame`` (a :class:`screen_capture.Frame`), reusing cached tiles."""
+        tiles = self._tiles(frame)
+        found, ocred = self._read(frame, [padded for _, padded in tiles])
+
+        words: List[Word] = []
+        clipped: List[Word] = []
+        for (core, padded), hits in zip(tiles, found):
+            cx, cy, cw, ch = core
+            for text, x, y, w, h, conf in hits:
+                word = Word(text, padded[0] + x, padded[1] + y, w, h, conf)
+                if self._clipped(frame, padded, word):
+                    clipped.append(word)
+                    continue
+                mx, my = word.center
+                if cx <= mx < cx + cw and cy <= my < cy + ch:
+                    words.append(word)
+        if clipped:
+            rejoined, extra = self._rejoin(frame, clipped, words)
+            words += rejoined
+            ocred += extra
+        result = OCRResult(frame.region, words, tiles=len(tiles), ocred=ocred)
+        self.last_result = result
+        return result
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def shutdown(self) -> None:
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+_engine: IncrementalOCR | None = None
+_engine_lock = threading.Lock()
+
+
+def get_engine() -> IncrementalOCR:
+    """Return the process-wide OCR engine."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            cfg = get_config_service()
+            _engine = IncrementalOCR(
+                tile_size=cfg.get_int("ocr_tile_size", TILE_SIZE),
+                margin=cfg.get_int("ocr_tile_margin", TILE_MARGIN),
+                workers=cfg.get_int("ocr_workers", 2),
+            )
+        return _engine
+
+
+def ocr_frame(region=None, max_age: float | None = None) -> OCRResult:
+    """Capture ``region`` through :mod:`screen_capture` and OCR it incrementally."""
+    return get_engine().ocr(screen_capture.grab(region, max_age))
+
+
+def get_description() -> str:
+    """Return a short summary of this module."""
+    return "Tiled, cached OCR that returns word boxes and skips unchanged screen areas."
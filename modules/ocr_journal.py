@@ -0,0 +1,321 @@
+"""ocr_journal.py
+Searchable history of OCR results kept in SQLite.
+
+Screen reads are queued by :meth:`OCRJournal.record` and written by one
+background thread in batched transactions, so OCR callers never wait on
+disk.  Text goes into an FTS5 index (a plain ``LIKE`` scan is used when the
+SQLite build lacks FTS5).  A capture identical to the previous one from the
+same source only extends that entry's ``last_seen`` time.  Entries older
+than ``ocr_journal_retention_days`` or beyond ``ocr_journal_max_entries``
+are pruned.
+
+:meth:`OCRJournal.last_seen` answers "when did X last appear on monitor 2"
+from the index without capturing the screen again.  Queries read what is
+already committed and never wait for the writer, so captures from the
+last ``FLUSH_INTERVAL`` seconds may not be found yet.
+"""
+
+from __future__ import annotations
+
+import atexit
+import hashlib
+import queue
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import List, Tuple
+
+from config_service import get_config_service
+from error_logger import log_error
+
+MODULE_NAME = "ocr_journal"
+DB_FILE = "ocr_journal.db"
+BATCH_SIZE = 64
+FLUSH_INTERVAL = 2.0
+RETENTION_DAYS = 30.0
+MAX_ENTRIES = 50000
+# Retention is enforced after this many written batches
+PRUNE_EVERY = 50
+
+__all__ = ["Entry", "OCRJournal", "get_journal", "record", "search", "last_seen"]
+
+
+@dataclass
+class Entry:
+    """One stored OCR capture."""
+
+    id: int
+    first_seen: float
+    last_seen: float
+    source: str
+    monitor: int | None
+    region: Tuple[int, int, int, int] | None
+    text: str
+
+
+def _parse_region(value: str | None):
+    if not value:
+        return None
+    return tuple(int(v) for v in value.split(","))
+
+
+def _fts_query(text: str) -> str:
+    """Quote each word so user text is never parsed as FTS syntax."""
+    return " ".join('"' + w.replace('"', '""') + '"' for w in text.split())
+
+
+class OCRJournal:
+    """Background SQLite writer plus a search API for past OCR text."""
+
+    def __init__(
+        self,
+        path: str = DB_FILE,
+        batch_size: int = BATCH_SIZE,
+        flush_interval: float = FLUSH_INTERVAL,
+        retention_days: float = RETENTION_DAYS,
+        max_entries: int = MAX_ENTRIES,
+    ):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retention_days = retention_days
+        self.max_entries = max_entries
+        self._queue: "queue.Queue" = queue.Queue()
+        self._last_digest: dict = {}
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._batches = 0
+        self.fts = True
+        self._init_db()
+
+    # ----- database -----
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _init_db(self) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS captures (id INTEGER PRIMARY KEY, "
+                "first_seen REAL, last_seen REAL, source TEXT, monitor INTEGER, "
+                "region TEXT, digest BLOB)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS captures_seen ON captures(last_seen)")
+            try:
+                conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS capture_text USING fts5(text)")
+            except sqlite3.OperationalError:
+                self.fts = False
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS capture_text (rowid INTEGER PRIMARY KEY, text TEXT)"
+                )
+
+    # ----- writing -----
+    def record(
+        self,
+        text: str,
+        source: str = "screen",
+        monitor: int | None = None,
+        region: Tuple[int, int, int, int] | None = None,
+        timestamp: float | None = None,
+    ) -> None:
+        """Queue an OCR result for writing; returns immediately."""
+        text = text.strip()
+        if not text:
+            return
+        ts = time.time() if timestamp is None else timestamp
+        digest = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+        key = (source, monitor, region)
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._writer, daemon=True)
+                self._thread.start()
+            if self._last_digest.get(key) == digest:
+                self._queue.put(("touch", key, ts))
+                return
+            self._last_digest[key] = digest
+        region_text = ",".join(str(v) for v in region) if region else None
+        self._queue.put(("insert", key, (ts, source, monitor, region_text, digest, text)))
+
+    def _writer(self) -> None:
+        conn = self._connect()
+        last_ids: dict = {}
+        try:
+            while True:
+                item = self._queue.get()
+                batch = [item]
+                deadline = time.monotonic() + self.flush_interval
+                while item is not None and len(batch) < self.batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(self._queue.get(timeout=remaining))
+                    except queue.Empty:
+                        break
+                    if batch[-1] is None:
+                        break
+                try:
+                    self._write(conn, batch, last_ids)
+                except Exception as e:
+                    log_error(f"[{MODULE_NAME}] write failed: {e}")
+                finally:
+                    for _ in batch:
+                        self._queue.task_done()
+                if batch[-1] is None:
+                    return
+        finally:
+            conn.close()
+
+    def _write(self, conn: sqlite3.Connection, batch: list, last_ids: dict) -> None:
+        with conn:
+            for item in batch:
+                if item is None:
+                    continue
+                kind, key, payload = item
+                if kind == "touch":
+                    if key in last_ids:
+                        conn.execute(
+                            "UPDATE captures SET last_seen = ? WHERE id = ?",
+                            (payload, last_ids[key]),
+                        )
+                    continue
+                ts, source, monitor, region, digest, text = payload
+                cur = conn.execute(
+                    "INSERT INTO captures (first_seen, last_seen, source, monitor, region, digest) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (ts, ts, source, monitor, region, digest),
+                )
+                last_ids[key] = cur.lastrowid
+                conn.execute(
+                    "INSERT INTO capture_text (rowid, text) VALUES (?, ?)", (cur.lastrowid, text)
+                )
+            self._batches += 1
+            if self._batches % PRUNE_EVERY == 0:
+                self._prune(conn)
+
+    def _prune(self, conn: sqlite3.Connection) -> int:
+        cutoff = time.time() - self.retention_days * 86400
+        ids = [
+            r[0]
+            for r in conn.execute(
+                "SELECT id FROM captures WHERE last_seen < ? OR id NOT IN "
+                "(SELECT id FROM captures ORDER BY id DESC LIMIT ?)",
+                (cutoff, self.max_entries),
+            )
+        ]
+        conn.executemany("DELETE FROM captures WHERE id = ?", [(i,) for i in ids])
+        conn.executemany("DELETE FROM capture_text WHERE rowid = ?", [(i,) for i in ids])
+        return len(ids)
+
+    def prune(self) -> int:
+        """Apply the retention limits now and return the number of entries removed."""
+        self.flush()
+        with self._connect() as conn:
+            return self._prune(conn)
+
+    def flush(self) -> None:
+        """Block until every queued capture has been written."""
+        self._queue.join()
+
+    def close(self) -> None:
+        """Write pending captures and stop the writer thread."""
+        thread = self._thread
+        if thread is not None and thread.is_alive():
+            self._queue.put(None)
+            thread.join()
+        self._thread = None
+
+    # ----- queries -----
+    def search(
+        self,
+        text: str,
+        monitor: int | None = None,
+        source: str | None = None,
+        since: float | None = None,
+        limit: int = 20,
+    ) -> List[Entry]:
+        """Return committed captures containing ``text``, newest first."""
+        if not text.strip():
+            return []
+        if self.fts:
+            where, params = ["capture_text MATCH ?"], [_fts_query(text)]
+        else:
+            where, params = ["capture_text.text LIKE ?"], [f"%{text}%"]
+        if monitor is not None:
+            where.append("captures.monitor = ?")
+            params.append(monitor)
+        if source is not None:
+            where.append("captures.source = ?")
+            params.append(source)
+        if since is not None:
+            where.append("captures.last_seen >= ?")
+            params.append(since)
+        params.append(limit)
+        sql = (
+            "SELECT captures.id, first_seen, last_seen, source, monitor, region, capture_text.text "
+            "FROM capture_text JOIN captures ON captures.id = capture_text.rowid "
+            f"WHERE {' AND '.join(where)} ORDER BY last_seen DESC LIMIT ?"
+        )
+        try:
+            with self._connect() as conn:
+                rows = conn.execute(sql, params).fetchall()
+        except sqlite3.Error as e:
+            log_error(f"[{MODULE_NAME}] search failed: {e}")
+            return []
+        return [
+            Entry(r[0], r[1], r[2], r[3], r[4], _parse_region(r[5]), r[6]) for r in rows
+        ]
+
+    def last_seen(self, text: str, monitor: int | None = None) -> Entry | None:
+        """Return the most recent capture containing ``text`` or ``None``."""
+        found = self.search(text, monitor=monitor, limit=1)
+        return found[0] if found else None
+
+    def count(self) -> int:
+        """Return the number of committed captures."""
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM captures").fetchone()[0]
+
+
+_journal: OCRJournal | None = None
+_journal_lock = threading.Lock()
+
+
+def get_journal() -> OCRJournal:
+    """Return the process-wide OCR journal."""
+    global _journal
+    with _journal_lock:
+        if _journal is None:
+            cfg = get_config_service()
+            _journal = OCRJournal(
+                path=cfg.get_str("ocr_journal_path", DB_FILE),
+                retention_days=cfg.get_float("ocr_journal_retention_days", RETENTION_DAYS),
+                max_entries=cfg.get_int("ocr_journal_max_entries", MAX_ENTRIES),
+            )
+            atexit.register(_journal.close)
+        return _journal
+
+
+def record(text: str, source: str = "screen", monitor: int | None = None, region=None) -> None:
+    """Shortcut for ``get_journal().record(...)``; never raises."""
+    try:
+        get_journal().record(text, source, monitor, region)
+    except Exception as e:
+        log_error(f"[{MODULE_NAME}] record failed: {e}")
+
+
+def search(text: str, monitor: int | None = None, limit: int = 20) -> List[Entry]:
+    """Shortcut for ``get_journal().search(...)``."""
+    return get_journal().search(text, monitor=monitor, limit=limit)
+
+
+def last_seen(text: str, monitor: int | None = None) -> Entry | None:
+    """Shortcut for ``get_journal().last_seen(...)``."""
+    return get_journal().last_seen(text, monitor)
+
+
+def get_description() -> str:
+    """Return a short summary of this module."""
+    return "Background SQLite journal of screen OCR text with full-text search."
@@ -1,7 +1,6 @@
 """Display a screenshot overlay for each step in a recorded macro."""
 
 import os
-import json
 
 try:
     import tkinter as tk
@@ -19,6 +18,8 @@ else:
 
 from error_logger import log_error
 
+from . import macro_format
+
 MACRO_DIR = "macros"
 MODULE_NAME = "overlay_preview"
 
@@ -29,12 +30,11 @@ def preview_macro(name: str) -> str:
     """Show an overlay preview of ``name`` macro steps."""
     if _IMPORT_ERROR:
         return f"Missing dependency: {_IMPORT_ERROR}"
-    path = os.path.join(MACRO_DIR, f"{name}.json")
+    path = macro_format.macro_path(name, MACRO_DIR)
     if not os.path.isfile(path):
         return f"Macro '{name}' not found"
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            events = json.load(f)
+        events = macro_format.load(path)
     except Exception as e:
         log_error(f"[{MODULE_NAME}] load error: {e}")
         return f"Error loading macro: {e}"
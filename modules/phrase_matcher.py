@@ -0,0 +1,277 @@
+"""phrase_matcher.py
+One-pass detection of wake, sleep, cancel, resume and chit-chat phrases.
+
+Every configured phrase set is compiled into a single Aho-Corasick
+automaton, so a transcript is scanned once no matter how many phrases or
+categories exist.  :meth:`PhraseMatcher.match` returns every category that
+matched together with the phrases found.
+
+Categories can require whole-word matches (``"hi"`` should not fire on
+``"this"``) and can opt into fuzzy matching: when no exact hit is found,
+word windows of the transcript within ``max_distance`` edits of a phrase
+also count, which catches ASR slips such as "hey assistance".
+
+The shared matcher from :func:`get_matcher` is built from ``config.json``,
+learned resume phrases and chit-chat phrases, and is rebuilt
+lazily after :func:`invalidate` or when a phrase list in the config changes.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+from collections import deque
+from typing import Dict, Iterable, List, Tuple
+
+from config_service import get_config_service
+from error_logger import log_error
+
+MODULE_NAME = "phrase_matcher"
+CONFIG_PATH = "config.json"
+
+DEFAULT_PHRASES = {
+    "wake": ["hey assistant"],
+    "sleep": ["ok that's all"],
+    "resume": ["next question", "next answer"],
+    "cancel": ["stop assistant"],
+    "exit": ["exit environment"],
+}
+# Config key for each category built from config.json
+CONFIG_KEYS = {
+    "wake": "wake_phrases",
+    "sleep": "sleep_phrases",
+    "resume": "resume_phrases",
+    "cancel": "cancel_phrases",
+    "exit": "exit_phrases",
+}
+# Categories where noisy ASR output is worth a fuzzy second look
+FUZZY_CATEGORIES = ("wake", "sleep", "resume", "cancel")
+
+__all__ = [
+    "PhraseMatcher",
+    "get_matcher",
+    "invalidate",
+    "match",
+    "levenshtein",
+]
+
+_WORD_RE = re.compile(r"[\w']+")
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+def levenshtein(a: str, b: str, limit: int | None = None) -> int:
+    """Return the edit distance between ``a`` and ``b``.
+
+    With ``limit`` the computation stops early and returns ``limit + 1`` once
+    the distance is known to exceed it.
+    """
+    if len(a) < len(b):
+        a, b = b, a
+    if limit is not None and len(a) - len(b) > limit:
+        return limit + 1
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i]
+        for j, cb in enumerate(b, 1):
+            cur.append(min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb)))
+        if limit is not None and min(cur) > limit:
+            return limit + 1
+        prev = cur
+    return prev[-1]
+
+
+class PhraseMatcher:
+    """Aho-Corasick automaton over named phrase sets."""
+
+    def __init__(self, max_distance: int = 0):
+        self.max_distance = max_distance
+        self._sets: Dict[str, List[str]] = {}
+        self._whole_words: Dict[str, bool] = {}
+        self._fuzzy: Dict[str, bool] = {}
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[str, str]]] = [[]]
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._last: Tuple[str, Dict[str, List[str]]] | None = None
+
+    # ----- building -----
+    def add_category(
+        self,
+        name: str,
+        phrases: Iterable[str],
+        whole_words: bool = False,
+        fuzzy: bool = False,
+    ) -> None:
+        """Replace the phrases of category ``name``."""
+        self._sets[name] = [p.lower().strip() for p in phrases if p and p.strip()]
+        self._whole_words[name] = whole_words
+        self._fuzzy[name] = fuzzy
+        self._dirty = True
+
+    def add_phrase(self, name: str, phrase: str) -> None:
+        """Add one ``phrase`` to category ``name``."""
+        phrase = phrase.lower().strip()
+        phrases = self._sets.setdefault(name, [])
+        self._whole_words.setdefault(name, False)
+        self._fuzzy.setdefault(name, False)
+        if phrase and phrase not in phrases:
+            phrases.append(phrase)
+            self._dirty = True
+
+    @property
+    def categories(self) -> List[str]:
+        return list(self._sets)
+
+    def phrases(self, name: str) -> List[str]:
+        return list(self._sets.get(name, []))
+
+    def _build(self) -> None:
+        goto: List[Dict[str, int]] = [{}]
+        out: List[List[Tuple[str, str]]] = [[]]
+        for name, phrases in self._sets.items():
+            for phrase in phrases:
+                state = 0
+                for ch in phrase:
+                    nxt = goto[state].get(ch)
+                    if nxt is None:
+                        nxt = len(goto)
+                        goto[state][ch] = nxt
+                        goto.append({})
+                        out.append([])
+                    state = nxt
+                out[state].append((name, phrase))
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                if state:
+                    f = fail[state]
+                    while f and ch not in goto[f]:
+                        f = fail[f]
+                    fail[nxt] = goto[f].get(ch, 0)
+                out[nxt] = out[nxt] + out[fail[nxt]]
+        self._goto, self._fail, self._out = goto, fail, out
+        self._dirty = False
+        self._last = None
+
+    # ----- matching -----
+    def _exact(self, text: str) -> Dict[str, List[str]]:
+        hits: Dict[str, List[str]] = {}
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for end, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for name, phrase in out[state]:
+                if self._whole_words[name]:
+                    start = end - len(phrase) + 1
+                    if start > 0 and _is_word_char(text[start - 1]):
+                        continue
+                    if end + 1 < len(text) and _is_word_char(text[end + 1]):
+                        continue
+                found = hits.setdefault(name, [])
+                if phrase not in found:
+                    found.append(phrase)
+        return hits
+
+    def _fuzzy_hits(self, text: str, hits: Dict[str, List[str]]) -> None:
+        words = _WORD_RE.findall(text)
+        for name, phrases in self._sets.items():
+            if not self._fuzzy[name] or name in hits:
+                continue
+            for phrase in phrases:
+                # Short phrases get fewer edits so "hi" does not match "a"
+                limit = min(self.max_distance, len(phrase) // 4)
+                if limit <= 0:
+                    continue
+                n = len(phrase.split())
+                for i in range(max(1, len(words) - n + 1)):
+                    window = " ".join(words[i : i + n])
+                    if levenshtein(window, phrase, limit) <= limit:
+                        hits.setdefault(name, []).append(phrase)
+                        break
+
+    def match(self, text: str) -> Dict[str, List[str]]:
+        """Return ``{category: [phrases]}`` for every category found in ``text``."""
+        text = text.lower()
+        with self._lock:
+            # The voice loop checks the same transcript for several categories
+            last = self._last
+            if last is None or last[0] != text or self._dirty:
+                if self._dirty:
+                    self._build()
+                hits = self._exact(text)
+                if self.max_distance > 0:
+                    self._fuzzy_hits(text, hits)
+                last = self._last = (text, hits)
+        return {k: list(v) for k, v in last[1].items()}
+
+    def matches(self, text: str, category: str) -> bool:
+        """Return ``True`` if ``category`` occurs in ``text``."""
+        return category in self.match(text)
+
+
+_matcher: PhraseMatcher | None = None
+_lock = threading.Lock()
+_subscribed = False
+
+
+def _build_default() -> PhraseMatcher:
+    service = get_config_service(CONFIG_PATH)
+    cfg = service.config
+    matcher = PhraseMatcher(max_distance=service.get_int("phrase_fuzzy_distance", 0))
+    for name, key in CONFIG_KEYS.items():
+        phrases = list(cfg.get(key, DEFAULT_PHRASES[name]))
+        if name == "resume":
+            try:
+                from state_manager import get_resume_phrases
+
+                phrases += get_resume_phrases()
+            except Exception as e:
+                log_error(f"[{MODULE_NAME}] Could not load learned phrases: {e}")
+        matcher.add_category(name, phrases, fuzzy=name in FUZZY_CATEGORIES)
+    try:
+        from modules.chitchat import CHITCHAT_PHRASES
+
+        matcher.add_category("chitchat", CHITCHAT_PHRASES, whole_words=True)
+    except Exception as e:
+        log_error(f"[{MODULE_NAME}] Could not load chit-chat phrases: {e}")
+    return matcher
+
+
+def invalidate(_value=None) -> None:
+    """Drop the shared matcher so the next :func:`match` rebuilds it."""
+    global _matcher
+    with _lock:
+        _matcher = None
+
+
+def get_matcher() -> PhraseMatcher:
+    """Return the shared matcher, building it on first use."""
+    global _matcher, _subscribed
+    with _lock:
+        if not _subscribed:
+            service = get_config_service(CONFIG_PATH)
+            for key in (*CONFIG_KEYS.values(), "phrase_fuzzy_distance"):
+                service.subscribe(key, invalidate)
+            _subscribed = True
+        if _matcher is None:
+            _matcher = _build_default()
+        return _matcher
+
+
+def match(text: str) -> Dict[str, List[str]]:
+    """Match ``text`` against every configured phrase set."""
+    return get_matcher().match(text)
+
+
+def get_description() -> str:
+    """Return a short summary of this module."""
+    return "Matches wake, sleep, cancel and chit-chat phrases in one pass."
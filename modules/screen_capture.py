@@ -0,0 +1,295 @@
+"""screen_capture.py
+Shared screen grabs with a short-lived frame cache and tile change detection.
+
+OCR, template matching and the live screen viewer all ask this service for
+pixels instead of calling ``pyautogui.screenshot`` themselves.  A frame
+younger than ``screen_cache_ttl`` seconds is reused, and a request for a
+region inside a cached full-screen frame is served by cropping it, so a
+burst of vision calls costs one capture.
+
+:meth:`ScreenCapture.changed_tiles` splits a frame into square tiles,
+hashes each one and reports only those that differ from what the named
+consumer saw last time, letting OCR and template matching skip unchanged
+parts of the screen.
+
+The ``"mss"`` backend returns NumPy arrays straight from the OS without a
+PIL round trip and is used automatically when installed; ``"pyautogui"``
+is the fallback.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from typing import Callable, Dict, List, Tuple
+
+from config_service import get_config_service
+from error_logger import log_error
+
+try:
+    import numpy as np
+except Exception:  # pragma: no cover - optional dependency
+    np = None
+
+MODULE_NAME = "screen_capture"
+CACHE_TTL = 0.25
+TILE_SIZE = 64
+# Frames kept in the cache at once (full screen plus a few regions)
+MAX_FRAMES = 8
+
+Region = Tuple[int, int, int, int]
+
+__all__ = ["Frame", "ScreenCapture", "get_capture", "grab", "changed_tiles"]
+
+
+class Frame:
+    """One captured image plus where and when it was taken.
+
+    Exactly one of ``array`` (RGB ``numpy`` array) or ``image`` (PIL image)
+    is set by the backend; the other form is produced on demand.
+    """
+
+    def __init__(self, region: Region, array=None, image=None, timestamp: float | None = None):
+        self.region = region
+        self.array = array
+        self.image = image
+        self.timestamp = time.monotonic() if timestamp is None else timestamp
+        self._gray = None
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.timestamp
+
+    def contains(self, region: Region) -> bool:
+        x, y, w, h = region
+        fx, fy, fw, fh = self.region
+        return fx <= x and fy <= y and x + w <= fx + fw and y + h <= fy + fh
+
+    def crop(self, region: Region) -> "Frame":
+        """Return the part of this frame covering absolute ``region``."""
+        x, y, w, h = region
+        left, top = x - self.region[0], y - self.region[1]
+        if self.array is not None:
+            array = self.array[top : top + h, left : left + w]
+            return Frame(region, array=array, timestamp=self.timestamp)
+        image = self.image.crop((left, top, left + w, top + h))
+        return Frame(region, image=image, timestamp=self.timestamp)
+
+    def to_numpy(self):
+        """Return the frame as an RGB ``numpy`` array."""
+        if self.array is None:
+            self.array = np.asarray(self.image.convert("RGB"))
+        return self.array
+
+    def to_pil(self):
+        """Return the frame as a PIL image."""
+        if self.image is None:
+            from PIL import Image
+
+            self.image = Image.fromarray(self.to_numpy())
+        return self.image
+
+    def gray(self):
+        """Return a cached single-channel ``numpy`` version for OpenCV."""
+        if self._gray is None:
+            import cv2
+
+            self._gray = cv2.cvtColor(self.to_numpy(), cv2.COLOR_RGB2GRAY)
+        return self._gray
+
+    def tile_bytes(self, box: Region) -> bytes:
+        """Return the raw pixels of ``box`` (frame-relative ``x, y, w, h``)."""
+        x, y, w, h = box
+        if self.array is not None:
+            return self.array[y : y + h, x : x + w].tobytes()
+        return self.image.crop((x, y, x + w, y + h)).tobytes()
+
+
+def _mss_backend() -> Callable[[Region | None], Frame]:
+    import mss
+
+    local = threading.local()
+
+    def grab_mss(region: Region | None) -> Frame:
+        sct = getattr(local, "sct", None)
+        if sct is None:
+            # mss handles are not shareable between threads
+            sct = local.sct = mss.mss()
+        if region is None:
+            mon = sct.monitors[0]
+            region = (mon["left"], mon["top"], mon["width"], mon["height"])
+        x, y, w, h = region
+        shot = sct.grab({"left": x, "top": y, "width": w, "height": h})
+        # BGRA -> RGB in one copy
+        array = np.ascontiguousarray(np.asarray(shot)[:, :, 2::-1])
+        return Frame(region, array=array)
+
+    return grab_mss
+
+
+def _pyautogui_backend() -> Callable[[Region | None], Frame]:
+    import pyautogui
+
+    def grab_pyautogui(region: Region | None) -> Frame:
+        image = pyautogui.screenshot(region=region)
+        if region is None:
+            region = (0, 0) + tuple(image.size)
+        return Frame(tuple(region), image=image)
+
+    return grab_pyautogui
+
+
+_BACKENDS = {"mss": _mss_backend, "pyautogui": _pyautogui_backend}
+
+
+class ScreenCapture:
+    """Screen grabber shared by every vision consumer."""
+
+    def __init__(
+        self,
+        backend: str | Callable[[Region | None], Frame] = "auto",
+        ttl: float = CACHE_TTL,
+        tile_size: int = TILE_SIZE,
+    ):
+        self.ttl = ttl
+        self.tile_size = tile_size
+        self.backend_name = backend if isinstance(backend, str) else "custom"
+        self._grab = backend if callable(backend) else None
+        self._lock = threading.Lock()
+        self._frames: Dict[Region | None, Frame] = {}
+        self._seen: Dict[str, Dict[Tuple[int, int], bytes]] = {}
+        self.captures = 0
+        self.hits = 0
+
+    def _backend(self) -> Callable[[Region | None], Frame]:
+        if self._grab is not None:
+            return self._grab
+        order = ["mss", "pyautogui"] if self.backend_name == "auto" else [self.backend_name]
+        errors = []
+        for name in order:
+            if name == "mss" and np is None:
+                errors.append("mss: numpy missing")
+                continue
+            try:
+                self._grab = _BACKENDS[name]()
+                self.backend_name = name
+                return self._grab
+            except Exception as e:
+                log_error(f"[{MODULE_NAME}] {name} backend unavailable: {e}")
+                errors.append(f"{name}: {e}")
+        raise RuntimeError(f"No screen capture backend available ({'; '.join(errors)})")
+
+    def _cached(self, region: Region | None, max_age: float) -> Frame | None:
+        frame = self._frames.get(region)
+        if frame is not None and frame.age <= max_age:
+            return frame
+        if region is None:
+            return None
+        for frame in self._frames.values():
+            if frame.age <= max_age and frame.contains(region):
+                return frame.crop(region)
+        return None
+
+    def grab(self, region: Region | None = None, max_age: float | None = None) -> Frame:
+        """Return a frame of ``region`` (whole virtual screen when ``None``).
+
+        A cached frame no older than ``max_age`` seconds (default ``ttl``) is
+        returned instead of capturing again.  Pass ``max_age=0`` to force a
+        fresh capture.
+        """
+        region = tuple(region) if region is not None else None
+        max_age = self.ttl if max_age is None else max_age
+        with self._lock:
+            frame = self._cached(region, max_age) if max_age > 0 else None
+            if frame is not None:
+                self.hits += 1
+                return frame
+            frame = self._backend()(region)
+            self.captures += 1
+            stale = [k for k, f in self._frames.items() if f.age > self.ttl]
+            for key in stale:
+                del self._frames[key]
+            if len(self._frames) >= MAX_FRAMES:
+                self._frames.pop(next(iter(self._frames)))
+            self._frames[region] = frame
+            return frame
+
+    def invalidate(self) -> None:
+        """Drop cached frames, e.g. right after clicking or typing."""
+        with self._lock:
+            self._frames.clear()
+
+    # ----- change detection -----
+    def tiles(self, frame: Frame) -> List[Region]:
+        """Return frame-relative tile boxes covering ``frame``."""
+        _, _, w, h = frame.region
+        t = self.tile_size
+        return [
+            (x, y, min(t, w - x), min(t, h - y))
+            for y in range(0, h, t)
+            for x in range(0, w, t)
+        ]
+
+    def tile_hashes(self, frame: Frame) -> Dict[Tuple[int, int], bytes]:
+        """Return ``{(x, y): digest}`` for every tile in ``frame``."""
+        return {
+            (x + frame.region[0], y + frame.region[1]): hashlib.blake2b(
+                frame.tile_bytes((x, y, w, h)), digest_size=8
+            ).digest()
+            for x, y, w, h in self.tiles(frame)
+        }
+
+    def changed_tiles(self, frame: Frame, consumer: str = "default") -> List[Region]:
+        """Return absolute tile rectangles that changed since ``consumer`` last looked.
+
+        The first call for a consumer reports every tile.
+        """
+        hashes = self.tile_hashes(frame)
+        with self._lock:
+            seen = self._seen.setdefault(consumer, {})
+            changed = [pos for pos, digest in hashes.items() if seen.get(pos) != digest]
+            seen.update(hashes)
+        t = self.tile_size
+        fx, fy, fw, fh = frame.region
+        return [
+            (x, y, min(t, fx + fw - x), min(t, fy + fh - y)) for x, y in changed
+        ]
+
+    def forget(self, consumer: str) -> None:
+        """Reset change tracking for ``consumer``."""
+        with self._lock:
+            self._seen.pop(consumer, None)
+
+
+_capture: ScreenCapture | None = None
+_capture_lock = threading.Lock()
+
+
+def get_capture() -> ScreenCapture:
+    """Return the process-wide screen capture service."""
+    global _capture
+    with _capture_lock:
+        if _capture is None:
+            cfg = get_config_service()
+            _capture = ScreenCapture(
+                backend=cfg.get_str("screen_capture_backend", "auto"),
+                ttl=cfg.get_float("screen_cache_ttl", CACHE_TTL),
+                tile_size=cfg.get_int("screen_tile_size", TILE_SIZE),
+            )
+        return _capture
+
+
+def grab(region: Region | None = None, max_age: float | None = None) -> Frame:
+    """Shortcut for ``get_capture().grab(region, max_age)``."""
+    return get_capture().grab(region, max_age)
+
+
+def changed_tiles(frame: Frame, consumer: str = "default") -> List[Region]:
+    """Shortcut for ``get_capture().changed_tiles(frame, consumer)``."""
+    return get_capture().changed_tiles(frame, consumer)
+
+
+def get_description() -> str:
+    """Return a short summary of this module."""
+    return "Shares cached screen captures and detects which screen tiles changed."
@@ -0,0 +1,264 @@
+"""sequence_miner.py
+Find multi-step command routines the user keeps repeating.
+
+Every command saved in the ``state_manager`` history is fed to
+:class:`SequenceMiner`.  The miner keeps a window of the last
+``max_len`` commands and counts each contiguous run of 2..``max_len``
+commands that ends with the new one.  A command therefore costs
+``max_len - 1`` counter updates, whatever the length of the history.
+
+Counters use lossy counting (Manku & Motwani).  Every ``bucket`` commands,
+runs seen less than about once per bucket since they were first counted
+are dropped.  Memory then stays bounded for histories of hundreds of
+thousands of commands, while routines the user actually repeats keep
+exact counts.  Commands more than ``session_gap`` seconds apart never
+form a run.  Commands that ask for or save these suggestions are not
+counted at all.  Commands that differ only in case or spacing count as
+one; suggestions use the text as the user first typed it.
+
+:meth:`SequenceMiner.suggest` returns the most frequent runs as candidate
+``command_macros``.  Shorter runs that are almost always part of a longer
+one are left out, and so are runs that repeat a command, which are usually
+one routine done twice in a row.
+
+Run ``python -m modules.sequence_miner [commands]`` to time the miner on
+a synthetic history.
+"""
+
+from __future__ import annotations
+
+import random
+import re
+import sys
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+MODULE_NAME = "sequence_miner"
+MAX_LEN = 5
+BUCKET = 2000
+SESSION_GAP = 15 * 60
+MIN_SUPPORT = 3
+# A shorter run is hidden when a longer run containing it has this share
+# of its occurrences
+CLOSED_RATIO = 0.8
+
+__all__ = ["Routine", "SequenceMiner", "get_miner", "suggest", "benchmark"]
+
+_SPACES = re.compile(r"\s+")
+# The commands that show and save suggestions, after ``normalize``
+_META = re.compile(r"(suggest macros|suggest a macro|save suggestion \d+ as \w+)$")
+
+
+@dataclass
+class Routine:
+    """A repeated run of commands."""
+
+    commands: List[str]
+    count: int
+
+
+def normalize(command: str) -> str:
+    """Return ``command`` lowercased with spacing and end punctuation removed."""
+    return _SPACES.sub(" ", command.strip().lower()).rstrip(".!?")
+
+
+class SequenceMiner:
+    """Incremental counter of contiguous command runs."""
+
+    def __init__(self, max_len: int = MAX_LEN, bucket: int = BUCKET, session_gap: float = SESSION_GAP):
+        self.max_len = max_len
+        self.bucket = bucket
+        self.session_gap = session_gap
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._ids: Dict[str, int] = {}
+        self._names: List[str] = []
+        self._window: deque = deque(maxlen=self.max_len)
+        # run of command ids -> [count, maximum undercount]
+        self._counts: Dict[Tuple[int, ...], List[int]] = {}
+        self._last_time: float | None = None
+        self.observed = 0
+        # Position in the state_manager history consumed by ``sync``
+        self._source: list | None = None
+        self._consumed = 0
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def add(self, command: str, timestamp: float | None = None) -> None:
+        """Count the runs ending with ``command``."""
+        text = normalize(command)
+        if not text or _META.match(text):
+            return
+        with self._lock:
+            if timestamp is not None:
+                if self._last_time is not None and timestamp - self._last_time > self.session_gap:
+                    self._window.clear()
+                self._last_time = timestamp
+            cid = self._ids.get(text)
+            if cid is None:
+                cid = self._ids[text] = len(self._names)
+                self._names.append(command.strip())
+            self._window.append(cid)
+            self.observed += 1
+            current = (self.observed - 1) // self.bucket + 1
+            window = tuple(self._window)
+            counts = self._counts
+            for start in range(len(window) - 1):
+                run = window[start:]
+                entry = counts.get(run)
+                if entry is None:
+                    counts[run] = [1, current - 1]
+                else:
+                    entry[0] += 1
+            if self.observed % self.bucket == 0:
+                self._counts = {r: e for r, e in counts.items() if e[0] + e[1] > current}
+
+    def extend(self, commands: Iterable) -> None:
+        """Add many commands, each a string or a ``(command, timestamp)`` pair."""
+        for item in commands:
+            if isinstance(item, str):
+                self.add(item)
+            else:
+                self.add(*item)
+
+    def sync(self, history: list | None = None) -> "SequenceMiner":
+        """Catch up with new ``last_command`` entries of the persisted history.
+
+        Only entries added since the previous call are read.  A replaced or
+        shortened history (after ``load_state``) is mined again from the
+        start.
+        """
+        if history is None:
+            import state_manager
+
+            history = state_manager.state.get("history", [])
+        if history is not self._source or len(history) < self._consumed:
+            self._reset()
+            self._source = history
+        for entry in history[self._consumed :]:
+            if isinstance(entry, dict) and entry.get("last_command"):
+                self.add(entry["last_command"], entry.get("last_command_time"))
+        self._consumed = len(history)
+        return self
+
+    def suggest(
+        self,
+        min_support: int = MIN_SUPPORT,
+        limit: int = 5,
+        exclude: Iterable[Sequence[str]] = (),
+    ) -> List[Routine]:
+        """Return up to ``limit`` frequent routines, most valuable first.
+
+        Routines are ranked by occurrences times the steps they save.  Runs
+        listed in ``exclude`` (existing macros) are skipped.
+        """
+        skip = {tuple(normalize(c) for c in seq) for seq in exclude}
+        with self._lock:
+            names = list(self._names)
+            found = [
+                (run, entry[0])
+                for run, entry in self._counts.items()
+                if entry[0] >= min_support and len(set(run)) == len(run)
+            ]
+        # Longest first, so each run is checked against the longer ones kept
+        found.sort(key=lambda item: (-len(item[0]), -item[1]))
+        kept: List[Tuple[Tuple[int, ...], int]] = []
+        for run, count in found:
+            if any(
+                longer_count >= CLOSED_RATIO * count and _contains(longer, run)
+                for longer, longer_count in kept
+            ):
+                continue
+            kept.append((run, count))
+        kept.sort(key=lambda item: (-item[1] * (len(item[0]) - 1), -len(item[0])))
+        routines = []
+        for run, count in kept:
+            commands = [names[i] for i in run]
+            if tuple(normalize(c) for c in commands) in skip:
+                continue
+            routines.append(Routine(commands, count))
+            if len(routines) >= limit:
+                break
+        return routines
+
+
+def _contains(longer: Tuple[int, ...], run: Tuple[int, ...]) -> bool:
+    size = len(run)
+    return any(longer[i : i + size] == run for i in range(len(longer) - size + 1))
+
+
+_miner: SequenceMiner | None = None
+_miner_lock = threading.Lock()
+
+
+def get_miner() -> SequenceMiner:
+    """Return the shared miner, caught up with the saved command history."""
+    global _miner
+    with _miner_lock:
+        if _miner is None:
+            _miner = SequenceMiner()
+        return _miner.sync()
+
+
+def suggest(min_support: int = MIN_SUPPORT, limit: int = 5, exclude=()) -> List[Routine]:
+    """Shortcut for ``get_miner().suggest(...)``."""
+    return get_miner().suggest(min_support, limit, exclude)
+
+
+# ----- benchmark -----
+def _synthetic_history(count: int, seed: int = 11) -> Tuple[List[str], List[List[str]]]:
+    rng = random.Random(seed)
+    apps = [f"app{i}" for i in range(300)]
+    noise = [f"{verb} {rng.choice(apps)}" for verb in ("open", "close", "focus", "search") for _ in range(2000)]
+    routines = [
+        ["open outlook", "maximize outlook", "search unread"],
+        ["open spotify", "play focus playlist"],
+        ["open terminal", "type git pull", "type make test", "minimize terminal"],
+    ]
+    history: List[str] = []
+    while len(history) < count:
+        if rng.random() < 0.02:
+            history.extend(rng.choice(routines))
+        else:
+            history.append(rng.choice(noise))
+    return history[:count], routines
+
+
+def benchmark(commands: int = 300000) -> Dict[str, float]:
+    """Mine a synthetic history of ``commands`` commands and time it."""
+    history, routines = _synthetic_history(commands)
+    miner = SequenceMiner()
+    peak = 0
+    start = time.perf_counter()
+    for i, command in enumerate(history, 1):
+        miner.add(command)
+        if i % miner.bucket == miner.bucket - 1:
+            peak = max(peak, len(miner))
+    build = time.perf_counter() - start
+    start = time.perf_counter()
+    found = miner.suggest(limit=len(routines))
+    query = time.perf_counter() - start
+    return {
+        "commands": float(commands),
+        "per_command_us": build / commands * 1e6,
+        "peak_tracked_runs": float(peak),
+        "suggest_ms": query * 1000,
+        "routines_found": float(sum(r.commands in routines for r in found)),
+    }
+
+
+def get_description() -> str:
+    """Return a short summary of this module."""
+    return "Mines the command history for repeated multi-step routines to suggest as macros."
+
+
+if __name__ == "__main__":
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 300000
+    for name, value in benchmark(size).items():
+        print(f"[{MODULE_NAME}] {name}: {value:,.3f}")
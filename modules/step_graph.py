@@ -0,0 +1,305 @@
+"""step_graph.py
+Run macro and plan steps concurrently when they cannot interfere.
+
+Command macros, learned macros, plans and app workflows used to run their
+steps strictly one after another.  Many of those steps are slow I/O that
+does not depend on the previous step, such as a download or resizing
+another window.
+
+Each :class:`Step` names the resources it uses: ``"focus"`` for keyboard
+and mouse input, ``"window:<name>"`` for one window, ``"network:<host>"``
+for one server, ``"files"`` for the download folder.  A step runs after
+every earlier step sharing one of its resources, so steps that conflict
+keep their order.  A resource written ``"shared:<name>"`` may be used by
+many steps at once, but still waits for, and blocks, steps using
+``<name>`` itself.  Window-only steps such as "minimize chrome" share
+``focus``, so they cannot race an earlier "open google chrome" whose
+window title is unknown.  Downloads share ``files``, so a later "open
+report.pdf" waits for them.  Steps with
+``resources=None`` are barriers: they wait for everything before them,
+and everything after waits for them.  :func:`infer_resources` derives the
+set from command text.  It only recognises window, input and download
+commands; any other command stays a barrier, because the LLM fallback
+may do anything.
+
+:func:`run` executes the graph on a thread pool of ``step_workers``
+threads.  It reports progress through a callback and stops starting new
+steps once ``cancel`` is set.  A failed step skips the steps that depend
+on it; independent steps still run.
+
+Run ``python -m modules.step_graph`` for the benchmark.
+"""
+
+from __future__ import annotations
+
+import re
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Sequence
+from urllib.parse import urlparse
+
+from config_service import get_config_service
+from error_logger import log_error
+
+MODULE_NAME = "step_graph"
+WORKERS = 4
+
+__all__ = [
+    "Step",
+    "GraphResult",
+    "infer_resources",
+    "command_steps",
+    "build_graph",
+    "run",
+    "run_commands",
+    "benchmark",
+]
+
+# Final step states, as reported to progress callbacks
+DONE, FAILED, SKIPPED = "done", "failed", "skipped"
+SHARED = "shared:"
+
+_WINDOW_INPUT = re.compile(
+    r"^(open|launch|start|focus|switch to|activate|maximize|maximise|close|restore)\s+(?:the\s+)?(.+)$"
+)
+_LAUNCH = {"open", "launch", "start"}
+# Trailing numbers are sizes or positions, not part of the window name
+_WINDOW_ONLY = re.compile(
+    r"^(?:minimize|minimise|resize|move window|move|terminate|kill)\s+(?:the\s+)?(.+?)(?:\s+-?\d+)*$"
+)
+_INPUT = re.compile(r"^(?:type|press|click|double click|right click|scroll|hotkey|write|paste|copy)\b")
+_IN_WINDOW = re.compile(r"\b(?:in|into|on)\s+(?:the\s+)?(\S+)\s*$")
+_DOWNLOAD = re.compile(r"^(?:download|fetch|get)\s+(https?://\S+)")
+
+
+@dataclass
+class Step:
+    """One unit of work: ``action(*args, **kwargs)``."""
+
+    action: Callable[..., Any]
+    args: tuple = ()
+    kwargs: dict = field(default_factory=dict)
+    label: str = ""
+    # ``None`` makes the step a barrier
+    resources: FrozenSet[str] | None = None
+    after: tuple = ()
+
+
+@dataclass
+class GraphResult:
+    """Outcome of :func:`run`, with per-step values in step order."""
+
+    results: List[Any]
+    states: List[str]
+    errors: Dict[int, BaseException]
+    cancelled: bool = False
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return not self.cancelled and all(s == DONE for s in self.states)
+
+
+def default_workers() -> int:
+    """Return ``step_workers`` from the config."""
+    return max(1, get_config_service().get_int("step_workers", WORKERS))
+
+
+def infer_resources(command: str) -> FrozenSet[str] | None:
+    """Return the resources ``command`` uses, or ``None`` if unknown."""
+    text = " ".join(command.lower().split())
+    m = _DOWNLOAD.match(text)
+    if m:
+        return frozenset({f"network:{urlparse(m.group(1)).hostname}", SHARED + "files"})
+    m = _WINDOW_ONLY.match(text)
+    if m:
+        return frozenset({SHARED + "focus", f"window:{m.group(1)}"})
+    m = _WINDOW_INPUT.match(text)
+    if m:
+        # Launching or activating a window moves keyboard focus; opening
+        # may read a file an earlier step downloaded
+        launch = {"files"} if m.group(1) in _LAUNCH else set()
+        return frozenset({"focus", f"window:{m.group(2)}", *launch})
+    if _INPUT.match(text):
+        m = _IN_WINDOW.search(text)
+        return frozenset({"focus", f"window:{m.group(1)}"} if m else {"focus"})
+    return None
+
+
+def command_steps(commands: Iterable[str], executor: Callable[[str], Any]) -> List[Step]:
+    """Return one step per command, executed through ``executor``."""
+    return [Step(executor, (cmd,), label=cmd, resources=infer_resources(cmd)) for cmd in commands]
+
+
+def build_graph(steps: Sequence[Step]) -> List[List[int]]:
+    """Return, for each step, the indexes of the earlier steps it waits for."""
+    deps: List[List[int]] = []
+    last_user: Dict[str, int] = {}
+    # Steps sharing a resource since its last exclusive user
+    sharers: Dict[str, List[int]] = {}
+    since_barrier: List[int] = []
+    barrier: int | None = None
+    for i, step in enumerate(steps):
+        wanted = set(step.after)
+        if step.resources is None:
+            wanted.update(since_barrier)
+            if barrier is not None:
+                wanted.add(barrier)
+            barrier, since_barrier, last_user, sharers = i, [], {}, {}
+        else:
+            if barrier is not None:
+                wanted.add(barrier)
+            for res in step.resources:
+                shared = res.startswith(SHARED)
+                res = res[len(SHARED) :] if shared else res
+                if res in last_user:
+                    wanted.add(last_user[res])
+                if shared:
+                    sharers.setdefault(res, []).append(i)
+                else:
+                    wanted.update(sharers.pop(res, ()))
+                    last_user[res] = i
+            since_barrier.append(i)
+        deps.append(sorted(d for d in wanted if d < i))
+    return deps
+
+
+def run(
+    steps: Sequence[Step],
+    workers: int | None = None,
+    on_progress: Callable[[int, int, Step, str], None] | None = None,
+    cancel: threading.Event | None = None,
+) -> GraphResult:
+    """Execute ``steps`` as a dependency graph and return a :class:`GraphResult`.
+
+    ``on_progress(finished, total, step, state)`` is called from the
+    calling thread after each step finishes, fails or is skipped.
+    """
+    steps = list(steps)
+    workers = default_workers() if workers is None else max(1, workers)
+    deps = build_graph(steps)
+    waiting = [len(d) for d in deps]
+    dependents: List[List[int]] = [[] for _ in steps]
+    for i, d in enumerate(deps):
+        for j in d:
+            dependents[j].append(i)
+    result = GraphResult([None] * len(steps), [""] * len(steps), {})
+    finished = 0
+    start = time.monotonic()
+
+    def report(i: int, state: str) -> None:
+        nonlocal finished
+        result.states[i] = state
+        finished += 1
+        if on_progress is not None:
+            try:
+                on_progress(finished, len(steps), steps[i], state)
+            except Exception as e:
+                log_error(f"[{MODULE_NAME}] progress callback failed: {e}")
+
+    def skip_dependents(i: int) -> None:
+        stack = list(dependents[i])
+        while stack:
+            j = stack.pop()
+            if not result.states[j]:
+                report(j, SKIPPED)
+                stack.extend(dependents[j])
+
+    ready = [i for i, n in enumerate(waiting) if n == 0]
+    running: Dict[Any, int] = {}
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=MODULE_NAME) as pool:
+        while ready or running:
+            if cancel is not None and cancel.is_set():
+                result.cancelled = True
+                ready = []
+            for i in ready:
+                step = steps[i]
+                running[pool.submit(step.action, *step.args, **step.kwargs)] = i
+            ready = []
+            if not running:
+                break
+            done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for fut in done:
+                i = running.pop(fut)
+                try:
+                    result.results[i] = fut.result()
+                except Exception as e:
+                    log_error(f"[{MODULE_NAME}] step {steps[i].label or i} failed: {e}")
+                    result.errors[i] = e
+                    report(i, FAILED)
+                    skip_dependents(i)
+                    continue
+                report(i, DONE)
+                for j in dependents[i]:
+                    waiting[j] -= 1
+                    if waiting[j] == 0 and not result.states[j]:
+                        ready.append(j)
+    for i, state in enumerate(result.states):
+        if not state:
+            report(i, SKIPPED)
+    result.elapsed = time.monotonic() - start
+    return result
+
+
+def run_commands(
+    commands: Iterable[str],
+    executor: Callable[[str], Any],
+    workers: int | None = None,
+    on_progress=None,
+    cancel: threading.Event | None = None,
+) -> GraphResult:
+    """Shortcut for ``run(command_steps(commands, executor), ...)``."""
+    return run(command_steps(commands, executor), workers, on_progress, cancel)
+
+
+# ----- benchmark -----
+_BENCH_MACRO = [
+    ("download https://example.com/report.pdf", 0.30),
+    ("download https://files.example.org/data.csv", 0.30),
+    ("minimize slack", 0.05),
+    ("resize chrome 1280 720", 0.05),
+    ("open notepad", 0.20),
+    ("type meeting notes in notepad", 0.10),
+    ("download https://example.com/slides.pptx", 0.30),
+    ("minimize discord", 0.05),
+    ("focus chrome", 0.10),
+    ("press ctrl+t", 0.05),
+    ("download https://cdn.example.net/installer.exe", 0.40),
+    ("what is on my calendar today", 0.25),
+]
+
+
+def benchmark(workers: int = WORKERS) -> Dict[str, float]:
+    """Time the mixed sample macro sequentially and as a step graph."""
+    delays = dict(_BENCH_MACRO)
+    commands = [c for c, _ in _BENCH_MACRO]
+
+    def execute(cmd: str) -> str:
+        time.sleep(delays[cmd])
+        return cmd
+
+    start = time.perf_counter()
+    for cmd in commands:
+        execute(cmd)
+    sequential = time.perf_counter() - start
+    graph = run_commands(commands, execute, workers=workers)
+    return {
+        "steps": float(len(commands)),
+        "sequential_seconds": sequential,
+        "graph_seconds": graph.elapsed,
+        "speedup": sequential / graph.elapsed,
+    }
+
+
+def get_description() -> str:
+    """Return a short summary of this module."""
+    return "Runs macro and plan steps in parallel when their resources do not conflict."
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else WORKERS
+    for name, value in benchmark(count).items():
+        print(f"[{MODULE_NAME}] {name}: {value:.3f}")
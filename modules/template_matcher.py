@@ -0,0 +1,305 @@
+"""template_matcher.py
+Cached, multi-scale template matching on shared screen frames.
+
+Templates are decoded once and kept in memory keyed by path; a newer file
+modification time reloads them.  A search first looks around the place the
+template was last found (the ROI hint) at the scale that matched last
+time.  Otherwise it runs ``matchTemplate`` on a downsampled copy of the
+screen and only refines the best coarse candidates at full resolution.
+
+Each template is also tried at ``template_scales`` so buttons captured on a
+100% monitor are still found on a 150% one.  :meth:`TemplateMatcher.match_many`
+checks several templates against one captured frame and shares the
+frame's pyramid between them.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Tuple
+
+try:
+    import cv2
+    import numpy as np
+except Exception as e:  # pragma: no cover - optional dependencies
+    cv2 = None
+    np = None
+    _IMPORT_ERROR = e
+else:
+    _IMPORT_ERROR = None
+
+from config_service import get_config_service
+from error_logger import log_error
+from . import screen_capture
+
+MODULE_NAME = "template_matcher"
+CACHE_SIZE = 64
+DEFAULT_SCALES = (1.0, 1.25, 1.5, 2.0, 0.8, 0.75, 0.5)
+# Smallest template side still worth matching on a downsampled level
+MIN_TEMPLATE_SIDE = 16
+MAX_LEVELS = 3
+# Downsampling blurs detailed templates and lowers their scores, so the best
+# few coarse peaks are refined regardless of how they scored
+COARSE_CANDIDATES = 3
+# Extra pixels searched around the last known location
+HINT_MARGIN = 40
+
+__all__ = ["Match", "TemplateCache", "TemplateMatcher", "get_matcher", "match", "match_many"]
+
+
+@dataclass
+class Match:
+    """A template hit in absolute screen coordinates."""
+
+    path: str
+    x: int
+    y: int
+    width: int
+    height: int
+    score: float
+    scale: float = 1.0
+
+    @property
+    def center(self) -> Tuple[int, int]:
+        return (self.x + self.width // 2, self.y + self.height // 2)
+
+
+class _Template:
+    def __init__(self, path: str, mtime: float, gray):
+        self.path = path
+        self.mtime = mtime
+        self.gray = gray
+        self._scaled: Dict[float, object] = {1.0: gray}
+
+    def scaled(self, scale: float):
+        img = self._scaled.get(scale)
+        if img is None:
+            h, w = self.gray.shape[:2]
+            size = (max(1, round(w * scale)), max(1, round(h * scale)))
+            interp = cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR
+            img = self._scaled[scale] = cv2.resize(self.gray, size, interpolation=interp)
+        return img
+
+
+class TemplateCache:
+    """Decoded grayscale templates keyed by path, reloaded when the file changes."""
+
+    def __init__(self, size: int = CACHE_SIZE):
+        self.size = size
+        self._items: "OrderedDict[str, _Template]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.loads = 0
+
+    def get(self, path: str) -> _Template | None:
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            return None
+        key = os.path.abspath(path)
+        with self._lock:
+            item = self._items.get(key)
+            if item is not None and item.mtime == mtime:
+                self._items.move_to_end(key)
+                return item
+        gray = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+        if gray is None:
+            return None
+        item = _Template(path, mtime, gray)
+        with self._lock:
+            self.loads += 1
+            self._items[key] = item
+            while len(self._items) > self.size:
+                self._items.popitem(last=False)
+        return item
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+
+class _Screen:
+    """Grayscale frame plus its lazily built pyramid."""
+
+    def __init__(self, gray, origin: Tuple[int, int]):
+        self.origin = origin
+        self.levels = [gray]
+
+    def level(self, n: int):
+        while len(self.levels) <= n:
+            self.levels.append(cv2.pyrDown(self.levels[-1]))
+        return self.levels[n]
+
+
+def _best(result) -> Tuple[float, Tuple[int, int]]:
+    _, score, _, loc = cv2.minMaxLoc(result)
+    return float(score), loc
+
+
+def _peaks(result, count: int, spacing: int) -> List[Tuple[int, int]]:
+    """Return the ``count`` strongest local maxima of ``result``."""
+    result = result.copy()
+    peaks = []
+    for _ in range(count):
+        score, (x, y) = _best(result)
+        if score <= -1:
+            break
+        peaks.append((x, y))
+        result[max(0, y - spacing) : y + spacing + 1, max(0, x - spacing) : x + spacing + 1] = -1
+    return peaks
+
+
+class TemplateMatcher:
+    """Find cached templates on screen frames."""
+
+    def __init__(self, scales: Iterable[float] = DEFAULT_SCALES, cache: TemplateCache | None = None):
+        self.scales = tuple(scales) or (1.0,)
+        self.cache = cache or TemplateCache()
+        self._hints: Dict[str, Match] = {}
+        self._lock = threading.Lock()
+
+    # ----- search strategies -----
+    def _match_window(self, screen: _Screen, tmpl, box) -> Tuple[float, Tuple[int, int]]:
+        """Match ``tmpl`` inside full-resolution ``box`` (frame-relative)."""
+        gray = screen.levels[0]
+        x, y, w, h = box
+        x0, y0 = max(0, x), max(0, y)
+        x1 = min(gray.shape[1], x + w)
+        y1 = min(gray.shape[0], y + h)
+        th, tw = tmpl.shape[:2]
+        if x1 - x0 < tw or y1 - y0 < th:
+            return -1.0, (0, 0)
+        score, (mx, my) = _best(cv2.matchTemplate(gray[y0:y1, x0:x1], tmpl, cv2.TM_CCOEFF_NORMED))
+        return score, (x0 + mx, y0 + my)
+
+    def _coarse_to_fine(self, screen: _Screen, tmpl, confidence: float):
+        th, tw = tmpl.shape[:2]
+        levels = 0
+        while levels < MAX_LEVELS and min(th, tw) >> (levels + 1) >= MIN_TEMPLATE_SIDE:
+            levels += 1
+        gray = screen.levels[0]
+        if gray.shape[0] < th or gray.shape[1] < tw:
+            return -1.0, (0, 0)
+        if levels == 0:
+            return _best(cv2.matchTemplate(gray, tmpl, cv2.TM_CCOEFF_NORMED))
+        small = tmpl
+        for _ in range(levels):
+            small = cv2.pyrDown(small)
+        coarse = cv2.matchTemplate(screen.level(levels), small, cv2.TM_CCOEFF_NORMED)
+        factor = 1 << levels
+        best = (-1.0, (0, 0))
+        spacing = max(1, min(small.shape[:2]) // 2)
+        for cx, cy in _peaks(coarse, COARSE_CANDIDATES, spacing):
+            pad = factor * 2
+            box = (cx * factor - pad, cy * factor - pad, tw + 2 * pad, th + 2 * pad)
+            found = self._match_window(screen, tmpl, box)
+            if found[0] > best[0]:
+                best = found
+            if best[0] >= confidence:
+                break
+        return best
+
+    def _search(self, screen: _Screen, template: _Template, confidence: float) -> Match | None:
+        hint = self._hints.get(template.path)
+        scales = list(self.scales)
+        if hint is not None and hint.scale in scales:
+            scales.remove(hint.scale)
+            scales.insert(0, hint.scale)
+        if hint is not None:
+            tmpl = template.scaled(hint.scale)
+            box = (
+                hint.x - screen.origin[0] - HINT_MARGIN,
+                hint.y - screen.origin[1] - HINT_MARGIN,
+                tmpl.shape[1] + 2 * HINT_MARGIN,
+                tmpl.shape[0] + 2 * HINT_MARGIN,
+            )
+            score, loc = self._match_window(screen, tmpl, box)
+            if score >= confidence:
+                return self._hit(screen, template, tmpl, hint.scale, score, loc)
+        for scale in scales:
+            tmpl = template.scaled(scale)
+            score, loc = self._coarse_to_fine(screen, tmpl, confidence)
+            if score >= confidence:
+                return self._hit(screen, template, tmpl, scale, score, loc)
+        return None
+
+    def _hit(self, screen, template, tmpl, scale, score, loc) -> Match:
+        th, tw = tmpl.shape[:2]
+        found = Match(
+            template.path,
+            loc[0] + screen.origin[0],
+            loc[1] + screen.origin[1],
+            tw,
+            th,
+            score,
+            scale,
+        )
+        with self._lock:
+            self._hints[template.path] = found
+        return found
+
+    # ----- public API -----
+    def match_many(self, paths: Iterable[str], frame=None, confidence: float = 0.8, region=None) -> Dict[str, Match | None]:
+        """Return ``{path: Match or None}`` for every template on one frame."""
+        if _IMPORT_ERROR:
+            raise RuntimeError(f"Missing dependency: {_IMPORT_ERROR}")
+        frame = frame or screen_capture.grab(region)
+        screen = _Screen(frame.gray(), frame.region[:2])
+        results: Dict[str, Match | None] = {}
+        for path in paths:
+            template = self.cache.get(path)
+            if template is None:
+                log_error(f"[{MODULE_NAME}] Could not load template {path}")
+                results[path] = None
+                continue
+            results[path] = self._search(screen, template, confidence)
+        return results
+
+    def match(self, path: str, frame=None, confidence: float = 0.8, region=None) -> Match | None:
+        """Return the best match of ``path`` or ``None``."""
+        return self.match_many([path], frame, confidence, region)[path]
+
+    def best(self, paths: Iterable[str], frame=None, confidence: float = 0.8, region=None) -> Match | None:
+        """Return the highest-scoring match among ``paths``."""
+        hits = [m for m in self.match_many(paths, frame, confidence, region).values() if m]
+        return max(hits, key=lambda m: m.score, default=None)
+
+    def forget(self, path: str | None = None) -> None:
+        """Drop ROI hints for ``path`` (all templates when ``None``)."""
+        with self._lock:
+            if path is None:
+                self._hints.clear()
+            else:
+                self._hints.pop(path, None)
+
+
+_matcher: TemplateMatcher | None = None
+_matcher_lock = threading.Lock()
+
+
+def get_matcher() -> TemplateMatcher:
+    """Return the process-wide template matcher."""
+    global _matcher
+    with _matcher_lock:
+        if _matcher is None:
+            cfg = get_config_service()
+            scales = cfg.get_list("template_scales", list(DEFAULT_SCALES))
+            _matcher = TemplateMatcher(scales=[float(s) for s in scales])
+        return _matcher
+
+
+def match(path: str, frame=None, confidence: float = 0.8, region=None) -> Match | None:
+    """Shortcut for ``get_matcher().match(...)``."""
+    return get_matcher().match(path, frame, confidence, region)
+
+
+def match_many(paths: Iterable[str], frame=None, confidence: float = 0.8, region=None) -> Dict[str, Match | None]:
+    """Shortcut for ``get_matcher().match_many(...)``."""
+    return get_matcher().match_many(paths, frame, confidence, region)
+
+
+def get_description() -> str:
+    """Return a short summary of this module."""
+    return "Cached multi-scale template matching for clicking on-screen images."
@@ -24,6 +24,7 @@ import shutil
 from io import StringIO
 import contextlib
 from datetime import datetime
+from . import ocr_journal
 from .automation_actions import (
     drag_drop,
     resize_window,
@@ -74,10 +75,8 @@ if not _IMPORT_ERROR and sys.platform.startswith("win"):
         pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
 
 def save_ocr_log(name: str, text: str) -> None:
-    """Write OCR output ``text`` to a timestamped log file."""
-    filename = f"ocr_log_{name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
-    with open(filename, "w", encoding="utf-8") as f:
-        f.write(text)
+    """Queue OCR output ``text`` for the searchable OCR journal."""
+    ocr_journal.record(text, source=name)
 
 def see_screen():
     """Capture screen and extract text using OCR"""
@@ -0,0 +1,274 @@
+"""tts_cache.py
+In-memory and on-disk cache of synthesized speech for frequent phrases.
+
+Entries are keyed by ``(backend, model, voice, text)``.  PCM audio is stored
+as 16-bit mono WAV files, while backends that only produce encoded audio
+(gTTS returns MP3) store their original bytes.  Both the RAM and the disk
+tiers use least-recently-used eviction.
+
+Only the phrases listed in ``tts_cache_phrases`` or passed to
+:func:`prewarm` are cached.  Other replies are one-off text, and caching
+them would only churn the disk and evict the phrases that matter.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import os
+import threading
+import wave
+from array import array
+from collections import OrderedDict
+from typing import Callable, Iterable
+
+from config_service import get_config_service
+from error_logger import log_error
+
+MODULE_NAME = "tts_cache"
+CACHE_DIR = "tts_cache"
+MAX_MEMORY_ENTRIES = 64
+MAX_DISK_ENTRIES = 512
+# Longer texts are one-off answers that are not worth caching
+MAX_TEXT_CHARS = 160
+DEFAULT_PHRASES = [
+    "Give me a moment...",
+    "Yes?",
+    "I'm awake!",
+    "Going to sleep. Say 'Hey Assistant' to wake me up.",
+    "Going to sleep due to inactivity.",
+    "I'm still processing your previous request but will follow up as soon as it's complete.",
+    "Sorry, I encountered an error. Please try again.",
+]
+
+# Phrases registered through ``prewarm`` besides the configured ones
+_prewarmed: set[str] = set()
+
+__all__ = [
+    "TTSCache",
+    "get_cache",
+    "is_cacheable",
+    "float_to_pcm16",
+    "pcm16_to_float",
+    "prewarm",
+]
+
+
+def _short(text: str) -> bool:
+    return 0 < len(text) <= MAX_TEXT_CHARS
+
+
+def _configured_phrases() -> list[str]:
+    """Return ``tts_cache_phrases`` from the config."""
+    return get_config_service().get_list("tts_cache_phrases", DEFAULT_PHRASES)
+
+
+def is_cacheable(text: str) -> bool:
+    """Return ``True`` if ``text`` is a configured or prewarmed phrase."""
+    text = (text or "").strip()
+    if not _short(text):
+        return False
+    return text in _prewarmed or text in {p.strip() for p in _configured_phrases()}
+
+
+def float_to_pcm16(samples) -> bytes:
+    """Convert float samples in ``[-1, 1]`` to little-endian int16 bytes."""
+    try:
+        import numpy as np
+
+        arr = np.clip(np.asarray(samples, dtype=np.float32).reshape(-1), -1.0, 1.0)
+        return (arr * 32767.0).astype("<i2").tobytes()
+    except Exception:
+        return array(
+            "h", (int(max(-1.0, min(1.0, float(x))) * 32767) for x in samples)
+        ).tobytes()
+
+
+def pcm16_to_float(data: bytes, volume: float = 1.0):
+    """Return float32 samples for int16 ``data`` scaled by ``volume``."""
+    scale = float(volume) / 32768.0
+    try:
+        import numpy as np
+
+        out = np.frombuffer(data, dtype="<i2").astype(np.float32)
+        out *= scale
+        return out
+    except Exception:
+        pcm = array("h")
+        pcm.frombytes(data)
+        return [x * scale for x in pcm]
+
+
+class TTSCache:
+    """Two-tier LRU cache for synthesized speech."""
+
+    def __init__(
+        self,
+        directory: str = CACHE_DIR,
+        max_memory_entries: int = MAX_MEMORY_ENTRIES,
+        max_disk_entries: int = MAX_DISK_ENTRIES,
+    ):
+        self.directory = directory
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self._memory: OrderedDict[str, tuple[bytes, int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(backend: str, model: str | None, voice: str | None, text: str) -> str:
+        raw = "\x1f".join([backend, model or "", voice or "", text.strip()])
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str, ext: str) -> str:
+        return os.path.join(self.directory, f"{key}.{ext}")
+
+    def _remember(self, key: str, value: tuple[bytes, int]) -> None:
+        with self._lock:
+            self._memory[key] = value
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_memory_entries:
+                self._memory.popitem(last=False)
+
+    def _touch(self, path: str) -> None:
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _evict_disk(self) -> None:
+        try:
+            entries = [
+                os.path.join(self.directory, name)
+                for name in os.listdir(self.directory)
+                if name.endswith((".wav", ".mp3"))
+            ]
+        except OSError:
+            return
+        excess = len(entries) - self.max_disk_entries
+        if excess <= 0:
+            return
+        entries.sort(key=lambda p: os.path.getmtime(p))
+        for path in entries[:excess]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    # ----- PCM audio -----
+    def get_pcm(self, backend, model, voice, text) -> tuple[bytes, int] | None:
+        """Return ``(int16_bytes, sample_rate)`` or ``None`` on a miss."""
+        key = self.key(backend, model, voice, text)
+        with self._lock:
+            hit = self._memory.get(key)
+            if hit is not None:
+                self._memory.move_to_end(key)
+                return hit
+        path = self._path(key, "wav")
+        if not os.path.exists(path):
+            return None
+        try:
+            with wave.open(path, "rb") as wf:
+                value = (wf.readframes(wf.getnframes()), wf.getframerate())
+        except Exception as e:
+            log_error(f"[{MODULE_NAME}] Could not read {path}: {e}")
+            return None
+        self._touch(path)
+        self._remember(key, value)
+        return value
+
+    def put_pcm(self, backend, model, voice, text, samples, rate: int) -> None:
+        """Store float ``samples`` at ``rate`` as 16-bit PCM."""
+        key = self.key(backend, model, voice, text)
+        value = (float_to_pcm16(samples), int(rate))
+        self._remember(key, value)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            buf = io.BytesIO()
+            with wave.open(buf, "wb") as wf:
+                wf.setnchannels(1)
+                wf.setsampwidth(2)
+                wf.setframerate(value[1])
+                wf.writeframes(value[0])
+            tmp = self._path(key, "wav.tmp")
+            with open(tmp, "wb") as f:
+                f.write(buf.getvalue())
+            os.replace(tmp, self._path(key, "wav"))
+            self._evict_disk()
+        except Exception as e:
+            log_error(f"[{MODULE_NAME}] Could not store audio: {e}")
+
+    # ----- encoded audio files -----
+    def get_file(self, backend, model, voice, text, ext: str) -> str | None:
+        """Return the path of a cached encoded file or ``None``."""
+        path = self._path(self.key(backend, model, voice, text), ext)
+        if os.path.exists(path):
+            self._touch(path)
+            return path
+        return None
+
+    def put_file(self, backend, model, voice, text, data: bytes, ext: str) -> str | None:
+        """Store encoded ``data`` and return its path."""
+        path = self._path(self.key(backend, model, voice, text), ext)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(path + ".tmp", "wb") as f:
+                f.write(data)
+            os.replace(path + ".tmp", path)
+            self._evict_disk()
+            return path
+        except Exception as e:
+            log_error(f"[{MODULE_NAME}] Could not store audio file: {e}")
+            return None
+
+    def clear(self) -> None:
+        """Remove every cached entry from memory and disk."""
+        with self._lock:
+            self._memory.clear()
+        if not os.path.isdir(self.directory):
+            return
+        for name in os.listdir(self.directory):
+            if name.endswith((".wav", ".mp3")):
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+
+
+_cache: TTSCache | None = None
+
+
+def get_cache() -> TTSCache:
+    """Return the process-wide cache configured from ``config.json``."""
+    global _cache
+    if _cache is None:
+        cfg = get_config_service()
+        _cache = TTSCache(
+            directory=cfg.get_str("tts_cache_dir", CACHE_DIR),
+            max_memory_entries=cfg.get_int("tts_cache_size", MAX_MEMORY_ENTRIES),
+        )
+    return _cache
+
+
+def prewarm(precache: Callable[[str], bool], phrases: Iterable[str] | None = None) -> int:
+    """Call ``precache`` for each phrase and return how many succeeded.
+
+    The phrases become cacheable for the rest of the session.
+    """
+    if phrases is None:
+        phrases = _configured_phrases()
+    done = 0
+    for phrase in phrases:
+        if not _short(phrase.strip()):
+            continue
+        _prewarmed.add(phrase.strip())
+        try:
+            if precache(phrase):
+                done += 1
+        except Exception as e:
+            log_error(f"[{MODULE_NAME}] prewarm failed for '{phrase}': {e}")
+    return done
+
+
+def get_description() -> str:
+    """Return a short summary of this module."""
+    return "Caches synthesized speech for frequent phrases in RAM and on disk."
@@ -1,9 +1,12 @@
 # modules/tts_integration.py
 
+import queue
+import re
+import threading
+import time
+
 try:
     import json
-    import threading
-    import time
     import numpy as np
     import sounddevice as sd
     from TTS.api import TTS
@@ -13,7 +16,8 @@ else:
     _IMPORT_ERROR = None
 
 from error_logger import log_error, log_info
-from . import gpu
+from config_service import get_config_service, update_config
+from . import audio_output, gpu, tts_cache
 
 CONFIG_PATH = "config.json"
 DEFAULTS = {
@@ -21,7 +25,15 @@ DEFAULTS = {
     "tts_voice": None,
     "tts_volume": 0.8,
     "tts_speed": 1.0,
+    "tts_streaming": True,
+    "tts_cache": True,
 }
+# Sentences shorter than this are merged with the next one before synthesis
+MIN_SENTENCE_CHARS = 20
+# Short text synthesized at startup to warm the model
+WARMUP_TEXT = "Hello."
+# Number of synthesized sentences allowed to wait for playback
+PIPELINE_DEPTH = 2
 MODULE_NAME = "tts_integration"
 
 __all__ = [
@@ -32,37 +44,248 @@ __all__ = [
     "set_speed",
     "is_speaking",
     "stop_speech",
+    "precache",
+    "warm_up",
+    "is_ready",
 ]
 
 def load_config() -> dict:
     """Return configuration dictionary combining defaults and ``config.json``."""
-    try:
-        with open(CONFIG_PATH, "r") as f:
-            cfg = json.load(f)
-    except Exception as e:
-        log_error(f"[{MODULE_NAME}] Could not load config.json: {e}")
-        cfg = {}
-    return {**DEFAULTS, **cfg}
+    return {**DEFAULTS, **get_config_service(CONFIG_PATH).config}
 
 config = load_config()
 _model = None
-_speaking = False
+_model_lock = threading.RLock()
+_ready = False
+_SENTENCE_END = re.compile(r"(?<=[.!?;:])\s+|\n+")
+
+
+def _on_setting_changed(key: str):
+    """Return a subscriber that mirrors ``key`` into :data:`config`."""
+
+    def _apply(value):
+        global _model, _ready
+        config[key] = DEFAULTS[key] if value is None else value
+        if key == "tts_model":
+            _model = None  # load the new model on next speak
+            _ready = False
+
+    return _apply
+
+
+for _key in DEFAULTS:
+    get_config_service(CONFIG_PATH).subscribe(_key, _on_setting_changed(_key))
+
+
+def _save_setting(key: str, value) -> bool:
+    """Persist ``key`` and return ``True`` once it is on disk.
+
+    The setters confirm the change out loud, so the debounced write is
+    flushed right away and a failure is reported instead of spoken as done.
+    """
+    service = get_config_service(CONFIG_PATH)
+    try:
+        update_config({key: value}, path=CONFIG_PATH)
+    except Exception as e:
+        log_error(f"[{MODULE_NAME}] Could not update config.json: {e}")
+        return False
+    if not service.flush() or service.write_error() is not None:
+        log_error(f"[{MODULE_NAME}] Could not save {key}: {service.write_error()}")
+        return False
+    return True
+
 
 def get_tts_model():
-    """Lazy-load and return the configured TTS model."""
+    """Lazy-load and return the configured TTS model.
+
+    Safe to call from several threads; a load already in progress (for
+    example by :func:`warm_up`) is waited for instead of repeated.
+    """
     if _IMPORT_ERROR:
         raise ImportError(_IMPORT_ERROR)
     global _model
-    if _model is None:
-        log_info(f"[{MODULE_NAME}] Loading Coqui model: {config['tts_model']}")
-        _model = TTS(
-            model_name=config["tts_model"],
-            progress_bar=False,
-            gpu=gpu.is_available(),
-        )
-    return _model
-
-def speak(text, voice=None, volume=None, speed=None, async_play=True, on_complete=None):
+    with _model_lock:
+        if _model is None:
+            log_info(f"[{MODULE_NAME}] Loading Coqui model: {config['tts_model']}")
+            _model = TTS(
+                model_name=config["tts_model"],
+                progress_bar=False,
+                gpu=gpu.is_available(),
+            )
+        return _model
+
+
+def warm_up(text: str = WARMUP_TEXT) -> bool:
+    """Load the model and run one throwaway synthesis.
+
+    The first inference pays for kernel compilation and allocator growth;
+    doing it at startup keeps that cost away from the first real reply.
+    """
+    if _IMPORT_ERROR:
+        return False
+    start = time.perf_counter()
+    with _model_lock:
+        model = get_tts_model()
+        _synthesize(model, text, config.get("tts_voice"), 0.0)
+    log_info(f"[{MODULE_NAME}] warm-up finished in {time.perf_counter() - start:.2f}s")
+    return True
+
+
+def is_ready() -> bool:
+    """Return ``True`` once the model has completed a synthesis."""
+    return _ready
+
+
+def is_cached(text: str) -> bool:
+    """Return ``True`` if ``text`` can be played from the phrase cache."""
+    return _cached_audio(text, config.get("tts_voice")) is not None
+
+def split_sentences(text: str) -> list[str]:
+    """Split ``text`` into sentence-sized chunks for pipelined synthesis.
+
+    Fragments shorter than :data:`MIN_SENTENCE_CHARS` are merged with the
+    following sentence so the model is not invoked for a lone "Yes.".
+    """
+    chunks = []
+    pending = ""
+    for part in _SENTENCE_END.split(text.strip()):
+        part = part.strip()
+        if not part:
+            continue
+        pending = f"{pending} {part}" if pending else part
+        if len(pending) >= MIN_SENTENCE_CHARS:
+            chunks.append(pending)
+            pending = ""
+    if pending:
+        chunks.append(pending)
+    return chunks
+
+
+def _synthesize(model, text, voice, volume):
+    """Return ``text`` as a float32 buffer already scaled by ``volume``."""
+    global _ready
+    with _model_lock:  # Coqui models are not safe to run concurrently
+        wav = model.tts(text, speaker=voice) if voice else model.tts(text)
+    _ready = True
+    buf = np.asarray(wav, dtype=np.float32)
+    np.multiply(buf, float(volume), out=buf)
+    return buf
+
+
+def _log_timing(start, first_audio, synth_time, audio_duration):
+    ttfa = (first_audio - start) if first_audio else 0.0
+    rtf = synth_time / audio_duration if audio_duration else 0
+    log_info(
+        f"[{MODULE_NAME}] synth_time={synth_time:.2f}s ttfa={ttfa:.2f}s rtf={rtf:.2f}"
+    )
+
+
+def _cached_audio(text, voice):
+    """Return cached ``(pcm16, rate)`` for ``text`` or ``None``."""
+    if not config.get("tts_cache", True) or not tts_cache.is_cacheable(text):
+        return None
+    return tts_cache.get_cache().get_pcm("coqui", config["tts_model"], voice, text)
+
+
+def _cached_source(entry, volume):
+    """Yield a cached phrase without touching the model."""
+    data, sample_rate = entry
+    yield tts_cache.pcm16_to_float(data, volume)
+    log_info(f"[{MODULE_NAME}] cache hit ({len(data) // 2 / sample_rate:.2f}s audio)")
+
+
+class _Cancel(threading.Event):
+    """Cancel event that also wakes a playback thread waiting on ``ready``."""
+
+    def __init__(self, ready: queue.Queue):
+        super().__init__()
+        self._ready = ready
+
+    def set(self) -> None:
+        super().set()
+        try:
+            self._ready.put_nowait(None)
+        except queue.Full:
+            # A buffer is waiting, so the consumer checks the event next
+            pass
+
+
+def _pipelined_source(model, chunks, voice, volume, cache=False):
+    """Start synthesizing ``chunks`` and return ``(source, cancelled)``.
+
+    The worker starts right away, so the first sentence is synthesized
+    while earlier speech is still playing, and sentence N+1 while sentence
+    N plays.  The scheduler writes every buffer to one continuous output
+    stream, so there are no gaps or device re-opens between sentences.
+    Synthesis never runs on the playback thread, which blocks on the next
+    buffer and is woken as soon as ``cancelled`` is set.  Closing the
+    generator (barge-in) stops the worker after its current sentence.  With
+    ``cache`` the single chunk is also stored in the phrase cache.
+    """
+    start = time.perf_counter()
+    sample_rate = model.synthesizer.output_sample_rate
+    ready: queue.Queue = queue.Queue(maxsize=PIPELINE_DEPTH)
+    cancelled = _Cancel(ready)
+    halt = threading.Event()
+    stats = {"synth": 0.0, "audio": 0.0}
+
+    def put(item):
+        while not halt.is_set() and not cancelled.is_set():
+            try:
+                ready.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def produce():
+        try:
+            for part in chunks:
+                if halt.is_set() or cancelled.is_set():
+                    break
+                t0 = time.perf_counter()
+                buf = _synthesize(model, part, voice, 1.0 if cache else volume)
+                stats["synth"] += time.perf_counter() - t0
+                stats["audio"] += len(buf) / sample_rate
+                if cache:
+                    tts_cache.get_cache().put_pcm(
+                        "coqui", config["tts_model"], voice, part, buf, sample_rate
+                    )
+                    np.multiply(buf, float(volume), out=buf)
+                put(buf)
+        except Exception as e:
+            log_error(f"[{MODULE_NAME}] synthesis error: {e}")
+        finally:
+            put(None)
+
+    def play():
+        first_audio = None
+        try:
+            while not cancelled.is_set():
+                buf = ready.get()
+                if buf is None:
+                    break
+                if first_audio is None:
+                    first_audio = time.perf_counter()
+                yield buf
+        finally:
+            halt.set()
+        _log_timing(start, first_audio, stats["synth"], stats["audio"])
+
+    threading.Thread(target=produce, daemon=True).start()
+    return play(), cancelled
+
+
+def speak(
+    text,
+    voice=None,
+    volume=None,
+    speed=None,
+    async_play=True,
+    on_complete=None,
+    stream=None,
+    priority=audio_output.PRIORITY_NORMAL,
+    interrupt=False,
+):
     """Speak text using Coqui TTS.
 
     Parameters
@@ -76,7 +299,14 @@ def speak(text, voice=None, volume=None, speed=None, async_play=True, on_complet
     speed : float, optional
         Playback rate multiplier. Defaults to ``config['tts_speed']`` if ``None``.
     async_play : bool, optional
-        When ``True`` the audio is played in a background thread.
+        When ``True`` return as soon as the utterance is queued.
+    stream : bool, optional
+        Synthesize and play sentence by sentence so long answers start
+        speaking sooner. Defaults to ``config['tts_streaming']``.
+    priority : int, optional
+        Queue priority for :mod:`modules.audio_output`; lower plays first.
+    interrupt : bool, optional
+        Cut off current speech of equal or lower priority (barge-in).
     """
     if _IMPORT_ERROR:
         msg = f"[{MODULE_NAME}] Missing dependency: {_IMPORT_ERROR}"
@@ -86,70 +316,65 @@ def speak(text, voice=None, volume=None, speed=None, async_play=True, on_complet
     # Enforce a single unified voice profile from config
     voice = config.get("tts_voice") or voice
     volume = volume if volume is not None else config.get("tts_volume", 0.8)
-    try:
-        model = get_tts_model()
-    except Exception as e:
-        log_error(f"[{MODULE_NAME}] load error: {e}")
-        return f"[TTS] load error: {e}"
+    cached = _cached_audio(text, voice)
+    model = None
+    if cached is None:
+        try:
+            model = get_tts_model()
+        except Exception as e:
+            log_error(f"[{MODULE_NAME}] load error: {e}")
+            return f"[TTS] load error: {e}"
     if speed is None:
         speed = config.get("tts_speed", 1.0)
-    chunks = [text]
+    if stream is None:
+        stream = config.get("tts_streaming", True)
+    cacheable = config.get("tts_cache", True) and tts_cache.is_cacheable(text)
+    # Short phrases are synthesized whole so they can be cached
+    chunks = split_sentences(text) if stream and not cacheable else [text]
 
-    def run():
-        try:
-            start = time.time()
-            wav = []
-            sample_rate = None
-            total_duration = 0.0
-            for part in chunks:
-                part_wav = model.tts(part, speaker=voice) if voice else model.tts(part)
-                part_wav = np.array(part_wav) * float(volume)
-                if sample_rate is None:
-                    sample_rate = model.synthesizer.output_sample_rate
-                total_duration += len(part_wav) / sample_rate
-                wav.extend(part_wav)
-            wav = np.array(wav)
-            rate = float(speed)
-            global _speaking
-            _speaking = True
-            sd.play(wav, int(sample_rate * rate))
-            sd.wait()
-            proc_time = time.time() - start
-            rtf = proc_time / total_duration if total_duration else 0
-            log_info(
-                f"[{MODULE_NAME}] synth_time={proc_time:.2f}s rtf={rtf:.2f}"
-            )
-            if on_complete:
-                try:
-                    on_complete()
-                except Exception as e:
-                    log_error(f"[{MODULE_NAME}] on_complete error: {e}")
-            _speaking = False
-        except Exception as e:
-            log_error(f"[{MODULE_NAME}] TTS/playback error: {e}")
+    if cached is not None:
+        source, sample_rate = _cached_source(cached, volume), cached[1]
+        cancelled = threading.Event()
+    else:
+        sample_rate = model.synthesizer.output_sample_rate
+        source, cancelled = _pipelined_source(model, chunks, voice, volume, cache=cacheable)
 
+    utterance = audio_output.get_output().submit(
+        source,
+        int(sample_rate * float(speed)),
+        priority=priority,
+        interrupt=interrupt,
+        on_complete=on_complete,
+        cancelled=cancelled,
+    )
     if async_play:
-        threading.Thread(target=run, daemon=True).start()
         return "[TTS] Speaking asynchronously."
-    else:
-        run()
-        return "[TTS] Done speaking."
+    utterance.wait()
+    return "[TTS] Done speaking."
+
+def precache(text: str) -> bool:
+    """Synthesize ``text`` into the phrase cache without playing it."""
+    if _IMPORT_ERROR or not tts_cache.is_cacheable(text):
+        return False
+    voice = config.get("tts_voice")
+    cache = tts_cache.get_cache()
+    if cache.get_pcm("coqui", config["tts_model"], voice, text) is not None:
+        return True
+    model = get_tts_model()
+    wav = _synthesize(model, text, voice, 1.0)
+    cache.put_pcm(
+        "coqui", config["tts_model"], voice, text, wav, model.synthesizer.output_sample_rate
+    )
+    return True
+
 
 def is_speaking() -> bool:
     """Return True while audio is currently playing."""
-    return _speaking
+    return audio_output.is_speaking()
 
 def stop_speech():
-    """Immediately stop any ongoing playback."""
-    if _IMPORT_ERROR:
-        return
-    try:
-        sd.stop()
-    except Exception as e:  # pragma: no cover - stop may fail if not playing
-        log_error(f"[{MODULE_NAME}] stop error: {e}")
-    finally:
-        global _speaking
-        _speaking = False
+    """Immediately stop any ongoing playback and drop queued speech."""
+    audio_output.stop()
 
 def list_voices():
     """Return a list of available speakers for the current model."""
@@ -165,17 +390,10 @@ def list_voices():
 def set_voice(new_voice):
     """Set and save the preferred voice."""
     config["tts_voice"] = new_voice
-    try:
-        with open(CONFIG_PATH, "r") as f:
-            all_cfg = json.load(f)
-        all_cfg["tts_voice"] = new_voice
-        with open(CONFIG_PATH, "w") as f:
-            json.dump(all_cfg, f, indent=2)
-        log_info(f"[{MODULE_NAME}] Voice switched to: {new_voice}")
-        return True
-    except Exception as e:
-        log_error(f"[{MODULE_NAME}] Could not update config.json: {e}")
+    if not _save_setting("tts_voice", new_voice):
         return False
+    log_info(f"[{MODULE_NAME}] Voice switched to: {new_voice}")
+    return True
 
 def set_volume(new_volume):
     """Set and save the preferred volume (0.0 - 1.0)."""
@@ -187,17 +405,10 @@ def set_volume(new_volume):
         log_error(msg)
         return msg
     config["tts_volume"] = vol
-    try:
-        with open(CONFIG_PATH, "r") as f:
-            all_cfg = json.load(f)
-        all_cfg["tts_volume"] = vol
-        with open(CONFIG_PATH, "w") as f:
-            json.dump(all_cfg, f, indent=2)
-        log_info(f"[{MODULE_NAME}] Volume set to: {vol}")
-        return True
-    except Exception as e:
-        log_error(f"[{MODULE_NAME}] Could not update config.json: {e}")
+    if not _save_setting("tts_volume", vol):
         return False
+    log_info(f"[{MODULE_NAME}] Volume set to: {vol}")
+    return True
 
 def set_speed(new_speed):
     """Set and save the preferred speech speed (0.5 - 2.0)."""
@@ -209,17 +420,10 @@ def set_speed(new_speed):
         log_error(msg)
         return False
     config["tts_speed"] = val
-    try:
-        with open(CONFIG_PATH, "r") as f:
-            all_cfg = json.load(f)
-        all_cfg["tts_speed"] = val
-        with open(CONFIG_PATH, "w") as f:
-            json.dump(all_cfg, f, indent=2)
-        log_info(f"[{MODULE_NAME}] Speed set to: {val}")
-        return True
-    except Exception as e:
-        log_error(f"[{MODULE_NAME}] Could not update config.json: {e}")
+    if not _save_setting("tts_speed", val):
         return False
+    log_info(f"[{MODULE_NAME}] Speed set to: {val}")
+    return True
 
 def get_info():
     """Plugin info for registry."""
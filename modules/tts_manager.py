@@ -1,7 +1,12 @@
 """Switchable TTS backend helper."""
 
-import json
 import importlib
+import threading
+import time
+
+from config_service import get_config_service
+from error_logger import log_error, log_info
+from modules import audio_output
 
 def _coqui():
     return importlib.import_module('modules.tts_integration')
@@ -13,31 +18,157 @@ def _hf():
     return importlib.import_module('modules.hf_tts')
 
 CONFIG_PATH = "config.json"
-try:
-    with open(CONFIG_PATH, "r") as f:
-        _CFG = json.load(f)
-except Exception:
-    _CFG = {}
+_config = get_config_service(CONFIG_PATH)
 
-BACKEND = _CFG.get("tts_backend", "coqui")  # "coqui", "gtts" or "huggingface"
+BACKEND = _config.get_str("tts_backend", "coqui")  # "coqui", "gtts" or "huggingface"
 
-__all__ = ["speak", "is_speaking", "stop_speech"]
 
+def _set_backend(value) -> None:
+    global BACKEND
+    BACKEND = value or "coqui"
 
-def speak(text: str, **kwargs):
+
+_config.subscribe("tts_backend", _set_backend)
+
+__all__ = [
+    "speak",
+    "is_speaking",
+    "stop_speech",
+    "wait_until_idle",
+    "on_idle",
+    "prewarm_cache",
+    "start_preload",
+    "is_ready",
+]
+
+_preload_thread = None
+
+
+def _backend():
     if BACKEND == "gtts":
-        return _gtts().speak(text, **kwargs)
+        return _gtts()
     if BACKEND == "huggingface":
-        return _hf().speak(text, **kwargs)
-    return _coqui().speak(text, **kwargs)
+        return _hf()
+    return _coqui()
+
+
+def _fallback():
+    """Return the lightweight backend used while the main model warms up."""
+    name = _config.get_str("tts_fallback_backend", "none")
+    if name in ("", "none", BACKEND):
+        return None
+    try:
+        backend = _gtts() if name == "gtts" else None
+    except Exception:
+        return None
+    if backend is None or not backend.is_ready():
+        return None
+    return backend
+
+
+def speak(text: str, **kwargs):
+    backend = _backend()
+    if is_preloading() and not is_ready() and not _is_cached(backend, text):
+        fallback = _fallback()
+        if fallback is not None:
+            kwargs.setdefault("async_play", True)
+            return fallback.speak(text, **kwargs)
+    return backend.speak(text, **kwargs)
+
+
+def _is_cached(backend, text: str) -> bool:
+    check = getattr(backend, "is_cached", None)
+    try:
+        return bool(check and check(text))
+    except Exception:
+        return False
+
+
+def is_ready() -> bool:
+    """Return ``True`` when the active backend can speak without loading."""
+    try:
+        check = getattr(_backend(), "is_ready", None)
+    except Exception:
+        return False
+    return True if check is None else bool(check())
+
+
+def is_preloading() -> bool:
+    """Return ``True`` while :func:`start_preload` is still running."""
+    return _preload_thread is not None and _preload_thread.is_alive()
+
+
+def _preload() -> None:
+    if _config.get_bool("tts_preload", True):
+        start = time.perf_counter()
+        try:
+            warm_up = getattr(_backend(), "warm_up", None)
+            if warm_up is not None and warm_up():
+                log_info(
+                    f"[tts_manager] {BACKEND} ready in {time.perf_counter() - start:.2f}s"
+                )
+        except Exception as e:
+            log_error(f"[tts_manager] preload failed: {e}")
+    prewarm_cache()
+
+
+def start_preload():
+    """Load and warm the active backend, then fill the phrase cache.
+
+    Runs on a daemon thread so GUI/CLI startup is not delayed. Until the
+    model is ready, :func:`speak` plays cached phrases or routes to
+    ``tts_fallback_backend``.
+    """
+    global _preload_thread
+    if is_preloading():
+        return _preload_thread
+    _preload_thread = threading.Thread(target=_preload, daemon=True)
+    _preload_thread.start()
+    return _preload_thread
+
+
+def prewarm_cache(phrases=None) -> int:
+    """Synthesize configured phrases into the TTS cache for the active backend.
+
+    Returns the number of phrases that are ready for instant playback.
+    """
+    from modules import tts_cache
+
+    if not _config.get_bool("tts_cache", True):
+        return 0
+    try:
+        precache = getattr(_backend(), "precache", None)
+    except Exception as e:
+        log_error(f"[tts_manager] prewarm skipped: {e}")
+        return 0
+    if precache is None:
+        return 0
+    return tts_cache.prewarm(precache, phrases)
 
 
 def is_speaking() -> bool:
-    return _coqui().is_speaking()
+    try:
+        return _backend().is_speaking()
+    except ImportError:
+        return audio_output.is_speaking()
 
 
 def stop_speech():
-    return _coqui().stop_speech()
+    try:
+        return _backend().stop_speech()
+    except ImportError:
+        # Backend failed to load; still silence the shared scheduler
+        return audio_output.stop()
+
+
+def wait_until_idle(timeout=None) -> bool:
+    """Block until all queued speech has played; ``False`` on timeout."""
+    return audio_output.wait_idle(timeout)
+
+
+def on_idle(callback) -> None:
+    """Call ``callback`` once all queued speech has played."""
+    audio_output.on_idle(callback)
 
 
 def get_description() -> str:
@@ -3,6 +3,8 @@
 import os
 import sys
 import re
+import threading
+from collections import deque
 from pathlib import Path
 
 __all__ = [
@@ -11,6 +13,7 @@ __all__ = [
     "clean_for_tts",
     "hide_cmd_window",
     "show_cmd_window",
+    "LatencyWindow",
 ]
 
 def resource_path(relative_path: str) -> str:
@@ -51,6 +54,7 @@ def get_info():
             "clean_for_tts",
             "hide_cmd_window",
             "show_cmd_window",
+            "LatencyWindow",
         ]
     }
 
@@ -84,3 +88,28 @@ def show_cmd_window() -> None:
             ctypes.windll.user32.ShowWindow(hwnd, 1)
     except Exception as exc:  # pragma: no cover - optional failure
         print(f"[utils] Could not show console: {exc}")
+
+
+class LatencyWindow:
+    """The last ``size`` latency samples, summarized in milliseconds."""
+
+    def __init__(self, size: int = 512):
+        self._samples: deque = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def summary(self, name: str) -> dict:
+        """Return ``<name>_ms_mean``, ``<name>_ms_p95`` and ``<name>_ms_max``."""
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return {f"{name}_ms_mean": 0.0, f"{name}_ms_p95": 0.0, f"{name}_ms_max": 0.0}
+        p95 = samples[min(len(samples) - 1, int(0.95 * len(samples)))]
+        return {
+            f"{name}_ms_mean": sum(samples) / len(samples) * 1000,
+            f"{name}_ms_p95": p95 * 1000,
+            f"{name}_ms_max": samples[-1] * 1000,
+        }
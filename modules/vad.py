@@ -0,0 +1,175 @@
+"""vad.py
+Voice activity detection for the listening loop.
+
+The default ``"energy"`` backend marks a frame as speech when its level is
+``margin_db`` above an adaptive noise floor and, if NumPy is available, its
+spectrum is not flat.  Voiced speech has strong harmonics; fans and hiss
+are close to white noise.  ``"webrtc"`` (``webrtcvad``) and ``"silero"``
+(``silero_vad`` + ``torch``) can be selected when installed.
+
+The noise floor follows the quietest recent frames.  It drops quickly and
+rises slowly, and more slowly still during speech.  Feeding the detector from the
+always-running hotword loop keeps the floor calibrated, so no
+``adjust_for_ambient_noise`` pause is needed before each utterance.
+Speech is considered over once ``hangover`` seconds pass without a speech
+frame.
+"""
+
+from __future__ import annotations
+
+import math
+
+from config_service import get_config_service
+from error_logger import log_error
+from .mic_capture import SAMPLE_RATE, SAMPLE_WIDTH, rms
+
+try:
+    import numpy as np
+except Exception:  # pragma: no cover - optional dependency
+    np = None
+
+MODULE_NAME = "vad"
+FRAME_MS = 30
+HANGOVER = 0.4
+MARGIN_DB = 10.0
+# Levels below this (dBFS-ish on int16 RMS) are never speech
+MIN_SPEECH_DB = 30.0
+# Spectral flatness above this looks like noise rather than voice
+FLATNESS_THRESHOLD = 0.45
+# Noise floor smoothing per frame: fast when the room gets quieter, slow
+# when louder, and slower still during speech so a sustained new noise
+# source (a fan switching on) is absorbed within ~10 s
+FLOOR_FALL = 0.5
+FLOOR_RISE = 0.02
+FLOOR_RISE_SPEECH = 0.002
+
+__all__ = ["VAD", "from_config", "spectral_flatness"]
+
+
+def _level_db(frame: bytes) -> float:
+    return 20.0 * math.log10(rms(frame) + 1e-9)
+
+
+def spectral_flatness(frame: bytes) -> float | None:
+    """Return the Wiener entropy of ``frame`` (``None`` without NumPy)."""
+    if np is None:
+        return None
+    samples = np.frombuffer(frame, dtype="<i2").astype(np.float32)
+    power = np.abs(np.fft.rfft(samples * np.hanning(len(samples)))) ** 2 + 1e-10
+    return float(np.exp(np.mean(np.log(power))) / np.mean(power))
+
+
+class VAD:
+    """Frame-based speech detector with adaptive floor and hangover."""
+
+    def __init__(
+        self,
+        samplerate: int = SAMPLE_RATE,
+        backend: str = "energy",
+        hangover: float = HANGOVER,
+        margin_db: float = MARGIN_DB,
+        aggressiveness: int = 2,
+    ):
+        self.samplerate = samplerate
+        self.margin_db = margin_db
+        self.backend = "energy"
+        self._model = None
+        frame_samples = samplerate * FRAME_MS // 1000
+        if backend == "webrtc":
+            try:
+                import webrtcvad
+
+                self._model = webrtcvad.Vad(aggressiveness)
+                self.backend = backend
+            except Exception as e:
+                log_error(f"[{MODULE_NAME}] webrtcvad unavailable, using energy: {e}")
+        elif backend == "silero":
+            try:
+                from silero_vad import load_silero_vad
+
+                self._model = load_silero_vad()
+                self.backend = backend
+                frame_samples = 512 if samplerate == 16000 else 256
+            except Exception as e:
+                log_error(f"[{MODULE_NAME}] silero_vad unavailable, using energy: {e}")
+        self.frame_bytes = frame_samples * SAMPLE_WIDTH
+        self.hangover_frames = max(1, round(hangover * samplerate / frame_samples))
+        self.noise_db: float | None = None
+        self._pending = b""
+        self._hang = 0
+
+    # ----- classification -----
+    def _energy_speech(self, frame: bytes, level: float) -> bool:
+        floor = self.noise_db if self.noise_db is not None else level
+        if level < MIN_SPEECH_DB or level < floor + self.margin_db:
+            return False
+        flatness = spectral_flatness(frame)
+        return flatness is None or flatness < FLATNESS_THRESHOLD
+
+    def _model_speech(self, frame: bytes) -> bool:
+        if self.backend == "webrtc":
+            return self._model.is_speech(frame, self.samplerate)
+        import torch
+
+        samples = torch.frombuffer(bytearray(frame), dtype=torch.int16).float() / 32768.0
+        return float(self._model(samples, self.samplerate)) > 0.5
+
+    def _update_floor(self, level: float, speech: bool) -> None:
+        if self.noise_db is None:
+            self.noise_db = level
+        elif level < self.noise_db:
+            self.noise_db += (level - self.noise_db) * FLOOR_FALL
+        else:
+            rise = FLOOR_RISE_SPEECH if speech else FLOOR_RISE
+            self.noise_db += (level - self.noise_db) * rise
+
+    def is_speech(self, frame: bytes) -> bool:
+        """Classify one frame and update the noise floor."""
+        level = _level_db(frame)
+        if self._model is not None:
+            speech = self._model_speech(frame)
+        else:
+            speech = self._energy_speech(frame, level)
+        self._update_floor(level, speech)
+        return speech
+
+    # ----- streaming -----
+    @property
+    def active(self) -> bool:
+        """``True`` from the first speech frame until the hangover expires."""
+        return self._hang > 0
+
+    def process(self, data: bytes) -> bool:
+        """Feed PCM ``data``; return ``True`` if any frame contained speech."""
+        data = self._pending + data
+        heard = False
+        end = len(data) - len(data) % self.frame_bytes
+        for offset in range(0, end, self.frame_bytes):
+            if self.is_speech(data[offset : offset + self.frame_bytes]):
+                heard = True
+                self._hang = self.hangover_frames
+            elif self._hang:
+                self._hang -= 1
+        self._pending = data[end:]
+        return heard
+
+    def reset(self) -> None:
+        """Forget the current utterance but keep the noise calibration."""
+        self._pending = b""
+        self._hang = 0
+
+
+def from_config(samplerate: int = SAMPLE_RATE) -> VAD:
+    """Build a :class:`VAD` from the ``vad_*`` keys in ``config.json``."""
+    cfg = get_config_service()
+    return VAD(
+        samplerate=samplerate,
+        backend=cfg.get_str("vad_backend", "energy"),
+        hangover=cfg.get_float("vad_hangover", HANGOVER),
+        margin_db=cfg.get_float("vad_margin_db", MARGIN_DB),
+    )
+
+
+def get_description() -> str:
+    """Return a short summary of this module."""
+    return "Detects speech in microphone audio with an adaptive noise floor."
@@ -26,10 +26,14 @@ __all__ = [
     "see_screen",
     "see_region",
     "click_image",
+    "find_text",
+    "click_text",
+    "when_seen",
     "list_monitors",
 ]
 from error_logger import log_error
 from datetime import datetime
+from . import ocr_engine, ocr_journal, screen_capture, template_matcher
 
 # Configure Tesseract only on Windows when available
 if not _IMPORT_ERROR and sys.platform.startswith("win"):
@@ -40,11 +44,9 @@ if not _IMPORT_ERROR and sys.platform.startswith("win"):
         pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
 
 def save_ocr_log(name: str, text: str) -> str:
-    """Save OCR ``text`` to a timestamped file and return its path."""
-    filename = f"ocr_log_{name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
-    with open(filename, "w", encoding="utf-8") as f:
-        f.write(text)
-    return f"OCR saved to {filename}"
+    """Queue OCR ``text`` for the searchable OCR journal."""
+    ocr_journal.record(text, source=name)
+    return "OCR queued for the journal"
 
 def list_monitors():
     """Return available monitor geometry using screeninfo and total virtual size."""
@@ -82,10 +84,9 @@ def see_screen(monitor: int | None = None, log: bool = True):
         except IndexError as e:
             return str(e)
     try:
-        img = pyautogui.screenshot(region=region)
-        text = pytesseract.image_to_string(img)
+        text = ocr_engine.ocr_frame(region).text
         if log:
-            save_ocr_log("full" if monitor is None else f"monitor_{monitor}", text)
+            ocr_journal.record(text, "screen", monitor, region)
         try:
             from modules import debug_panel
             debug_panel.add_ocr_result(text.strip())
@@ -108,13 +109,9 @@ def see_region(x: int, y: int, w: int, h: int, monitor: int | None = None, log:
         except IndexError as e:
             return str(e)
     try:
-        img = pyautogui.screenshot(region=(x, y, w, h))
-        text = pytesseract.image_to_string(img)
+        text = ocr_engine.ocr_frame((x, y, w, h)).text
         if log:
-            label = (
-                f"region_{x}_{y}" if monitor is None else f"monitor{monitor}_{x}_{y}"
-            )
-            save_ocr_log(label, text)
+            ocr_journal.record(text, "region", monitor, (x, y, w, h))
         try:
             from modules import debug_panel
             debug_panel.add_ocr_result(text.strip())
@@ -140,26 +137,67 @@ def click_image(
         except IndexError as e:
             return str(e)
     try:
-        screen = pyautogui.screenshot(region=region)
-        screen_np = np.array(screen)
-        screen_gray = cv2.cvtColor(screen_np, cv2.COLOR_RGB2GRAY)
-        template = cv2.imread(template_path, cv2.IMREAD_GRAYSCALE)
-        if template is None:
+        if not os.path.exists(template_path):
             return f"Error: Could not load template image from {template_path}"
-
-        res = cv2.matchTemplate(screen_gray, template, cv2.TM_CCOEFF_NORMED)
-        loc = np.where(res >= confidence)
-
-        if loc[0].size > 0:
-            y, x = loc[0][0], loc[1][0]
-            h, w = template.shape
-            pyautogui.click(x + w // 2, y + h // 2)
-            return f"Clicked image match at ({x}, {y})"
+        found = template_matcher.match(template_path, confidence=confidence, region=region)
+        if found:
+            pyautogui.click(*found.center)
+            screen_capture.get_capture().invalidate()
+            return f"Clicked image match at ({found.x}, {found.y})"
         return "No matching image found."
     except Exception as e:  # pragma: no cover - handle pyautogui/cv2 errors
         log_error(f"[vision_tools] click_image failed: {e}")
         return f"Error clicking image: {e}"
 
+def find_text(phrase: str, monitor: int | None = None) -> list:
+    """Return ``(x, y)`` screen centres of every occurrence of ``phrase``.
+
+    Uses the word boxes from incremental OCR, so text that was just read by
+    :func:`see_screen` is located without another Tesseract run.
+    """
+    if _IMPORT_ERROR:
+        return []
+    region = None
+    if monitor is not None:
+        try:
+            region = _get_monitor_region(monitor)
+        except IndexError:
+            return []
+    try:
+        return [w.center for w in ocr_engine.ocr_frame(region).find(phrase)]
+    except Exception as e:  # pragma: no cover - OCR backend errors
+        log_error(f"[vision_tools] find_text failed: {e}")
+        return []
+
+
+def when_seen(phrase: str, monitor: int | None = None) -> str:
+    """Report when ``phrase`` was last read on screen, from the OCR journal."""
+    try:
+        entry = ocr_journal.last_seen(phrase, monitor)
+    except Exception as e:  # pragma: no cover - database errors
+        log_error(f"[vision_tools] when_seen failed: {e}")
+        return f"Error searching OCR history: {e}"
+    if entry is None:
+        where = "the screen" if monitor is None else f"monitor {monitor}"
+        return f"'{phrase}' has not been seen on {where}."
+    where = "the screen" if entry.monitor is None else f"monitor {entry.monitor}"
+    when = datetime.fromtimestamp(entry.last_seen).strftime("%Y-%m-%d %H:%M:%S")
+    return f"'{phrase}' was last seen on {where} at {when}."
+
+
+def click_text(phrase: str, monitor: int | None = None) -> str:
+    """Click the first on-screen occurrence of ``phrase``."""
+    if _IMPORT_ERROR:
+        return f"Missing dependency: {_IMPORT_ERROR}"
+    matches = find_text(phrase, monitor)
+    if not matches:
+        return f"Text '{phrase}' not found on screen."
+    x, y = matches[0]
+    pyautogui.click(x, y)
+    screen_capture.get_capture().invalidate()
+    return f"Clicked '{phrase}' at ({x}, {y})"
+
+
 def screenshot(path: str | None = None, monitor: int | None = None, region: tuple[int, int, int, int] | None = None):
     """Take a screenshot of the full screen, a monitor, or a region."""
     if _IMPORT_ERROR:
@@ -170,7 +208,7 @@ def screenshot(path: str | None = None, monitor: int | None = None, region: tupl
         except IndexError as e:
             return str(e)
     try:
-        img = pyautogui.screenshot(region=region)
+        img = screen_capture.grab(region).to_pil()
         if path:
             img.save(path)
             return path
@@ -193,10 +231,8 @@ def find_on_screen(
             region = _get_monitor_region(monitor)
         except IndexError as e:
             return str(e)
-    loc = pyautogui.locateCenterOnScreen(template_path, confidence=confidence, region=region)
-    if loc:
-        return loc
-    return None
+    found = template_matcher.match(template_path, confidence=confidence, region=region)
+    return found.center if found else None
 
 def analyze_image(path: str):
     """Run OCR on an image from disk."""
@@ -227,6 +263,9 @@ def get_info():
             "see_screen",
             "see_region",
             "click_image",
+            "find_text",
+            "click_text",
+            "when_seen",
             "list_monitors",
         ],
     }
@@ -2,38 +2,33 @@
 
 import time
 import threading
-import json
 import os
 from error_logger import log_error
+from config_service import get_config_service
 try:
     import speech_recognition as sr
-    from vosk import Model, KaldiRecognizer
-    import pyaudio
+    from vosk import KaldiRecognizer
 except Exception as e:  # pragma: no cover - optional dependencies
     sr = None
-    Model = None
     KaldiRecognizer = None
-    pyaudio = None
     _IMPORT_ERROR = e
 else:
     _IMPORT_ERROR = None
 
 CONFIG_PATH = "config.json"
-try:
-    with open(CONFIG_PATH, "r") as f:
-        _CFG = json.load(f)
-except Exception:
-    _CFG = {}
+_CFG = get_config_service(CONFIG_PATH).config
 
 # Configurable parameters
-PAUSE_THRESHOLD = _CFG.get("pause_threshold", 2.0)
 MAX_SPEECH_LENGTH = _CFG.get("max_speech_length", 30)
 AUTO_SLEEP_TIMEOUT = _CFG.get("auto_sleep_timeout", 15)
 ENABLE_BEEP = _CFG.get("voice_beep", False)
-CANCEL_PHRASES = [p.lower() for p in _CFG.get("cancel_phrases", ["stop assistant"])]
 EXIT_PHRASES = [p.lower() for p in _CFG.get("exit_phrases", ["exit environment"])]
 SOFT_MUTE_SECS = 3
+# Audio kept from before speech onset so the first word is not clipped
+STT_PREROLL = _CFG.get("stt_preroll", 0.3)
 STT_BACKEND = _CFG.get("stt_backend", "google")  # "google", "vosk", or "huggingface"
+# Restrict the idle hotword recognizer to the wake/resume/cancel phrases
+HOTWORD_GRAMMAR = _CFG.get("hotword_grammar", True)
 
 __all__ = [
     "start_voice_listener",
@@ -50,11 +45,12 @@ from assistant import (
     check_wake,
     is_listening,
     speak,
-    process_input,
+    submit_command,
     set_listening,
     cancel_processing,
 )
 from modules.tts_manager import is_speaking, stop_speech
+from modules import audio_output, mic_capture, phrase_matcher, vad as vad_module, vosk_integration
 
 # Track last time we heard any speech
 last_activity_time = time.time()
@@ -93,29 +89,50 @@ def is_exit_command(text: str) -> bool:
     """Return ``True`` if ``text`` equals the exit command."""
     return text.strip().lower() in EXIT_PHRASES
 
+def _heard_partial(_text: str) -> None:
+    """Keep the session awake while a partial transcript is growing."""
+    global last_activity_time
+    last_activity_time = time.time()
+
+
+def _transcribe(recognizer, pcm: bytes, samplerate: int) -> str:
+    """Return text for ``pcm`` using the Google or Hugging Face backend."""
+    audio = sr.AudioData(pcm, samplerate, mic_capture.SAMPLE_WIDTH)
+    if STT_BACKEND == "huggingface":
+        from modules.hf_stt import recognize_from_audio
+
+        return recognize_from_audio(audio.get_wav_data())
+    return recognizer.recognize_google(audio)
+
+
+def _hotword_recognizer(model, samplerate: int, matcher):
+    """Return the recognizer used for wake and cancel detection."""
+    if not HOTWORD_GRAMMAR:
+        return KaldiRecognizer(model, samplerate)
+    phrases = matcher.phrases("wake") + matcher.phrases("resume") + matcher.phrases("cancel")
+    return vosk_integration.hotword_recognizer(model, samplerate, phrases)
+
+
 def start_voice_listener(output_widget, vosk_model_path, mic_hard_muted_func, stop_event=None):
     """Unified loop for wake-word detection and speech recognition."""
     if _IMPORT_ERROR:
         return f"Missing dependency: {_IMPORT_ERROR}"
 
     # Hotword detection setup
-    model = Model(vosk_model_path)
-    rec = KaldiRecognizer(model, 16000)
-    pa = pyaudio.PyAudio()
-    stream = pa.open(
-        format=pyaudio.paInt16,
-        channels=1,
-        rate=16000,
-        input=True,
-        frames_per_buffer=8000,
-    )
-    stream.start_stream()
-
-    # Speech recognition setup
+    # Shared with the Vosk STT backend so the model is loaded once
+    model = vosk_integration.get_model(vosk_model_path)
+    capture = mic_capture.get_capture()
+    matcher = phrase_matcher.get_matcher()
+    rec = _hotword_recognizer(model, capture.samplerate, matcher)
+    sub = capture.subscribe("hotword")
+    if not capture.running:
+        sub.close()
+        return "Could not open microphone"
+
+    # Speech recognition setup; the VAD noise floor is calibrated
+    # continuously from the hotword stream instead of before each utterance
     recognizer = sr.Recognizer()
-    recognizer.pause_threshold = PAUSE_THRESHOLD
-    mic = sr.Microphone()
-
+    vad = vad_module.from_config(capture.samplerate)
 
     global last_activity_time
     was_listening = False
@@ -126,6 +143,7 @@ def start_voice_listener(output_widget, vosk_model_path, mic_hard_muted_func, st
                 break
             if mic_hard_muted_func():
                 time.sleep(0.5)
+                sub.skip()
                 continue
 
             if is_speaking():
@@ -138,11 +156,18 @@ def start_voice_listener(output_widget, vosk_model_path, mic_hard_muted_func, st
                 output_widget.insert("end", "Assistant: 🎤 Hotword resumed.\n")
                 output_widget.see("end")
 
-            data = stream.read(4000, exception_on_overflow=False)
+            data = sub.read(timeout=0.5)
+            if data is None:
+                continue
+            vad.process(data)
+            if phrase_matcher.get_matcher() is not matcher:
+                # Phrases were added; rebuild the grammar
+                matcher = phrase_matcher.get_matcher()
+                rec = _hotword_recognizer(model, capture.samplerate, matcher)
             if rec.AcceptWaveform(data):
                 result = rec.Result().lower()
 
-                if any(p in result for p in CANCEL_PHRASES):
+                if "cancel" in phrase_matcher.match(result):
                     stop_speech()
                     cancel_processing()
                     unmute_hotword()
@@ -155,7 +180,12 @@ def start_voice_listener(output_widget, vosk_model_path, mic_hard_muted_func, st
                     output_widget.see("end")
                     _beep()
                     mute_hotword()
-                    speak("Yes?", on_complete=unmute_hotword)
+                    speak(
+                        "Yes?",
+                        on_complete=unmute_hotword,
+                        priority=audio_output.PRIORITY_HIGH,
+                        interrupt=True,
+                    )
                     last_activity_time = time.time()
                     continue
 
@@ -164,6 +194,12 @@ def start_voice_listener(output_widget, vosk_model_path, mic_hard_muted_func, st
             if listening and not was_listening:
                 _beep()
                 last_activity_time = time.time()
+                if STT_BACKEND == "huggingface":
+                    # Load while the user starts talking; unloaded again
+                    # after hf_stt_idle_unload seconds without requests
+                    from modules import hf_stt
+
+                    hf_stt.preload()
             elif not listening and was_listening:
                 _beep()
             was_listening = listening
@@ -177,25 +213,39 @@ def start_voice_listener(output_widget, vosk_model_path, mic_hard_muted_func, st
                     _beep()
                     continue
 
-                with mic as source:
-                    recognizer.adjust_for_ambient_noise(source)
-                    try:
-                        audio = recognizer.listen(source, timeout=1, phrase_time_limit=MAX_SPEECH_LENGTH)
-                    except sr.WaitTimeoutError:
-                        continue
-
+                # The phrase is read from the same stream the hotword uses,
+                # starting slightly before speech onset
                 try:
-                    if STT_BACKEND == "google":
-                        text = recognizer.recognize_google(audio)
-                    elif STT_BACKEND == "huggingface":
-                        from modules.hf_stt import recognize_from_audio
-                        text = recognize_from_audio(audio.get_wav_data())
-                    else:
-                        from modules.vosk_integration import recognize_from_mic
-                        text = recognize_from_mic()
+                    with capture.subscribe("stt") as stt_sub:
+                        if STT_BACKEND in ("google", "huggingface"):
+                            pcm = mic_capture.record_phrase(
+                                stt_sub,
+                                timeout=1,
+                                phrase_time_limit=MAX_SPEECH_LENGTH,
+                                preroll=STT_PREROLL,
+                                stop_event=stop_event,
+                                vad=vad,
+                            )
+                            text = _transcribe(recognizer, pcm, capture.samplerate) if pcm else ""
+                        else:
+                            # Decode while the user speaks; ends at the endpoint
+                            stt_sub.rewind(STT_PREROLL)
+                            text = vosk_integration.listen_stream(
+                                stt_sub,
+                                model,
+                                timeout=1,
+                                max_seconds=MAX_SPEECH_LENGTH,
+                                on_partial=_heard_partial,
+                                stop_event=stop_event,
+                            )
                 except Exception as e:
                     log_error(f"[Mic Error] {e}")
                     continue
+                finally:
+                    # The hotword recognizer must not process the phrase again
+                    sub.skip()
+                if not text:
+                    continue
 
                 last_activity_time = time.time()
 
@@ -207,7 +257,7 @@ def start_voice_listener(output_widget, vosk_model_path, mic_hard_muted_func, st
                     _beep()
                     continue
 
-                if any(p in text.lower() for p in CANCEL_PHRASES):
+                if "cancel" in phrase_matcher.match(text):
                     stop_speech()
                     cancel_processing()
                     unmute_hotword()
@@ -227,13 +277,11 @@ def start_voice_listener(output_widget, vosk_model_path, mic_hard_muted_func, st
                     debug_panel.add_command(text)
                 except Exception:
                     pass
-                threading.Thread(target=process_input, args=(text, output_widget), daemon=True).start()
+                submit_command(text, output_widget, source="voice")
             else:
                 time.sleep(0.1)
     finally:
-        stream.stop_stream()
-        stream.close()
-        pa.terminate()
+        sub.close()
 
 # Simple wrappers used by get_info for discovery
 def listen(output_widget, vosk_model_path, mic_hard_muted_func):
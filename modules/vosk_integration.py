@@ -1,27 +1,41 @@
 # modules/vosk_integration.py
 
+import json
+import os
+import threading
+import time
+
 try:
     import vosk
-    import sounddevice as sd
-    import queue
-    import json
-    import os
 except ImportError as e:
     _IMPORT_ERROR = str(e)
 else:
     _IMPORT_ERROR = None
 
 from error_logger import log_error, log_info
+from config_service import get_config_service
+from . import mic_capture
 
 MODULE_NAME = "vosk_integration"
+# Endpointer delays in seconds: wait for speech, trailing silence, hard cap
+ENDPOINT_START = 5.0
+ENDPOINT_SILENCE = 0.5
+ENDPOINT_MAX = 20.0
 
-__all__ = ["recognize_from_mic"]
+__all__ = [
+    "recognize_from_mic",
+    "recognize_pcm",
+    "listen_stream",
+    "StreamingRecognizer",
+    "get_model",
+    "hotword_recognizer",
+    "measure_hotword",
+]
 
 def load_config(path: str = "config.json") -> dict:
-    """Return dictionary from ``path`` or empty dict on failure."""
+    """Return the shared configuration for ``path`` (empty dict on failure)."""
     try:
-        with open(path, "r") as f:
-            return json.load(f)
+        return get_config_service(path).config
     except Exception as e:
         log_error(f"[{MODULE_NAME}] Config load error: {e}")
         return {}
@@ -37,32 +51,191 @@ def load_vosk_model(model_path: str | None = None):
         raise FileNotFoundError(f"Vosk model not found at {model_path}")
     return vosk.Model(model_path)
 
+_models: dict = {}
+_models_lock = threading.Lock()
+
+
+def get_model(model_path: str | None = None):
+    """Return the process-wide Vosk model for ``model_path``.
+
+    Loading a model takes seconds, so the hotword listener, streaming
+    recognizer and one-shot helpers all share the same instance.
+    """
+    if _IMPORT_ERROR:
+        raise ImportError(_IMPORT_ERROR)
+    if model_path is None:
+        model_path = load_config().get("vosk_model_path")
+    key = os.path.abspath(model_path) if model_path else model_path
+    with _models_lock:
+        model = _models.get(key)
+        if model is None:
+            model = load_vosk_model(model_path)
+            _models[key] = model
+        return model
+
+
+def hotword_recognizer(model, samplerate: int, phrases):
+    """Return a ``KaldiRecognizer`` that can only output ``phrases``.
+
+    Restricting the decoder to a short JSON phrase list (plus ``[unk]`` for
+    everything else) makes the search graph tiny, so idle listening costs a
+    fraction of the CPU of large-vocabulary decoding.  Words missing from
+    the model vocabulary are dropped by Vosk with a warning.
+    """
+    if _IMPORT_ERROR:
+        raise ImportError(_IMPORT_ERROR)
+    grammar = sorted({p.lower().strip() for p in phrases if p and p.strip()})
+    return vosk.KaldiRecognizer(model, samplerate, json.dumps(grammar + ["[unk]"]))
+
+
+def measure_hotword(
+    pcm: bytes,
+    phrases,
+    model=None,
+    samplerate: int = 16000,
+    block_seconds: float = 0.1,
+) -> dict:
+    """Compare full and grammar-restricted recognizers on ``pcm``.
+
+    For each mode returns the CPU load (process CPU seconds per second of
+    audio) and ``detected_at``, the audio time in seconds at which one of
+    ``phrases`` first appeared in a partial or final result (``None`` if it
+    never did).
+    """
+    model = model or get_model()
+    phrases = [p.lower() for p in phrases]
+    block = int(samplerate * block_seconds) * mic_capture.SAMPLE_WIDTH
+    duration = len(pcm) / (samplerate * mic_capture.SAMPLE_WIDTH)
+    report = {}
+    for mode in ("full", "grammar"):
+        if mode == "full":
+            rec = vosk.KaldiRecognizer(model, samplerate)
+        else:
+            rec = hotword_recognizer(model, samplerate, phrases)
+        detected_at = None
+        start = time.process_time()
+        for offset in range(0, len(pcm), block):
+            if rec.AcceptWaveform(pcm[offset : offset + block]):
+                text = json.loads(rec.Result()).get("text", "")
+            else:
+                text = json.loads(rec.PartialResult()).get("partial", "")
+            if detected_at is None and any(p in text for p in phrases):
+                detected_at = (offset + block) / (samplerate * mic_capture.SAMPLE_WIDTH)
+        rec.FinalResult()
+        cpu = time.process_time() - start
+        report[mode] = {
+            "cpu_load": cpu / duration if duration else 0.0,
+            "detected_at": detected_at,
+        }
+    return report
+
+
+class StreamingRecognizer:
+    """Feed PCM frames to Kaldi as they arrive and stop at the endpoint.
+
+    Vosk's endpointer finalizes a result after a short trailing silence, so
+    a two-word command completes a few hundred milliseconds after the
+    speaker stops instead of after a fixed recording window.
+    """
+
+    def __init__(self, model=None, samplerate: int = 16000, on_partial=None):
+        if _IMPORT_ERROR:
+            raise ImportError(_IMPORT_ERROR)
+        self.samplerate = samplerate
+        self.on_partial = on_partial
+        self._rec = vosk.KaldiRecognizer(model or get_model(), samplerate)
+        delays = getattr(self._rec, "SetEndpointerDelays", None)
+        if delays is not None:
+            # start-of-speech wait, trailing silence, hard cap (seconds)
+            delays(ENDPOINT_START, ENDPOINT_SILENCE, ENDPOINT_MAX)
+        self._partial = ""
+        self.heard_speech = False
+
+    def accept(self, data: bytes) -> str | None:
+        """Feed ``data``; return the final text once an endpoint is hit."""
+        if self._rec.AcceptWaveform(data):
+            return json.loads(self._rec.Result()).get("text", "").strip()
+        partial = json.loads(self._rec.PartialResult()).get("partial", "")
+        if partial and partial != self._partial:
+            self._partial = partial
+            self.heard_speech = True
+            if self.on_partial:
+                self.on_partial(partial)
+        return None
+
+    def finish(self) -> str:
+        """Flush buffered audio and return the last result."""
+        return json.loads(self._rec.FinalResult()).get("text", "").strip()
+
+
+def listen_stream(
+    sub,
+    model=None,
+    timeout: float = 3.0,
+    max_seconds: float = 15.0,
+    on_partial=None,
+    stop_event=None,
+) -> str:
+    """Recognize one utterance from a :class:`mic_capture.Subscription`.
+
+    Returns ``""`` if nothing was said within ``timeout`` seconds and never
+    listens longer than ``max_seconds``.
+    """
+    recognizer = StreamingRecognizer(model, sub._capture.samplerate, on_partial)
+    start = time.monotonic()
+    while not (stop_event and stop_event.is_set()):
+        data = sub.read(timeout=0.2)
+        if data:
+            text = recognizer.accept(data)
+            if text:
+                return text
+        elapsed = time.monotonic() - start
+        if not recognizer.heard_speech and elapsed > timeout:
+            break
+        if elapsed > max_seconds or sub.closed:
+            break
+    return recognizer.finish()
+
+
+def recognize_pcm(data: bytes, model=None, samplerate: int = 16000) -> str:
+    """Return text for raw 16-bit mono PCM ``data``."""
+    if _IMPORT_ERROR:
+        raise ImportError(_IMPORT_ERROR)
+    rec = vosk.KaldiRecognizer(model or get_model(), samplerate)
+    result = ""
+    step = samplerate  # feed half a second of int16 samples at a time
+    for offset in range(0, len(data), step):
+        if rec.AcceptWaveform(data[offset : offset + step]):
+            result += json.loads(rec.Result()).get("text", "") + " "
+    result += json.loads(rec.FinalResult()).get("text", "")
+    return result.strip()
+
+
 def recognize_from_mic(
-    model=None, duration: int = 5, samplerate: int = 16000
+    model=None, duration: int = 5, samplerate: int = 16000, on_partial=None
 ) -> str:
-    """Return transcribed text from microphone using Vosk."""
+    """Return transcribed text from microphone using Vosk.
+
+    Audio comes from the shared :mod:`modules.mic_capture` stream and is
+    decoded while it arrives; recognition ends at the first endpoint, with
+    ``duration`` only as an upper bound.
+    """
     if _IMPORT_ERROR:
         return f"[{MODULE_NAME} Error] {str(_IMPORT_ERROR)}"
     try:
-        if model is None:
-            model = load_vosk_model()
-        q = queue.Queue()
-        result = ""
-        def callback(indata, frames, time, status):
-            q.put(bytes(indata))
-        with sd.RawInputStream(samplerate=samplerate, blocksize=8000, dtype='int16', channels=1, callback=callback):
-            rec = vosk.KaldiRecognizer(model, samplerate)
+        capture = mic_capture.get_capture()
+        with capture.subscribe("vosk") as sub:
+            if not capture.running:
+                raise RuntimeError("microphone unavailable")
             # Using concise logging instead of noisy prints
-            log_info(f"[{MODULE_NAME}] Listening for {duration} sec")
-            sd.sleep(duration * 1000)
-            while not q.empty():
-                data = q.get()
-                if rec.AcceptWaveform(data):
-                    part = json.loads(rec.Result())
-                    result += part.get("text", "") + " "
-            final = json.loads(rec.FinalResult())
-            result += final.get("text", "")
-        return result.strip()
+            log_info(f"[{MODULE_NAME}] Listening for up to {duration} sec")
+            return listen_stream(
+                sub,
+                model or get_model(),
+                timeout=duration,
+                max_seconds=duration,
+                on_partial=on_partial,
+            )
     except Exception as e:
         log_error(f"[{MODULE_NAME}] Recognition error: {e}")
         return f"[{MODULE_NAME} Error] {str(e)}"
@@ -70,7 +243,7 @@ def recognize_from_mic(
 def get_info():
     return {
         "name": MODULE_NAME,
-        "description": "Offline speech recognition using Vosk and sounddevice.",
+        "description": "Offline speech recognition using Vosk and the shared microphone stream.",
         "functions": ["recognize_from_mic"]
     }
 
@@ -94,3 +267,17 @@ def register(registry=None):
 
 # Optionally auto-register
 # register()
+
+
+if __name__ == "__main__":
+    import sys
+    import wave
+
+    # Usage: python -m modules.vosk_integration recording.wav
+    with wave.open(sys.argv[1], "rb") as wav:
+        rate = wav.getframerate()
+        pcm = wav.readframes(wav.getnframes())
+    cfg = load_config()
+    phrases = cfg.get("wake_phrases", []) + cfg.get("cancel_phrases", [])
+    for mode, row in measure_hotword(pcm, phrases, samplerate=rate).items():
+        print(f"[{MODULE_NAME}] {mode}: CPU {row['cpu_load'] * 100:.1f}% of a core, detected at {row['detected_at']}")
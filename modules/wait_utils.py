@@ -0,0 +1,179 @@
+"""wait_utils.py
+Condition-based waiting with exponential back-off.
+
+Window actions used to sleep a fixed 0.1-0.5 s after every step whether or
+not the window had already reacted.  :func:`wait_until` polls the real
+condition instead: it checks immediately, then sleeps ``interval`` seconds
+and doubles the sleep up to ``max_interval`` until the condition holds or
+``timeout`` expires.  An already-focused window therefore costs one check.
+
+Run ``python -m modules.wait_utils`` to time the window actions against a
+stubbed window backend whose windows react after a configurable delay.
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+import time
+import types
+from typing import Callable, Dict
+
+from config_service import get_config_service
+
+MODULE_NAME = "wait_utils"
+WAIT_TIMEOUT = 2.0
+# Focus checks keep the old fixed delay as their cap: a window manager
+# that never reports the new active window should not cost 2 s per step
+FOCUS_TIMEOUT = 0.5
+FIRST_INTERVAL = 0.01
+MAX_INTERVAL = 0.2
+
+__all__ = ["wait_until", "default_timeout", "focus_timeout", "benchmark"]
+
+
+def default_timeout() -> float:
+    """Return ``window_wait_timeout`` from the config."""
+    return get_config_service().get_float("window_wait_timeout", WAIT_TIMEOUT)
+
+
+def focus_timeout() -> float:
+    """Return how long to wait for a window to become active."""
+    return min(default_timeout(), FOCUS_TIMEOUT)
+
+
+def wait_until(
+    condition: Callable[[], bool],
+    timeout: float | None = None,
+    interval: float = FIRST_INTERVAL,
+    max_interval: float = MAX_INTERVAL,
+    backoff: float = 2.0,
+) -> bool:
+    """Return ``True`` as soon as ``condition()`` is truthy, ``False`` on timeout.
+
+    Exceptions raised by ``condition`` count as "not yet".
+    """
+    timeout = default_timeout() if timeout is None else timeout
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            if condition():
+                return True
+        except Exception:
+            pass
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        time.sleep(min(interval, remaining))
+        interval = min(interval * backoff, max_interval)
+
+
+# ----- benchmark -----
+class _StubWindow:
+    def __init__(self, backend, title: str):
+        self.backend = backend
+        self.title = title
+        self._hWnd = id(self)
+        self.isMaximized = False
+
+    def _later(self, action):
+        timer = threading.Timer(self.backend.delay, action)
+        timer.daemon = True
+        timer.start()
+
+    def activate(self):
+        self._later(lambda: setattr(self.backend, "active", self))
+
+    def close(self):
+        self._later(lambda: self.backend.windows.remove(self))
+
+    def maximize(self):
+        self._later(lambda: setattr(self, "isMaximized", True))
+
+    def minimize(self):
+        pass
+
+
+class _StubBackend:
+    """Just enough of ``pygetwindow`` for the window actions."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.windows = []
+        self.active = None
+
+    def add(self, title: str) -> _StubWindow:
+        win = _StubWindow(self, title)
+        self.windows.append(win)
+        return win
+
+    def getAllWindows(self):
+        return list(self.windows)
+
+    def getAllTitles(self):
+        return [w.title for w in self.windows]
+
+    def getWindowsWithTitle(self, title):
+        return [w for w in self.windows if w.title == title]
+
+    def getActiveWindow(self):
+        return self.active
+
+
+def benchmark(runs: int = 5, delay: float = 0.02) -> Dict[str, float]:
+    """Return the mean seconds per window action on a stub backend.
+
+    Stub windows apply focus/close/maximize ``delay`` seconds after the
+    call, like a real window manager; typing itself is instant.
+    """
+    from modules import app_window_manager, window_tools
+
+    keyboard = types.SimpleNamespace(
+        write=lambda *a, **k: None, hotkey=lambda *a, **k: None, press=lambda *a, **k: None
+    )
+    patched = ("gw", "pyautogui", "_IMPORT_ERROR", "_GW_ERROR", "_PYAUTOGUI_ERROR")
+    saved = [
+        (mod, name, getattr(mod, name))
+        for mod in (window_tools, app_window_manager)
+        for name in patched
+        if hasattr(mod, name)
+    ]
+    actions = {
+        "focus_window": lambda: window_tools.focus_window("notepad"),
+        "focus_window (already active)": lambda: window_tools.focus_window("notepad"),
+        "type_in_window": lambda: window_tools.type_in_window("notepad", "hi"),
+        "close_taskbar_item": lambda: window_tools.close_taskbar_item(1),
+        "app close_window": lambda: app_window_manager.close_window("scratch"),
+        "app focus_window": lambda: app_window_manager.focus_window("notepad"),
+        "app maximize_window": lambda: app_window_manager.maximize_window("notepad"),
+    }
+    timings = {name: 0.0 for name in actions}
+    try:
+        for _ in range(runs):
+            for name, action in actions.items():
+                backend = _StubBackend(delay)
+                notepad = backend.add("Untitled - Notepad")
+                backend.add("scratch")
+                if name.endswith("(already active)"):
+                    backend.active = notepad
+                for mod, attr, _ in saved:
+                    stub = {"gw": backend, "pyautogui": keyboard}.get(attr)
+                    setattr(mod, attr, stub)
+                start = time.perf_counter()
+                action()
+                timings[name] += time.perf_counter() - start
+    finally:
+        for mod, name, value in saved:
+            setattr(mod, name, value)
+    return {name: total / runs for name, total in timings.items()}
+
+
+def get_description() -> str:
+    """Return a short summary of this module."""
+    return "Polls for window and UI conditions with back-off instead of fixed sleeps."
+
+
+if __name__ == "__main__":
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    for action, seconds in benchmark(runs).items():
+        print(f"[wait_utils] {action}: {seconds * 1000:.1f} ms")
@@ -19,9 +19,9 @@ def command_route():
         return jsonify({'error': str(_IMPORT_ERROR)}), 500
     data = request.get_json(force=True)
     cmd = data.get('command', '')
-    from assistant import process_input
-    process_input(cmd, None)  # type: ignore[arg-type]
-    return jsonify({'status': 'queued'})
+    from assistant import submit_command, scheduler
+    submit_command(cmd, source="web")
+    return jsonify({'status': 'queued', 'depth': scheduler.depth()})
 
 
 def run(host: str = '127.0.0.1', port: int = 5000):
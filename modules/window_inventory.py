@@ -0,0 +1,396 @@
+"""window_inventory.py
+Cached snapshot of the open top-level windows with a fuzzy title index.
+
+Window commands used to enumerate every window (through ``pygetwindow`` or
+a ``wmctrl -lp`` subprocess) on each call.  :class:`WindowInventory` keeps
+one snapshot instead.  A background poller refreshes it every
+``window_poll_interval`` seconds.  On X11, when ``python-xlib`` is
+installed, a watcher also refreshes it as soon as ``_NET_CLIENT_LIST``
+changes.  Both stop after ``IDLE_STOP`` seconds without a lookup and start
+again with the next one.  Without them, a snapshot older than
+``window_cache_ttl`` is refreshed on demand.
+
+Titles are indexed by character trigrams, so a partial-title lookup such
+as "chrome" only checks windows sharing all of its trigrams.  Process
+names are looked up once per pid and cached until the pid disappears.
+"""
+
+from __future__ import annotations
+
+import os
+import platform
+import re
+import select
+import subprocess
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Set, Tuple
+
+try:
+    import pygetwindow as gw
+except Exception:  # pragma: no cover - optional dependency
+    gw = None
+
+try:
+    import psutil
+except Exception:  # pragma: no cover - optional dependency
+    psutil = None
+
+try:  # pid lookup for pygetwindow handles on Windows
+    import win32process
+except Exception:  # pragma: no cover - optional dependency
+    win32process = None
+
+from config_service import get_config_service
+from error_logger import log_error
+
+from . import fuzzy_index
+
+MODULE_NAME = "window_inventory"
+CACHE_TTL = 0.5
+POLL_INTERVAL = 1.0
+# Poll less often when X11 events already report new and closed windows
+EVENT_POLL_FACTOR = 5
+# Background refresh stops after this many seconds without a lookup
+IDLE_STOP = 60.0
+# How often the X11 watcher checks for ``stop`` while no event arrives
+WATCH_TIMEOUT = 0.5
+# Title parts a fuzzy lookup can match on its own, e.g. "Notepad" in
+# "Untitled - Notepad"
+_TITLE_PARTS = re.compile(r"\s+[-\u2013\u2014|:]\s+|\s+")
+
+__all__ = [
+    "WindowInfo",
+    "WindowInventory",
+    "get_inventory",
+    "find",
+    "closest",
+    "titles",
+    "is_active",
+    "is_gone",
+]
+
+
+@dataclass
+class WindowInfo:
+    """One top-level window in the snapshot."""
+
+    title: str
+    pid: int | None = None
+    process: str | None = None
+    window: object = field(default=None, compare=False, repr=False)
+
+
+def trigrams(text: str) -> Set[str]:
+    text = text.lower()
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+def _pid_of(win) -> int | None:
+    if os.name == "nt" and win32process is not None and hasattr(win, "_hWnd"):
+        try:
+            return win32process.GetWindowThreadProcessId(int(win._hWnd))[1]
+        except Exception:  # pragma: no cover - OS specific
+            return None
+    return None
+
+
+def _process_name(pid: int) -> str | None:
+    if psutil is None:
+        return None
+    try:
+        return psutil.Process(pid).name()
+    except Exception:
+        return None
+
+
+def _pygetwindow_windows(backend) -> List[Tuple[str, int | None, object]]:
+    if hasattr(backend, "getAllWindows"):
+        found = []
+        for win in backend.getAllWindows():
+            title = getattr(win, "title", "").strip()
+            if title:
+                found.append((title, _pid_of(win), win))
+        return found
+    return [(t, None, None) for t in backend.getAllTitles() if t.strip()]
+
+
+def _wmctrl_windows() -> List[Tuple[str, int | None, object]]:
+    try:
+        output = subprocess.check_output(["wmctrl", "-lp"], text=True)
+    except Exception:
+        return []
+    found = []
+    for line in output.splitlines():
+        # <id> <desktop> <pid> <host> <title>
+        parts = line.split(None, 4)
+        if len(parts) >= 5 and parts[4].strip():
+            pid = int(parts[2]) if parts[2].isdigit() and parts[2] != "0" else None
+            found.append((parts[4].strip(), pid, None))
+    return found
+
+
+def is_active(backend, win) -> bool:
+    """Return whether ``win`` is the foreground window of ``backend``.
+
+    Backends that cannot report the active window count as done.
+    """
+    get_active = getattr(backend, "getActiveWindow", None)
+    if get_active is None:
+        return True
+    active = get_active()
+    return active is not None and (active == win or active.title == win.title)
+
+
+def is_gone(backend, win) -> bool:
+    """Return whether ``win`` is no longer among ``backend``'s windows."""
+    return win not in backend.getAllWindows()
+
+
+class WindowInventory:
+    """Shared window list with trigram title lookup."""
+
+    def __init__(self, backend=None, ttl: float = CACHE_TTL):
+        self.backend = backend
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._windows: Tuple[WindowInfo, ...] = ()
+        self._lowered: Tuple[str, ...] = ()
+        self._index: Dict[str, List[int]] = {}
+        self._names: Dict[int, str | None] = {}
+        self._fuzzy: Tuple[fuzzy_index.FuzzyIndex, Dict[str, int]] | None = None
+        self._key: tuple | None = None
+        self._stamp = 0.0
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._interval = 0.0
+        self._last_use = time.monotonic()
+        self.refreshes = 0
+
+    # ----- snapshot -----
+    def _enumerate(self) -> List[Tuple[str, int | None, object]]:
+        if self.backend is not None:
+            return _pygetwindow_windows(self.backend)
+        if platform.system() != "Windows":
+            return _wmctrl_windows()
+        return []
+
+    def refresh(self) -> Tuple[WindowInfo, ...]:
+        """Enumerate windows now and rebuild the index if anything changed."""
+        try:
+            raw = self._enumerate()
+        except Exception as e:
+            log_error(f"[{MODULE_NAME}] enumeration failed: {e}")
+            raw = []
+        # pygetwindow returns new wrapper objects each time; compare handles
+        key = tuple((title, pid, getattr(win, "_hWnd", None)) for title, pid, win in raw)
+        with self._lock:
+            self.refreshes += 1
+            self._stamp = time.monotonic()
+            if key == self._key:
+                return self._windows
+            live = {pid for _, pid, _ in raw if pid}
+            self._names = {pid: n for pid, n in self._names.items() if pid in live}
+        for pid in live:
+            if pid not in self._names:
+                self._names[pid] = _process_name(pid)
+        windows = tuple(
+            WindowInfo(title, pid, self._names.get(pid) if pid else None, win)
+            for title, pid, win in raw
+        )
+        lowered = tuple(w.title.lower() for w in windows)
+        index: Dict[str, List[int]] = {}
+        for i, title in enumerate(lowered):
+            for gram in trigrams(title):
+                index.setdefault(gram, []).append(i)
+        with self._lock:
+            self._windows, self._lowered, self._index, self._key = windows, lowered, index, key
+            self._fuzzy = None
+        return windows
+
+    def invalidate(self) -> None:
+        """Force the next lookup to re-enumerate, e.g. after closing a window."""
+        with self._lock:
+            self._stamp = 0.0
+
+    def windows(self, max_age: float | None = None) -> Tuple[WindowInfo, ...]:
+        """Return the snapshot, refreshing it when older than ``max_age``."""
+        self._last_use = time.monotonic()
+        if self._interval and not self._threads:
+            self.start(self._interval)
+        max_age = self.ttl if max_age is None else max_age
+        if time.monotonic() - self._stamp > max_age:
+            return self.refresh()
+        return self._windows
+
+    def titles(self, max_age: float | None = None) -> List[str]:
+        return [w.title for w in self.windows(max_age)]
+
+    def find(self, partial_title: str, max_age: float | None = None) -> List[WindowInfo]:
+        """Return windows whose title contains ``partial_title`` (case-insensitive).
+
+        A miss on a cached snapshot re-enumerates once, so a window opened a
+        moment ago is still found.
+        """
+        stale = time.monotonic() - self._stamp > (self.ttl if max_age is None else max_age)
+        self.windows(max_age)
+        found = self._lookup(partial_title.lower())
+        if not found and not stale:
+            self.refresh()
+            found = self._lookup(partial_title.lower())
+        return found
+
+    def _lookup(self, needle: str) -> List[WindowInfo]:
+        with self._lock:
+            windows, lowered, index = self._windows, self._lowered, self._index
+        if len(needle) < 3:
+            candidates = range(len(windows))
+        else:
+            postings = sorted((index.get(g, []) for g in trigrams(needle)), key=len)
+            if not postings[0]:
+                return []
+            candidates = set(postings[0])
+            for posting in postings[1:]:
+                candidates.intersection_update(posting)
+                if not candidates:
+                    return []
+            candidates = sorted(candidates)
+        return [windows[i] for i in candidates if needle in lowered[i]]
+
+    def closest(self, name: str, cutoff: float = fuzzy_index.CUTOFF) -> WindowInfo | None:
+        """Return the window whose title, or a part of it, best resembles ``name``.
+
+        Used when :meth:`find` has no substring match, e.g. for "notpad".
+        The fuzzy index is built on first use after each snapshot change.
+        """
+        self.windows()
+        with self._lock:
+            windows, lowered, fuzzy = self._windows, self._lowered, self._fuzzy
+        if fuzzy is None:
+            owners: Dict[str, int] = {}
+            for i, title in enumerate(lowered):
+                owners.setdefault(title, i)
+                for part in _TITLE_PARTS.split(title):
+                    if len(part) >= 3:
+                        owners.setdefault(part, i)
+            fuzzy = (fuzzy_index.FuzzyIndex(owners), owners)
+            with self._lock:
+                if self._windows is windows:
+                    self._fuzzy = fuzzy
+        best = fuzzy[0].best(name, cutoff)
+        return windows[fuzzy[1][best]] if best is not None else None
+
+    # ----- background refresh -----
+    def start(self, interval: float = POLL_INTERVAL) -> None:
+        """Start the background poller (and the X11 watcher when available).
+
+        They run while the inventory is in use and stop after ``IDLE_STOP``
+        seconds without a lookup; the next lookup starts them again.
+        """
+        with self._lock:
+            self._interval = interval
+            if self._threads:
+                return
+            # A fresh event per run, so threads of a stopped run cannot revive
+            self._stop = stop = threading.Event()
+            threads = []
+            if platform.system() == "Linux" and os.environ.get("DISPLAY"):
+                threads.append(threading.Thread(target=self._watch_x11, args=(stop,), daemon=True))
+            threads.append(threading.Thread(target=self._poll, args=(interval, stop), daemon=True))
+            self._threads = threads
+        for thread in threads:
+            thread.start()
+
+    def stop(self) -> None:
+        """Stop background refresh until :meth:`start` is called again."""
+        with self._lock:
+            self._interval = 0.0
+            self._halt_locked(self._stop)
+
+    def _halt_locked(self, stop: threading.Event) -> None:
+        stop.set()
+        if stop is self._stop:
+            self._threads = []
+
+    def _poll(self, interval: float, stop: threading.Event) -> None:
+        while not stop.is_set():
+            if time.monotonic() - self._last_use > IDLE_STOP:
+                with self._lock:
+                    self._halt_locked(stop)
+                return
+            self.refresh()
+            threads = self._threads
+            watching = len(threads) > 1 and threads[0].is_alive()
+            stop.wait(interval * (EVENT_POLL_FACTOR if watching else 1))
+
+    def _watch_x11(self, stop: threading.Event) -> None:
+        try:
+            from Xlib import X, display
+        except Exception:
+            return
+        disp = None
+        try:
+            disp = display.Display()
+            root = disp.screen().root
+            client_list = disp.intern_atom("_NET_CLIENT_LIST")
+            root.change_attributes(event_mask=X.PropertyChangeMask)
+            # Let the poller keep the titles fresh while windows open and close
+            self.ttl = max(self.ttl, POLL_INTERVAL * EVENT_POLL_FACTOR)
+            while not stop.is_set():
+                # next_event() blocks forever; wait on the socket so stop() is seen
+                if not disp.pending_events():
+                    select.select([disp], [], [], WATCH_TIMEOUT)
+                    continue
+                event = disp.next_event()
+                if event.type == X.PropertyNotify and event.atom == client_list:
+                    self.refresh()
+        except Exception as e:  # pragma: no cover - X server specific
+            log_error(f"[{MODULE_NAME}] X11 watcher stopped: {e}")
+        finally:
+            if disp is not None:
+                disp.close()
+
+
+_inventory: WindowInventory | None = None
+_inventory_lock = threading.Lock()
+
+
+def get_inventory(backend=None) -> WindowInventory:
+    """Return the shared inventory for ``backend`` (default ``pygetwindow``).
+
+    Passing a different backend object (a window module stub, for example)
+    replaces the shared inventory.
+    """
+    global _inventory
+    backend = gw if backend is None else backend
+    with _inventory_lock:
+        if _inventory is None or _inventory.backend is not backend:
+            if _inventory is not None:
+                _inventory.stop()
+            cfg = get_config_service()
+            _inventory = WindowInventory(backend, ttl=cfg.get_float("window_cache_ttl", CACHE_TTL))
+            interval = cfg.get_float("window_poll_interval", POLL_INTERVAL)
+            if interval > 0 and backend is gw:
+                _inventory.start(interval)
+        return _inventory
+
+
+def find(partial_title: str) -> List[WindowInfo]:
+    """Shortcut for ``get_inventory().find(partial_title)``."""
+    return get_inventory().find(partial_title)
+
+
+def closest(name: str) -> WindowInfo | None:
+    """Shortcut for ``get_inventory().closest(name)``."""
+    return get_inventory().closest(name)
+
+
+def titles() -> List[str]:
+    """Shortcut for ``get_inventory().titles()``."""
+    return get_inventory().titles()
+
+
+def get_description() -> str:
+    """Return a short summary of this module."""
+    return "Keeps a cached, indexed list of open windows for fast title lookups."
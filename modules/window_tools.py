@@ -11,13 +11,13 @@ except Exception as e:  # pragma: no cover - optional dependency
     _PYAUTOGUI_ERROR = e
 else:
     _PYAUTOGUI_ERROR = None
-import time
 import os
 import platform
 import subprocess
 import ctypes
 from ctypes import wintypes
-from modules import vision_tools
+from modules import screen_capture, template_matcher, vision_tools, window_inventory
+from modules.wait_utils import focus_timeout, wait_until
 
 __all__ = [
     "focus_window",
@@ -56,31 +56,28 @@ def _windows_fallback() -> list[str]:
     return titles
 
 
-def _wmctrl_fallback() -> list[str]:
-    """Fallback window title listing using the ``wmctrl`` CLI."""
-    try:
-        output = subprocess.check_output(["wmctrl", "-lp"], text=True)
-    except Exception:
-        return []
-    titles = []
-    for line in output.splitlines():
-        parts = line.split(None, 3)
-        if len(parts) >= 4:
-            title = parts[3].strip()
-            if title:
-                titles.append(title)
-    return titles
+def _find(partial_title: str) -> list:
+    """Return cached inventory entries whose title contains ``partial_title``."""
+    return window_inventory.get_inventory(gw).find(partial_title)
+
+
+def _window(info):
+    """Return the ``pygetwindow`` object behind an inventory entry."""
+    if info.window is not None:
+        return info.window
+    return gw.getWindowsWithTitle(info.title)[0]
 
 
 def list_open_windows() -> list[str]:
     """Return titles of currently open windows."""
     if gw is not None and not _IMPORT_ERROR:
-        return [w for w in gw.getAllTitles() if w.strip()]
+        return window_inventory.get_inventory(gw).titles()
 
     system = platform.system()
     if system == "Windows":
         return _windows_fallback()
-    return _wmctrl_fallback()
+    # Served from the inventory's ``wmctrl -lp`` snapshot
+    return window_inventory.get_inventory(None).titles()
 
 
 def list_taskbar_windows():
@@ -94,17 +91,18 @@ def close_taskbar_item(index: int):
         return False, f"Invalid window index: {index}"
     if gw is None or _IMPORT_ERROR:
         return False, f"pygetwindow not available: {_IMPORT_ERROR}" if _IMPORT_ERROR else "pygetwindow not available"
-    windows = [w for w in gw.getAllWindows() if w.title.strip()]
+    inventory = window_inventory.get_inventory(gw)
+    windows = inventory.windows()
     if index >= len(windows):
         return False, f"Invalid window index: {index}"
-    win = windows[index]
+    win = _window(windows[index])
+    inventory.invalidate()
 
     # 1) Native close()
     try:
         win.activate()
         win.close()
-        time.sleep(0.5)
-        if win not in gw.getAllWindows():
+        if wait_until(lambda: window_inventory.is_gone(gw, win)):
             return True, f"Closed window '{win.title}'"
     except Exception:
         pass
@@ -113,8 +111,7 @@ def close_taskbar_item(index: int):
     try:
         win.activate()
         pyautogui.hotkey('alt', 'f4')
-        time.sleep(0.5)
-        if win not in gw.getAllWindows():
+        if wait_until(lambda: window_inventory.is_gone(gw, win)):
             return True, f"Closed via Alt+F4 '{win.title}'"
     except Exception:
         pass
@@ -137,13 +134,14 @@ def focus_window(partial_title):
     """Bring the first window matching ``partial_title`` to the front."""
     if _IMPORT_ERROR:
         return False, f"pygetwindow not available: {_IMPORT_ERROR}"
-    matches = [w for w in gw.getAllTitles() if partial_title.lower() in w.lower()]
+    matches = _find(partial_title)
     if not matches:
         return False, f"No window found containing '{partial_title}'"
-    win = gw.getWindowsWithTitle(matches[0])[0]
+    win = _window(matches[0])
     win.activate()
-    time.sleep(0.5)
-    return True, f"Activated window: {matches[0]}"
+    if not wait_until(lambda: window_inventory.is_active(gw, win), timeout=focus_timeout()):
+        return False, f"Window '{matches[0].title}' did not come to the front"
+    return True, f"Activated window: {matches[0].title}"
 
 def move_window(title, x, y):
     """Move the first window matching title to (x, y)."""
@@ -180,48 +178,62 @@ def minimize_window(partial_title: str):
     """Minimize the first window containing ``partial_title`` in its title."""
     if _IMPORT_ERROR:
         return False, f"pygetwindow not available: {_IMPORT_ERROR}"
-    matches = [w for w in gw.getAllTitles() if partial_title.lower() in w.lower()]
+    matches = _find(partial_title)
     if not matches:
         return False, f"No window found containing '{partial_title}'"
-    win = gw.getWindowsWithTitle(matches[0])[0]
+    title = matches[0].title
+    win = _window(matches[0])
     try:
         win.minimize()
-        return True, f"Minimized window: {matches[0]}"
+        return True, f"Minimized window: {title}"
     except Exception as e:  # pragma: no cover - OS specific
-        return False, f"Failed to minimize '{matches[0]}': {e}"
+        return False, f"Failed to minimize '{title}': {e}"
 
 def type_in_window(partial_title: str, text: str) -> tuple[bool, str]:
     """Focus ``partial_title`` window and type ``text`` into it."""
     if _IMPORT_ERROR or _PYAUTOGUI_ERROR:
         return False, "pygetwindow or pyautogui not available"
-    matches = [w for w in gw.getAllTitles() if partial_title.lower() in w.lower()]
+    matches = _find(partial_title)
     if not matches:
         return False, f"No window found containing '{partial_title}'"
-    win = gw.getWindowsWithTitle(matches[0])[0]
+    title = matches[0].title
+    win = _window(matches[0])
     try:
         win.activate()
-        time.sleep(0.5)
+        active = wait_until(lambda: window_inventory.is_active(gw, win), timeout=focus_timeout())
     except Exception:
-        pass
+        active = False
+    if not active:
+        # Typing now would send the text to whichever window has focus
+        return False, f"Could not focus '{title}' to type into it"
     try:
         pyautogui.write(text, interval=0.05)
-        return True, f"Typed text into '{matches[0]}'"
+        return True, f"Typed text into '{title}'"
     except Exception as e:  # pragma: no cover - pyautogui failures
-        return False, f"Failed to type in '{matches[0]}': {e}"
+        return False, f"Failed to type in '{title}': {e}"
 
 def list_windows():
     """Alias for list_open_windows for API consistency."""
     return list_open_windows()
 
 def click_ui_element(image_path, confidence=0.8):
-    """Try to locate and click a UI element; if not found, prompt to learn."""
+    """Try to locate and click a UI element; if not found, prompt to learn.
+
+    ``image_path`` may be a list of candidate templates; they are all matched
+    against a single screen capture and the best hit is clicked.
+    """
     if _PYAUTOGUI_ERROR:
         return False, f"pyautogui not available: {_PYAUTOGUI_ERROR}"
-    loc = pyautogui.locateCenterOnScreen(image_path, confidence=confidence)
-    if loc:
-        pyautogui.click(loc)
-        return True, f"Clicked '{image_path}'"
-    return False, f"Could not find '{image_path}' on screen"
+    paths = [image_path] if isinstance(image_path, str) else list(image_path)
+    try:
+        found = template_matcher.get_matcher().best(paths, confidence=confidence)
+    except Exception as e:  # pragma: no cover - cv2/capture failures
+        return False, f"Template matching failed: {e}"
+    if found:
+        pyautogui.click(*found.center)
+        screen_capture.get_capture().invalidate()
+        return True, f"Clicked '{found.path}'"
+    return False, f"Could not find '{', '.join(paths)}' on screen"
 
 def learn_new_button(app, action, speak):
     """Interactive: prompts user to capture a button template."""
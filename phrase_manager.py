@@ -1,48 +1,29 @@
-import json
 from typing import Any
+from config_service import get_config_service, update_config
 from error_logger import log_error
+from modules import phrase_matcher
 
 CONFIG_PATH = "config.json"
 MODULE_NAME = "phrase_manager"
 
 
-def _load_all() -> dict:
-    try:
-        with open(CONFIG_PATH, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception as e:  # pragma: no cover - I/O error
-        log_error(f"[{MODULE_NAME}] Could not load config: {e}")
-        return {}
-
-
-def _save_all(cfg: dict) -> bool:
-    try:
-        with open(CONFIG_PATH, "w", encoding="utf-8") as f:
-            json.dump(cfg, f, indent=2)
-        return True
-    except Exception as e:  # pragma: no cover - I/O error
-        log_error(f"[{MODULE_NAME}] Could not update config: {e}")
-        return False
-
-
-config = _load_all()
+config = get_config_service(CONFIG_PATH).config
 
 
 def _add_phrase(key: str, phrase: str) -> str:
     phrase = phrase.lower().strip()
-    cfg_list = config.setdefault(key, [])
-    if not phrase or phrase in cfg_list:
+    phrases = list(config.get(key, []))
+    if not phrase or phrase in phrases:
         return "Phrase already known"
-    cfg_list.append(phrase)
-    all_cfg = _load_all() or {}
-    all_cfg.setdefault(key, [])
-    if phrase not in all_cfg[key]:
-        all_cfg[key].append(phrase)
-    if _save_all(all_cfg):
-        config[key] = all_cfg[key]
-        return f"Added {key[:-8] if key.endswith('_phrases') else key} phrase: {phrase}"
-    cfg_list.pop()
-    return "Failed to update config"
+    phrases.append(phrase)
+    try:
+        update_config({key: phrases}, path=CONFIG_PATH)
+    except Exception as e:  # pragma: no cover - I/O error
+        log_error(f"[{MODULE_NAME}] Could not update config: {e}")
+        return "Failed to update config"
+    config[key] = phrases
+    phrase_matcher.invalidate()
+    return f"Added {key[:-8] if key.endswith('_phrases') else key} phrase: {phrase}"
 
 
 def add_wake_phrase(phrase: str) -> str:
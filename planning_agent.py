@@ -8,6 +8,8 @@ without heavy dependencies.
 
 from typing import List, Callable
 
+from modules import step_graph
+
 
 def create_plan(task: str) -> List[str]:
     """Return ``task`` as a single-item plan."""
@@ -15,7 +17,15 @@ def create_plan(task: str) -> List[str]:
     return [text] if text else []
 
 
-def assign_tasks(plan: List[str], dispatch_func: Callable[[str], None]) -> None:
-    """Send each item of ``plan`` to ``dispatch_func`` in order."""
-    for sub in plan:
-        dispatch_func(sub)
+def assign_tasks(
+    plan: List[str],
+    dispatch_func: Callable[[str], None],
+    on_progress: Callable | None = None,
+    cancel=None,
+) -> None:
+    """Send each item of ``plan`` to ``dispatch_func``.
+
+    Subtasks run in plan order unless :func:`step_graph.infer_resources`
+    shows they cannot interfere, in which case they run concurrently.
+    """
+    step_graph.run_commands(plan, dispatch_func, on_progress=on_progress, cancel=cancel)
@@ -1,7 +1,8 @@
 import json
 import os
-from config_loader import ConfigLoader
+from config_service import get_config_service
 from error_logger import log_error
+from modules import phrase_matcher
 
 STATE_FILE = "assistant_state.json"
 ACTIONS_FILE = "learned_actions.json"
@@ -13,7 +14,7 @@ state = _DEFAULT_STATE.copy()
 actions = _default_actions.copy()
 
 # Load configuration for phrase persistence
-_config_loader = ConfigLoader()
+_config_loader = get_config_service()
 
 def load_state():
     global state
@@ -91,15 +92,12 @@ def clear_actions() -> None:
 
 def _update_config_phrase(key: str, phrase: str) -> None:
     """Ensure ``phrase`` is stored under ``key`` in the config file."""
-    cfg = _config_loader.config
-    phrases = cfg.setdefault(key, [])
+    phrases = list(_config_loader.config.get(key, []))
     phrase = phrase.lower().strip()
     if phrase and phrase not in phrases:
         phrases.append(phrase)
         try:
-            with open(_config_loader.path, "w", encoding="utf-8") as f:
-                json.dump(cfg, f, indent=2)
-            _config_loader.last_modified = os.path.getmtime(_config_loader.path)
+            _config_loader.update({key: phrases})
         except Exception as e:  # pragma: no cover - file I/O error
             log_error(f"[state_manager] Could not update config: {e}")
 
@@ -117,6 +115,7 @@ def add_resume_phrase(phrase: str) -> str:
         phrases.append(phrase)
         save_state()
         _update_config_phrase("resume_phrases", phrase)
+        phrase_matcher.invalidate()
         return f"Learned resume phrase: {phrase}"
     return "Phrase already known"
 
@@ -10,7 +10,7 @@ def setup_api(monkeypatch, tmp_path: Path):
     cfg_path.write_text(json.dumps(cfg))
     api = importlib.import_module("modules.api_keys")
     importlib.reload(api)
-    monkeypatch.setattr(api, "_config_loader", api.ConfigLoader(str(cfg_path)), raising=False)
+    monkeypatch.setattr(api, "_config_loader", api.get_config_service(str(cfg_path)), raising=False)
     api._config = api._config_loader.config
     return api, cfg_path
 
@@ -25,6 +25,7 @@ def test_apply_keys(monkeypatch, tmp_path):
 def test_save_keys(monkeypatch, tmp_path):
     api, cfg_path = setup_api(monkeypatch, tmp_path)
     api.save_api_keys({"google": "ghi"})
+    api._config_loader.flush()
     saved = json.loads(cfg_path.read_text())
     assert saved["api_keys"]["google"] == "ghi"
     assert os.environ.get("GOOGLE_API_KEY") == "ghi"
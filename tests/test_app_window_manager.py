@@ -4,20 +4,21 @@ import types
 
 def test_get_open_windows(monkeypatch):
     mod = importlib.import_module('modules.app_window_manager')
+    inventory = importlib.import_module('modules.window_inventory')
     win_obj = types.SimpleNamespace(title='Demo', _hWnd=1)
     mock_gw = types.SimpleNamespace(getAllWindows=lambda: [win_obj], getAllTitles=lambda: ['Demo'])
     monkeypatch.setattr(mod, 'gw', mock_gw)
     monkeypatch.setattr(mod, '_GW_ERROR', None)
     monkeypatch.setattr(mod.os, 'name', 'nt', raising=False)
     monkeypatch.setattr(
-        mod,
+        inventory,
         'win32process',
         types.SimpleNamespace(GetWindowThreadProcessId=lambda h: (1, 123)),
     )
     proc_mod = types.SimpleNamespace(
         Process=lambda pid: types.SimpleNamespace(name=lambda: 'demo.exe')
     )
-    monkeypatch.setattr(mod, 'psutil', proc_mod)
+    monkeypatch.setattr(inventory, 'psutil', proc_mod)
 
     windows = mod.get_open_windows()
     assert windows == [{'title': 'Demo', 'process': 'demo.exe'}]
@@ -39,12 +40,17 @@ def test_close_window(monkeypatch):
     mock_gw = types.SimpleNamespace(
         getAllTitles=lambda: ['Test App'],
         getWindowsWithTitle=lambda t: [w],
-        getAllWindows=lambda: []
+        getAllWindows=lambda: [] if w.closed else [w]
     )
     monkeypatch.setattr(mod, 'gw', mock_gw)
     monkeypatch.setattr(mod, '_GW_ERROR', None)
     monkeypatch.setattr(mod, 'pyautogui', types.SimpleNamespace(hotkey=lambda *a: None))
 
+    # A misspelt title is not fuzzily matched for a destructive action
+    ok, msg = mod.close_window('tset app')
+    assert not ok and not w.closed
+    assert mod._matching_titles('tset app', fuzzy=True) == ['Test App']
+
     ok, msg = mod.close_window('test app')
     assert ok
     assert w.closed
@@ -0,0 +1,166 @@
+import importlib
+import sys
+import threading
+import time
+import types
+
+from modules import audio_output
+
+
+def stub_sounddevice(monkeypatch, realtime=False):
+    writes = []
+    streams = []
+
+    class DummyStream:
+        def __init__(self, samplerate=None, **kwargs):
+            self.rate = samplerate
+            self.aborted = False
+            streams.append(self)
+
+        def start(self):
+            pass
+
+        def write(self, data):
+            writes.append(list(data))
+            if realtime:
+                time.sleep(len(data) / self.rate)
+
+        def stop(self):
+            pass
+
+        def abort(self):
+            self.aborted = True
+
+        def close(self):
+            pass
+
+    sd_stub = types.ModuleType("sounddevice")
+    sd_stub.OutputStream = DummyStream
+    monkeypatch.setitem(sys.modules, "sounddevice", sd_stub)
+    return writes, streams
+
+
+def test_priority_order_and_stream_reuse(monkeypatch):
+    writes, streams = stub_sounddevice(monkeypatch)
+    out = audio_output.AudioOutput()
+    gate = threading.Event()
+    started = threading.Event()
+
+    def blocked():
+        started.set()
+        gate.wait(2)
+        yield [0.0]
+
+    out.submit(blocked(), 100)
+    assert started.wait(2)
+    out.submit([[2.0]], 100, priority=audio_output.PRIORITY_LOW)
+    last = out.submit([[1.0]], 100, priority=audio_output.PRIORITY_HIGH)
+    gate.set()
+    assert last.wait(2)
+    assert out.wait_idle(2)
+
+    assert writes == [[0.0], [1.0], [2.0]]
+    assert len(streams) == 1  # same rate reuses the open stream
+    assert out.is_speaking() is False
+
+
+def test_stop_barges_in_quickly(monkeypatch):
+    writes, streams = stub_sounddevice(monkeypatch, realtime=True)
+    out = audio_output.AudioOutput(block_frames=200)
+    done = []
+    long_clip = out.submit([[0.1] * 16000 * 5], 16000, on_complete=lambda: done.append(1))
+    queued = out.submit([[0.2] * 10], 16000)
+
+    deadline = time.time() + 2
+    while not out.is_speaking() and time.time() < deadline:
+        time.sleep(0.005)
+    assert out.is_speaking()
+
+    start = time.perf_counter()
+    out.stop()
+    assert long_clip.wait(1)
+    assert time.perf_counter() - start < 0.05
+    assert queued.done.is_set() and queued.cancelled.is_set()
+    assert done == [1]
+    assert streams[0].aborted
+    assert out.wait_idle(1)
+    assert out.is_speaking() is False
+
+
+def test_interrupt_keeps_higher_priority(monkeypatch):
+    stub_sounddevice(monkeypatch)
+    out = audio_output.AudioOutput()
+    gate = threading.Event()
+    started = threading.Event()
+
+    def blocked():
+        started.set()
+        gate.wait(2)
+        yield [0.0]
+
+    current = out.submit(blocked(), 100)
+    assert started.wait(2)
+    urgent = out.submit([[1.0]], 100, priority=audio_output.PRIORITY_HIGH)
+    normal = out.submit([[2.0]], 100)
+    out.submit([[3.0]], 100, interrupt=True)
+    gate.set()
+    assert out.wait_idle(2)
+
+    assert current.cancelled.is_set()
+    assert normal.cancelled.is_set()
+    assert not urgent.cancelled.is_set()
+
+
+def test_manager_routes_state_to_active_backend(monkeypatch):
+    mgr = importlib.import_module("modules.tts_manager")
+    stopped = []
+    gtts = types.SimpleNamespace(
+        speak=lambda text, **kw: "gtts",
+        is_speaking=lambda: True,
+        stop_speech=lambda: stopped.append("gtts"),
+    )
+    coqui = types.SimpleNamespace(
+        speak=lambda text, **kw: "coqui",
+        is_speaking=lambda: False,
+        stop_speech=lambda: stopped.append("coqui"),
+    )
+    monkeypatch.setitem(sys.modules, "modules.gtts_tts", gtts)
+    monkeypatch.setitem(sys.modules, "modules.tts_integration", coqui)
+    monkeypatch.setattr(mgr, "BACKEND", "gtts")
+
+    assert mgr.is_speaking() is True
+    mgr.stop_speech()
+    assert stopped == ["gtts"]
+
+
+def test_on_idle_fires_when_queue_drains(monkeypatch):
+    stub_sounddevice(monkeypatch)
+    out = audio_output.AudioOutput()
+    calls = []
+    out.on_idle(lambda: calls.append("now"))
+    assert calls == ["now"]
+
+    gate = threading.Event()
+
+    def blocked():
+        gate.wait(2)
+        yield [0.0]
+
+    out.submit(blocked(), 100)
+    fired = threading.Event()
+    out.on_idle(fired.set)
+    assert not fired.wait(0.05)
+    gate.set()
+    assert fired.wait(2)
+
+
+def test_on_idle_fires_when_queued_speech_is_dropped(monkeypatch):
+    stub_sounddevice(monkeypatch)
+    out = audio_output.AudioOutput()
+    fired = threading.Event()
+    # Drop the utterance before the worker can pop it
+    with out._cond:
+        out.submit([[1.0]], 100)
+        out.on_idle(fired.set)
+        out.stop()
+    assert fired.wait(2)
@@ -0,0 +1,119 @@
+import threading
+import time
+
+from modules import command_scheduler as cs
+
+
+def test_priority_order_and_hold():
+    sched = cs.CommandScheduler(workers=2)
+    order = []
+    sched.hold()
+    sched.submit(order.append, "low", priority=cs.PRIORITY_LOW)
+    sched.submit(order.append, "normal")
+    sched.submit(order.append, "high", priority=cs.PRIORITY_HIGH)
+    sched.submit(order.append, "normal2")
+    time.sleep(0.05)
+    assert order == []
+    assert sched.depth() == 4
+    sched.release()
+    assert sched.wait_idle(2)
+    assert order == ["high", "normal", "normal2", "low"]
+    stats = sched.stats()
+    assert stats["done"] == 4 and stats["depth"] == 0 and stats["max_depth"] == 4
+    sched.close()
+
+
+def test_timeout_releases_slot_and_sets_token():
+    sched = cs.CommandScheduler(workers=2)
+    gate = threading.Event()
+    timed_out = []
+    seen = {}
+
+    def stuck():
+        seen["ticket"] = cs.current()
+        gate.wait(2)
+
+    slow = sched.submit(stuck, timeout=0.05, on_timeout=timed_out.append)
+    quick = sched.submit(lambda: "next", timeout=0)
+    assert quick.wait(1)
+    assert quick.result == "next"
+    assert slow.state == cs.TIMED_OUT and slow.token.reason == cs.TIMED_OUT
+    assert timed_out == [slow] and seen["ticket"] is slow
+    gate.set()
+    assert sched.stats()["timed_out"] == 1
+    sched.close()
+
+
+def test_ttl_expiry_and_cancel():
+    sched = cs.CommandScheduler(workers=1)
+    gate = threading.Event()
+    running = sched.submit(gate.wait, 2)
+    stale = sched.submit(lambda: "late", ttl=0.05)
+    dropped = sched.submit(lambda: "never")
+    assert stale.wait(1) and stale.state == cs.EXPIRED
+    assert dropped.cancel() and dropped.state == cs.CANCELLED
+    assert sched.cancel_all() == 1
+    assert running.token.is_set() and running.state == cs.CANCELLED
+    gate.set()
+    assert sched.wait_idle(1)
+    sched.close()
+
+
+def test_failure_is_recorded(monkeypatch):
+    monkeypatch.setattr(cs, "log_error", lambda msg: None)
+    sched = cs.CommandScheduler(workers=1)
+
+    def boom():
+        raise ValueError("bad")
+
+    ticket = sched.submit(boom)
+    assert ticket.wait(1)
+    assert ticket.state == cs.FAILED and isinstance(ticket.error, ValueError)
+    assert sched.stats()["failed"] == 1
+    sched.close()
+
+
+def test_hold_timeout_resumes_queue(monkeypatch):
+    monkeypatch.setattr(cs, "log_error", lambda msg: None)
+    sched = cs.CommandScheduler(workers=1)
+    stale = sched.hold(timeout=0.05)
+    ticket = sched.submit(lambda: "ran")
+    assert ticket.wait(1) and ticket.result == "ran"
+    assert not sched.held
+    # A late release of the expired hold does not lift a newer one
+    newer = sched.hold()
+    sched.release(stale)
+    assert sched.held
+    sched.release(newer)
+    sched.close()
+
+
+def test_stuck_commands_do_not_starve_the_pool(monkeypatch):
+    monkeypatch.setattr(cs, "log_error", lambda msg: None)
+    sched = cs.CommandScheduler(workers=1)
+    gate = threading.Event()
+    stuck = [sched.submit(gate.wait, 5, timeout=0.05) for _ in range(2)]
+    later = sched.submit(lambda: "ran", timeout=0)
+    assert later.wait(2) and later.result == "ran"
+    assert all(t.state == cs.TIMED_OUT for t in stuck)
+    gate.set()
+    deadline = time.time() + 2
+    while sched._abandoned and time.time() < deadline:
+        time.sleep(0.01)
+    # Stuck threads exit once their command returns
+    assert sched._abandoned == 0
+    assert sum(t.name != "command_scheduler-watchdog" for t in sched._threads) == 1
+    sched.close()
+
+
+def test_command_returning_during_timeout_callback_keeps_its_worker(monkeypatch):
+    monkeypatch.setattr(cs, "log_error", lambda msg: None)
+    sched = cs.CommandScheduler(workers=2)
+    # The command returns while the slow ``on_timeout`` is still running
+    ticket = sched.submit(time.sleep, 0.15, timeout=0.05, on_timeout=lambda t: time.sleep(0.3))
+    assert ticket.wait(2) and ticket.state == cs.TIMED_OUT
+    assert sched._abandoned == 0
+    assert sum(t.name != "command_scheduler-watchdog" for t in sched._threads) == 2
+    later = sched.submit(lambda: "ran", timeout=0)
+    assert later.wait(1) and later.result == "ran"
+    sched.close()
@@ -1,6 +1,10 @@
 import importlib
+import queue
+import threading
 import time
 
+import pytest
+
 ct = importlib.import_module("modules.concurrent_tasks")
 
 
@@ -24,3 +28,96 @@ def test_run_tasks_accepts_plain_callables():
         return "hi"
 
     assert ct.run_tasks([hello]) == ["hi"]
+
+
+def square(x):
+    return x * x
+
+
+def test_failed_task_keeps_other_results(monkeypatch):
+    monkeypatch.setattr(ct, "log_error", lambda msg: None)
+
+    def boom():
+        raise ValueError("bad")
+
+    assert ct.run_tasks([lambda: 1, boom, lambda: 3]) == [1, None, 3]
+    results = ct.run_tasks([lambda: 1, boom], return_exceptions=True)
+    assert results[0] == 1 and isinstance(results[1], ValueError)
+
+
+def test_task_kwargs_named_like_submit_options_pass_through():
+    def echo(x, wait=False, block=False):
+        return (x, wait, block)
+
+    tasks = [(echo, (1,), {"wait": True}), (echo, (2,), {"block": True})]
+    assert ct.run_tasks(tasks, return_exceptions=True) == [(1, True, False), (2, False, True)]
+
+
+def test_as_completed_streams_in_finish_order():
+    service = ct.TaskService(max_workers=3)
+    tasks = [(time.sleep, (d,), {}) for d in (0.3, 0.05, 0.15)]
+    start = time.time()
+    first = next(service.as_completed(tasks))
+    assert first.index == 1 and first.ok
+    assert time.time() - start < 0.25
+    service.shutdown()
+
+
+def test_timeout_and_cancel():
+    service = ct.TaskService(max_workers=2)
+    tasks = [(time.sleep, (0.5,), {}), (square, (3,), {})]
+    results = {r.index: r for r in service.as_completed(tasks, timeout=0.1)}
+    assert results[1].value == 9
+    assert results[0].state == ct.TIMEOUT and isinstance(results[0].error, TimeoutError)
+
+    cancel = threading.Event()
+    cancel.set()
+    assert ct.run_tasks([lambda: 1], cancel=cancel) == [None]
+    stats = service.stats()
+    assert stats["timeout"] == 1 and stats["done"] == 1
+    service.shutdown()
+
+
+def test_timed_out_tasks_do_not_starve_later_ones(monkeypatch):
+    monkeypatch.setattr(ct, "log_error", lambda msg: None)
+    service = ct.TaskService(max_workers=2)
+    gate = threading.Event()
+    stuck = [(gate.wait, (2,), {}), (gate.wait, (2,), {})]
+    assert [r.state for r in service.as_completed(stuck, timeout=0.1)] == [ct.TIMEOUT] * 2
+    start = time.time()
+    results = list(service.as_completed([(abs, (-1,), {})], timeout=0.5))
+    assert results[0].ok and results[0].value == 1
+    assert time.time() - start < 0.5
+    gate.set()
+    time.sleep(0.1)
+    stats = service.stats()
+    assert stats["timeout"] == 2 and stats["done"] == 1 and stats["in_flight"] == 0
+    service.shutdown()
+
+
+def test_timeout_counts_from_task_start():
+    service = ct.TaskService(max_workers=1)
+    tasks = [(time.sleep, (0.15,), {}), (time.sleep, (0.15,), {})]
+    results = list(service.as_completed(tasks, timeout=0.25))
+    assert [r.state for r in results] == [ct.DONE, ct.DONE]
+    service.shutdown()
+
+
+def test_bounded_queue_applies_backpressure():
+    service = ct.TaskService(max_workers=1, max_queue=1)
+    gate = threading.Event()
+    fut = service.submit(gate.wait, (2,))
+    with pytest.raises(queue.Full):
+        service.submit(square, (2,), block=False)
+    gate.set()
+    assert fut.result(1) is True
+    assert service.submit(square, (2,), wait=1).result(1) == 4
+    assert service.stats()["in_flight"] == 0
+    service.shutdown()
+
+
+def test_process_mode_runs_picklable_tasks():
+    service = ct.TaskService(max_workers=2, mode="process")
+    results = sorted(r.value for r in service.as_completed([(square, (n,), {}) for n in range(4)]))
+    assert results == [0, 1, 4, 9]
+    service.shutdown()
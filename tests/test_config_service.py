@@ -0,0 +1,129 @@
+import json
+import os
+
+import config_service
+
+
+def make_service(tmp_path, data=None, delay=60.0):
+    cfg_path = tmp_path / "config.json"
+    cfg_path.write_text(json.dumps(data or {}))
+    writer = config_service.ConfigWriter(delay=delay)
+    return config_service.ConfigService(str(cfg_path), writer=writer), cfg_path
+
+
+def test_typed_accessors(tmp_path):
+    svc, _ = make_service(
+        tmp_path,
+        {"a": "3", "b": "yes", "c": 1.5, "d": ["x"], "e": None, "f": "bad"},
+    )
+    assert svc.get_int("a") == 3
+    assert svc.get_bool("b") is True
+    assert svc.get_float("c") == 1.5
+    assert svc.get_list("d") == ["x"]
+    assert svc.get_list("missing", ["y"]) == ["y"]
+    assert svc.get_str("e", "fallback") == "fallback"
+    assert svc.get_int("f", 7) == 7
+
+
+def test_writes_are_debounced_and_atomic(tmp_path):
+    svc, cfg_path = make_service(tmp_path, {"tts_volume": 0.5})
+    for vol in (0.6, 0.7, 0.8):
+        svc.set("tts_volume", vol)
+    # Nothing is written until the debounce window elapses or a flush happens
+    assert json.loads(cfg_path.read_text())["tts_volume"] == 0.5
+    assert svc.flush() is True
+    assert json.loads(cfg_path.read_text())["tts_volume"] == 0.8
+    leftovers = [p for p in os.listdir(tmp_path) if p.endswith(".tmp")]
+    assert leftovers == []
+
+
+def test_subscribers_fire_on_update_and_reload(tmp_path):
+    svc, cfg_path = make_service(tmp_path, {"tts_backend": "coqui", "other": 1})
+    seen = []
+    reloads = []
+    unsubscribe = svc.subscribe("tts_backend", seen.append)
+    svc.add_reload_listener(reloads.append)
+
+    svc.set("tts_backend", "gtts")
+    svc.set("other", 2)
+    assert seen == ["gtts"]
+    assert reloads == []
+
+    svc.flush()
+    cfg_path.write_text(json.dumps({"tts_backend": "huggingface", "other": 2}))
+    os.utime(cfg_path, (0, 0))
+    svc.reload_if_changed()
+    assert seen == ["gtts", "huggingface"]
+    assert reloads == [{"tts_backend": "huggingface"}]
+
+    unsubscribe()
+    svc.set("tts_backend", "coqui")
+    assert seen == ["gtts", "huggingface"]
+
+
+def test_reload_keeps_dict_identity(tmp_path):
+    svc, cfg_path = make_service(tmp_path, {"x": 1})
+    alias = svc.config
+    cfg_path.write_text(json.dumps({"x": 2}))
+    svc.reload()
+    assert alias is svc.config
+    assert alias["x"] == 2
+
+
+def test_reload_merges_pending_writes_with_external_edits(tmp_path):
+    svc, cfg_path = make_service(tmp_path, {"x": 1, "y": 1})
+    svc.set("x", 5)
+    cfg_path.write_text(json.dumps({"x": 1, "y": 2, "z": 3}))
+    os.utime(cfg_path, (0, 0))
+    svc.reload_if_changed()
+    assert svc.config == {"x": 5, "y": 2, "z": 3}
+    assert json.loads(cfg_path.read_text())["x"] == 1
+    assert svc.flush() is True
+    assert json.loads(cfg_path.read_text()) == {"x": 5, "y": 2, "z": 3}
+
+
+def test_failed_writes_are_reported(tmp_path, monkeypatch):
+    svc, cfg_path = make_service(tmp_path, {"x": 1})
+    monkeypatch.setattr(config_service, "log_error", lambda msg: None)
+
+    def fail(path, data):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(config_service, "atomic_write_json", fail)
+    svc.set("x", 2)
+    assert svc.flush() is False
+    assert isinstance(svc.write_error(), OSError)
+    monkeypatch.undo()
+    svc.set("x", 3)
+    assert svc.flush() is True
+    assert svc.write_error() is None
+
+
+def test_failed_writes_stay_pending_until_written(tmp_path, monkeypatch):
+    svc, cfg_path = make_service(tmp_path, {"x": 1, "y": 1})
+    monkeypatch.setattr(config_service, "log_error", lambda msg: None)
+
+    def fail(path, data):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(config_service, "atomic_write_json", fail)
+    svc.set("x", 2)
+    assert svc.flush() is False
+    # An external edit does not drop the unsaved value
+    cfg_path.write_text(json.dumps({"x": 1, "y": 5}))
+    os.utime(cfg_path, (0, 0))
+    svc.reload_if_changed()
+    assert svc.config == {"x": 2, "y": 5}
+    monkeypatch.undo()
+    # The failed write is retried without a new set()
+    assert svc.flush() is True
+    assert json.loads(cfg_path.read_text()) == {"x": 2, "y": 5}
+    assert svc.write_error() is None
+
+
+def test_get_config_service_is_shared(tmp_path):
+    cfg_path = tmp_path / "config.json"
+    cfg_path.write_text("{}")
+    a = config_service.get_config_service(str(cfg_path))
+    b = config_service.get_config_service(str(cfg_path))
+    assert a is b
@@ -0,0 +1,122 @@
+import os
+import stat
+import threading
+
+from modules import desktop_shortcuts, exe_index
+
+
+def make_tree(base):
+    (base / "Vendor" / "App").mkdir(parents=True)
+    (base / "Vendor" / "App" / "Editor.exe").write_text("x")
+    (base / "Vendor" / "readme.txt").write_text("x")
+    (base / "Tools").mkdir()
+    (base / "Tools" / "zip.EXE").write_text("x")
+    return [("exe", str(base))]
+
+
+def test_scan_and_incremental_refresh(tmp_path):
+    roots = make_tree(tmp_path / "pf")
+    index = exe_index.ExeIndex(path=None, workers=4)
+    found = index.exe_map(roots)
+    assert found == {
+        "editor": str(tmp_path / "pf" / "Vendor" / "App" / "Editor.exe"),
+        "zip": str(tmp_path / "pf" / "Tools" / "zip.EXE"),
+    }
+    assert index.last_stats["scanned"] == 4
+
+    index.refresh(roots)
+    assert index.last_stats["scanned"] == 0
+
+    (tmp_path / "pf" / "Tools" / "paint.exe").write_text("x")
+    os.remove(tmp_path / "pf" / "Vendor" / "App" / "Editor.exe")
+    found = index.exe_map(roots, max_age=0)
+    assert index.last_stats["scanned"] == 2
+    assert sorted(found) == ["paint", "zip"]
+
+
+def test_index_is_persisted_for_warm_start(tmp_path):
+    roots = make_tree(tmp_path / "pf")
+    db = str(tmp_path / "index.json")
+    first = exe_index.ExeIndex(path=db)
+    first.exe_map(roots)
+    first.flush()
+
+    warm = exe_index.ExeIndex(path=db)
+    assert sorted(warm.exe_map(roots)) == ["editor", "zip"]
+    assert warm.last_stats == {}  # served from disk without scanning
+
+
+def test_desktop_and_path_roots(tmp_path):
+    apps = tmp_path / "applications"
+    apps.mkdir()
+    (apps / "org.gimp.desktop").write_text(
+        "[Desktop Entry]\nType=Application\nName=GNU Image Editor\nExec=gimp\n"
+        "[Desktop Action new]\nName=New Window\n"
+    )
+    (apps / "hidden.desktop").write_text("[Desktop Entry]\nType=Application\nName=Hidden\nNoDisplay=true\n")
+    bin_dir = tmp_path / "bin"
+    (bin_dir / "nested").mkdir(parents=True)
+    tool = bin_dir / "htop"
+    tool.write_text("#!/bin/sh\n")
+    tool.chmod(tool.stat().st_mode | stat.S_IXUSR)
+    (bin_dir / "notes.txt").write_text("x")
+    (bin_dir / "nested" / "inner").write_text("x")
+
+    found = exe_index.ExeIndex(path=None).exe_map([("desktop", str(apps)), ("path", str(bin_dir))])
+    assert found == {
+        "gnu image editor": str(apps / "org.gimp.desktop"),
+        "htop": str(tool),
+    }
+
+
+def test_open_shortcut_reuses_map_until_desktop_changes(tmp_path, monkeypatch):
+    desktop = tmp_path / "Desktop"
+    desktop.mkdir()
+    (desktop / "Game.lnk").write_text("x")
+    builds = []
+    real_build = desktop_shortcuts.build_shortcut_map
+
+    def build(path=None, include_system=False):
+        builds.append(path)
+        return real_build(path, include_system)
+
+    monkeypatch.setattr(desktop_shortcuts, "build_shortcut_map", build)
+    monkeypatch.setattr(desktop_shortcuts, "get_desktop_path", lambda: str(desktop))
+    monkeypatch.setattr(desktop_shortcuts, "_shortcut_cache", {})
+    opened = []
+    monkeypatch.setattr(desktop_shortcuts.os, "startfile", opened.append, raising=False)
+
+    desktop_shortcuts.open_shortcut("open game")
+    desktop_shortcuts.open_shortcut("open game")
+    assert len(builds) == 1 and len(opened) == 2
+
+    (desktop / "Mail.url").write_text("x")
+    os.utime(desktop, ns=(0, os.stat(desktop).st_mtime_ns + 10**9))
+    assert "Opening Mail" in desktop_shortcuts.open_shortcut("open mail")
+    assert len(builds) == 2
+
+
+def test_save_does_not_block_lookups(tmp_path, monkeypatch):
+    roots = make_tree(tmp_path / "pf")
+    index = exe_index.ExeIndex(path=str(tmp_path / "index.json"))
+    index.exe_map(roots)
+    index.flush()
+    free = []
+    dump = exe_index.json.dump
+
+    def probe():
+        got = index._lock.acquire(timeout=1)
+        free.append(got)
+        if got:
+            index._lock.release()
+
+    def checked_dump(data, fh, **kwargs):
+        # A lookup on another thread must not wait for the file write
+        thread = threading.Thread(target=probe)
+        thread.start()
+        thread.join()
+        dump(data, fh, **kwargs)
+
+    monkeypatch.setattr(exe_index.json, "dump", checked_dump)
+    index.save()
+    assert free == [True]
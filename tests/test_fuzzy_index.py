@@ -0,0 +1,52 @@
+import difflib
+import importlib
+import types
+
+from modules import fuzzy_index, window_inventory
+
+
+NAMES = ["Google Chrome", "notepad", "notepad++", "calculator", "steam", "visual studio code"]
+
+
+def test_lookup_agrees_with_difflib():
+    index = fuzzy_index.FuzzyIndex(NAMES)
+    for query in ["notpad", "google chrom", "calculater", "steem", "visual studo code", "zzz"]:
+        expected = difflib.get_close_matches(query, [n.lower() for n in NAMES], n=1, cutoff=0.7)
+        found = index.best(query)
+        assert (found.lower() if found else None) == (expected[0] if expected else None)
+    assert index.best("NOTEPAD") == "notepad"
+    assert index.lookup("notepad", n=2)[1][0] == "notepad++"
+
+
+def test_index_is_built_once_per_map():
+    names = {"steam": "a", "epic": "b"}
+    assert fuzzy_index.index_for(names) is fuzzy_index.index_for(names)
+    names["origin"] = "c"
+    assert fuzzy_index.closest("orign", names) == "origin"
+    assert fuzzy_index.index_for(dict(names)) is not fuzzy_index.index_for(names)
+
+
+def test_window_closest_matches_title_parts():
+    backend = types.SimpleNamespace(
+        getAllWindows=lambda: [
+            types.SimpleNamespace(title=t, _hWnd=i)
+            for i, t in enumerate(["Untitled - Notepad", "Inbox | Mozilla Thunderbird"])
+        ]
+    )
+    inv = window_inventory.WindowInventory(backend, ttl=60)
+    assert inv.find("notpad") == []
+    assert inv.closest("notpad").title == "Untitled - Notepad"
+    assert inv.closest("thunderbrd").title == "Inbox | Mozilla Thunderbird"
+    assert inv.closest("excel") is None
+
+
+def test_install_launcher_accepts_misspelled_name(tmp_path, monkeypatch):
+    li = importlib.import_module("modules.launcher_installer")
+    monkeypatch.chdir(tmp_path)
+    li.register_launcher("battlenet", "https://example.com/battle.exe")
+    fetched = []
+    monkeypatch.setattr(li, "_download_file", lambda url, dest: fetched.append(url) or dest)
+    monkeypatch.setattr(li, "_install_file", lambda path: "installed")
+    assert li.install_launcher("batlenet", str(tmp_path)) == "installed"
+    assert fetched == ["https://example.com/battle.exe"]
+    assert li.install_launcher("uplay", str(tmp_path)) == "no launcher named uplay"
@@ -10,8 +10,8 @@ def test_save_hf_models(monkeypatch, tmp_path):
     cfg_file = tmp_path / "config.json"
     cfg_file.write_text(json.dumps(cfg))
 
-    from config_loader import ConfigLoader as CL
-    monkeypatch.setattr("config_loader.ConfigLoader", lambda path='config.json': CL(str(cfg_file)))
+    import config_service
+    monkeypatch.setattr("config_service.get_config_service", lambda path='config.json': config_service.ConfigService(str(cfg_file)))
 
     monkeypatch.setenv("PYTEST_CURRENT_TEST", "1")
     if "gui_assistant" in sys.modules:
@@ -22,6 +22,7 @@ def test_save_hf_models(monkeypatch, tmp_path):
     ga.hf_stt_var.set("stt")
     ga.save_hf_stt_model()
 
+    config_service.flush_writes()
     saved = json.loads(cfg_file.read_text())
     assert saved["hf_tts_model"] == "tts"
     assert saved["hf_stt_model"] == "stt"
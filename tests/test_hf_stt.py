@@ -0,0 +1,89 @@
+import time
+
+from modules import hf_stt
+
+
+class FakeASR:
+    """Records call arguments and pretends to decode at 10x real time."""
+
+    def __init__(self):
+        self.calls = []
+        self.model = "float"
+
+    def __call__(self, inputs, **kwargs):
+        self.calls.append((len(inputs["raw"]), inputs["sampling_rate"], kwargs))
+        time.sleep(len(inputs["raw"]) / inputs["sampling_rate"] / 10000)
+        return {"text": " hello world "}
+
+
+def stub_pipeline(monkeypatch, cfg=None):
+    loads = []
+    asr = FakeASR()
+
+    def fake_pipeline(task, model, device):
+        loads.append((task, model, device))
+        return asr
+
+    monkeypatch.setattr(hf_stt, "pipeline", fake_pipeline)
+    monkeypatch.setattr(hf_stt, "_IMPORT_ERROR", None)
+    monkeypatch.setattr(hf_stt, "_model", None)
+    monkeypatch.setattr(hf_stt.gpu, "is_available", lambda: False)
+    monkeypatch.setattr(hf_stt, "_CFG", {"hf_stt_idle_unload": 0, **(cfg or {})})
+    return asr, loads
+
+
+def test_short_clip_is_decoded_in_one_call(monkeypatch):
+    asr, loads = stub_pipeline(monkeypatch)
+    assert hf_stt.transcribe([0.0] * 16000 * 5, 16000) == "hello world"
+    assert asr.calls == [(80000, 16000, {})]
+    assert loads == [("automatic-speech-recognition", hf_stt.DEFAULT_MODEL, -1)]
+
+
+def test_long_clip_is_chunked_and_batched(monkeypatch):
+    asr, loads = stub_pipeline(monkeypatch, {"hf_stt_batch_size": 8})
+    hf_stt.transcribe([0.0] * 16000 * 90, 16000)
+    hf_stt.transcribe([0.0] * 16000 * 45, 16000)
+    assert asr.calls[0][2] == {"chunk_length_s": 30.0, "stride_length_s": 5.0, "batch_size": 8}
+    # The pipeline is built once and reused
+    assert len(loads) == 1
+
+
+def test_quantization_only_on_cpu(monkeypatch):
+    asr, _ = stub_pipeline(monkeypatch, {"hf_stt_quantize": True})
+    monkeypatch.setattr(hf_stt, "_quantize", lambda a: setattr(a, "model", "int8") or a)
+    hf_stt.transcribe([0.0] * 160, 16000)
+    assert asr.model == "int8"
+
+    asr, _ = stub_pipeline(monkeypatch, {"hf_stt_quantize": True})
+    monkeypatch.setattr(hf_stt.gpu, "is_available", lambda: True)
+    hf_stt.transcribe([0.0] * 160, 16000)
+    assert asr.model == "float"
+
+
+def test_model_unloads_after_idle(monkeypatch):
+    stub_pipeline(monkeypatch, {"hf_stt_idle_unload": 0.05})
+    hf_stt.transcribe([0.0] * 160, 16000)
+    assert hf_stt.is_loaded()
+    deadline = time.monotonic() + 2
+    while hf_stt.is_loaded() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not hf_stt.is_loaded()
+
+
+def test_preload_keeps_model_warm(monkeypatch):
+    _, loads = stub_pipeline(monkeypatch)
+    hf_stt.preload().join(1)
+    assert hf_stt.is_loaded()
+    hf_stt.transcribe([0.0] * 160, 16000)
+    assert len(loads) == 1
+    hf_stt.unload()
+
+
+def test_benchmark_reports_real_time_factor(monkeypatch):
+    stub_pipeline(monkeypatch)
+    clips = [([0.0] * 16000 * 2, 16000), ([0.0] * 16000 * 40, 16000)]
+    report = hf_stt.benchmark(clips)
+    assert report["audio_seconds"] == 42
+    assert [c["audio"] for c in report["clips"]] == [2, 40]
+    assert 0 < report["rtf"] < 1
+    assert report["clips"][0]["text"] == "hello world"
@@ -0,0 +1,77 @@
+import importlib
+import json
+import types
+
+import pytest
+
+from modules import macro_format
+
+
+EVENTS = [
+    {"type": "move", "x": 0, "y": 0, "t": 100.0},
+    {"type": "move", "x": 5, "y": 5, "t": 100.01},
+    {"type": "move", "x": 10, "y": 10, "t": 100.02},
+    {"type": "move", "x": 10, "y": 30, "t": 100.03},
+    {"type": "click", "x": 10, "y": 30, "button": "Button.left", "pressed": True, "t": 100.1},
+    {"type": "click", "x": 10, "y": 30, "button": "Button.left", "pressed": False, "t": 100.15},
+    {"type": "scroll", "x": 10, "y": 30, "dx": 0, "dy": -3, "t": 100.2},
+    {"type": "key", "key": "Key.ctrl", "down": True, "t": 100.3},
+    {"type": "key", "key": "'é'", "down": False, "t": 100.312345},
+    {"type": "write", "text": "hello", "t": 101.0},
+]
+
+
+def test_round_trip_is_exact():
+    assert macro_format.decode(macro_format.encode(EVENTS)) == EVENTS
+    assert macro_format.decode(macro_format.encode([])) == []
+
+
+def test_unsupported_events_fall_back_to_json(tmp_path):
+    with pytest.raises(ValueError):
+        macro_format.encode([{"x": 1}])
+    path = macro_format.save(str(tmp_path / "odd"), [{"x": 1}])
+    assert path.endswith("odd.json")
+    assert json.loads(open(path).read()) == [{"x": 1}]
+    assert not list(tmp_path.glob("*.tmp"))
+
+    macro_format.save(str(tmp_path / "same"), EVENTS)
+    macro_format.save(str(tmp_path / "same"), [{"x": 2}])
+    assert macro_format.macro_path("same", str(tmp_path)).endswith("same.json")
+    assert macro_format.load(macro_format.macro_path("same", str(tmp_path))) == [{"x": 2}]
+
+
+def test_simplify_drops_only_collinear_moves_by_default():
+    simplified = macro_format.simplify(EVENTS)
+    moves = [(e["x"], e["y"]) for e in simplified if e["type"] == "move"]
+    assert moves == [(0, 0), (10, 10), (10, 30)]
+    assert simplified[3:] == EVENTS[4:]
+
+    wobbly = [{"type": "move", "x": i, "y": i % 2, "t": float(i)} for i in range(10)]
+    assert len(macro_format.simplify(wobbly, 0.0)) == 10
+    assert [e["x"] for e in macro_format.simplify(wobbly, 1.0)] == [0, 9]
+
+
+def test_convert_and_prefer_packed_file(tmp_path):
+    (tmp_path / "demo.json").write_text(json.dumps(EVENTS))
+    packed = macro_format.convert(str(tmp_path / "demo.json"), epsilon=0)
+    assert packed.endswith("demo.macro")
+    assert macro_format.macro_path("demo", str(tmp_path)) == packed
+    assert macro_format.load(packed) == EVENTS
+    assert macro_format.list_names(str(tmp_path)) == ["demo"]
+
+
+def test_record_and_play_packed_macro(tmp_path, monkeypatch):
+    mod = importlib.import_module("modules.automation_learning")
+    monkeypatch.setattr(mod, "pyautogui", types.SimpleNamespace())
+    monkeypatch.setattr(mod, "_IMPORT_ERROR", None)
+    monkeypatch.setattr(mod, "record_events", lambda: list(EVENTS))
+    played = []
+    monkeypatch.setattr(mod, "play_events", played.append)
+    monkeypatch.setattr(mod, "MACRO_DIR", str(tmp_path / "macros"))
+    monkeypatch.setattr(mod, "register_action", lambda *a: None)
+
+    path = mod.record_macro("packed")
+    assert path.endswith("packed.macro")
+    assert mod.list_macros() == ["packed"]
+    assert "Played macro" in mod.play_macro("packed")
+    assert played[0] == EVENTS
@@ -0,0 +1,79 @@
+import threading
+import time
+
+from modules import macro_player
+
+
+class Recorder:
+    """pyautogui stand-in that logs calls with their time."""
+
+    def __init__(self, pause=False):
+        self.calls = []
+        if pause:
+            self.PAUSE = 0.1
+
+    def __getattr__(self, name):
+        if name.startswith("_") or name == "PAUSE":
+            raise AttributeError(name)
+        return lambda *a, **k: self.calls.append((name, a, k, time.monotonic()))
+
+
+def test_events_follow_recorded_schedule():
+    events = [
+        {"type": "key", "key": "'a'", "down": True, "t": 10.0},
+        {"type": "key", "key": "'a'", "down": False, "t": 10.05},
+        {"type": "move", "x": 1, "y": 2, "t": 10.1},
+    ]
+    out = Recorder()
+    start = time.monotonic()
+    stats = macro_player.replay(events, out, speed=1.0, cancel=threading.Event())
+    offsets = [c[3] - start for c in out.calls]
+    assert all(abs(o - want) < 0.015 for o, want in zip(offsets, [0.0, 0.05, 0.1]))
+    assert stats.sent == 3 and not stats.cancelled and stats.max_lag < 0.015
+
+    out = Recorder()
+    start = time.monotonic()
+    macro_player.replay(events, out, speed=2.0, cancel=threading.Event())
+    assert abs(out.calls[-1][3] - start - 0.05) < 0.015
+
+
+def test_moves_due_together_are_coalesced():
+    moves = [{"type": "move", "x": i, "y": i, "t": 5.0 + i * 0.001} for i in range(6)]
+    out = Recorder()
+    moves.append({"type": "move", "x": 50, "y": 50, "t": 5.05})
+    stats = macro_player.replay(moves, out, speed=1.0, cancel=threading.Event())
+    assert [c[1] for c in out.calls] == [(5, 5), (50, 50)]
+    assert stats.coalesced == 5
+
+    out = Recorder()
+    macro_player.replay(moves, out, speed=0, cancel=threading.Event())
+    assert len(out.calls) == 7
+
+
+def test_cancel_stops_and_releases_held_input():
+    events = [
+        {"type": "key", "key": "Key.ctrl_l", "down": True, "t": 0.0},
+        {"type": "click", "x": 3, "y": 4, "button": "Button.left", "pressed": True, "t": 0.0},
+        {"type": "move", "x": 9, "y": 9, "t": 5.0},
+    ]
+    cancel = threading.Event()
+    threading.Timer(0.05, cancel.set).start()
+    out = Recorder(pause=True)
+    stats = macro_player.replay(events, out, speed=1.0, cancel=cancel)
+    assert stats.cancelled and stats.duration < 1
+    names = [(c[0], c[1] or c[2].get("button")) for c in out.calls]
+    assert names == [
+        ("keyDown", ("ctrlleft",)),
+        ("mouseDown", "left"),
+        ("keyUp", ("ctrlleft",)),
+        ("mouseUp", "left"),
+    ]
+    # Real pyautogui gets its per-call pause switched off
+    assert all(c[2].get("_pause") is False for c in out.calls)
+
+
+def test_key_names_are_translated_for_pyautogui():
+    assert macro_player._key_name("'x'") == "x"
+    assert macro_player._key_name("Key.shift_r") == "shiftright"
+    assert macro_player._key_name("Key.page_down") == "pagedown"
+    assert macro_player._key_name("enter") == "enter"
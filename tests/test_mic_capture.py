@@ -0,0 +1,79 @@
+import threading
+import time
+from array import array
+
+from modules import mic_capture
+
+
+def tone(level, frames=1600):
+    return array("h", [level, -level] * (frames // 2)).tobytes()
+
+
+def make_capture(seconds=1.0):
+    cap = mic_capture.MicCapture(buffer_seconds=seconds)
+    cap.start = lambda: True  # no real device in tests
+    return cap
+
+
+def test_ring_buffer_wraps_and_clamps():
+    ring = mic_capture.RingBuffer(8)
+    ring.write(b"abcdef")
+    ring.write(b"ghij")
+    assert ring.total == 10
+    # Oldest two bytes were overwritten
+    assert ring.read(0) == (b"cdefghij", 10)
+    assert ring.read(6, 8) == (b"gh", 8)
+    ring.write(b"0123456789ab")
+    assert ring.read(0) == (b"456789ab", 22)
+
+
+def test_subscribers_each_see_every_block():
+    cap = make_capture()
+    hotword = cap.subscribe("hotword")
+    stt = cap.subscribe("stt")
+    cap.feed(b"\x01\x00" * 4)
+    assert hotword.read(0.1) == b"\x01\x00" * 4
+    cap.feed(b"\x02\x00" * 4)
+    assert hotword.read(0.1) == b"\x02\x00" * 4
+    # A slower reader gets both blocks at once
+    assert stt.read(0.1) == b"\x01\x00" * 4 + b"\x02\x00" * 4
+    assert hotword.read(0.01) is None
+    assert cap.subscribers == ["hotword", "stt"]
+    stt.close()
+    assert cap.subscribers == ["hotword"]
+
+
+def test_late_subscriber_can_rewind_into_history():
+    cap = make_capture()
+    cap.feed(tone(1000))  # spoken before STT subscribed
+    sub = cap.subscribe("stt")
+    assert sub.read(0.01) is None
+    sub.rewind(0.1)
+    assert sub.read(0.01) == tone(1000)
+
+
+def test_record_phrase_keeps_preroll_and_stops_on_silence():
+    cap = make_capture(seconds=5)
+    cap.feed(tone(10) * 5)  # quiet room
+    sub = cap.subscribe("stt")
+
+    def speaker():
+        time.sleep(0.05)
+        for block in [tone(10), tone(5000), tone(5000), tone(10), tone(10), tone(10)]:
+            cap.feed(block)
+            time.sleep(0.02)
+
+    threading.Thread(target=speaker, daemon=True).start()
+    pcm = mic_capture.record_phrase(
+        sub, timeout=1, pause_threshold=0.03, preroll=0.1
+    )
+    assert pcm is not None
+    # Preroll (one quiet block) precedes the two loud blocks
+    assert pcm.startswith(tone(10) + tone(5000) + tone(5000))
+
+
+def test_record_phrase_times_out_without_speech():
+    cap = make_capture()
+    sub = cap.subscribe("stt")
+    cap.feed(tone(10))
+    assert mic_capture.record_phrase(sub, timeout=0.05, preroll=0.0) is None
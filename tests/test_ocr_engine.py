@@ -0,0 +1,116 @@
+from modules import ocr_engine, screen_capture
+from tests.test_screen_capture import FakeImage
+
+
+class FakeTesseract:
+    """Reports each non-zero pixel as a 1x1 word named after its value."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, image):
+        self.calls += 1
+        words = []
+        for y, row in enumerate(image.rows):
+            for x, value in enumerate(row):
+                if value:
+                    words.append((f"w{value}", x, y, 1, 1, 90.0))
+        return words
+
+
+def make_frame(width=128, height=64, marks=()):
+    rows = [[0] * width for _ in range(height)]
+    for x, y, value in marks:
+        rows[y][x] = value
+    return screen_capture.Frame((100, 50, width, height), image=FakeImage(rows))
+
+
+def make_engine():
+    ocr = FakeTesseract()
+    engine = ocr_engine.IncrementalOCR(tile_size=32, margin=4, ocr_func=ocr)
+    return engine, ocr
+
+
+def test_words_have_absolute_boxes_and_no_duplicates():
+    engine, _ = make_engine()
+    # (31, 10) lies in the margin of the neighbouring tile too
+    result = engine.ocr(make_frame(marks=[(31, 10, 1), (70, 40, 2)]))
+    assert [(w.text, w.x, w.y) for w in result.words] == [("w1", 131, 60), ("w2", 170, 90)]
+    assert result.tiles == 8
+
+
+def test_unchanged_tiles_are_not_ocred_again():
+    engine, ocr = make_engine()
+    engine.ocr(make_frame(marks=[(5, 5, 1)]))
+    first = ocr.calls
+    # Blank tiles share one cache entry per padded size
+    assert first < 8
+
+    result = engine.ocr(make_frame(marks=[(5, 5, 1)]))
+    assert ocr.calls == first and result.ocred == 0
+
+    result = engine.ocr(make_frame(marks=[(5, 5, 1), (100, 50, 3)]))
+    assert result.ocred == 1
+    assert {w.text for w in result.words} == {"w1", "w3"}
+
+
+def test_text_and_find():
+    words = [
+        ocr_engine.Word("Save", 10, 100, 40, 12),
+        ocr_engine.Word("File", 10, 10, 30, 12),
+        ocr_engine.Word("As", 55, 101, 20, 12),
+        ocr_engine.Word("Edit", 50, 11, 30, 12),
+    ]
+    result = ocr_engine.OCRResult((0, 0, 200, 200), words)
+    assert result.text == "File Edit\nSave As"
+    (box,) = result.find("save as")
+    assert (box.x, box.y, box.width, box.height) == (10, 100, 65, 13)
+    assert result.find("edit")[0].center == (65, 17)
+    assert result.find("missing") == []
+
+
+def test_dirty_tiles_run_on_worker_pool():
+    engine = ocr_engine.IncrementalOCR(tile_size=32, margin=4, workers=2, ocr_func=FakeTesseract())
+    try:
+        result = engine.ocr(make_frame(marks=[(5, 5, 1), (70, 40, 2)]))
+        assert engine._pool is not None
+        assert {w.text for w in result.words} == {"w1", "w2"}
+    finally:
+        engine.shutdown()
+
+
+class RunTesseract:
+    """Reports each horizontal run of non-zero pixels as one word."""
+
+    def __call__(self, image):
+        words = []
+        for y, row in enumerate(image.rows):
+            x = 0
+            while x < len(row):
+                if not row[x]:
+                    x += 1
+                    continue
+                start = x
+                while x < len(row) and row[x]:
+                    x += 1
+                words.append((f"len{x - start}", start, y, x - start, 1, 90.0))
+        return words
+
+
+def test_words_wider_than_the_margin_are_read_whole():
+    engine = ocr_engine.IncrementalOCR(tile_size=32, margin=4, ocr_func=RunTesseract())
+    # A 40px word straddles the x=32 tile edge, far past the 4px margin
+    result = engine.ocr(make_frame(marks=[(x, 10, 1) for x in range(12, 52)] + [(70, 40, 1)]))
+    assert sorted((w.text, w.x, w.y, w.width) for w in result.words) == [
+        ("len1", 170, 90, 1),
+        ("len40", 112, 60, 40),
+    ]
+    assert len(result.find("len40")) == 1
+
+    # A word spanning several tiles needs the crop widened more than once
+    result = engine.ocr(make_frame(marks=[(x, 20, 1) for x in range(3, 120)]))
+    assert [(w.text, w.x) for w in result.words] == [("len117", 103)]
+
+    # Unchanged frames reuse the cached rejoin crop too
+    again = engine.ocr(make_frame(marks=[(x, 20, 1) for x in range(3, 120)]))
+    assert again.ocred == 0 and [w.text for w in again.words] == ["len117"]
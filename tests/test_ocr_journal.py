@@ -0,0 +1,80 @@
+import time
+
+from modules import ocr_journal
+
+
+def make_journal(tmp_path, **kwargs):
+    kwargs.setdefault("flush_interval", 0.01)
+    return ocr_journal.OCRJournal(str(tmp_path / "ocr.db"), **kwargs)
+
+
+def test_record_is_written_in_background_and_searchable(tmp_path):
+    journal = make_journal(tmp_path)
+    journal.record("Invoice 42 due Friday", monitor=2, timestamp=100.0)
+    journal.record("Quarterly report draft", monitor=1, timestamp=200.0)
+    journal.record("Invoice paid", monitor=1, timestamp=300.0)
+    journal.flush()
+
+    entry = journal.last_seen("invoice")
+    assert (entry.text, entry.monitor) == ("Invoice paid", 1)
+    entry = journal.last_seen("invoice", monitor=2)
+    assert entry.last_seen == 100.0
+    assert journal.last_seen("missing") is None
+    assert [e.text for e in journal.search("report")] == ["Quarterly report draft"]
+    # FTS syntax in user text is treated literally
+    assert journal.search('"report" OR') == []
+    journal.close()
+
+
+def test_identical_consecutive_captures_only_update_last_seen(tmp_path):
+    journal = make_journal(tmp_path)
+    journal.record("Build passed", monitor=0, timestamp=10.0)
+    journal.record("Build passed", monitor=0, timestamp=20.0)
+    journal.record("Build passed", monitor=1, timestamp=30.0)
+    journal.flush()
+    assert journal.count() == 2
+    entry = journal.last_seen("build", monitor=0)
+    assert (entry.first_seen, entry.last_seen) == (10.0, 20.0)
+
+    journal.record("Build failed", monitor=0, timestamp=40.0)
+    journal.record("Build passed", monitor=0, timestamp=50.0)
+    journal.flush()
+    assert journal.count() == 4
+    journal.close()
+
+
+def test_retention_limits(tmp_path):
+    journal = make_journal(tmp_path, retention_days=1, max_entries=3)
+    now = time.time()
+    journal.record("ancient text", timestamp=now - 3 * 86400)
+    for i in range(4):
+        journal.record(f"entry {i}", region=(0, 0, 10, 10), timestamp=now + i)
+    assert journal.prune() == 2
+    assert [e.text for e in journal.search("entry")] == ["entry 3", "entry 2", "entry 1"]
+    assert journal.search("entry")[0].region == (0, 0, 10, 10)
+    journal.close()
+
+
+def test_record_does_not_block_on_writes(tmp_path, monkeypatch):
+    journal = make_journal(tmp_path)
+    batches = []
+    original = journal._write
+
+    def slow_write(conn, batch, last_ids):
+        time.sleep(0.2)
+        batches.append(len(batch))
+        original(conn, batch, last_ids)
+
+    monkeypatch.setattr(journal, "_write", slow_write)
+    start = time.perf_counter()
+    for i in range(20):
+        journal.record(f"line {i}")
+    assert time.perf_counter() - start < 0.1
+    # Queries read committed rows instead of waiting for the writer
+    start = time.perf_counter()
+    assert journal.search("line") == []
+    assert time.perf_counter() - start < 0.1
+    journal.flush()
+    assert journal.count() == 20
+    assert len(batches) < 20
+    journal.close()
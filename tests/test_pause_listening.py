@@ -38,10 +38,14 @@ def test_pending_commands_cleared(monkeypatch):
 
     monkeypatch.setattr(assistant, 'talk_to_llm', mock_llm)
 
-    assistant.queue_command('extra', DummyWidget())
-    assert assistant.pending_commands
-    assistant.process_input('hello', DummyWidget())
-    assert assistant.pending_commands == []
+    assistant.scheduler.hold()
+    try:
+        assistant.queue_command('extra', DummyWidget())
+        assert assistant.scheduler.depth() == 1
+        assistant.process_input('hello', DummyWidget())
+        assert assistant.scheduler.depth() == 0
+    finally:
+        assistant.scheduler.release()
 
 
 def test_learn_resume_phrase(monkeypatch, tmp_path):
@@ -53,9 +57,10 @@ def test_learn_resume_phrase(monkeypatch, tmp_path):
     sm = importlib.import_module('state_manager')
     importlib.reload(sm)
     monkeypatch.setattr(sm, 'STATE_FILE', str(path), raising=False)
-    sm._config_loader = sm.ConfigLoader(str(cfg_path))
+    sm._config_loader = sm.get_config_service(str(cfg_path))
     sm.load_state()
     sm.add_resume_phrase(phrase)
+    sm._config_loader.flush()
     assert phrase in sm.get_resume_phrases()
     saved = json.loads(cfg_path.read_text())
     assert phrase in saved['resume_phrases']
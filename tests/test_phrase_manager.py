@@ -1,6 +1,8 @@
 import json
 import importlib
 
+import config_service
+
 
 def test_add_wake_phrase(tmp_path, monkeypatch):
     cfg_file = tmp_path / "config.json"
@@ -10,6 +12,7 @@ def test_add_wake_phrase(tmp_path, monkeypatch):
     pm.config = {}
 
     msg = pm.add_wake_phrase("jarvis")
+    config_service.flush_writes()
     assert "jarvis" in json.loads(cfg_file.read_text())["wake_phrases"]
     assert "jarvis" in pm.config["wake_phrases"]
     assert "Added" in msg
@@ -27,6 +30,7 @@ def test_add_sleep_and_cancel_phrase(tmp_path, monkeypatch):
 
     pm.add_sleep_phrase("good night")
     pm.add_cancel_phrase("abort")
+    config_service.flush_writes()
     saved = json.loads(cfg_file.read_text())
     assert "good night" in saved["sleep_phrases"]
     assert "abort" in saved["cancel_phrases"]
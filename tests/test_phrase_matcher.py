@@ -0,0 +1,77 @@
+import re
+
+from modules import phrase_matcher
+
+
+def make_matcher(max_distance=0):
+    m = phrase_matcher.PhraseMatcher(max_distance=max_distance)
+    m.add_category("wake", ["hey assistant", "wake up"], fuzzy=True)
+    m.add_category("sleep", ["go to sleep", "ok that's all"], fuzzy=True)
+    m.add_category("cancel", ["stop assistant"], fuzzy=True)
+    m.add_category("chitchat", ["hi", "how are you"], whole_words=True)
+    return m
+
+
+def test_all_categories_in_one_pass():
+    m = make_matcher()
+    hits = m.match("Hey assistant, stop assistant and go to sleep")
+    assert hits == {
+        "wake": ["hey assistant"],
+        "cancel": ["stop assistant"],
+        "sleep": ["go to sleep"],
+    }
+    assert m.match("nothing here") == {}
+
+
+def test_overlapping_phrases_use_failure_links():
+    m = phrase_matcher.PhraseMatcher()
+    m.add_category("a", ["he", "she", "hers"])
+    m.add_category("b", ["his"])
+    assert sorted(m.match("ushers")["a"]) == ["he", "hers", "she"]
+    assert "b" not in m.match("ushers")
+
+
+def test_whole_words_match_like_word_boundary_regex():
+    m = make_matcher()
+    for text in ["hi there", "this is it", "Hi!", "how are you?", "so, hi"]:
+        expected = bool(re.search(r"\b(hi|how are you)\b", text, re.IGNORECASE))
+        assert ("chitchat" in m.match(text)) is expected, text
+
+
+def test_fuzzy_matches_noisy_transcripts():
+    assert "wake" not in make_matcher().match("hey assistance")
+    fuzzy = make_matcher(max_distance=2)
+    assert fuzzy.match("hey assistance please")["wake"] == ["hey assistant"]
+    assert fuzzy.match("go to slip")["sleep"] == ["go to sleep"]
+    # Short whole-word phrases are never matched fuzzily
+    assert "chitchat" not in fuzzy.match("ha")
+
+
+def test_rebuilds_after_adding_phrase():
+    m = make_matcher()
+    assert "wake" not in m.match("jarvis")
+    m.add_phrase("wake", "Jarvis")
+    assert m.match("ok jarvis") == {"wake": ["jarvis"]}
+
+
+def test_levenshtein_limit():
+    assert phrase_matcher.levenshtein("kitten", "sitting") == 3
+    assert phrase_matcher.levenshtein("kitten", "sitting", limit=1) == 2
+
+
+def test_shared_matcher_follows_config(monkeypatch):
+    cfg = {"wake_phrases": ["computer"], "sleep_phrases": ["bye"]}
+    service = phrase_matcher.get_config_service()
+    monkeypatch.setattr(service, "config", cfg)
+    phrase_matcher.invalidate()
+    try:
+        hits = phrase_matcher.match("computer, hi, bye")
+        assert hits["wake"] == ["computer"]
+        assert hits["sleep"] == ["bye"]
+        assert hits["chitchat"] == ["hi"]
+        assert "resume" not in phrase_matcher.match("computer")
+        cfg["wake_phrases"] = ["jarvis"]
+        service._notify({"wake_phrases": ["jarvis"]})
+        assert "wake" in phrase_matcher.match("jarvis")
+    finally:
+        phrase_matcher.invalidate()
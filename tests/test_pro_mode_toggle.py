@@ -11,8 +11,8 @@ def test_pro_mode_toggle(monkeypatch, tmp_path):
     cfg_file = tmp_path / "config.json"
     cfg_file.write_text(json.dumps(cfg))
 
-    from config_loader import ConfigLoader as CL
-    monkeypatch.setattr("config_loader.ConfigLoader", lambda path='config.json': CL(str(cfg_file)))
+    import config_service
+    monkeypatch.setattr("config_service.get_config_service", lambda path='config.json': config_service.ConfigService(str(cfg_file)))
 
     if "gui_assistant" in sys.modules:
         del sys.modules["gui_assistant"]
@@ -21,6 +21,7 @@ def test_pro_mode_toggle(monkeypatch, tmp_path):
     monkeypatch.setattr(ga, "has_internet", lambda: True)
     ga.pro_var.set(True)
     ga.toggle_pro_mode()
+    config_service.flush_writes()
     saved = json.loads(cfg_file.read_text())
     assert saved["pro_mode"] is True
     assert saved["tts_backend"] == "huggingface"
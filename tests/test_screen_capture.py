@@ -0,0 +1,94 @@
+import time
+
+from modules import screen_capture
+
+
+class FakeImage:
+    """Minimal PIL stand-in: a grid of one-byte pixels."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.size = (len(rows[0]), len(rows))
+
+    def crop(self, box):
+        left, top, right, bottom = box
+        return FakeImage([row[left:right] for row in self.rows[top:bottom]])
+
+    def tobytes(self):
+        return b"".join(bytes(row) for row in self.rows)
+
+
+class FakeScreen:
+    def __init__(self, width=256, height=128):
+        self.rows = [[0] * width for _ in range(height)]
+        self.grabs = []
+
+    def grab(self, region):
+        self.grabs.append(region)
+        image = FakeImage([list(r) for r in self.rows])
+        full = (0, 0) + image.size
+        frame = screen_capture.Frame(full, image=image)
+        return frame if region is None else frame.crop(region)
+
+
+def test_frames_are_shared_within_ttl():
+    screen = FakeScreen()
+    cap = screen_capture.ScreenCapture(backend=screen.grab, ttl=10)
+    full = cap.grab()
+    assert cap.grab() is full
+    # A region inside the cached full frame is cropped, not re-captured
+    region = cap.grab((10, 20, 30, 40))
+    assert region.region == (10, 20, 30, 40)
+    assert region.image.size == (30, 40)
+    assert screen.grabs == [None]
+    assert (cap.captures, cap.hits) == (1, 2)
+    cap.grab(max_age=0)
+    assert len(screen.grabs) == 2
+
+
+def test_stale_frames_are_recaptured():
+    screen = FakeScreen()
+    cap = screen_capture.ScreenCapture(backend=screen.grab, ttl=0.01)
+    cap.grab()
+    time.sleep(0.02)
+    cap.grab()
+    assert screen.grabs == [None, None]
+
+
+def test_changed_tiles_reports_only_dirty_tiles():
+    screen = FakeScreen(width=256, height=128)
+    cap = screen_capture.ScreenCapture(backend=screen.grab, ttl=0, tile_size=64)
+    first = cap.changed_tiles(cap.grab(), "ocr")
+    assert len(first) == 8  # 4 x 2 tiles, all new
+    assert cap.changed_tiles(cap.grab(), "ocr") == []
+
+    screen.rows[70][130] = 255  # inside tile (128, 64)
+    assert cap.changed_tiles(cap.grab(), "ocr") == [(128, 64, 64, 64)]
+    # Each consumer tracks its own view of the screen
+    assert len(cap.changed_tiles(cap.grab(), "template")) == 8
+
+
+def test_edge_tiles_are_clipped_to_region():
+    screen = FakeScreen(width=100, height=70)
+    cap = screen_capture.ScreenCapture(backend=screen.grab, ttl=0, tile_size=64)
+    tiles = cap.changed_tiles(cap.grab((10, 10, 90, 60)))
+    assert sorted(tiles) == [(10, 10, 64, 60), (74, 10, 26, 60)]
+
+
+def test_backend_fallback(monkeypatch):
+    calls = []
+
+    def broken():
+        raise ImportError("no mss")
+
+    def working():
+        calls.append("pyautogui")
+        return lambda region: screen_capture.Frame((0, 0, 1, 1), image=FakeImage([[0]]))
+
+    monkeypatch.setattr(screen_capture, "np", object())
+    monkeypatch.setitem(screen_capture._BACKENDS, "mss", broken)
+    monkeypatch.setitem(screen_capture._BACKENDS, "pyautogui", working)
+    cap = screen_capture.ScreenCapture()
+    cap.grab()
+    assert cap.backend_name == "pyautogui"
+    assert calls == ["pyautogui"]
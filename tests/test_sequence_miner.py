@@ -0,0 +1,76 @@
+import importlib
+
+from modules import sequence_miner
+
+
+ROUTINE = ["Open Outlook", "maximize outlook", "search unread."]
+
+
+def test_finds_repeated_routine_and_hides_its_parts():
+    miner = sequence_miner.SequenceMiner()
+    for i in range(4):
+        miner.extend(ROUTINE)
+        miner.extend([f"open app{i}", "next", "next", f"close app{i}"])
+    found = miner.suggest(min_support=3)
+    assert found[0].commands == ROUTINE
+    assert found[0].count == 4
+    # Sub-runs of the routine and runs repeating a command are not offered
+    assert [r.commands for r in found] == [ROUTINE]
+    # A routine already saved as a macro is not offered again, nor are its parts
+    assert miner.suggest(exclude=[["open outlook", "maximize outlook", "search unread"]]) == []
+
+
+def test_session_gap_breaks_runs():
+    miner = sequence_miner.SequenceMiner(session_gap=60)
+    for day in range(5):
+        miner.add("open mail", day * 86400)
+        miner.add("close mail", day * 86400 + 10)
+        miner.add("open news", day * 86400 + 20)
+    assert [r.commands for r in miner.suggest()] == [["open mail", "close mail", "open news"]]
+    assert miner.suggest()[0].count == 5
+
+
+def test_lossy_counting_bounds_memory_but_keeps_routines():
+    miner = sequence_miner.SequenceMiner(bucket=100)
+    for i in range(3000):
+        miner.add(f"noise {i}")
+        if i % 20 == 0:
+            miner.extend(["open spotify", "play focus"])
+    assert len(miner) < 500
+    best = miner.suggest()[0]
+    assert best.commands == ["open spotify", "play focus"] and best.count == 150
+
+
+def test_sync_reads_only_new_history_entries():
+    history = [{"last_command": c} for c in ROUTINE * 3]
+    miner = sequence_miner.SequenceMiner().sync(history)
+    observed = miner.observed
+    history.append({"last_action": "tutorial"})
+    history.extend({"last_command": c} for c in ROUTINE)
+    miner.sync(history)
+    assert miner.observed == observed + 3
+    assert miner.suggest()[0].count == 4
+    # A reloaded history is mined from scratch
+    assert miner.sync(history[:3]).observed == 3
+
+
+def test_save_suggested_routine_as_command_macro(tmp_path, monkeypatch):
+    cm = importlib.import_module("modules.command_macros")
+    ms = importlib.import_module("modules.macro_suggestions")
+    monkeypatch.setattr(cm, "FILE_PATH", str(tmp_path / "command_macros.json"))
+    miner = sequence_miner.SequenceMiner().sync([{"last_command": c} for c in ROUTINE * 3])
+    monkeypatch.setattr(sequence_miner, "get_miner", lambda: miner)
+
+    assert ms.suggest_routines() == [ROUTINE]
+    assert ms.save_routine(1, "mail") == "Saved macro 'mail'"
+    assert cm._load()["mail"] == ROUTINE
+    assert ms.save_routine(2, "other") == "No suggestion 2"
+    assert ms.suggest_routines() == []
+
+
+def test_suggestion_commands_are_not_mined():
+    history = []
+    for _ in range(3):
+        history += ["open mail", "Suggest macros", "save suggestion 1 as mail", "close mail"]
+    miner = sequence_miner.SequenceMiner().sync([{"last_command": c} for c in history])
+    assert [r.commands for r in miner.suggest()] == [["open mail", "close mail"]]
@@ -0,0 +1,117 @@
+import threading
+import time
+
+from modules import step_graph
+
+
+def test_infer_resources():
+    assert step_graph.infer_resources("Download https://example.com/a.zip") == {
+        "network:example.com",
+        "shared:files",
+    }
+    assert step_graph.infer_resources("minimize slack") == {"shared:focus", "window:slack"}
+    assert step_graph.infer_resources("resize google chrome 800 600") == {"shared:focus", "window:google chrome"}
+    assert step_graph.infer_resources("open notepad") == {"focus", "files", "window:notepad"}
+    assert step_graph.infer_resources("type hello in notepad") == {"focus", "window:notepad"}
+    assert step_graph.infer_resources("press enter") == {"focus"}
+    assert step_graph.infer_resources("tell me a joke") is None
+
+
+def test_graph_orders_conflicts_and_barriers():
+    steps = step_graph.command_steps(
+        ["open notepad", "minimize slack", "type hi in notepad", "what time is it", "minimize chrome"],
+        print,
+    )
+    assert step_graph.build_graph(steps) == [[], [0], [0, 1], [0, 1, 2], [3]]
+
+
+def test_window_and_file_steps_wait_for_launches_and_downloads():
+    steps = step_graph.command_steps(
+        [
+            "download https://a.example/report.pdf",
+            "download https://b.example/data.csv",
+            "minimize slack",
+            "minimize discord",
+            "open report.pdf",
+            "open google chrome",
+            "minimize chrome",
+        ],
+        print,
+    )
+    # Downloads and window-only steps overlap; the open waits for all of
+    # them, and "minimize chrome" for the open that may create its window
+    assert step_graph.build_graph(steps) == [[], [], [], [], [0, 1, 2, 3], [4], [5]]
+
+
+def test_independent_steps_overlap_and_results_keep_order():
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def work(cmd):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+        return cmd.upper()
+
+    cmds = [f"download https://host{i}.example/file" for i in range(4)]
+    progress = []
+    start = time.monotonic()
+    result = step_graph.run_commands(
+        cmds, work, workers=4, on_progress=lambda n, total, step, state: progress.append((n, total, state))
+    )
+    assert time.monotonic() - start < 0.15
+    assert peak[0] == 4
+    assert result.ok and result.results == [c.upper() for c in cmds]
+    assert progress[-1] == (4, 4, "done")
+
+
+def test_failure_skips_dependents_and_cancel_stops():
+    order = []
+
+    def work(cmd):
+        order.append(cmd)
+        if cmd == "open broken":
+            raise RuntimeError("no such app")
+
+    result = step_graph.run_commands(
+        ["open broken", "type x in broken", "download https://example.com/x"], work, workers=2
+    )
+    assert result.states == ["failed", "skipped", "skipped"]
+    result = step_graph.run_commands(["minimize other", "open broken", "type x in broken"], work, workers=2)
+    assert result.states == ["done", "failed", "skipped"]
+    assert "type x in broken" not in order
+
+    cancel = threading.Event()
+
+    def slow(cmd):
+        cancel.set()
+        return cmd
+
+    result = step_graph.run_commands(["one", "two", "three"], slow, cancel=cancel)
+    assert result.cancelled and result.states == ["done", "skipped", "skipped"]
+
+
+def test_app_workflow_steps_use_declared_resources(monkeypatch):
+    from modules import app_window_manager as awm
+
+    calls = []
+    monkeypatch.setitem(awm._FUNCTION_MAP, "minimize_window", lambda t: calls.append(t) or (True, f"min {t}"))
+    monkeypatch.setitem(
+        awm.APP_WORKFLOWS,
+        "work",
+        [
+            {"action": "minimize_window", "args": ["slack"]},
+            {"action": "minimize_window", "args": ["chrome"], "resources": ["window:chrome"]},
+            {"action": "unknown"},
+        ],
+    )
+    assert awm._workflow_resources({"action": "focus_window", "args": ["Chrome"]}) == {"focus", "window:chrome"}
+    assert awm._workflow_resources({"action": "minimize_window", "args": ["Chrome"]}) == {
+        "shared:focus",
+        "window:chrome",
+    }
+    assert awm.handle_app_logic("work") == "min slack; min chrome"
+    assert sorted(calls) == ["chrome", "slack"]
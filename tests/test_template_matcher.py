@@ -0,0 +1,117 @@
+import os
+import types
+
+import pytest
+
+from modules import template_matcher
+
+
+class FakeGray:
+    def __init__(self, name):
+        self.name = name
+        self.shape = (10, 10)
+
+
+class FakeFrame:
+    region = (100, 50, 640, 480)
+
+    def __init__(self):
+        self.gray_calls = 0
+
+    def gray(self):
+        self.gray_calls += 1
+        return FakeGray("screen")
+
+
+def fake_cv2(loads):
+    def imread(path, flag):
+        loads.append(path)
+        return FakeGray(path)
+
+    return types.SimpleNamespace(imread=imread, IMREAD_GRAYSCALE=0)
+
+
+def test_cache_reloads_only_when_file_changes(tmp_path, monkeypatch):
+    loads = []
+    monkeypatch.setattr(template_matcher, "cv2", fake_cv2(loads))
+    path = tmp_path / "play.png"
+    path.write_bytes(b"x")
+    cache = template_matcher.TemplateCache()
+
+    first = cache.get(str(path))
+    assert cache.get(str(path)) is first
+    assert loads == [str(path)]
+
+    os.utime(path, (1, 1))
+    assert cache.get(str(path)) is not first
+    assert len(loads) == 2
+    assert cache.get(str(tmp_path / "missing.png")) is None
+
+
+def test_cache_evicts_least_recently_used(tmp_path, monkeypatch):
+    monkeypatch.setattr(template_matcher, "cv2", fake_cv2([]))
+    cache = template_matcher.TemplateCache(size=2)
+    paths = []
+    for name in "abc":
+        p = tmp_path / f"{name}.png"
+        p.write_bytes(b"x")
+        paths.append(str(p))
+    cache.get(paths[0])
+    cache.get(paths[1])
+    cache.get(paths[0])
+    cache.get(paths[2])
+    assert cache.loads == 3
+    cache.get(paths[0])
+    assert cache.loads == 3  # still cached, "b" was evicted
+    cache.get(paths[1])
+    assert cache.loads == 4
+
+
+def test_match_many_shares_one_frame(tmp_path, monkeypatch):
+    monkeypatch.setattr(template_matcher, "cv2", fake_cv2([]))
+    monkeypatch.setattr(template_matcher, "_IMPORT_ERROR", None)
+    paths = []
+    for name in ("play", "pause"):
+        p = tmp_path / f"{name}.png"
+        p.write_bytes(b"x")
+        paths.append(str(p))
+    matcher = template_matcher.TemplateMatcher()
+    screens = []
+
+    def search(screen, template, confidence):
+        screens.append(screen)
+        if template.path.endswith("pause.png"):
+            return template_matcher.Match(template.path, 5, 5, 10, 10, 0.9)
+        return None
+
+    monkeypatch.setattr(matcher, "_search", search)
+    frame = FakeFrame()
+    results = matcher.match_many(paths + [str(tmp_path / "missing.png")], frame)
+    assert results[paths[0]] is None and results[paths[1]].score == 0.9
+    assert frame.gray_calls == 1
+    assert screens[0] is screens[1] and screens[0].origin == (100, 50)
+    assert matcher.best(paths, frame).path == paths[1]
+
+
+def test_finds_scaled_template_and_reuses_hint(tmp_path, monkeypatch):
+    cv2 = pytest.importorskip("cv2")
+    np = pytest.importorskip("numpy")
+    rng = np.random.default_rng(0)
+    button = (rng.random((40, 60)) * 255).astype(np.uint8)
+    path = tmp_path / "button.png"
+    cv2.imwrite(str(path), button)
+
+    screen = np.zeros((400, 600), np.uint8)
+    big = cv2.resize(button, (90, 60), interpolation=cv2.INTER_LINEAR)
+    screen[200:260, 300:390] = big
+    frame = types.SimpleNamespace(region=(1000, 0, 600, 400), gray=lambda: screen)
+
+    matcher = template_matcher.TemplateMatcher(scales=(1.0, 1.5))
+    found = matcher.match(str(path), frame, confidence=0.8)
+    assert found.scale == 1.5
+    assert abs(found.x - 1300) <= 2 and abs(found.y - 200) <= 2
+
+    calls = []
+    monkeypatch.setattr(matcher, "_coarse_to_fine", lambda *a: calls.append(a) or (-1.0, (0, 0)))
+    assert matcher.match(str(path), frame, confidence=0.8).center == found.center
+    assert calls == []  # served by the ROI hint
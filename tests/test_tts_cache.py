@@ -0,0 +1,112 @@
+import importlib
+import sys
+import types
+
+import pytest
+
+from modules import tts_cache
+
+
+def test_pcm_roundtrip_memory_and_disk(tmp_path):
+    cache = tts_cache.TTSCache(directory=str(tmp_path), max_memory_entries=1)
+    cache.put_pcm("coqui", "m", None, "Yes?", [0.0, 0.5, -0.5, 1.5], 22050)
+
+    data, rate = cache.get_pcm("coqui", "m", None, "Yes?")
+    assert rate == 22050
+    assert len(data) == 8  # four int16 samples
+    samples = list(tts_cache.pcm16_to_float(data))
+    assert samples[1] == pytest.approx(0.5, abs=1e-3)
+    assert samples[3] == pytest.approx(1.0, abs=1e-3)  # clipped
+
+    # A fresh cache instance reads the entry back from disk
+    other = tts_cache.TTSCache(directory=str(tmp_path))
+    assert other.get_pcm("coqui", "m", None, "Yes?") == (data, rate)
+    # Key includes backend, model and voice
+    assert other.get_pcm("coqui", "m", "jenny", "Yes?") is None
+    assert other.get_pcm("huggingface", "m", None, "Yes?") is None
+
+
+def test_lru_eviction(tmp_path):
+    cache = tts_cache.TTSCache(
+        directory=str(tmp_path), max_memory_entries=2, max_disk_entries=2
+    )
+    for text in ("one", "two"):
+        cache.put_pcm("coqui", "m", None, text, [0.1], 100)
+    cache.get_pcm("coqui", "m", None, "one")  # most recently used
+    cache.put_pcm("coqui", "m", None, "three", [0.1], 100)
+
+    assert list(cache._memory) == [
+        cache.key("coqui", "m", None, "one"),
+        cache.key("coqui", "m", None, "three"),
+    ]
+    assert len(list(tmp_path.glob("*.wav"))) == 2
+
+
+def test_prewarm_skips_long_text():
+    seen = []
+    count = tts_cache.prewarm(lambda t: seen.append(t) or True, ["Yes?", "x" * 500])
+    assert count == 1
+    assert seen == ["Yes?"]
+
+
+def test_only_configured_or_prewarmed_phrases_are_cacheable(monkeypatch):
+    monkeypatch.setattr(tts_cache, "_prewarmed", set())
+    assert tts_cache.is_cacheable(" Yes? ")
+    assert not tts_cache.is_cacheable("The weather today is sunny.")
+    tts_cache.prewarm(lambda t: True, ["Opening your browser."])
+    assert tts_cache.is_cacheable("Opening your browser.")
+
+
+def test_coqui_speak_uses_cache_without_model(monkeypatch, tmp_path):
+    played = []
+
+    class DummyStream:
+        def __init__(self, samplerate=None, **kwargs):
+            self.rate = samplerate
+
+        def start(self):
+            pass
+
+        def write(self, data):
+            played.append((list(data), self.rate))
+
+        def stop(self):
+            pass
+
+        def abort(self):
+            pass
+
+        def close(self):
+            pass
+
+    sd_stub = types.ModuleType("sounddevice")
+    sd_stub.OutputStream = DummyStream
+    np_stub = types.ModuleType("numpy")
+    api = types.ModuleType("TTS.api")
+
+    def fail(*_a, **_k):
+        raise AssertionError("model should not load on a cache hit")
+
+    api.TTS = fail
+    pkg = types.ModuleType("TTS")
+    pkg.api = api
+    monkeypatch.setitem(sys.modules, "numpy", np_stub)
+    monkeypatch.setitem(sys.modules, "sounddevice", sd_stub)
+    monkeypatch.setitem(sys.modules, "TTS", pkg)
+    monkeypatch.setitem(sys.modules, "TTS.api", api)
+
+    cache = tts_cache.TTSCache(directory=str(tmp_path))
+    monkeypatch.setattr(tts_cache, "_cache", cache)
+    from modules import audio_output
+    monkeypatch.setattr(audio_output, "_output", None)
+    tts = importlib.import_module("modules.tts_integration")
+    importlib.reload(tts)
+    monkeypatch.setitem(tts.config, "tts_cache", True)
+    monkeypatch.setitem(tts.config, "tts_voice", None)
+    cache.put_pcm("coqui", tts.config["tts_model"], None, "Yes?", [0.5], 1000)
+
+    assert tts.speak("Yes?", async_play=False, volume=1.0, speed=2.0) == "[TTS] Done speaking."
+    assert len(played) == 1
+    assert len(played[0][0]) == 1
+    assert abs(played[0][0][0] - 0.5) < 1e-3
+    assert played[0][1] == 2000
@@ -3,6 +3,8 @@ import json
 import sys
 import types
 
+import config_service
+
 
 def setup_tts(monkeypatch, tmp_path):
     # stub numpy and sounddevice
@@ -42,11 +44,13 @@ def setup_tts(monkeypatch, tmp_path):
 def test_set_volume_and_voice(monkeypatch, tmp_path):
     tts, cfg_file = setup_tts(monkeypatch, tmp_path)
     assert tts.set_volume(0.7) is True
+    config_service.flush_writes()
     saved = json.loads(cfg_file.read_text())
     assert saved["tts_volume"] == 0.7
     assert tts.config["tts_volume"] == 0.7
 
     assert tts.set_voice("alice") is True
+    config_service.flush_writes()
     saved = json.loads(cfg_file.read_text())
     assert saved["tts_voice"] == "alice"
     assert tts.config["tts_voice"] == "alice"
@@ -60,8 +64,26 @@ def test_set_speed(monkeypatch, tmp_path):
     tts, cfg_file = setup_tts(monkeypatch, tmp_path)
 
     assert tts.set_speed(1.2) is True
+    config_service.flush_writes()
     saved = json.loads(cfg_file.read_text())
     assert saved["tts_speed"] == 1.2
     assert tts.config["tts_speed"] == 1.2
 
     assert tts.set_speed(2.5) is False
+
+
+def test_setter_reports_failed_writes(monkeypatch, tmp_path):
+    tts, cfg_file = setup_tts(monkeypatch, tmp_path)
+    monkeypatch.setattr(config_service, "log_error", lambda msg: None)
+    monkeypatch.setattr(tts, "log_error", lambda msg: None)
+
+    def fail(path, data):
+        raise OSError("read-only")
+
+    write = config_service.atomic_write_json
+    monkeypatch.setattr(config_service, "atomic_write_json", fail)
+    # The setting is written right away, so the failure is reported
+    assert tts.set_speed(1.1) is False
+    monkeypatch.setattr(config_service, "atomic_write_json", write)
+    assert tts.set_speed(1.3) is True
+    assert json.loads(cfg_file.read_text())["tts_speed"] == 1.3
@@ -0,0 +1,99 @@
+import importlib
+import sys
+import threading
+import types
+
+
+def test_speak_falls_back_while_model_warms(monkeypatch):
+    mgr = importlib.import_module("modules.tts_manager")
+    release = threading.Event()
+    state = {"ready": False}
+    spoken = []
+
+    def warm_up():
+        release.wait(2)
+        state["ready"] = True
+        return True
+
+    coqui = types.SimpleNamespace(
+        speak=lambda text, **kw: spoken.append(("coqui", text)),
+        warm_up=warm_up,
+        is_ready=lambda: state["ready"],
+        is_cached=lambda text: text == "Yes?",
+    )
+    gtts = types.SimpleNamespace(
+        speak=lambda text, **kw: spoken.append(("gtts", text, kw["async_play"])),
+        is_ready=lambda: True,
+    )
+    monkeypatch.setitem(sys.modules, "modules.tts_integration", coqui)
+    monkeypatch.setitem(sys.modules, "modules.gtts_tts", gtts)
+    monkeypatch.setattr(mgr, "BACKEND", "coqui")
+    monkeypatch.setattr(mgr, "_preload_thread", None)
+    monkeypatch.setitem(mgr._config.config, "tts_preload", True)
+    monkeypatch.setitem(mgr._config.config, "tts_fallback_backend", "gtts")
+    monkeypatch.setattr(mgr, "prewarm_cache", lambda phrases=None: 0)
+
+    thread = mgr.start_preload()
+    assert mgr.is_preloading()
+    assert mgr.is_ready() is False
+
+    mgr.speak("Yes?")
+    mgr.speak("Opening the browser")
+    release.set()
+    thread.join(2)
+    mgr.speak("Done")
+
+    assert spoken == [
+        ("coqui", "Yes?"),  # cached phrase plays on the main voice
+        ("gtts", "Opening the browser", True),
+        ("coqui", "Done"),
+    ]
+    assert mgr.is_ready() is True
+
+
+def test_coqui_warm_up_loads_model_once(monkeypatch):
+    loads = []
+    synthesized = []
+
+    class DummySynth:
+        output_sample_rate = 100
+
+    class DummyTTS:
+        def __init__(self, *a, **k):
+            loads.append(1)
+            self.synthesizer = DummySynth()
+
+        def tts(self, text, speaker=None):
+            synthesized.append(text)
+            return [0.5] * 4
+
+    np_stub = types.ModuleType("numpy")
+    np_stub.float32 = float
+    np_stub.asarray = lambda x, dtype=None: list(x)
+
+    def np_multiply(arr, val, out=None):
+        out[:] = [x * val for x in arr]
+        return out
+
+    np_stub.multiply = np_multiply
+    api = types.ModuleType("TTS.api")
+    api.TTS = DummyTTS
+    pkg = types.ModuleType("TTS")
+    pkg.api = api
+    monkeypatch.setitem(sys.modules, "numpy", np_stub)
+    monkeypatch.setitem(sys.modules, "sounddevice", types.ModuleType("sounddevice"))
+    monkeypatch.setitem(sys.modules, "TTS", pkg)
+    monkeypatch.setitem(sys.modules, "TTS.api", api)
+
+    tts = importlib.reload(importlib.import_module("modules.tts_integration"))
+    assert tts.is_ready() is False
+
+    threads = [threading.Thread(target=tts.warm_up) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(2)
+
+    assert tts.is_ready() is True
+    assert loads == [1]
+    assert synthesized == [tts.WARMUP_TEXT] * 3
@@ -10,17 +10,40 @@ def test_speak_speed(monkeypatch):
             return DummyArray([x * other for x in self])
     np_stub = types.ModuleType("numpy")
     np_stub.array = lambda x: DummyArray(x)
+    np_stub.float32 = float
+    np_stub.asarray = lambda x, dtype=None: DummyArray(x)
 
-    # Capture calls to sounddevice
+    def np_multiply(arr, val, out=None):
+        out[:] = [x * val for x in arr]
+        return out
+
+    np_stub.multiply = np_multiply
+
+    # Capture output streams opened by the playback scheduler
     calls = []
-    waited = []
+    written = []
+
+    class DummyStream:
+        def __init__(self, samplerate=None, **kwargs):
+            calls.append(samplerate)
+
+        def start(self):
+            pass
+
+        def write(self, data):
+            written.append(list(data))
+
+        def stop(self):
+            pass
+
+        def abort(self):
+            pass
+
+        def close(self):
+            pass
+
     sd_stub = types.ModuleType("sounddevice")
-    def sd_play(wav, rate):
-        calls.append(rate)
-    def sd_wait():
-        waited.append(True)
-    sd_stub.play = sd_play
-    sd_stub.wait = sd_wait
+    sd_stub.OutputStream = DummyStream
 
     # Minimal TTS implementation
     class DummySynth:
@@ -42,14 +65,18 @@ def test_speak_speed(monkeypatch):
     monkeypatch.setitem(sys.modules, "TTS", TTS_stub)
     monkeypatch.setitem(sys.modules, "TTS.api", TTS_api_stub)
 
+    from modules import audio_output
+    monkeypatch.setattr(audio_output, "_output", None)
+
     tts = importlib.import_module("modules.tts_integration")
     importlib.reload(tts)
+    monkeypatch.setitem(tts.config, "tts_cache", False)
 
     result = tts.speak("hello", async_play=False, speed=0.5)
 
     assert result == "[TTS] Done speaking."
     assert calls[-1] == int(DummySynth.output_sample_rate * 0.5)
-    assert waited
+    assert len(written) == 1 and len(written[0]) == 3
 
     calls.clear()
     tts.config["tts_speed"] = 1.3
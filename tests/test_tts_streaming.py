@@ -0,0 +1,183 @@
+import importlib
+import sys
+import threading
+import time
+import types
+
+
+class DummyArray(list):
+    def reshape(self, *_shape):
+        return self
+
+
+def setup_tts(monkeypatch):
+    np_stub = types.ModuleType("numpy")
+    np_stub.float32 = float
+    np_stub.array = lambda x: DummyArray(x)
+    np_stub.asarray = lambda x, dtype=None: DummyArray(x)
+
+    def np_multiply(arr, val, out=None):
+        out[:] = [x * val for x in arr]
+        return out
+
+    np_stub.multiply = np_multiply
+
+    writes = []
+    streams = []
+    synthesized = []
+    second_started = threading.Event()
+
+    class DummyStream:
+        def __init__(self, samplerate=None, **kwargs):
+            streams.append(samplerate)
+
+        def start(self):
+            pass
+
+        def stop(self):
+            pass
+
+        def abort(self):
+            pass
+
+        def close(self):
+            pass
+
+        def write(self, data):
+            # Playback of sentence 1 must overlap synthesis of sentence 2
+            if not writes:
+                second_started.wait(2)
+            writes.append(list(data))
+
+    sd_stub = types.ModuleType("sounddevice")
+    sd_stub.OutputStream = DummyStream
+
+    class DummySynth:
+        output_sample_rate = 100
+
+    class DummyTTS:
+        def __init__(self, *a, **k):
+            self.synthesizer = DummySynth()
+
+        def tts(self, text, speaker=None):
+            synthesized.append(text)
+            if len(synthesized) == 2:
+                second_started.set()
+            return [1.0] * 10
+
+    api = types.ModuleType("TTS.api")
+    api.TTS = lambda *a, **k: DummyTTS()
+    pkg = types.ModuleType("TTS")
+    pkg.api = api
+
+    monkeypatch.setitem(sys.modules, "numpy", np_stub)
+    monkeypatch.setitem(sys.modules, "sounddevice", sd_stub)
+    monkeypatch.setitem(sys.modules, "TTS", pkg)
+    monkeypatch.setitem(sys.modules, "TTS.api", api)
+
+    from modules import audio_output
+    monkeypatch.setattr(audio_output, "_output", None)
+
+    tts = importlib.import_module("modules.tts_integration")
+    importlib.reload(tts)
+    monkeypatch.setitem(tts.config, "tts_cache", False)
+    return tts, writes, streams, synthesized, second_started
+
+
+def test_split_sentences_merges_short_fragments():
+    tts = importlib.import_module("modules.tts_integration")
+    parts = tts.split_sentences(
+        "Yes. I can do that for you right away! Opening the browser now.\nDone"
+    )
+    assert parts == [
+        "Yes. I can do that for you right away!",
+        "Opening the browser now.",
+        "Done",
+    ]
+
+
+def test_pipelined_playback_overlaps_synthesis(monkeypatch):
+    tts, writes, streams, synthesized, second_started = setup_tts(monkeypatch)
+    text = "This is the first long sentence. This is the second long sentence."
+    result = tts.speak(text, async_play=False, volume=0.5, speed=2.0)
+
+    assert result == "[TTS] Done speaking."
+    assert synthesized == [
+        "This is the first long sentence.",
+        "This is the second long sentence.",
+    ]
+    assert second_started.is_set()
+    # One continuous output stream for both sentences
+    assert streams == [200]
+    assert sum(len(w) for w in writes) == 20
+    assert writes[0][0] == 0.5
+    assert tts.is_speaking() is False
+
+
+def test_stream_disabled_plays_whole_text(monkeypatch):
+    tts, writes, streams, synthesized, _ = setup_tts(monkeypatch)
+    text = "This is the first long sentence. This is the second long sentence."
+    tts.speak(text, async_play=False, stream=False)
+    assert synthesized == [text]
+    assert len(streams) == 1
+    assert [len(w) for w in writes] == [10]
+
+
+def test_stop_does_not_wait_for_running_synthesis(monkeypatch):
+    tts, writes, _, _, _ = setup_tts(monkeypatch)
+    from modules import audio_output
+
+    release = threading.Event()
+    model = tts.get_tts_model()
+    monkeypatch.setattr(model, "tts", lambda text, speaker=None: release.wait(2) and [1.0] * 10)
+    tts.speak("Hello there.", async_play=True)
+    time.sleep(0.05)
+    assert audio_output.get_output().is_busy()
+    start = time.monotonic()
+    tts.stop_speech()
+    assert audio_output.get_output().wait_idle(1)
+    assert time.monotonic() - start < 0.5
+    release.set()
+    assert writes == []
+
+
+def test_cancel_while_waiting_for_next_sentence_is_prompt(monkeypatch):
+    tts, writes, _, _, second_started = setup_tts(monkeypatch)
+    from modules import audio_output
+
+    second_started.set()
+    gates = [threading.Event()]
+    model = tts.get_tts_model()
+    monkeypatch.setattr(
+        model, "tts", lambda text, speaker=None: (text.startswith("This") or gates[-1].wait(2)) and [1.0] * 10
+    )
+    for round_ in range(1, 4):
+        tts.speak("This is the first long sentence. Then a second long sentence.", async_play=True)
+        deadline = time.monotonic() + 1
+        while len(writes) < round_ and time.monotonic() < deadline:
+            time.sleep(0.005)
+        # Playback is now blocked waiting for the second sentence
+        time.sleep(0.03)
+        start = time.monotonic()
+        tts.stop_speech()
+        assert audio_output.get_output().wait_idle(1)
+        assert time.monotonic() - start < 0.05
+        gates[-1].set()
+        gates.append(threading.Event())
+    assert len(writes) == 3
+
+
+def test_synthesis_starts_while_earlier_speech_plays(monkeypatch):
+    tts, _, _, synthesized, second_started = setup_tts(monkeypatch)
+    from modules import audio_output
+
+    second_started.set()
+    gate = threading.Event()
+    audio_output.get_output().submit(play=lambda: gate.wait(2))
+    tts.speak("Hello there.", async_play=True)
+    deadline = time.monotonic() + 1
+    while not synthesized and time.monotonic() < deadline:
+        time.sleep(0.005)
+    assert synthesized == ["Hello there."]
+    gate.set()
+    assert audio_output.get_output().wait_idle(1)
@@ -0,0 +1,111 @@
+import math
+import random
+import threading
+import time
+from array import array
+
+import pytest
+
+from modules import mic_capture, vad
+
+RATE = 16000
+BLOCK = 1600  # 100 ms, the mic_capture callback size
+
+
+def noise(seconds, level, seed=0):
+    # 0.5 s of random samples, tiled; plenty for frame-level statistics
+    rnd = random.Random(seed)
+    n = int(seconds * RATE)
+    block = array("h", (rnd.randint(-level, level) for _ in range(min(n, RATE // 2))))
+    return (block * (n // len(block) + 1))[:n]
+
+
+def voiced(seconds, level=4000):
+    """Harmonic-rich tone standing in for a recorded vowel."""
+    period = RATE // 160  # 160 Hz fundamental, an exact number of samples
+    cycle = array("h")
+    for i in range(period):
+        t = i / RATE
+        v = sum(math.sin(2 * math.pi * 160 * k * t) / k for k in range(1, 6))
+        cycle.append(int(level * v / 2.3))
+    n = int(seconds * RATE)
+    return (cycle * (n // period + 1))[:n]
+
+
+def fixture(lead=1.0, speech=1.0, tail=3.0):
+    pcm = noise(lead, 100) + voiced(speech) + noise(tail, 100, seed=1)
+    return pcm.tobytes(), lead + speech
+
+
+def end_latency(pcm, speech_end, is_speech, pause):
+    """Audio seconds after ``speech_end`` until the utterance is closed."""
+    started = False
+    silent = 0.0
+    for offset in range(0, len(pcm), BLOCK * 2):
+        block = pcm[offset : offset + BLOCK * 2]
+        t = (offset // 2 + BLOCK) / RATE
+        if is_speech(block):
+            started, silent = True, 0.0
+        elif started:
+            silent += BLOCK / RATE
+            if pause(silent):
+                return t - speech_end
+    return None
+
+
+def test_vad_ends_utterance_sooner_than_pause_threshold():
+    pcm, speech_end = fixture()
+
+    # Before: energy gate with the configured 2 s pause_threshold
+    threshold = max(mic_capture.ENERGY_FLOOR, mic_capture.rms(pcm[: RATE * 2]) * 1.5)
+    before = end_latency(
+        pcm, speech_end, lambda b: mic_capture.rms(b) > threshold, lambda s: s >= 2.0
+    )
+
+    # After: VAD hangover decides when speech is over
+    detector = vad.VAD(hangover=0.3)
+    after = end_latency(
+        pcm, speech_end, detector.process, lambda _s: not detector.active
+    )
+
+    assert before == pytest.approx(2.0, abs=0.11)
+    assert after is not None and after <= 0.45
+    assert after < before / 4
+
+
+def test_noise_floor_adapts_to_new_background():
+    detector = vad.VAD()
+    detector.process(noise(1.0, 100).tobytes())
+    quiet_floor = detector.noise_db
+    detector.process(noise(15.0, 1500, seed=2).tobytes())
+    assert detector.noise_db > quiet_floor + 15
+    # After adapting, the steady fan noise is no longer speech
+    assert detector.process(noise(0.5, 1500, seed=3).tobytes()) is False
+    assert detector.process(voiced(0.3, level=12000).tobytes()) is True
+
+
+def test_record_phrase_with_vad(monkeypatch):
+    cap = mic_capture.MicCapture(buffer_seconds=10)
+    cap.start = lambda: True
+    pcm, _ = fixture(lead=0.5, speech=0.5, tail=1.0)
+    detector = vad.VAD(hangover=0.2)
+    detector.process(noise(1.0, 100).tobytes())  # calibrated by hotword loop
+
+    def speaker():
+        for offset in range(0, len(pcm), BLOCK * 2):
+            cap.feed(pcm[offset : offset + BLOCK * 2])
+            time.sleep(0.005)
+
+    with cap.subscribe("stt") as sub:
+        threading.Thread(target=speaker, daemon=True).start()
+        phrase = mic_capture.record_phrase(sub, timeout=1, preroll=0.0, vad=detector)
+    assert phrase is not None
+    # Ends shortly after the 0.5 s of speech instead of at the buffer end
+    assert len(phrase) < len(pcm) * 0.6
+
+
+def test_spectral_flatness_separates_tone_from_noise():
+    pytest.importorskip("numpy")
+    frame = 480 * 2
+    assert vad.spectral_flatness(voiced(0.03).tobytes()[:frame]) < 0.2
+    assert vad.spectral_flatness(noise(0.03, 3000).tobytes()[:frame]) > 0.45
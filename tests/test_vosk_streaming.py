@@ -0,0 +1,113 @@
+import json
+import threading
+import time
+import types
+
+from modules import mic_capture, vosk_integration
+
+
+class FakeRecognizer:
+    """Treats each non-silent block as a word; silence ends the utterance."""
+
+    def __init__(self, model, rate, grammar=None):
+        self.words = []
+        self.delays = None
+        self.grammar = json.loads(grammar) if grammar else None
+
+    def SetEndpointerDelays(self, *delays):
+        self.delays = delays
+
+    def AcceptWaveform(self, data):
+        if data.strip(b"\x00"):
+            word = data.decode().strip()
+            if self.grammar is not None and word not in " ".join(self.grammar).split():
+                word = "[unk]"
+            self.words.append(word)
+            return False
+        return bool(self.words)
+
+    def Result(self):
+        text, self.words = " ".join(self.words), []
+        return json.dumps({"text": text})
+
+    def PartialResult(self):
+        return json.dumps({"partial": " ".join(self.words)})
+
+    def FinalResult(self):
+        return self.Result()
+
+
+def stub_vosk(monkeypatch, tmp_path):
+    loads = []
+    vosk = types.SimpleNamespace(
+        Model=lambda path: loads.append(path) or object(),
+        KaldiRecognizer=FakeRecognizer,
+    )
+    monkeypatch.setattr(vosk_integration, "vosk", vosk, raising=False)
+    monkeypatch.setattr(vosk_integration, "_IMPORT_ERROR", None)
+    monkeypatch.setattr(vosk_integration, "_models", {})
+    monkeypatch.setattr(
+        vosk_integration, "load_config", lambda: {"vosk_model_path": str(tmp_path)}
+    )
+    return loads
+
+
+def test_model_is_loaded_once(monkeypatch, tmp_path):
+    loads = stub_vosk(monkeypatch, tmp_path)
+    first = vosk_integration.get_model()
+    assert vosk_integration.get_model(str(tmp_path)) is first
+    assert loads == [str(tmp_path)]
+
+
+def test_listen_stream_returns_at_endpoint(monkeypatch, tmp_path):
+    stub_vosk(monkeypatch, tmp_path)
+    cap = mic_capture.MicCapture()
+    cap.start = lambda: True
+    partials = []
+
+    def speaker():
+        for block in (b"open  ", b"browser ", b"\x00\x00"):
+            time.sleep(0.02)
+            cap.feed(block)
+
+    with cap.subscribe("stt") as sub:
+        threading.Thread(target=speaker, daemon=True).start()
+        start = time.monotonic()
+        text = vosk_integration.listen_stream(
+            sub, timeout=1, max_seconds=5, on_partial=partials.append
+        )
+        elapsed = time.monotonic() - start
+
+    assert text == "open browser"
+    assert partials == ["open", "open browser"]
+    # Ends on the endpoint, not after max_seconds
+    assert elapsed < 1
+
+
+def test_listen_stream_gives_up_without_speech(monkeypatch, tmp_path):
+    stub_vosk(monkeypatch, tmp_path)
+    cap = mic_capture.MicCapture()
+    cap.start = lambda: True
+    with cap.subscribe("stt") as sub:
+        cap.feed(b"\x00\x00")
+        assert vosk_integration.listen_stream(sub, timeout=0.1) == ""
+
+
+def test_hotword_recognizer_uses_phrase_grammar(monkeypatch, tmp_path):
+    stub_vosk(monkeypatch, tmp_path)
+    rec = vosk_integration.hotword_recognizer(
+        object(), 16000, ["Hey Assistant", "stop assistant", "hey assistant"]
+    )
+    assert rec.grammar == ["hey assistant", "stop assistant", "[unk]"]
+
+
+def test_measure_hotword_reports_both_modes(monkeypatch, tmp_path):
+    stub_vosk(monkeypatch, tmp_path)
+    block = 3200  # 0.1 s at 16 kHz
+    pcm = b"".join(w.ljust(block).encode() for w in ["weather", "hey", "assistant"])
+    pcm += b"\x00" * block
+    report = vosk_integration.measure_hotword(pcm, ["hey assistant"], model=object())
+    assert set(report) == {"full", "grammar"}
+    assert report["grammar"]["detected_at"] == 0.3
+    assert report["full"]["detected_at"] == 0.3
+    assert report["grammar"]["cpu_load"] >= 0
@@ -0,0 +1,48 @@
+import time
+
+from modules import wait_utils
+
+
+def test_returns_as_soon_as_condition_holds():
+    start = time.monotonic()
+    calls = []
+
+    def ready():
+        calls.append(1)
+        return len(calls) >= 3
+
+    assert wait_utils.wait_until(ready, timeout=1)
+    assert time.monotonic() - start < 0.2
+    # Checked immediately, so a condition that already holds costs no sleep
+    start = time.monotonic()
+    assert wait_utils.wait_until(lambda: True, timeout=1)
+    assert time.monotonic() - start < 0.005
+
+
+def test_times_out_and_treats_errors_as_not_ready():
+    def broken():
+        raise RuntimeError("window vanished")
+
+    start = time.monotonic()
+    assert not wait_utils.wait_until(broken, timeout=0.05)
+    assert 0.05 <= time.monotonic() - start < 0.2
+
+
+def test_backoff_grows_to_max_interval(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(wait_utils.time, "sleep", sleeps.append)
+    monkeypatch.setattr(wait_utils.time, "monotonic", lambda: 0.0)
+    calls = []
+
+    def ready():
+        calls.append(1)
+        return len(calls) > 5
+
+    wait_utils.wait_until(ready, timeout=1, interval=0.01, max_interval=0.04)
+    assert sleeps == [0.01, 0.02, 0.04, 0.04, 0.04]
+
+
+def test_benchmark_actions_finish_when_window_reacts():
+    timings = wait_utils.benchmark(runs=1, delay=0.005)
+    assert timings["focus_window (already active)"] < 0.05
+    assert all(seconds < 0.3 for seconds in timings.values())
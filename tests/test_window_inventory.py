@@ -0,0 +1,138 @@
+import os
+import sys
+import threading
+import time
+import types
+
+from modules import window_inventory
+
+
+class FakeWindows:
+    def __init__(self, *titles):
+        self.titles = list(titles)
+        self.calls = 0
+
+    def getAllWindows(self):
+        self.calls += 1
+        return [types.SimpleNamespace(title=t, _hWnd=i) for i, t in enumerate(self.titles)]
+
+
+def test_find_uses_cached_snapshot():
+    backend = FakeWindows("Inbox - Google Chrome", "Untitled - Notepad", "chrome://settings", "")
+    inv = window_inventory.WindowInventory(backend, ttl=60)
+    assert [w.title for w in inv.find("CHROME")] == ["Inbox - Google Chrome", "chrome://settings"]
+    assert [w.title for w in inv.find("pad")] == ["Untitled - Notepad"]
+    # Short needles fall back to a scan
+    assert [w.title for w in inv.find("no")] == ["Untitled - Notepad"]
+    assert backend.calls == 1
+    assert inv.find("notepad")[0].window.title == "Untitled - Notepad"
+
+
+def test_miss_refreshes_once_and_invalidate_forces_refresh():
+    backend = FakeWindows("Notepad")
+    inv = window_inventory.WindowInventory(backend, ttl=60)
+    inv.find("notepad")
+    backend.titles.append("Calculator")
+    assert [w.title for w in inv.find("calc")] == ["Calculator"]
+    assert backend.calls == 2
+    assert inv.find("missing") == [] and backend.calls == 3
+
+    backend.titles.remove("Notepad")
+    assert inv.titles() == ["Notepad", "Calculator"]
+    inv.invalidate()
+    assert inv.titles() == ["Calculator"]
+
+
+def test_process_names_are_cached_per_pid(monkeypatch):
+    lookups = []
+
+    def process(pid):
+        lookups.append(pid)
+        return types.SimpleNamespace(name=lambda: f"proc{pid}")
+
+    monkeypatch.setattr(window_inventory, "psutil", types.SimpleNamespace(Process=process))
+    monkeypatch.setattr(window_inventory, "_pid_of", lambda win: 100 + win._hWnd % 2)
+    backend = FakeWindows("a one", "b two", "c three")
+    inv = window_inventory.WindowInventory(backend, ttl=0)
+    assert [w.process for w in inv.windows()] == ["proc100", "proc101", "proc100"]
+    backend.titles.append("d four")
+    inv.refresh()
+    assert sorted(lookups) == [100, 101]
+
+
+def test_wmctrl_backend(monkeypatch):
+    output = (
+        "0x01 0 1234 host Terminal - bash\n"
+        "0x02 -1 0 host Desktop\n"
+        "0x03 0 42 host\n"
+    )
+    monkeypatch.setattr(window_inventory.subprocess, "check_output", lambda *a, **k: output)
+    monkeypatch.setattr(window_inventory.platform, "system", lambda: "Linux")
+    monkeypatch.setattr(window_inventory, "_process_name", lambda pid: "bash")
+    inv = window_inventory.WindowInventory(None)
+    assert [(w.title, w.pid, w.process) for w in inv.windows()] == [
+        ("Terminal - bash", 1234, "bash"),
+        ("Desktop", None, None),
+    ]
+
+
+def test_get_inventory_rebinds_to_new_backend():
+    first = FakeWindows("One")
+    second = FakeWindows("Two")
+    assert window_inventory.get_inventory(first).titles() == ["One"]
+    assert window_inventory.get_inventory(first) is window_inventory.get_inventory(first)
+    assert window_inventory.get_inventory(second).titles() == ["Two"]
+
+
+def test_poller_stops_when_idle_and_restarts_on_use(monkeypatch):
+    monkeypatch.setattr(window_inventory, "IDLE_STOP", 0.1)
+    monkeypatch.setattr(window_inventory.platform, "system", lambda: "Windows")
+    inv = window_inventory.WindowInventory(FakeWindows("One"), ttl=60)
+    inv.start(0.02)
+    time.sleep(0.3)
+    assert inv._threads == []
+    idle = inv.refreshes
+    time.sleep(0.1)
+    assert inv.refreshes == idle
+    assert inv.titles() == ["One"]
+    assert inv._threads
+    inv.stop()
+
+
+def test_x11_watcher_sees_stop_without_events(monkeypatch):
+    read_fd, write_fd = os.pipe()
+
+    class FakeDisplay:
+        closed = False
+
+        def screen(self):
+            return types.SimpleNamespace(root=types.SimpleNamespace(change_attributes=lambda **k: None))
+
+        def intern_atom(self, name):
+            return 1
+
+        def pending_events(self):
+            return 0
+
+        def fileno(self):
+            return read_fd
+
+        def close(self):
+            self.closed = True
+
+    disp = FakeDisplay()
+    xlib = types.ModuleType("Xlib")
+    xlib.X = types.SimpleNamespace(PropertyChangeMask=1, PropertyNotify=28)
+    xlib.display = types.SimpleNamespace(Display=lambda: disp)
+    monkeypatch.setitem(sys.modules, "Xlib", xlib)
+    monkeypatch.setattr(window_inventory, "WATCH_TIMEOUT", 0.05)
+    stop = threading.Event()
+    inv = window_inventory.WindowInventory(FakeWindows("One"))
+    watcher = threading.Thread(target=inv._watch_x11, args=(stop,), daemon=True)
+    watcher.start()
+    time.sleep(0.1)
+    stop.set()
+    watcher.join(1)
+    os.close(read_fd)
+    os.close(write_fd)
+    assert not watcher.is_alive() and disp.closed
@@ -1,4 +1,5 @@
 import importlib
+import time
 import types
 from modules.window_tools import close_taskbar_item, minimize_window, focus_window
 
@@ -142,3 +143,32 @@ def test_focus_window_success(monkeypatch):
     assert ok
     assert mock_win.activated
     assert 'activated' in msg.lower()
+
+
+def test_focus_and_type_report_windows_that_never_activate(monkeypatch):
+    wt = importlib.import_module('modules.window_tools')
+    other = types.SimpleNamespace(title='Other')
+
+    class MockWin:
+        def __init__(self, title):
+            self.title = title
+        def activate(self):
+            pass
+
+    mock_gw = types.SimpleNamespace(
+        getAllTitles=lambda: ['Notepad'],
+        getWindowsWithTitle=lambda t: [MockWin(t)],
+        getActiveWindow=lambda: other,
+    )
+    typed = []
+    monkeypatch.setattr(wt, 'gw', mock_gw)
+    monkeypatch.setattr(wt, 'pyautogui', types.SimpleNamespace(write=lambda text, interval=0.05: typed.append(text)))
+    monkeypatch.setattr(wt, '_IMPORT_ERROR', None)
+    monkeypatch.setattr(wt, '_PYAUTOGUI_ERROR', None)
+
+    start = time.monotonic()
+    ok, msg = wt.focus_window('notepad')
+    assert not ok and 'front' in msg
+    assert time.monotonic() - start < 1.0
+    ok, msg = wt.type_in_window('notepad', 'secret')
+    assert not ok and typed == []